@@ -0,0 +1,86 @@
+"""
+Time for a local asyncua client to browse the full data model, with flat and with sharded sensor folders.
+Run from the repository root: python -m Benchmark.browse_tree --sensors 20000 --folder-sizes 0 1000 100
+"""
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+
+from asyncua import Client, Node
+from asyncua import ua
+from asyncua.ua import NodeClass
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.OpcUa import ServerConfiguration
+from MyServer.Sensor import TemperatureSensor
+
+PORT: int = 48490
+FOLDER_TYPE: ua.NodeId = ua.NodeId(ua.ObjectIds.FolderType)
+
+
+async def browse(node: Node, folders_only: bool) -> tuple[int, int]:
+    """
+    Browse a subtree, one Browse service call per node.
+    :param node: Root of the subtree.
+    :param folders_only: Only descend into folders, that is, list the sensors without their variables.
+    :return: Number of nodes found and number of browse calls.
+    """
+    children = await node.get_children_descriptions()
+    nodes, calls = len(children), 1
+    for child in children:
+        if child.NodeClass != NodeClass.Object:
+            continue
+        if not folders_only or child.TypeDefinition == FOLDER_TYPE:
+            child_nodes, child_calls = await browse(Node(node.session, child.NodeId), folders_only)
+            nodes += child_nodes
+            calls += child_calls
+    return nodes, calls
+
+
+async def measure(sensors: int, max_folder_size: int) -> tuple[float, float, float, int, int]:
+    """:return: Setup time, time to list the sensors, full browse time, number of nodes and number of browse calls."""
+    model: MachineModel = MachineModel()
+    for i in range(sensors):
+        model.add_sensor(TemperatureSensor(i, updates_per_second=0.1))
+    configuration = ServerConfiguration(company="Benchmark", ip_address="0.0.0.0", fields=[], port=PORT,
+                                        max_folder_size=max_folder_size)
+    with tempfile.TemporaryDirectory() as directory:
+        server = OpcUaTestServer(machine=model, server_configuration=configuration,
+                                 machine_model_file=f"{directory}/model.json")
+        start: float = time.perf_counter()
+        await server.setup_server()
+        setup: float = time.perf_counter() - start
+        try:
+            async with Client(url=server.end_point.replace("0.0.0.0", "127.0.0.1")) as client:
+                root: Node = [x for x in await client.nodes.objects.get_children()
+                              if (await x.read_browse_name()).Name == configuration.sensors][0]
+                start = time.perf_counter()
+                await browse(root, folders_only=True)
+                listing: float = time.perf_counter() - start
+                start = time.perf_counter()
+                nodes, calls = await browse(root, folders_only=False)
+                elapsed: float = time.perf_counter() - start
+        finally:
+            await server.stop()
+    return setup, listing, elapsed, nodes, calls
+
+
+async def main(sensors: int, folder_sizes: list[int]):
+    print(f"{sensors} sensors")
+    print(f"{'folder size':>11} {'setup s':>9} {'list s':>9} {'browse s':>9} {'nodes':>9} {'calls':>7}")
+    for size in folder_sizes:
+        setup, listing, elapsed, nodes, calls = await measure(sensors, size)
+        print(f"{size if size > 0 else 'flat':>11} {setup:>9.2f} {listing:>9.3f} {elapsed:>9.2f} {nodes:>9} {calls:>7}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the browse time of the full sensor tree.")
+    parser.add_argument("--sensors", type=int, default=20000, help="Number of sensors")
+    parser.add_argument("--folder-sizes", type=int, nargs="+", default=[0, 1000, 100],
+                        help="Maximum folder sizes to compare, 0 for one flat folder")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.sensors, args.folder_sizes))
@@ -0,0 +1,262 @@
+"""
+Load of many OPC UA client sessions on the server: the sessions run in client processes of their own and subscribe to
+subsets of the sensor Value nodes at given publishing intervals. Reported per number of sensors and of sessions: the
+values written per second (below sensors times rate if the server falls behind), the notifications per second, the
+latency from the source time stamp of a value to its receipt, the updates missed by the sessions (written while
+subscribed, but not received), the CPU time of the server process and the sessions which lost their subscription.
+Run from the repository root:
+python -m Benchmark.client_swarm --sensors 1000 4000 --clients 1 8 32 --subscribed 250 --intervals 0.1 0.5
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import math
+import multiprocessing
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from asyncua import Client, ua
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.OpcUa import ServerConfiguration, sensor_node_id, VALUE
+from MyServer.Sensor import TemperatureSensor
+
+PORT: int = 48500
+BIN: float = 0.0001
+"""Width of the latency histogram bins in seconds."""
+BINS: int = 100000
+"""Bins of the latency histogram, the last one takes the latencies of 10 s and more."""
+
+
+class _Handler:
+    """Counts the notifications of a session per sensor and their latencies, for the values written while measuring."""
+
+    def __init__(self, histogram: list[int]):
+        self.start: float = math.inf
+        self.stop: float = math.inf
+        self.received: dict[int, int] = {}
+        self.histogram: list[int] = histogram
+        self.lost: bool = False
+
+    def datachange_notification(self, node, val, data):
+        now: datetime = datetime.now(timezone.utc)
+        source: datetime | None = data.monitored_item.Value.SourceTimestamp
+        if source is None:
+            return
+        if source.tzinfo is None:
+            source = source.replace(tzinfo=timezone.utc)
+        if not self.start <= source.timestamp() < self.stop:
+            return
+        identifier: int = node.nodeid.Identifier
+        self.received[identifier] = self.received.get(identifier, 0) + 1
+        self.histogram[min(BINS - 1, max(0, int((now - source).total_seconds() / BIN)))] += 1
+
+    def status_change_notification(self, status):
+        self.lost = True  # the subscription timed out or was closed by the server
+
+
+def subset(session: int, sensors: int, subscribed: int) -> range:
+    """Positions of the sensors a session subscribes to: a slice shifted by the session, wrapping around."""
+    count: int = sensors if subscribed <= 0 else min(subscribed, sensors)
+    start: int = session * count % sensors
+    return range(start, start + count)
+
+
+async def swarm(sessions: list[int], node_ids: list[int], namespace_uri: str, subscribed: int,
+                intervals: list[float], rate: float, window, ready, start,
+                stop) -> tuple[dict[int, int], list[int], int]:
+    """
+    Run sessions of a client process.
+    :return: Notifications received per node ID, summed over the sessions, the latency histogram and the number of
+    sessions which lost their subscription or connection.
+    """
+    histogram: list[int] = [0] * BINS
+    clients: list[Client] = []
+    handlers: list[_Handler] = []
+
+    async def connect(session: int):
+        client = Client(url=f"opc.tcp://127.0.0.1:{PORT}/freeopcua/server/", timeout=60)
+        handler = _Handler(histogram)
+        clients.append(client)
+        handlers.append(handler)
+        try:
+            await subscribe(session, client, handler)
+        except (ConnectionError, TimeoutError, OSError, ua.UaError):
+            handler.lost = True
+
+    async def subscribe(session: int, client: Client, handler: _Handler):
+        await client.connect()
+        idx: int = await client.get_namespace_index(namespace_uri)
+        interval: float = intervals[session % len(intervals)]
+        subscription = await client.create_subscription(interval * 1000, handler, queue_maxsize=0)
+        nodes = [client.get_node(ua.NodeId(node_ids[x % len(node_ids)], idx))
+                 for x in subset(session, len(node_ids), subscribed)]
+        # queues every update written within a publishing interval, they are counted as missed otherwise
+        await subscription.subscribe_data_change(nodes, queuesize=max(1, math.ceil(rate * interval)),
+                                                 sampling_interval=0)
+
+    await asyncio.gather(*(connect(x) for x in sessions))
+    ready.set()
+    await asyncio.to_thread(start.wait)
+    for handler in handlers:
+        handler.start = window[0]
+    await asyncio.to_thread(stop.wait)
+    for handler in handlers:
+        handler.stop = window[1]
+    await asyncio.sleep(max(intervals) + 1.0)  # the values written before the end are still on their way
+    lost: int = 0
+    for client, handler in zip(clients, handlers):
+        try:
+            await client.disconnect()
+        except (ConnectionError, TimeoutError, ua.UaError):
+            handler.lost = True
+        lost += handler.lost
+    received: dict[int, int] = {}
+    for handler in handlers:
+        for identifier, count in handler.received.items():
+            received[identifier] = received.get(identifier, 0) + count
+    return received, histogram, lost
+
+
+def run_swarm(sessions: list[int], node_ids: list[int], namespace_uri: str, subscribed: int, intervals: list[float],
+              rate: float, window, ready, start, stop, results):
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger("asyncua").setLevel(logging.CRITICAL)  # lost sessions are counted, not logged per request
+    results.put(asyncio.run(swarm(sessions, node_ids, namespace_uri, subscribed, intervals, rate, window, ready,
+                                  start, stop)))
+
+
+def percentile(histogram: list[int], fraction: float) -> float:
+    """Latency in seconds below which a fraction of the notifications were received."""
+    target: float = fraction * sum(histogram)
+    total: int = 0
+    for index, count in enumerate(histogram):
+        total += count
+        if count and total >= target:
+            return (index + 1) * BIN
+    return 0.0
+
+
+async def measure(sensors: int, clients: int, processes: int, subscribed: int, intervals: list[float], rate: float,
+                  seconds: float) -> dict[str, float]:
+    model: MachineModel = MachineModel()
+    for i in range(sensors):
+        model.add_sensor(TemperatureSensor(i, updates_per_second=rate), random_seed=i)
+    configuration = ServerConfiguration(company="Benchmark", ip_address="0.0.0.0", fields=[], port=PORT)
+    written: dict[int, int] = {}
+    measuring: list[bool] = [False]
+
+    def counter(identifier: int):
+        async def count(ts: datetime, v: float):
+            if measuring[0]:
+                written[identifier] = written.get(identifier, 0) + 1
+
+        return count
+
+    node_ids: list[int] = [sensor_node_id(x.sensor_type, x.identifier, VALUE) for x in model.sensors]
+    for sensor, node_id in zip(model.sensors, node_ids):
+        sensor.add_callback(counter(node_id))
+    with tempfile.TemporaryDirectory() as directory:
+        server = OpcUaTestServer(machine=model, server_configuration=configuration,
+                                 machine_model_file=f"{directory}/model.json", freq=0.0)
+        await server.setup_server()
+        context = multiprocessing.get_context("spawn")
+        start, stop, results = context.Event(), context.Event(), context.Queue()
+        window = context.Array("d", 2)  # POSIX times of the start and of the end of the measurement
+        readies = []
+        workers = []
+        for p in range(min(processes, clients)):
+            ready = context.Event()
+            worker = context.Process(target=run_swarm,
+                                     args=(list(range(p, clients, processes)), node_ids,
+                                           server.get_uri(configuration.sensors), subscribed, intervals, rate,
+                                           window, ready, start, stop, results))
+            worker.start()
+            readies.append(ready)
+            workers.append(worker)
+        try:
+            while not all(x.is_set() for x in readies):  # the sessions are set up before measuring
+                await asyncio.sleep(0.1)
+            window[0] = time.time()
+            measuring[0] = True
+            start.set()
+            start_cpu: float = time.process_time()
+            start_time: float = time.perf_counter()
+            await asyncio.sleep(seconds)
+            measuring[0] = False
+            window[1] = time.time()
+            stop.set()
+            elapsed: float = time.perf_counter() - start_time
+            cpu: float = (time.process_time() - start_cpu) / elapsed
+            received: dict[int, int] = {}
+            histogram: list[int] = [0] * BINS
+            lost: int = 0
+            for _ in workers:
+                part, part_histogram, part_lost = await asyncio.to_thread(results.get)
+                lost += part_lost
+                for identifier, count in part.items():
+                    received[identifier] = received.get(identifier, 0) + count
+                histogram = [a + b for a, b in zip(histogram, part_histogram)]
+            for worker in workers:
+                await asyncio.to_thread(worker.join)
+        finally:
+            await server.stop()
+    # every session subscribing to a sensor should receive each of its updates
+    subscriptions: dict[int, int] = {}
+    for session in range(clients):
+        for position in subset(session, sensors, subscribed):
+            node_id: int = node_ids[position % sensors]
+            subscriptions[node_id] = subscriptions.get(node_id, 0) + 1
+    expected: int = sum(written.get(x, 0) * n for x, n in subscriptions.items())
+    missed: int = sum(max(0, written.get(x, 0) * n - received.get(x, 0)) for x, n in subscriptions.items())
+    notifications: int = sum(received.values())
+    return {
+        "sensors": sensors,
+        "clients": clients,
+        "updates/s": round(sum(written.values()) / elapsed, 1),
+        "notifications/s": round(notifications / elapsed, 1),
+        "p50 ms": round(percentile(histogram, 0.5) * 1000, 1),
+        "p99 ms": round(percentile(histogram, 0.99) * 1000, 1),
+        "missed %": round(missed / expected * 100 if expected else 0.0, 2),
+        "server CPU %": round(cpu * 100, 1),
+        "lost sessions": lost
+    }
+
+
+async def main(sensors: list[int], clients: list[int], processes: int, subscribed: int, intervals: list[float],
+               rate: float, seconds: float, output: str):
+    print(f"sensors at {rate:g} Hz, {subscribed or 'all'} subscribed per session, publishing every "
+          f"{', '.join(f'{x:g}' for x in intervals)} s, {processes} client processes")
+    rows: list[dict[str, float]] = []
+    for sensor_count in sensors:
+        for client_count in clients:
+            row = await measure(sensor_count, client_count, processes, subscribed, intervals, rate, seconds)
+            if not rows:
+                print(" ".join(f"{x:>15}" for x in row))
+            print(" ".join(f"{x:>15}" for x in row.values()))
+            rows.append(row)
+    if output:
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the server under the load of many client sessions.")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[1000, 4000], help="Numbers of simulated sensors")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32], help="Numbers of client sessions")
+    parser.add_argument("--processes", type=int, default=4, help="Client processes the sessions are spread over")
+    parser.add_argument("--subscribed", type=int, default=250, help="Sensors per session, 0 for all")
+    parser.add_argument("--intervals", type=float, nargs="+", default=[0.1, 0.5],
+                        help="Publishing intervals in seconds, assigned to the sessions in turn")
+    parser.add_argument("--rate", type=float, default=10.0, help="Updates per second of every sensor")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measurement time per run")
+    parser.add_argument("--output", default="", help="CSV file for the rows, for example to plot scaling curves")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(main(args.sensors, args.clients, args.processes, args.subscribed, args.intervals, args.rate,
+                     args.seconds, args.output))
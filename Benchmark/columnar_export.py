@@ -0,0 +1,96 @@
+"""
+Time to encode and to decode the current values of many sensors in the formats of /v0.1/values and /v0.1/history:
+json, Arrow IPC stream and msgpack, see MyServer/Api/v0_1/columnar.py.
+Run from the repository root: python -m Benchmark.columnar_export --sensors 10000 100000 --depth 10
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+import msgpack
+import numpy as np
+import pyarrow as pa
+from starlette.requests import Request
+
+from MyServer.Api.v0_1.columnar import columnar_response, JSON_MEDIA_TYPE, ARROW_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+from MyServer.Recording import ValueHistory, SENSOR_TYPES
+from MyServer.Recording.value_history import TYPE_COLUMN
+from MyServer.Sensor import TemperatureSensor
+
+START: datetime = datetime(2024, 1, 1)
+
+
+def request(media_type: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"",
+                    "headers": [(b"accept", media_type.encode("ascii"))]})
+
+
+def decode_json(content: bytes) -> Any:
+    return json.loads(content)
+
+
+def decode_arrow(content: bytes) -> Any:
+    return pa.ipc.open_stream(content).read_all()
+
+
+def decode_msgpack(content: bytes) -> Any:
+    return {name: np.frombuffer(column["data"], dtype=column["dtype"]) if "data" in column else column
+            for name, column in msgpack.unpackb(content).items()}
+
+
+DECODERS: dict[str, tuple[str, Callable[[bytes], Any]]] = {
+    JSON_MEDIA_TYPE: ("json", decode_json),
+    ARROW_MEDIA_TYPE: ("arrow", decode_arrow),
+    MSGPACK_MEDIA_TYPE: ("msgpack", decode_msgpack)
+}
+
+
+async def filled(sensors: int, depth: int) -> ValueHistory:
+    sensor_list = [TemperatureSensor(i) for i in range(sensors)]
+    history: ValueHistory = ValueHistory(sensor_list, depth)
+    history.start()
+    for sample in range(depth):
+        for sensor in sensor_list:
+            await sensor.on_new_data(START + timedelta(seconds=sample), 20.0 + sample)
+    return history
+
+
+def measure(sensors: int, depth: int, repetitions: int) -> list[tuple[str, str, float, float, int]]:
+    history: ValueHistory = asyncio.run(filled(sensors, depth))
+    dictionaries: dict[str, list[str]] = {TYPE_COLUMN: [str(x) for x in SENSOR_TYPES]}
+    results: list[tuple[str, str, float, float, int]] = []
+    for name, read in (("values", history.latest), ("history", history.window)):
+        columns = read()
+        for media_type, (label, decode) in DECODERS.items():
+            start: float = time.perf_counter()
+            for _ in range(repetitions):
+                content: bytes = columnar_response(request(media_type), columns, dictionaries).body
+            encoded: float = (time.perf_counter() - start) / repetitions * 1000
+            start = time.perf_counter()
+            for _ in range(repetitions):
+                decode(content)
+            decoded: float = (time.perf_counter() - start) / repetitions * 1000
+            results.append((name, label, encoded, decoded, len(content)))
+    return results
+
+
+def main(sensors: list[int], depth: int, repetitions: int):
+    logging.disable(logging.CRITICAL)
+    print(f"{'sensors':>8} {'request':>8} {'format':>8} {'encode ms':>10} {'decode ms':>10} {'bytes':>10}")
+    for count in sensors:
+        for name, media_type, encoded, decoded, size in measure(count, depth, repetitions):
+            print(f"{count:>8} {name:>8} {media_type:>8} {encoded:>10.2f} {decoded:>10.2f} {size:>10}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the time to export the sensor values.")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[10000, 100000], help="Numbers of sensors")
+    parser.add_argument("--depth", type=int, default=10, help="Samples kept per sensor")
+    parser.add_argument("--repetitions", type=int, default=5, help="Encodings per measurement")
+    args = parser.parse_args()
+    main(args.sensors, args.depth, args.repetitions)
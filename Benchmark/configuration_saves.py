@@ -0,0 +1,57 @@
+"""
+Time a configuration change blocks the event loop, rewriting the whole file against appending to the journal.
+Run from the repository root: python -m Benchmark.configuration_saves --sensors 1000 10000 50000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from MyServer.Lifetime import MachineModel
+from MyServer.Sensor import TemperatureSensor
+
+
+def measure(sensors: int, changes: int) -> tuple[float, float, float]:
+    """
+    Add sensors, then change one driver repeatedly.
+    :return: Milliseconds per change with a full save and with the journal, and the milliseconds of the final close.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        model: MachineModel = MachineModel()
+        for i in range(sensors):
+            model.add_sensor(TemperatureSensor(i))
+        file_path: str = os.path.join(directory, "full.json")
+        start: float = time.perf_counter()
+        for _ in range(changes):
+            model.save_configuration(file_path)
+        full: float = (time.perf_counter() - start) / changes
+
+        journaled: MachineModel = MachineModel()
+        journal_path: str = os.path.join(directory, "journaled.json")
+        journaled.open_journal(journal_path)
+        for i in range(sensors):
+            journaled.add_sensor(TemperatureSensor(i))
+        sensor_id = journaled.sensors[0].sensor_id
+        start = time.perf_counter()
+        for _ in range(changes):
+            journaled.record_change(sensor_id)
+        record: float = (time.perf_counter() - start) / changes
+        start = time.perf_counter()
+        journaled.close_journal()  # waits for the writer thread
+        close: float = time.perf_counter() - start
+    return full * 1000, record * 1000, close * 1000
+
+
+def main(sensors: list[int], changes: int):
+    print(f"{'sensors':>8} {'full save ms':>13} {'journal ms':>11} {'writer drain ms':>16}")
+    for count in sensors:
+        full, record, close = measure(count, changes)
+        print(f"{count:>8} {full:>13.3f} {record:>11.4f} {close:>16.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the cost of a configuration change.")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[1000, 10000, 50000], help="Numbers of sensors")
+    parser.add_argument("--changes", type=int, default=20, help="Changes per measurement")
+    args = parser.parse_args()
+    main(args.sensors, args.changes)
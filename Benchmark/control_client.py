@@ -0,0 +1,54 @@
+"""
+Time to add sensors through the control API: one request per sensor, as with ad-hoc requests, against the queued
+operations of ControlClient, sent to /v0.1/add_sensors. The app is called in the process, without network.
+Run from the repository root: python -m Benchmark.control_client --sensors 1000 10000
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from MyServer import OpcUaTestServer
+from MyServer.Client import ControlClient
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import SensorConfig, SensorType
+from main import app
+
+
+def configs(sensors: int) -> list[SensorConfig]:
+    return [SensorConfig(type=SensorType.TEMPERATURE, identifier=i, simulator_config=None) for i in range(sensors)]
+
+
+async def one_by_one(sensors: int) -> tuple[float, int]:
+    app.state.server = OpcUaTestServer(machine=MachineModel())
+    start: float = time.perf_counter()
+    for config in configs(sensors):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            (await client.post("/v0.1/add_sensor", json=config.model_dump(mode="json"))).raise_for_status()
+    return time.perf_counter() - start, sensors
+
+
+async def queued(sensors: int) -> tuple[float, int]:
+    app.state.server = OpcUaTestServer(machine=MachineModel())
+    start: float = time.perf_counter()
+    async with ControlClient(transport=httpx.ASGITransport(app=app)) as client:
+        await client.add_sensors(configs(sensors))
+    return time.perf_counter() - start, client.sent
+
+
+def main(sensors: list[int]):
+    logging.disable(logging.CRITICAL)
+    print(f"{'sensors':>8} {'client':>12} {'s':>8} {'requests':>9}")
+    for count in sensors:
+        for name, measure in (("one by one", one_by_one), ("queued", queued)):
+            seconds, requests = asyncio.run(measure(count))
+            print(f"{count:>8} {name:>12} {seconds:>8.2f} {requests:>9}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the time to add sensors through the control API.")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[1000, 10000], help="Numbers of sensors")
+    args = parser.parse_args()
+    main(args.sensors)
@@ -0,0 +1,86 @@
+"""
+Memory and CPU time per machine of a fleet, with the shared scheduler and with one polling task per sensor.
+Run from the repository root: python -m Benchmark.fleet_hosting --machines 500 --sensors 10 --rate 1
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from MyServer.Fleet import Fleet, FleetScheduler, MachineTemplate
+from MyServer.Lifetime import MachineModel
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+
+
+def make_template(sensors: int, rate: float) -> MachineTemplate:
+    model: MachineModel = MachineModel()
+    for i in range(sensors):
+        sensor = TemperatureSensor(i, updates_per_second=rate) if i % 2 == 0 \
+            else PressureSensor(i, updates_per_second=rate)
+        model.add_sensor(sensor)
+    return MachineTemplate.from_model(model)
+
+
+async def measure(machines: int, sensors: int, rate: float, seconds: float, shared: bool) -> tuple[float, float, float]:
+    """
+    Build and run the fleet.
+    :return: Bytes per machine, samples per second and CPU seconds per real second.
+    """
+    template: MachineTemplate = make_template(sensors, rate)
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+    fleet: Fleet = Fleet()
+    for i in range(machines):
+        fleet.add_machine(f"Machine{i:04d}", template)
+    received: list[int] = [0]
+
+    async def count(ts, v):
+        received[0] += 1
+
+    for sensor in fleet.sensors:
+        sensor.add_callback(count)
+    scheduler: FleetScheduler = FleetScheduler(fleet.mutators)
+    task: asyncio.Task | None = None
+    if shared:
+        scheduler.start()
+        task = asyncio.create_task(scheduler.run())
+    else:
+        for sensor in fleet.sensors:
+            sensor.start()
+    await asyncio.sleep(0.5)
+    memory: int = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    await asyncio.sleep(1.0)  # tracing slows down the first samples, let them settle
+    start_samples: int = received[0]
+    start: float = time.perf_counter()
+    start_cpu: float = time.process_time()
+    await asyncio.sleep(seconds)
+    elapsed: float = time.perf_counter() - start
+    cpu: float = time.process_time() - start_cpu
+    samples: int = received[0] - start_samples
+    if task is not None:
+        task.cancel()
+        await scheduler.stop()
+    for sensor in fleet.sensors:
+        if sensor.running:
+            sensor.stop()
+    return memory / machines, samples / elapsed, cpu / elapsed
+
+
+async def main(machines: int, sensors: int, rate: float, seconds: float):
+    print(f"{machines} machines with {sensors} sensors at {rate:g} Hz, "
+          f"{machines * sensors * rate:,.0f} samples/s requested")
+    print(f"{'polling':>10} {'kB/machine':>11} {'samples/s':>10} {'CPU load':>9}")
+    for shared in (False, True):
+        memory, samples, load = await measure(machines, sensors, rate, seconds, shared)
+        print(f"{'shared' if shared else 'per sensor':>10} {memory / 1024:>11.1f} {samples:>10,.0f} {load:>9.1%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the cost per machine of a fleet.")
+    parser.add_argument("--machines", type=int, default=500, help="Number of machines")
+    parser.add_argument("--sensors", type=int, default=10, help="Sensors per machine")
+    parser.add_argument("--rate", type=float, default=1.0, help="Updates per second of every sensor")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Measurement time per run")
+    args = parser.parse_args()
+    asyncio.run(main(args.machines, args.sensors, args.rate, args.seconds))
@@ -0,0 +1,73 @@
+"""
+Sensors per Modbus request and achieved sample rate with block register reads against per-sensor reads, for sensors
+with float32 values in contiguous holding registers of one device. The stand-in answers after a fixed latency, like
+the cycle time of a PLC, and requests on the connection are sent one after another.
+Run from the repository root: python -m Benchmark.modbus_block_reads --sensors 10 100 1000 --rate 10 --latency 0.002
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from MyServer.Modbus import ModbusConnection, ModbusDevice, ModbusDriver, ModbusStandIn, RegisterSpec, RegisterType, \
+    MAX_REGISTERS
+from MyServer.Sensor import TemperatureSensor
+
+
+async def measure(sensors: int, rate: float, latency: float, max_registers: int, seconds: float) \
+        -> tuple[int, int, int, float]:
+    """:return: Requests, values read, samples received and mean seconds from poll to value."""
+    stand_in = ModbusStandIn(latency=latency)
+    await stand_in.start()
+    device = ModbusDevice(ModbusConnection("127.0.0.1", stand_in.port), max_registers=max_registers)
+    received: int = 0
+    delays: list[float] = []
+    drivers: list[ModbusDriver] = []
+    for i in range(sensors):
+        sensor = TemperatureSensor(i, updates_per_second=rate)
+        driver = ModbusDriver(sensor, device, RegisterSpec(RegisterType.HOLDING, 2 * i))
+
+        async def measure_timed(driver=driver) -> float:
+            start: float = time.perf_counter()
+            value: float = await driver.measure()
+            delays.append(time.perf_counter() - start)
+            return value
+
+        sensor.source = measure_timed
+        drivers.append(driver)
+
+        async def count(ts, v):
+            nonlocal received
+            received += 1
+
+        sensor.add_callback(count)
+    for driver in drivers:
+        driver.sensor.start()
+    await asyncio.sleep(seconds)
+    for driver in drivers:
+        driver.sensor.stop()
+    await asyncio.sleep(0.1)  # reads in flight
+    await device.connection.close()
+    await stand_in.close()
+    return device.requests, device.reads, received, sum(delays) / max(1, len(delays))
+
+
+async def main(sensor_counts: list[int], rate: float, latency: float, seconds: float):
+    print(f"sensors at {rate:g} Hz, {latency * 1000:g} ms device latency, {seconds:g} s per run")
+    print(f"{'mode':>8} {'sensors':>8} {'requests/s':>10} {'sensors/request':>15} {'samples/s':>10} {'delay':>9}")
+    for sensors in sensor_counts:
+        for mode, max_registers in (("single", 2), ("block", MAX_REGISTERS)):
+            requests, reads, received, delay = await measure(sensors, rate, latency, max_registers, seconds)
+            print(f"{mode:>8} {sensors:>8} {requests / seconds:>10.1f} {reads / max(1, requests):>15.1f} "
+                  f"{received / seconds:>10.1f} {delay * 1000:>7.1f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare block register reads with one request per sensor.")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[10, 100, 1000], help="Numbers of sensors")
+    parser.add_argument("--rate", type=float, default=10.0, help="Updates per second of every sensor")
+    parser.add_argument("--latency", type=float, default=0.002, help="Seconds the device takes to answer")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Measurement time per run")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.sensors, args.rate, args.latency, args.seconds))
@@ -0,0 +1,120 @@
+"""
+Server CPU time per consumer for client/server subscriptions and for PubSub multicast, for an increasing number of
+consumers which all want every sensor. The consumers run in a process of their own, so only the server is measured.
+Run from the repository root: python -m Benchmark.pubsub_fan_out --sensors 2000 --rate 10 --consumers 1 4 16
+"""
+import argparse
+import asyncio
+import dataclasses
+import logging
+import multiprocessing
+import tempfile
+import time
+
+from asyncua import Client, ua
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.OpcUa import ServerConfiguration, sensor_node_id, VALUE
+from MyServer.PubSub import UadpSubscriber, udp_address
+from MyServer.Sensor import TemperatureSensor
+
+PORT: int = 48470
+PUBSUB_URL: str = "opc.udp://239.255.0.2:48471"
+INTERFACE: str = "127.0.0.1"
+INTERVAL: float = 0.1
+"""Publishing interval of the subscriptions and of the publisher."""
+
+
+class _Handler:
+    def __init__(self):
+        self.notifications: int = 0
+
+    def datachange_notification(self, node, val, data):
+        self.notifications += 1
+
+
+async def consume(mode: str, consumers: int, node_ids: list[int], namespace_uri: str, seconds: float,
+                  ready) -> int:
+    """Receive all sensors with a number of consumers. :return: Data changes or network messages received."""
+    if mode == "pubsub":
+        subscribers = [UadpSubscriber(udp_address(PUBSUB_URL), interface=INTERFACE) for _ in range(consumers)]
+        for subscriber in subscribers:
+            await subscriber.start()
+        ready.set()
+        await asyncio.sleep(seconds)
+        for subscriber in subscribers:
+            subscriber.close()
+        return sum(x.received for x in subscribers)
+
+    clients = [Client(url=f"opc.tcp://127.0.0.1:{PORT}/freeopcua/server/") for _ in range(consumers)]
+    handlers = [_Handler() for _ in range(consumers)]
+    for client, handler in zip(clients, handlers):
+        await client.connect()
+        idx: int = await client.get_namespace_index(namespace_uri)
+        subscription = await client.create_subscription(INTERVAL * 1000, handler)
+        await subscription.subscribe_data_change([client.get_node(ua.NodeId(x, idx)) for x in node_ids])
+    ready.set()
+    await asyncio.sleep(seconds)
+    for client in clients:
+        await client.disconnect()
+    return sum(x.notifications for x in handlers)
+
+
+def run_consumers(mode: str, consumers: int, node_ids: list[int], namespace_uri: str, seconds: float,
+                  ready, results):
+    results.put(asyncio.run(consume(mode, consumers, node_ids, namespace_uri, seconds, ready)))
+
+
+async def measure(mode: str, sensors: int, rate: float, consumers: int, seconds: float) -> tuple[float, int]:
+    """:return: Server CPU seconds per second and number of data changes or messages received by the consumers."""
+    model: MachineModel = MachineModel()
+    for i in range(sensors):
+        model.add_sensor(TemperatureSensor(i, updates_per_second=rate), random_seed=i)
+    configuration = ServerConfiguration(company="Benchmark", ip_address="0.0.0.0", fields=[], port=PORT,
+                                        publishing_interval=INTERVAL)
+    if mode == "pubsub":
+        configuration = dataclasses.replace(configuration, pubsub_url=PUBSUB_URL, pubsub_interface=INTERFACE)
+    with tempfile.TemporaryDirectory() as directory:
+        server = OpcUaTestServer(machine=model, server_configuration=configuration,
+                                 machine_model_file=f"{directory}/model.json")
+        await server.setup_server()
+        context = multiprocessing.get_context("spawn")
+        ready, results = context.Event(), context.Queue()
+        node_ids = [sensor_node_id(x.sensor_type, x.identifier, VALUE) for x in model.sensors]
+        process = context.Process(target=run_consumers,
+                                  args=(mode, consumers, node_ids, server.get_uri(configuration.sensors), seconds,
+                                        ready, results))
+        process.start()
+        try:
+            while not ready.is_set():  # the sessions are set up before measuring
+                await asyncio.sleep(0.1)
+            start_cpu: float = time.process_time()
+            start: float = time.perf_counter()
+            await asyncio.sleep(seconds)
+            cpu: float = (time.process_time() - start_cpu) / (time.perf_counter() - start)
+            received: int = await asyncio.to_thread(results.get)
+            await asyncio.to_thread(process.join)
+        finally:
+            await server.stop()
+    return cpu, received
+
+
+async def main(sensors: int, rate: float, consumer_counts: list[int], seconds: float):
+    print(f"{sensors} sensors at {rate:g} Hz, publishing every {INTERVAL:g} s")
+    print(f"{'mode':>13} {'consumers':>9} {'server CPU':>10} {'per consumer':>12} {'received':>10}")
+    for mode in ("client/server", "pubsub"):
+        for consumers in consumer_counts:
+            cpu, received = await measure(mode, sensors, rate, consumers, seconds)
+            print(f"{mode:>13} {consumers:>9} {cpu:>10.1%} {cpu / consumers:>12.2%} {received:>10}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the server CPU time per consumer of subscriptions and PubSub.")
+    parser.add_argument("--sensors", type=int, default=2000, help="Number of simulated sensors")
+    parser.add_argument("--rate", type=float, default=10.0, help="Updates per second of every sensor")
+    parser.add_argument("--consumers", type=int, nargs="+", default=[1, 4, 16], help="Numbers of consumers")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measurement time per run")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.sensors, args.rate, args.consumers, args.seconds))
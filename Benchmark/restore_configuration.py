@@ -0,0 +1,80 @@
+"""
+Time restoring a configuration: one driver at a time from json, as before, against the bulk construction from the
+streamed json file and from a binary snapshot.
+Run from the repository root: python -m Benchmark.restore_configuration --sensors 10000 100000
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import tempfile
+import time
+
+from MyServer.Lifetime import MachineModel
+from MyServer.Sensor import PressureSensor, TemperatureSensor
+
+
+def one_by_one(file_path: str) -> MachineModel:
+    """Restore the way restore_configuration did before, for reference."""
+    model: MachineModel = MachineModel()
+    with open(file_path, "r") as f:
+        entries = json.load(f)
+    for entry in entries:
+        driver = model.create_driver(entry)
+        model._attach(driver)
+        model._sensors.append(driver.sensor)
+        model._drivers.append(driver)
+    return model
+
+
+def restored(file_path: str) -> MachineModel:
+    model: MachineModel = MachineModel()
+    model.restore_configuration(file_path)
+    return model
+
+
+def measure(sensors: int, repeats: int) -> tuple[float, float, float, int, int]:
+    """
+    Save a model of temperature and pressure sensors both ways and restore it, the best of some repeats each.
+    :return: Seconds to restore one by one, from json and from the snapshot, and the sizes of both files in bytes.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        model: MachineModel = MachineModel()
+        for i in range(sensors):
+            model.add_sensor(TemperatureSensor(i) if i % 2 == 0 else PressureSensor(i), random_seed=i)
+        json_path: str = os.path.join(directory, "configuration.json")
+        snapshot_path: str = os.path.join(directory, "configuration.snapshot")
+        model.save_configuration(json_path)
+        model.save_snapshot(snapshot_path)
+        del model
+        gc.collect()  # drivers and sensors reference each other, not to be collected during a restore
+        timings: list[float] = []
+        for restore, file_path in [(one_by_one, json_path), (restored, json_path), (restored, snapshot_path)]:
+            best: float = float("inf")
+            for _ in range(repeats):
+                start: float = time.perf_counter()
+                result: MachineModel = restore(file_path)
+                best = min(best, time.perf_counter() - start)
+                assert len(result.sensors) == sensors
+                del result
+                gc.collect()
+            timings.append(best)
+        return timings[0], timings[1], timings[2], os.path.getsize(json_path), os.path.getsize(snapshot_path)
+
+
+def main(sensors: list[int], repeats: int):
+    logging.disable(logging.CRITICAL)  # one log line per sensor would dominate
+    print(f"{'sensors':>8} {'one by one s':>13} {'json s':>7} {'snapshot s':>11} {'json MB':>8} {'snapshot MB':>12}")
+    for count in sensors:
+        single, streamed, snapshot, json_size, snapshot_size = measure(count, repeats)
+        print(f"{count:>8} {single:>13.2f} {streamed:>7.2f} {snapshot:>11.2f} {json_size / 1e6:>8.1f} "
+              f"{snapshot_size / 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the time to restore a configuration.")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[10000, 100000], help="Numbers of sensors")
+    parser.add_argument("--repeats", type=int, default=3, help="Restores per way, the fastest is reported")
+    args = parser.parse_args()
+    main(args.sensors, args.repeats)
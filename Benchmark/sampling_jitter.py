@@ -0,0 +1,107 @@
+"""
+Sampling jitter under HTTP load, with the OPC UA server on the loop of the API and on a thread of its own.
+Run from the repository root: python -m Benchmark.sampling_jitter --sensors 200 --rate 50 --clients 16
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+from fastapi import FastAPI
+
+from MyServer import OpcUaTestServer, ServerThread
+from MyServer.Api import router_v01
+from MyServer.Lifetime import MachineModel
+from MyServer.Sensor import TemperatureSensor
+
+
+def make_server(sensors: int, rate: float, intervals: list[float], directory: str) -> OpcUaTestServer:
+    model: MachineModel = MachineModel()
+    period: float = 1.0 / rate
+    for i in range(sensors):
+        sensor = TemperatureSensor(i, updates_per_second=rate)
+        model.add_sensor(sensor)
+        last: list[float] = []
+
+        async def callback(ts: datetime, value: float, last: list[float] = last):
+            now = time.perf_counter()
+            if last:
+                intervals.append(now - last[0] - period)
+            last[:] = [now]
+        sensor.add_callback(callback)
+    return OpcUaTestServer(machine=model, machine_model_file=f"{directory}/model.json")
+
+
+async def load(client: httpx.AsyncClient, until: float) -> int:
+    """Request the sensor list until the deadline. Returns the number of requests."""
+    requests: int = 0
+    while time.perf_counter() < until:
+        response = await client.get("/v0.1/get_sensors")
+        response.raise_for_status()
+        requests += 1
+        await asyncio.sleep(0)  # in-process requests never wait for a socket, yield like a network round trip
+    return requests
+
+
+async def measure(isolated: bool, sensors: int, rate: float, clients: int, seconds: float) -> tuple[list[float], int]:
+    intervals: list[float] = []
+    with tempfile.TemporaryDirectory() as directory:
+        server = make_server(sensors, rate, intervals, directory)
+        server_thread = ServerThread(server) if isolated else None
+        if server_thread is not None:
+            server_thread.start()
+        app = FastAPI()
+        app.state.server = server
+        app.include_router(router_v01, prefix="/v0.1")
+        transport = httpx.ASGITransport(app=app)
+        try:
+            await server.execute(server.setup_server)
+            await asyncio.sleep(1.0)  # let the pollers settle
+            intervals.clear()
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                until = time.perf_counter() + seconds
+                if clients > 0:
+                    requests = sum(await asyncio.gather(*(load(client, until) for _ in range(clients))))
+                else:
+                    await asyncio.sleep(seconds)
+                    requests = 0
+            samples = list(intervals)
+        finally:
+            if server_thread is not None:
+                await asyncio.to_thread(server_thread.stop)
+            else:
+                await server.stop()
+    return samples, requests
+
+
+def report(name: str, deviations: list[float], requests: int, seconds: float):
+    absolute = sorted(abs(x) * 1000.0 for x in deviations)
+    if not absolute:
+        print(f"{name:<24} no samples")
+        return
+    p99 = absolute[min(len(absolute) - 1, int(len(absolute) * 0.99))]
+    print(f"{name:<24} {len(absolute):>9} {statistics.fmean(absolute):>9.2f} {p99:>9.2f} {absolute[-1]:>9.2f} "
+          f"{requests / seconds:>9.0f}")
+
+
+async def main(sensors: int, rate: float, clients: int, seconds: float):
+    print(f"{sensors} sensors at {rate:g} Hz, {clients} concurrent HTTP clients, {seconds:g} s per run")
+    print(f"{'setup':<24} {'samples':>9} {'mean ms':>9} {'p99 ms':>9} {'max ms':>9} {'req/s':>9}")
+    for isolated in (False, True):
+        name = "own thread" if isolated else "shared loop"
+        for load_clients in (0, clients):
+            deviations, requests = await measure(isolated, sensors, rate, load_clients, seconds)
+            report(f"{name}, {'loaded' if load_clients else 'idle'}", deviations, requests, seconds)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the sampling jitter under HTTP load.")
+    parser.add_argument("--sensors", type=int, default=200, help="Number of simulated sensors")
+    parser.add_argument("--rate", type=float, default=50.0, help="Updates per second of every sensor")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent HTTP clients")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measurement time per run")
+    args = parser.parse_args()
+    asyncio.run(main(args.sensors, args.rate, args.clients, args.seconds))
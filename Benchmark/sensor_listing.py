@@ -0,0 +1,63 @@
+"""
+Time of a /v0.1/get_sensors request: rebuilt after a change, cached, paged and unchanged (304 Not Modified), and of
+a /v0.1/changes request for the one change a replica missed.
+Run from the repository root: python -m Benchmark.sensor_listing --sensors 10000 100000
+"""
+import argparse
+import logging
+import time
+
+from fastapi.testclient import TestClient
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.Sensor import TemperatureSensor
+from main import app
+
+
+def timed(client: TestClient, repetitions: int, **kwargs) -> tuple[float, int]:
+    """:return: Milliseconds per request and bytes of the last response."""
+    start: float = time.perf_counter()
+    for _ in range(repetitions):
+        response = client.get("/v0.1/get_sensors", **kwargs)
+    return (time.perf_counter() - start) / repetitions * 1000, len(response.content)
+
+
+def measure(sensors: int, repetitions: int) -> list[tuple[str, float, int]]:
+    model: MachineModel = MachineModel()
+    for i in range(sensors):
+        model.add_sensor(TemperatureSensor(i))
+    app.state.server = OpcUaTestServer(machine=model)
+    results: list[tuple[str, float, int]] = []
+    with TestClient(app) as client:
+        start: float = time.perf_counter()
+        model.record_change(model.sensors[0].sensor_id)  # invalidates the listing
+        response = client.get("/v0.1/get_sensors")
+        results.append(("rebuilt", (time.perf_counter() - start) * 1000, len(response.content)))
+        results.append(("cached", *timed(client, repetitions)))
+        results.append(("page of 1000", *timed(client, repetitions, params={"limit": 1000})))
+        results.append(("not modified", *timed(client, repetitions,
+                                               headers={"If-None-Match": response.headers["ETag"]})))
+        since: int = int(response.headers["ETag"].strip('"'))
+        model.record_change(model.sensors[-1].sensor_id)
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            response = client.get("/v0.1/changes", params={"since": since})
+        results.append(("one change", (time.perf_counter() - start) / repetitions * 1000, len(response.content)))
+    return results
+
+
+def main(sensors: list[int], repetitions: int):
+    logging.disable(logging.CRITICAL)
+    print(f"{'sensors':>8} {'request':>13} {'ms':>9} {'bytes':>10}")
+    for count in sensors:
+        for name, milliseconds, size in measure(count, repetitions):
+            print(f"{count:>8} {name:>13} {milliseconds:>9.2f} {size:>10}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the time to list the sensors.")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[10000, 100000], help="Numbers of sensors")
+    parser.add_argument("--repetitions", type=int, default=10, help="Requests per measurement")
+    args = parser.parse_args()
+    main(args.sensors, args.repetitions)
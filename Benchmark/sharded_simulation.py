@@ -0,0 +1,107 @@
+"""
+Throughput of the sharded simulation for an increasing number of worker processes. With --consume, also the ceiling
+of the server process, which hands every sample to its sensor on one core whatever the number of workers.
+Run from the repository root: python -m Benchmark.sharded_simulation --sensors 20000 --rate 100
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+
+from MyServer.Lifetime import MachineModel
+from MyServer.Sensor import TemperatureSensor
+from MyServer.Sensor.Base import LatestValues
+from MyServer.Sharding import ShardedSimulation
+
+
+async def measure(sensors: int, rate: float, shards: int, seconds: float, consume: bool) -> tuple[float, float]:
+    """
+    Run the simulation and count the samples.
+    :return: Samples per second written by the workers and handed to the sensors.
+    """
+    model: MachineModel = MachineModel()
+    for i in range(sensors):
+        model.add_sensor(TemperatureSensor(i, updates_per_second=rate), random_seed=i)
+    simulation = ShardedSimulation(model, shards)
+    simulation.start()
+    try:
+        # wait for the workers to import and build their drivers
+        while simulation.table.samples() < sensors:
+            await asyncio.sleep(0.1)
+        consumed: int = 0
+        written: int = simulation.table.samples()
+        start: float = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            if consume:
+                consumed += await simulation.poll()
+            await asyncio.sleep(0.01)
+        elapsed: float = time.perf_counter() - start
+        written = simulation.table.samples() - written
+    finally:
+        await simulation.stop()
+    return written / elapsed, consumed / elapsed
+
+
+async def ceiling(sensors: int, seconds: float) -> float:
+    """
+    Hand samples to the sensors with the workers stopped and every slot changed before each poll. The sensors have
+    the latest value collector of the server as callback.
+    :return: Samples per second of poll time, the most the server process consumes with any number of workers.
+    """
+    model: MachineModel = MachineModel()
+    for i in range(sensors):
+        model.add_sensor(TemperatureSensor(i), random_seed=i)
+    latest = LatestValues(model.sensors, datetime.now())
+    latest.start()
+    simulation = ShardedSimulation(model, 1)
+    simulation.start()
+    try:
+        while simulation.table.samples() < sensors:
+            await asyncio.sleep(0.1)
+        simulation.table.request_stop()
+        await asyncio.sleep(1.0)  # the worker stops within its poll interval
+        timestamps = simulation.table.timestamps
+        consumed: int = 0
+        busy: float = 0.0
+        start: float = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            timestamps += 1
+            begin: float = time.perf_counter()
+            consumed += await simulation.poll()
+            busy += time.perf_counter() - begin
+    finally:
+        latest.close()
+        await simulation.stop()
+    return consumed / busy
+
+
+async def main(sensors: int, rate: float, max_shards: int, seconds: float, consume: bool):
+    print(f"{sensors} sensors at {rate:g} Hz, {sensors * rate:,.0f} samples/s requested, {os.cpu_count()} CPUs")
+    print(f"{'shards':>6} {'written/s':>12} {'consumed/s':>12} {'speedup':>8} {'consumed':>9}")
+    baseline: float | None = None
+    consumed_baseline: float | None = None
+    shards: int = 1
+    while shards <= max_shards:
+        written, consumed = await measure(sensors, rate, shards, seconds, consume)
+        baseline = baseline or written
+        consumed_baseline = consumed_baseline or consumed or 1.0
+        print(f"{shards:>6} {written:>12,.0f} {consumed:>12,.0f} {written / baseline:>8.2f} "
+              f"{consumed / consumed_baseline:>9.2f}")
+        shards *= 2
+    if consume:
+        print(f"server process ceiling: {await ceiling(sensors, seconds):,.0f} samples/s handed to the sensors")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the throughput of the sharded simulation.")
+    parser.add_argument("--sensors", type=int, default=20000, help="Number of simulated sensors")
+    parser.add_argument("--rate", type=float, default=100.0, help="Updates per second of every sensor")
+    parser.add_argument("--max-shards", type=int, default=os.cpu_count(), help="Largest number of workers")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measurement time per run")
+    parser.add_argument("--consume", action="store_true",
+                        help="Also hand the samples to the sensors in this process, as the server does")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # the stopped sensors log one line each
+    asyncio.run(main(args.sensors, args.rate, args.max_shards, args.seconds, args.consume))
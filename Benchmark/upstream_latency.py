@@ -0,0 +1,106 @@
+"""
+End-to-end latency of the upstream aggregation: simulated upstream OPC UA servers in a process of their own, and a
+concentrator session per upstream feeding local sensors. The latency is measured from the source time stamp of a value
+on the upstream to its arrival at the local sensor, and includes the publishing interval of the subscriptions.
+Run from the repository root: python -m Benchmark.upstream_latency --upstreams 4 --sensors 500 --rate 10
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.OpcUa import ServerConfiguration, expanded_node_id, VALUE
+from MyServer.MachineOperation import SensorType
+from MyServer.Sensor import TemperatureSensor
+from MyServer.Upstream import UpstreamSession, UpstreamDriver
+
+PORT: int = 48480
+COMPANY: str = "Upstream"
+
+
+def configuration(port: int) -> ServerConfiguration:
+    return ServerConfiguration(company=COMPANY, ip_address="0.0.0.0", fields=[], port=port)
+
+
+async def serve(upstreams: int, sensors: int, rate: float, ready, stop):
+    servers: list[OpcUaTestServer] = []
+    with tempfile.TemporaryDirectory() as directory:
+        for u in range(upstreams):
+            model: MachineModel = MachineModel()
+            for i in range(sensors):
+                model.add_sensor(TemperatureSensor(i, updates_per_second=rate), random_seed=i)
+            server = OpcUaTestServer(machine=model, server_configuration=configuration(PORT + u),
+                                     machine_model_file=f"{directory}/model_{u}.json", freq=0.0)
+            await server.setup_server()
+            servers.append(server)
+        ready.set()
+        while not stop.is_set():
+            await asyncio.sleep(0.1)
+        for server in servers:
+            await server.stop()
+
+
+def run_upstreams(upstreams: int, sensors: int, rate: float, ready, stop):
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(serve(upstreams, sensors, rate, ready, stop))
+
+
+async def main(upstreams: int, sensors: int, rate: float, interval: float, seconds: float):
+    context = multiprocessing.get_context("spawn")
+    ready, stop = context.Event(), context.Event()
+    process = context.Process(target=run_upstreams, args=(upstreams, sensors, rate, ready, stop))
+    process.start()
+    while not ready.is_set():
+        await asyncio.sleep(0.1)
+
+    latencies: list[float] = []
+
+    async def measure(ts: datetime, v: float):
+        latencies.append((datetime.now(timezone.utc) - ts).total_seconds())
+
+    sessions: list[UpstreamSession] = []
+    for u in range(upstreams):
+        session = UpstreamSession(f"opc.tcp://127.0.0.1:{PORT + u}/freeopcua/server/", publishing_interval=interval)
+        for i in range(sensors):
+            sensor = TemperatureSensor(u * sensors + i)
+            sensor.add_callback(measure)
+            UpstreamDriver(sensor, session,
+                           expanded_node_id(configuration(PORT + u), SensorType.TEMPERATURE, i, "", VALUE))
+        session.start()
+        sessions.append(session)
+    for session in sessions:
+        await session.wait_connected(30.0)
+    latencies.clear()
+    start_cpu: float = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu: float = (time.process_time() - start_cpu) / seconds
+    measured = sorted(latencies)
+    for session in sessions:
+        await session.stop()
+    stop.set()
+    await asyncio.to_thread(process.join)
+
+    print(f"{upstreams} upstreams with {sensors} sensors at {rate:g} Hz, publishing every {interval:g} s")
+    print(f"data changes/s: {len(measured) / seconds:.0f} of {upstreams * sensors * rate:.0f} written, "
+          f"concentrator CPU: {cpu:.1%}")
+    if measured:
+        print(f"latency p50: {statistics.median(measured) * 1000:.1f} ms, "
+              f"p99: {measured[int(0.99 * (len(measured) - 1))] * 1000:.1f} ms, max: {measured[-1] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the end-to-end latency of upstream sessions.")
+    parser.add_argument("--upstreams", type=int, default=4, help="Number of upstream servers")
+    parser.add_argument("--sensors", type=int, default=500, help="Sensors per upstream server")
+    parser.add_argument("--rate", type=float, default=10.0, help="Updates per second of every sensor")
+    parser.add_argument("--interval", type=float, default=0.1, help="Publishing interval of the subscriptions")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measurement time")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.upstreams, args.sensors, args.rate, args.interval, args.seconds))
@@ -1,2 +1,2 @@
 from .api_router import router
-from .v0_1 import router_v01, router_examples
\ No newline at end of file
+from .v0_1 import router_v01, router_examples, router_fleet
\ No newline at end of file
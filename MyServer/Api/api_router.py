@@ -13,7 +13,7 @@ router: APIRouter = APIRouter()
 
 @router.post("/add_sensor")
 async def add_sensor(sensor_config: SensorConfig, request: Request):
-    logging.info(f"Adding sensor: {sensor_config.type}: {sensor_config.identifier}")
+    logging.info("Adding sensor: %s: %s", sensor_config.type, sensor_config.identifier)
     if sensor_config.simulator_config is not None:
         logging.info("Simulator config found.")
     server: OpcUaTestServer = request.app.state.server
@@ -26,10 +26,11 @@ async def add_sensor(sensor_config: SensorConfig, request: Request):
                         temperature_sensor,
                         **sensor_config.simulator_config
                     )
-                    logging.debug(f"Adding sensor {temperature_sensor.name} with mutator.")
+                    logging.debug("Adding sensor %s with mutator.", temperature_sensor.name)
                     server.model.add_sensor(temperature_sensor, temperature_mutator)
                 except Exception as e:
-                    logging.error(f"Error caught: {e} config: {sensor_config.simulator_config}. Using default config.")
+                    logging.error("Error caught: %s config: %s. Using default config.", e,
+                                  sensor_config.simulator_config)
                     server.model.add_sensor(temperature_sensor)
             else:
                 logging.debug("Using default configuration.")
@@ -53,21 +54,21 @@ async def get_sensors(request: Request):
 
     server: OpcUaTestServer = request.app.state.server
     sensors: list[SensorBase] = server.model.sensors
-    logging.debug(f"Number of sensors: {len(sensors)}.")
+    logging.debug("Number of sensors: %s.", len(sensors))
     config_list = SensorConfigList(sensors=[to_sensor_config(x) for x in sensors])
     return config_list
 
 @router.post("/delete_sensor")
 async def delete_sensor(sensor_id: SensorId, request: Request):
-    logging.info(f"Deletion of sensor {sensor_id} requested.")
+    logging.info("Deletion of sensor %s requested.", sensor_id)
     server: OpcUaTestServer = request.app.state.server
     sensor = next((x for x in server.model.sensors if x.sensor_type == sensor_id.type and x.identifier == sensor_id.identifier), None)
     if sensor is None:
-        logging.warning(f"Sensor {sensor_id} not found.")
+        logging.warning("Sensor %s not found.", sensor_id)
         return False
 
     server.model.delete_sensor(sensor_id)
-    logging.info(f"Sensor {sensor_id} deleted.")
+    logging.info("Sensor %s deleted.", sensor_id)
     return True
 
 @router.post("/start")
@@ -86,7 +87,7 @@ async def stop(request: Request):
 async def is_running(request: Request):
     server: OpcUaTestServer = request.app.state.server
     result = server.alive_status()
-    logging.info(f"Requested running status. Result: {result}.")
+    logging.info("Requested running status. Result: %s.", result)
     return result
 
 @router.post("/start_job")
@@ -94,7 +95,7 @@ async def start_job(request: Request):
     logging.info("Start of job requested.")
     server: OpcUaTestServer = request.app.state.server
     started = await server.start_job()
-    logging.info(f"Start of job, is started: {started}.")
+    logging.info("Start of job, is started: %s.", started)
     return started
 
 @router.post("/stop_job")
@@ -102,15 +103,15 @@ async def stop_job(request: Request):
     logging.info("Stop of job requested.")
     server: OpcUaTestServer = request.app.state.server
     stopped = await server.stop_job()
-    logging.info(f"Sop of job, stopped: {stopped}.")
+    logging.info("Sop of job, stopped: %s.", stopped)
     return stopped
 
 @router.post("/custom_message")
 async def custom_message(message, request: Request):
     logging.info("Received custom message.")
-    logging.debug(f"Message: {message}")
+    logging.debug("Message: %s", message)
     server: OpcUaTestServer = request.app.state.server
     model: MachineModelBase = server.model
     success = model.custom_message(message)
-    logging.info(f"Custom message success: {success}.")
+    logging.info("Custom message success: %s.", success)
     return success
@@ -1,2 +1,3 @@
 from .router import router_v01
 from .examples import router_examples
+from .fleet import router_fleet
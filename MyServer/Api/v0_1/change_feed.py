@@ -0,0 +1,31 @@
+import logging
+from typing import Any
+
+from fastapi import HTTPException
+
+from MyServer.Lifetime import ChangeLog, ConfigurationChange
+
+MAX_WAIT: float = 60.0
+"""Longest wait of a long-polling request for changes, in seconds."""
+
+
+async def changes_response(changes: ChangeLog | None, since: int, wait: float) -> dict[str, Any]:
+    """
+    Answer a request for the changes after a version, waiting up to wait seconds for the first one.
+    complete is False if changes after the version were dropped already or the version is not one of this process,
+    for example of the server before a restart, the sensors have to be listed anew then, starting from the version in
+    the ETag of the listing.
+    """
+    if changes is None:
+        logging.warning("Changes requested, but the model keeps no change log.")
+        raise HTTPException(status_code=404, detail="The model keeps no change log.")
+    if wait > 0.0 and since <= changes.version:  # a version of another process is answered right away
+        await changes.wait(since, min(wait, MAX_WAIT))
+    entries: list[ConfigurationChange] | None = changes.since(since)
+    if entries is None:
+        return {"version": changes.version, "complete": False, "changes": []}
+    return {
+        "version": entries[-1].version if entries else since,  # the since of the next request
+        "complete": True,
+        "changes": [x.as_dict() for x in entries]
+    }
@@ -0,0 +1,83 @@
+import json
+from typing import Any
+
+import msgpack
+import numpy as np
+import pyarrow as pa
+from fastapi import Request, Response
+
+JSON_MEDIA_TYPE: str = "application/json"
+ARROW_MEDIA_TYPE: str = "application/vnd.apache.arrow.stream"
+"""Arrow IPC stream, read with pyarrow.ipc.open_stream."""
+MSGPACK_MEDIA_TYPE: str = "application/msgpack"
+"""msgpack map of columns, numeric columns as {"dtype": numpy type string, "data": raw bytes}."""
+MEDIA_TYPES: list[str] = [JSON_MEDIA_TYPE, ARROW_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]
+TIMESTAMP_SUFFIX: str = "timestamp"
+"""Columns named like this hold microseconds since the epoch, typed as time stamps in Arrow."""
+
+Column = np.ndarray | list[Any]
+
+
+def negotiate(request: Request) -> str:
+    """Get the media type to answer with from the Accept header of a request, json if none of the others is asked."""
+    accepted: list[tuple[float, int, str]] = []
+    for position, part in enumerate(request.headers.get("accept", "").split(",")):
+        media_type, *parameters = [x.strip() for x in part.split(";")]
+        quality: float = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type in MEDIA_TYPES and quality > 0.0:
+            accepted.append((-quality, position, media_type))
+    return min(accepted)[2] if accepted else JSON_MEDIA_TYPE
+
+
+def columnar_response(request: Request, columns: dict[str, Column],
+                      dictionaries: dict[str, list[str]] | None = None, headers: dict[str, str] | None = None) \
+        -> Response:
+    """
+    Encode columns in the media type asked for (see negotiate). Numeric columns go from their arrays into the body
+    without Python objects per row: as Arrow buffers or as raw bytes in msgpack. json gets lists.
+    :param request: The request.
+    :param columns: The columns, all of the same length.
+    :param dictionaries: Labels of columns holding codes, for example the sensor types. Arrow gets dictionary arrays,
+    msgpack the codes and the labels, json the labels.
+    :param headers: Further headers of the response.
+    """
+    dictionaries = dictionaries or {}
+    media_type: str = negotiate(request)
+    if media_type == ARROW_MEDIA_TYPE:
+        arrays: dict[str, pa.Array] = {}
+        for name, column in columns.items():
+            if name in dictionaries:
+                arrays[name] = pa.DictionaryArray.from_arrays(pa.array(column, type=pa.int32()),
+                                                              pa.array(dictionaries[name], type=pa.string()))
+            elif name.endswith(TIMESTAMP_SUFFIX):
+                arrays[name] = pa.array(column, type=pa.timestamp("us"))
+            else:
+                arrays[name] = pa.array(column)
+        table: pa.Table = pa.table(arrays)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        content: bytes = sink.getvalue().to_pybytes()
+    elif media_type == MSGPACK_MEDIA_TYPE:
+        encoded: dict[str, Any] = {}
+        for name, column in columns.items():
+            value: Any = {"dtype": column.dtype.str, "data": column.tobytes()} \
+                if isinstance(column, np.ndarray) else list(column)
+            if name in dictionaries:
+                value = {"codes": value, "labels": dictionaries[name]}
+            encoded[name] = value
+        content = msgpack.packb(encoded)
+    else:
+        content = json.dumps({
+            name: [dictionaries[name][x] for x in column] if name in dictionaries
+            else column.tolist() if isinstance(column, np.ndarray) else list(column)
+            for name, column in columns.items()
+        }).encode("utf-8")
+    return Response(content=content, media_type=media_type, headers=headers)
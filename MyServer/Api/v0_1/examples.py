@@ -31,6 +31,18 @@ async def example_config(sensor_type: SensorType):
                 "adaption_rate": 0.5
             }
             sensor_config = SensorConfig(type=SensorType.PRESSURE, identifier=1234, simulator_config=simulator_config)
+        case SensorType.WAVEFORM:
+            simulator_config = {
+                "start_value": 0.0,
+                "random_seed": 42,
+                "frequency": 50.0,
+                "amplitude_idle": 0.1,
+                "amplitude_running": 1.0,
+                "fault_frequency": 150.0,
+                "fault_amplitude": 0.5,
+                "st_dev": 0.05
+            }
+            sensor_config = SensorConfig(type=SensorType.WAVEFORM, identifier=1234, simulator_config=simulator_config)
 
 
     return sensor_config
\ No newline at end of file
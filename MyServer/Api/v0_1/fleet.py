@@ -0,0 +1,150 @@
+from fastapi import APIRouter, Request
+import logging
+
+from MyServer import OpcUaTestServer
+from MyServer.Fleet import Fleet
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import SensorConfig, SensorConfigList, SensorId, SensorNodeIdsList, SensorType
+from MyServer.OpcUa import FOLDER_SEPARATOR
+from .listing import listing_response
+from .change_feed import changes_response
+from .node_ids import node_ids_response
+from .router import _create_sensor, _add_sensors
+
+router_fleet = APIRouter(prefix="/machines")
+
+SENSOR_FOLDER: str = "Sensors"
+"""Folder below the machine of the sensors added without a namespace, the default namespace of the sensors."""
+
+
+def _machine(request: Request, name: str) -> MachineModel | None:
+    server: OpcUaTestServer = request.app.state.server
+    if not isinstance(server.model, Fleet):
+        logging.warning("Machine %s requested, but the server does not host a fleet.", name)
+        return None
+    model: MachineModel | None = server.model.machine(name)
+    if model is None:
+        logging.warning("Machine %s not found.", name)
+    return model
+
+
+@router_fleet.get("",
+                  summary="Get the names of the machines.",
+                  description="Get the names of the machines hosted by the server. Empty if it hosts a single machine.")
+async def machines(request: Request):
+    server: OpcUaTestServer = request.app.state.server
+    return list(server.model.machines) if isinstance(server.model, Fleet) else []
+
+
+@router_fleet.get("/{machine}/status",
+                  summary="Get the status of a machine.",
+                  description="Get mode, state and number of sensors of a machine of the fleet.")
+async def status(machine: str, request: Request):
+    model: MachineModel | None = _machine(request, machine)
+    if model is None:
+        return None
+    return {"mode": model.mode, "state": model.state, "sensors": len(model.sensors)}
+
+
+@router_fleet.post("/{machine}/start_job",
+                   summary="Start a job on a machine.",
+                   description="Switch the simulated sensors of one machine of the fleet to \"working\" mode.")
+async def start_job(machine: str, request: Request):
+    logging.info("Start of job on %s requested.", machine)
+    model: MachineModel | None = _machine(request, machine)
+    if model is None:
+        return False
+    server: OpcUaTestServer = request.app.state.server
+    await server.execute(model.start_job)
+    return True
+
+
+@router_fleet.post("/{machine}/stop_job",
+                   summary="Stop the job of a machine.",
+                   description="Stop the running job of one machine of the fleet.")
+async def stop_job(machine: str, request: Request):
+    logging.info("Stop of job on %s requested.", machine)
+    model: MachineModel | None = _machine(request, machine)
+    if model is None:
+        return False
+    server: OpcUaTestServer = request.app.state.server
+    await server.execute(model.stop_job)
+    return True
+
+
+@router_fleet.post("/{machine}/add_sensor",
+                   summary="Add a sensor to a machine.",
+                   description="Add a sensor to one machine of the fleet, as /add_sensor. The namespace is taken "
+                       "below the folder of the machine.")
+async def add_sensor(machine: str, sensor_config: SensorConfig, request: Request):
+    model: MachineModel | None = _machine(request, machine)
+    if model is None:
+        return False
+    namespace: str = machine + FOLDER_SEPARATOR + (sensor_config.namespace or SENSOR_FOLDER)
+    created = _create_sensor(sensor_config.model_copy(update={"namespace": namespace}))
+    if created is None:
+        return False
+    server: OpcUaTestServer = request.app.state.server
+    await server.execute(_add_sensors, model, [created])
+    return True
+
+
+@router_fleet.post("/{machine}/delete_sensor",
+                   summary="Delete a sensor of a machine.",
+                   description="Delete a sensor of one machine of the fleet given by its SensorId.")
+async def delete_sensor(machine: str, sensor_id: SensorId, request: Request):
+    logging.info("Deletion of sensor %s of %s requested.", sensor_id, machine)
+    model: MachineModel | None = _machine(request, machine)
+    if model is None:
+        return False
+    if not any(x.sensor_id == sensor_id for x in model.sensors):
+        logging.warning("Sensor %s not found on %s.", sensor_id, machine)
+        return False
+    server: OpcUaTestServer = request.app.state.server
+    await server.execute(model.delete_sensor, sensor_id)
+    return True
+
+
+@router_fleet.post("/{machine}/custom_message",
+                   summary="Send a custom message to a machine.",
+                   description="Send a custom message to one machine of the fleet, for example "
+                       "{\"machine_state\": false} to break it.")
+async def custom_message(machine: str, message: dict, request: Request):
+    logging.debug("Message for %s: %s", machine, message)
+    model: MachineModel | None = _machine(request, machine)
+    if model is None:
+        return False
+    server: OpcUaTestServer = request.app.state.server
+    return await server.execute(model.custom_message, message)
+
+
+@router_fleet.get("/{machine}/get_sensors", response_model=SensorConfigList,
+                  summary="Get the sensors of a machine.",
+                  description="Get the sensors of one machine of the fleet as a list, with the filters, pages and "
+                      "ETag of /get_sensors.")
+async def get_sensors(machine: str, request: Request, cursor: str | None = None, limit: int | None = None,
+                      sensor_type: SensorType | None = None, namespace: str | None = None,
+                      simulator_config: bool = False):
+    model: MachineModel | None = _machine(request, machine)
+    if model is None:
+        return SensorConfigList(sensors=[])
+    return listing_response(request, model, cursor, limit, sensor_type, namespace, simulator_config)
+
+
+@router_fleet.get("/{machine}/changes",
+                  summary="Get the changes of the sensors of a machine.",
+                  description="Get the changes of one machine of the fleet after a version, see /changes.")
+async def changes(machine: str, request: Request, since: int = 0, wait: float = 0.0):
+    model: MachineModel | None = _machine(request, machine)
+    return await changes_response(None if model is None else model.changes, since, wait)
+
+
+@router_fleet.get("/{machine}/get_node_ids", response_model=SensorNodeIdsList,
+                  summary="Get the OPC UA node IDs of the sensors of a machine.",
+                  description="Get the stable node IDs of the sensors of one machine of the fleet. Every machine has "
+                      "a namespace of its own, so the numeric parts repeat across machines.")
+async def get_node_ids(machine: str, request: Request):
+    model: MachineModel | None = _machine(request, machine)
+    if model is None:
+        return SensorNodeIdsList(sensors=[])
+    return node_ids_response(request.app.state.server, model.sensors)
@@ -0,0 +1,78 @@
+import weakref
+
+import numpy as np
+from fastapi import HTTPException, Request, Response
+
+from MyServer.Lifetime import MachineModelBase, SensorListing
+from MyServer.MachineOperation import SensorConfigList, SensorType
+from MyServer.Recording import SENSOR_TYPES
+from MyServer.Recording.value_history import TYPE_COLUMN, IDENTIFIER_COLUMN
+from .columnar import JSON_MEDIA_TYPE, Column, columnar_response, negotiate
+
+NAMESPACE_COLUMN: str = "namespace"
+NEXT_CURSOR_HEADER: str = "X-Next-Cursor"
+"""Header with the cursor of the next page in binary listings, which have no field for it."""
+
+_listings: weakref.WeakKeyDictionary[MachineModelBase, SensorListing] = weakref.WeakKeyDictionary()
+
+
+def _etag(version: int | None, media_type: str) -> str | None:
+    """The version, followed by the subtype of the media type for the binary formats, which have other bodies."""
+    if version is None:
+        return None
+    return f'"{version}"' if media_type == JSON_MEDIA_TYPE else f'"{version}-{media_type.rpartition("/")[2]}"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    """Whether the If-None-Match header of a request names the ETag."""
+    header: str = request.headers.get("if-none-match", "")
+    return any(x.strip().removeprefix("W/") in (etag, "*") for x in header.split(",") if x.strip())
+
+
+def listing_response(request: Request, model: MachineModelBase, cursor: str | None, limit: int | None,
+                     sensor_type: SensorType | None, namespace: str | None, simulator_config: bool) -> Response:
+    """
+    Answer a request for the sensors of a model from its cached listing, see SensorListing. The ETag is the version of
+    the model, suffixed by the media type for Arrow and msgpack, a request naming it in If-None-Match gets 304 Not
+    Modified without a body.
+    The cursor is the version and the offset of the next page. It is rejected with 409 Conflict once the model
+    changed, the listing has to be started again.
+    Arrow and msgpack (see columnar_response) get columns of type, identifier and namespace, the cursor of the next
+    page in the X-Next-Cursor header.
+    """
+    listing: SensorListing | None = _listings.get(model)
+    if listing is None:
+        listing = _listings[model] = SensorListing(model)
+    listing.sensors()  # brings the listing up to date
+    media_type: str = negotiate(request)
+    etag: str | None = _etag(listing.version, media_type)
+    headers: dict[str, str] = {"Vary": "Accept"} if etag is None else {"ETag": etag, "Vary": "Accept"}
+    if etag is not None and _matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    offset: int = 0
+    if cursor:
+        version, _, position = cursor.rpartition(".")
+        if version != str(listing.version) or not position.isdigit():
+            raise HTTPException(status_code=409, detail="The sensors changed since the cursor was issued.")
+        offset = int(position)
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=422, detail=f"The limit must be positive, got {limit}.")
+    sensors, next_offset = listing.page(offset, limit, sensor_type, namespace, simulator_config)
+    next_cursor: str | None = None if next_offset is None else f"{listing.version}.{next_offset}"
+    if media_type != JSON_MEDIA_TYPE:
+        # columns of type, identifier and namespace, the simulator configurations are only listed in json
+        namespaces: dict[str, int] = {}
+        columns: dict[str, Column] = {
+            TYPE_COLUMN: np.array([SENSOR_TYPES.index(x.type) for x in sensors], dtype=np.int32),
+            IDENTIFIER_COLUMN: np.array([x.identifier for x in sensors], dtype=np.int64),
+            NAMESPACE_COLUMN: np.array([namespaces.setdefault(x.namespace or "", len(namespaces)) for x in sensors],
+                                       dtype=np.int32)
+        }
+        if next_cursor is not None:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+        return columnar_response(request, columns, {TYPE_COLUMN: [str(x) for x in SENSOR_TYPES],
+                                                    NAMESPACE_COLUMN: list(namespaces)}, headers)
+    page: SensorConfigList = SensorConfigList(sensors=sensors, next_cursor=next_cursor)
+    # serialized directly, validating the cached sensors again as response model takes longer than the listing
+    return Response(content=page.model_dump_json(), media_type="application/json", headers=headers)
+
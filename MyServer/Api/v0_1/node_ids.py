@@ -0,0 +1,20 @@
+from MyServer import OpcUaTestServer
+from MyServer.MachineOperation import SensorNodeIds, SensorNodeIdsList
+from MyServer.OpcUa import VALUE, SENSOR_TIME
+from MyServer.Sensor.Base import SensorBase
+
+
+def node_ids_response(server: OpcUaTestServer, sensors: list[SensorBase]) -> SensorNodeIdsList:
+    """
+    List the node IDs of sensors and their fields, leaving out the sensors without stable node IDs.
+    :param server: The server which created the nodes.
+    :param sensors: The sensors of the machine, of the whole server or of one machine of a fleet.
+    """
+    node_ids: list[SensorNodeIds] = []
+    for s in sensors:
+        sensor, value, sensor_time = (server.node_id(s, x) for x in (None, VALUE, SENSOR_TIME))
+        if sensor is None:
+            continue
+        node_ids.append(SensorNodeIds(type=s.sensor_type, identifier=s.identifier, sensor=sensor, value=value,
+                                      sensor_time=sensor_time))
+    return SensorNodeIdsList(sensors=node_ids)
@@ -1,12 +1,29 @@
-from fastapi import APIRouter, Request
+import asyncio
+from datetime import datetime
+
+import numpy as np
+
+from fastapi import APIRouter, HTTPException, Request
 import logging
 from MyServer import OpcUaTestServer
+from MyServer.Fleet import Fleet
 from MyServer.Lifetime import MachineModelBase
-from MyServer.MachineOperation import SensorConfig, SensorConfigList, SensorId
+from MyServer.MachineOperation import SensorConfig, SensorConfigList, SensorId, SensorNodeIdsList
 from MyServer.MachineOperation import SensorType
-from MyServer.Sensor import TemperatureSensor, PressureSensor
-from MyServer.Sensor.Base import SensorBase, SensorDictBase
-from MyServer.Simulation import TemperatureSimulationDriver, PressureSimulationDriver
+from MyServer.Sensor import TemperatureSensor, PressureSensor, WaveformSensor
+from MyServer.Sensor.Base import SensorBase
+from MyServer.Simulation import SimulationDriver, TemperatureSimulationDriver, PressureSimulationDriver, \
+    WaveformSimulationDriver
+from .listing import listing_response
+from .change_feed import changes_response
+from .node_ids import node_ids_response
+from .columnar import columnar_response
+from MyServer.Timing import ScaledClock
+from MyServer.Dataset import OutputFormat
+from MyServer.Recording import SampleRecorder, ValueHistory, SENSOR_TYPES
+from MyServer.Recording.value_history import TYPE_COLUMN
+
+RECORDING_DIRECTORY: str = "recordings"
 
 router_v01 = APIRouter()
 
@@ -27,7 +44,7 @@ async def status(request: Request):
 async def start(request: Request):
     logging.info("Starting the machine.")
     server: OpcUaTestServer = request.app.state.server
-    result = await server.start()
+    result = await server.execute(server.start)
     return result
 
 @router_v01.post("/stop",
@@ -36,7 +53,7 @@ async def start(request: Request):
 async def stop(request: Request):
     logging.info("Stopping the machine.")
     server: OpcUaTestServer = request.app.state.server
-    await server.stop()
+    await server.execute(server.stop)
 
 @router_v01.get("/is_initialized",
                 summary="Returns whether the system is initialized.",
@@ -45,7 +62,7 @@ async def stop(request: Request):
 async def is_initialized(request: Request):
     server: OpcUaTestServer = request.app.state.server
     result = server.is_initialized
-    logging.info(f"Requested is initialized, result: {result}")
+    logging.info("Requested is initialized, result: %s", result)
     return result
 
 @router_v01.get("/is_running",
@@ -54,89 +71,177 @@ async def is_initialized(request: Request):
 async def is_running(request: Request):
     server: OpcUaTestServer = request.app.state.server
     result = server.alive_status()
-    logging.info(f"Requested running status. Result: {result}.")
+    logging.info("Requested running status. Result: %s.", result)
     return result
 
+_SENSOR_CLASSES: dict[SensorType, tuple[type[SensorBase], type[SimulationDriver]]] = {
+    SensorType.TEMPERATURE: (TemperatureSensor, TemperatureSimulationDriver),
+    SensorType.PRESSURE: (PressureSensor, PressureSimulationDriver),
+    SensorType.WAVEFORM: (WaveformSensor, WaveformSimulationDriver)
+}
+
+
+def _create_sensor(sensor_config: SensorConfig) -> tuple[SensorBase, SimulationDriver | None] | None:
+    """
+    Create the sensor of a configuration with its simulation driver.
+    :return: The sensor and its driver, None as driver for the default configuration. None for an unknown type.
+    """
+    logging.info("Adding sensor: %s: %s", sensor_config.type, sensor_config.identifier)
+    classes = _SENSOR_CLASSES.get(sensor_config.type)
+    if classes is None:
+        return None  # should no longer occur, but here for good measure
+    sensor_class, driver_class = classes
+    options = {} if sensor_config.namespace is None else {"namespace": sensor_config.namespace}
+    sensor: SensorBase = sensor_class(sensor_config.identifier, **options)
+    if sensor_config.simulator_config is None:
+        logging.debug("Using default configuration.")
+        return sensor, None
+    logging.info("Simulator config found.")
+    try:
+        driver: SimulationDriver = driver_class(sensor, **sensor_config.simulator_config)
+        logging.debug("Adding sensor %s with driver.", sensor.name)
+        return sensor, driver
+    except Exception as e:
+        logging.error("Error caught: %s config: %s. Using default config.", e, sensor_config.simulator_config)
+        return sensor, None
+
+
+def _add_sensors(model: MachineModelBase, sensors: list[tuple[SensorBase, SimulationDriver | None]]):
+    """Add sensors with their drivers to a model, None as driver for the default one."""
+    for sensor, driver in sensors:
+        model.add_sensor(sensor, driver)
+
+
+def _delete_sensors(model: MachineModelBase, sensor_ids: list[SensorId]):
+    for sensor_id in sensor_ids:
+        model.delete_sensor(sensor_id)
+
+
+def _reject_fleet(server: OpcUaTestServer):
+    """Answer 409 Conflict for a fleet, its sensors belong to a machine and are changed under /machines/<machine>."""
+    if isinstance(server.model, Fleet):
+        logging.warning("Sensors of a fleet changed without naming the machine.")
+        raise HTTPException(status_code=409, detail="The server hosts a fleet, change the sensors of a machine under "
+                                                    "/v0.1/machines/<machine>/.")
+
+
 @router_v01.post("/add_sensor",
                  summary="Add a sensor to the server.",
                  description="Add a sensor. Does work only if the server is not running.")
 async def add_sensor(sensor_config: SensorConfig, request: Request):
-    logging.info(f"Adding sensor: {sensor_config.type}: {sensor_config.identifier}")
-    if sensor_config.simulator_config is not None:
-        logging.info("Simulator config found.")
-    server: OpcUaTestServer = request.app.state.server
-    match sensor_config.type:
-        case SensorType.TEMPERATURE:
-            temperature_sensor: TemperatureSensor = TemperatureSensor(sensor_config.identifier)
-            if not sensor_config.simulator_config is None:
-                try:
-                    temperature_mutator: TemperatureSimulationDriver = TemperatureSimulationDriver(
-                        temperature_sensor,
-                        **sensor_config.simulator_config
-                    )
-                    logging.debug(f"Adding sensor {temperature_sensor.name} with driver.")
-                    server.model.add_sensor(temperature_sensor, temperature_mutator)
-                except Exception as e:
-                    logging.error(f"Error caught: {e} config: {sensor_config.simulator_config}. Using default config.")
-                    server.model.add_sensor(temperature_sensor)
-            else:
-                logging.debug("Using default configuration.")
-                server.model.add_sensor(temperature_sensor)
-            return True
-        case SensorType.PRESSURE:
-            pressure_sensor: PressureSensor = PressureSensor(sensor_config.identifier)
-            if not sensor_config.simulator_config is None:
-                try:
-                    pressure_mutator: PressureSimulationDriver = PressureSimulationDriver(
-                        pressure_sensor,
-                        **sensor_config.simulator_config
-                    )
-                    logging.debug(f"Adding sensor {pressure_sensor.name} with driver.")
-                    server.model.add_sensor(pressure_sensor, pressure_mutator)
-                except Exception as e:
-                    logging.error(f"Error caught: {e} config: {sensor_config.simulator_config}. Using default config.")
-                    server.model.add_sensor(pressure_sensor)
-            else:
-                logging.debug("Using default configuration.")
-                server.model.add_sensor(pressure_sensor)
-            return True
-
-    return False  # should no longer occur, but here for good measure
+    server: OpcUaTestServer = request.app.state.server
+    _reject_fleet(server)
+    created = _create_sensor(sensor_config)
+    if created is None:
+        return False
+    await server.execute(_add_sensors, server.model, [created])
+    return True
+
+@router_v01.post("/add_sensors",
+                 summary="Add sensors to the server.",
+                 description="Add several sensors in one request, as add_sensor. Answers whether each one was added.")
+async def add_sensors(sensor_configs: list[SensorConfig], request: Request) -> list[bool]:
+    server: OpcUaTestServer = request.app.state.server
+    _reject_fleet(server)
+    created = [_create_sensor(x) for x in sensor_configs]
+    await server.execute(_add_sensors, server.model, [x for x in created if x is not None])
+    return [x is not None for x in created]
 
 @router_v01.post("/delete_sensor",
                  summary="Delete a sensor.",
                  description="Delete a sensor given by its SensorId")
 async def delete_sensor(sensor_id: SensorId, request: Request):
-    logging.info(f"Deletion of sensor {sensor_id} requested.")
+    logging.info("Deletion of sensor %s requested.", sensor_id)
     server: OpcUaTestServer = request.app.state.server
+    _reject_fleet(server)
     sensor = next((x for x in server.model.sensors if x.sensor_type == sensor_id.type and x.identifier == sensor_id.identifier), None)
     if sensor is None:
-        logging.warning(f"Sensor {sensor_id} not found.")
+        logging.warning("Sensor %s not found.", sensor_id)
         return False
 
-    server.model.delete_sensor(sensor_id)
-    logging.info(f"Sensor {sensor_id} deleted.")
+    await server.execute(server.model.delete_sensor, sensor_id)
+    logging.info("Sensor %s deleted.", sensor_id)
     return True
 
+@router_v01.post("/delete_sensors",
+                 summary="Delete sensors.",
+                 description="Delete several sensors in one request, as delete_sensor. Answers whether each one was "
+                    "found.")
+async def delete_sensors(sensor_ids: list[SensorId], request: Request) -> list[bool]:
+    logging.info("Deletion of %s sensors requested.", len(sensor_ids))
+    server: OpcUaTestServer = request.app.state.server
+    _reject_fleet(server)
+    present: set[SensorId] = {x.sensor_id for x in server.model.sensors}
+    found: list[bool] = []
+    for sensor_id in sensor_ids:
+        found.append(sensor_id in present)
+        if not found[-1]:
+            logging.warning("Sensor %s not found.", sensor_id)
+        present.discard(sensor_id)  # deleted once if named twice
+    await server.execute(_delete_sensors, server.model, [x for x, f in zip(sensor_ids, found) if f])
+    return found
+
 @router_v01.get("/get_sensors", response_model=SensorConfigList,
                 summary="Get a list of the installed sensors.",
-                description="Get the installed sensors as a list.")
-async def get_sensors(request: Request):
+                description="Get the installed sensors as a list, optionally filtered by type and by namespace "
+                    "(including its subfolders) and paged: with a limit, next_cursor is passed as cursor to get the "
+                    "next page. The simulator configurations are included on request. The ETag changes only when "
+                    "sensors are added, deleted or changed, a request with If-None-Match gets 304 until then.")
+async def get_sensors(request: Request, cursor: str | None = None, limit: int | None = None,
+                      sensor_type: SensorType | None = None, namespace: str | None = None,
+                      simulator_config: bool = False):
     logging.info("List of sensors requested.")
-    def to_sensor_config(s: SensorBase) -> SensorConfig:
-        dictionary: SensorDictBase = s.to_data_object()
-        config: SensorConfig = SensorConfig(
-            type=dictionary.sensor_type,
-            identifier=s.identifier,
-            simulator_config=None
-        )
-        return config
+    server: OpcUaTestServer = request.app.state.server
+    return listing_response(request, server.model, cursor, limit, sensor_type, namespace, simulator_config)
 
+@router_v01.get("/changes",
+                summary="Get the changes of the sensors.",
+                description="Get the changes of the machine model after a version, oldest first: added, deleted "
+                    "and changed sensors with their serialized drivers, and changes of mode and state. Start with "
+                    "the ETag of /get_sensors, then pass the returned version as since. With wait, the request "
+                    "waits up to that many seconds for the next change (long polling). If changes after the version "
+                    "were dropped already, complete is false and the sensors have to be listed anew. A reset "
+                    "change, for example after restoring a configuration, also asks for a new listing.")
+async def changes(request: Request, since: int = 0, wait: float = 0.0):
     server: OpcUaTestServer = request.app.state.server
-    sensors: list[SensorBase] = server.model.sensors
-    logging.debug(f"Number of sensors: {len(sensors)}.")
-    config_list = SensorConfigList(sensors=[to_sensor_config(x) for x in sensors])
-    return config_list
+    return await changes_response(getattr(server.model, "changes", None), since, wait)
+
+@router_v01.get("/values",
+                summary="Get the current values of the sensors.",
+                description="Get the latest sample of every sensor with samples, as columns type, identifier, "
+                    "timestamp (microseconds since the epoch) and value. Answered as Arrow IPC stream or msgpack if "
+                    "asked for in the Accept header, see the README, otherwise as json.")
+async def values(request: Request):
+    server: OpcUaTestServer = request.app.state.server
+    history: ValueHistory | None = getattr(server, "history", None)
+    columns = await server.execute(history.latest) if history is not None else _empty_columns()
+    return columnar_response(request, columns, {TYPE_COLUMN: [str(x) for x in SENSOR_TYPES]})
+
+@router_v01.get("/history",
+                summary="Get the latest samples of the sensors.",
+                description="Get the kept samples (see --history) from start to end, optionally of one sensor type "
+                    "or identifier, ordered by sensor and time. Columns and formats as /values.")
+async def history(request: Request, start: datetime | None = None, end: datetime | None = None,
+                  sensor_type: SensorType | None = None, identifier: int | None = None):
+    server: OpcUaTestServer = request.app.state.server
+    value_history: ValueHistory | None = getattr(server, "history", None)
+    columns = await server.execute(value_history.window, start, end, sensor_type, identifier) \
+        if value_history is not None else _empty_columns()
+    return columnar_response(request, columns, {TYPE_COLUMN: [str(x) for x in SENSOR_TYPES]})
+
+def _empty_columns() -> dict[str, np.ndarray]:
+    """Columns of a history without samples, before the server is set up."""
+    return ValueHistory([]).latest()
+
+@router_v01.get("/get_node_ids", response_model=SensorNodeIdsList,
+                summary="Get the OPC UA node IDs of the sensors.",
+                description="Get the node IDs of the installed sensors and their fields. They are derived from the "
+                    "sensor type and identifier and do not change between restarts, so clients can cache them "
+                    "instead of browsing. Sensors without stable node IDs are left out.")
+async def get_node_ids(request: Request):
+    logging.info("List of node IDs requested.")
+    server: OpcUaTestServer = request.app.state.server
+    return node_ids_response(server, server.model.sensors)
 
 @router_v01.post("/initialize",
                  summary="Initialize the machine.",
@@ -148,7 +253,7 @@ async def initialize(request: Request):
     if already_initialized:
         logging.info("Request for initialization, but already initialized. Skipping.")
         return False
-    result = await server.setup_server()
+    result = await server.execute(server.setup_server)
     if result:
         logging.info("Setting up server successful.")
     else:
@@ -162,8 +267,8 @@ async def initialize(request: Request):
 async def start_job(request: Request):
     logging.info("Start of job requested.")
     server: OpcUaTestServer = request.app.state.server
-    started = await server.start_job()
-    logging.info(f"Start of job, is started: {started}.")
+    started = await server.execute(server.start_job)
+    logging.info("Start of job, is started: %s.", started)
     return started
 
 @router_v01.post("/stop_job",
@@ -172,15 +277,15 @@ async def start_job(request: Request):
 async def stop_job(request: Request):
     logging.info("Stop of job requested.")
     server: OpcUaTestServer = request.app.state.server
-    stopped = await server.stop_job()
-    logging.info(f"Sop of job, stopped: {stopped}.")
+    stopped = await server.execute(server.stop_job)
+    logging.info("Sop of job, stopped: %s.", stopped)
     return stopped
 
 @router_v01.get("/is_job_running")
 async def is_job_running(request: Request):
     server: OpcUaTestServer = request.app.state.server
     job_running: bool = server.is_job_running
-    logging.info(f"Request whether job is running: {job_running}.")
+    logging.info("Request whether job is running: %s.", job_running)
     return job_running
 
 @router_v01.post("/custom_message",
@@ -188,10 +293,75 @@ async def is_job_running(request: Request):
                  description="Send a custom message. Used for higher level and debug controls.")
 async def custom_message(message, request: Request):
     logging.info("Received custom message.")
-    logging.debug(f"Message: {message}")
+    logging.debug("Message: %s", message)
     server: OpcUaTestServer = request.app.state.server
     model: MachineModelBase = server.model
-    success = model.custom_message(message)
-    logging.info(f"Custom message success: {success}.")
+    success = await server.execute(model.custom_message, message)
+    logging.info("Custom message success: %s.", success)
     return success
 
+
+
+@router_v01.get("/speed_factor",
+                summary="Get the speed factor of the simulation.",
+                description="Get how many simulated seconds pass per real second.")
+async def speed_factor(request: Request):
+    server: OpcUaTestServer = request.app.state.server
+    return server.clock.speed
+
+@router_v01.post("/set_speed_factor",
+                 summary="Set the speed factor of the simulation.",
+                 description="Set how many simulated seconds pass per real second, for example 10 or 100 to reach "
+                    "steady state values faster. Works only if the server runs on an adjustable clock.")
+async def set_speed_factor(factor: float, request: Request):
+    logging.info("Speed factor %s requested.", factor)
+    server: OpcUaTestServer = request.app.state.server
+    if factor <= 0:
+        logging.warning("Speed factor must be positive, got %s.", factor)
+        return False
+    if not isinstance(server.clock, ScaledClock):
+        logging.warning("Speed factor cannot be set, the server clock is not adjustable.")
+        return False
+
+    def set_speed():
+        server.clock.speed = factor
+
+    await server.execute(set_speed)
+    return True
+
+@router_v01.post("/start_recording",
+                 summary="Start recording the published samples.",
+                 description=f"Record the samples of the given sensors, or of all sensors if none are given, to "
+                    f"rotating files in the directory \"{RECORDING_DIRECTORY}\".")
+async def start_recording(request: Request, sensor_ids: list[SensorId] | None = None,
+                          output_format: OutputFormat = OutputFormat.PARQUET):
+    recorder: SampleRecorder | None = getattr(request.app.state, "recorder", None)
+    if recorder is not None and recorder.running:
+        logging.warning("Recording requested, but already recording.")
+        return False
+    server: OpcUaTestServer = request.app.state.server
+    sensors: list[SensorBase] = server.model.sensors
+    if sensor_ids:
+        requested: set[SensorId] = set(sensor_ids)
+        sensors = [x for x in sensors if x.sensor_id in requested]
+    logging.info("Start recording %s sensor(s) as %s.", len(sensors), output_format)
+    recorder = SampleRecorder(RECORDING_DIRECTORY, prefix=datetime.now().strftime("samples_%Y%m%d_%H%M%S"),
+                              output_format=output_format)
+    recorder.start()
+    await server.execute(recorder.record, sensors)
+    request.app.state.recorder = recorder
+    return True
+
+@router_v01.post("/stop_recording",
+                 summary="Stop recording.",
+                 description="Stop recording and write the remaining samples. Returns the written files.")
+async def stop_recording(request: Request):
+    recorder: SampleRecorder | None = getattr(request.app.state, "recorder", None)
+    if recorder is None or not recorder.running:
+        logging.warning("Stop of recording requested, but not recording.")
+        return []
+    server: OpcUaTestServer = request.app.state.server
+    await server.execute(recorder.close)  # the sensors append to the recorder on the loop of the server
+    await asyncio.to_thread(recorder.join)
+    logging.info("Recording stopped, %s samples recorded.", recorder.recorded)
+    return recorder.files
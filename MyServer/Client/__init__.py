@@ -0,0 +1,3 @@
+from .control_client import ControlClient
+
+__all__ = ["ControlClient"]
@@ -0,0 +1,219 @@
+import asyncio
+import itertools
+import logging
+from typing import Any
+
+import httpx
+from pydantic import BaseModel
+
+from MyServer.MachineOperation import SensorConfig, SensorConfigList, SensorId, SensorNodeIdsList, SensorType
+
+BASE_URL: str = "http://localhost:8765"
+"""Address of the control API as started by main.py."""
+API_PREFIX: str = "/v0.1"
+MAX_CONNECTIONS: int = 10
+"""Connections kept open to the server."""
+MAX_CONCURRENCY: int = 10
+"""Requests in flight at the same time."""
+BATCH_SIZE: int = 1000
+"""Largest number of queued operations sent in one request to a bulk endpoint."""
+PAGE_SIZE: int = 1000
+"""Sensors requested per page of a listing."""
+
+_BULK_PATHS: dict[str, str] = {"/add_sensor": "/add_sensors", "/delete_sensor": "/delete_sensors"}
+
+
+class ControlClient:
+    """
+    Asynchronous client of the control API (/v0.1) with typed methods, using the models of the API (SensorConfig,
+    SensorId). The connections are kept open and shared by the requests, of which at most max_concurrency are in flight.
+    Added and deleted sensors are queued: the operations queued while the loop is busy (for example by gathering
+    add_sensor calls) are sent together to the bulk endpoints add_sensors and delete_sensors, in the order they were
+    queued. Other requests wait for the queued operations to be sent first, so they see their effects.
+    Use as async context manager or call close.
+    """
+
+    def __init__(self,
+                 base_url: str = BASE_URL,
+                 transport: httpx.AsyncBaseTransport | None = None,
+                 max_connections: int = MAX_CONNECTIONS,
+                 max_concurrency: int = MAX_CONCURRENCY,
+                 batch_size: int = BATCH_SIZE,
+                 batch_delay: float = 0.0,
+                 timeout: float = 10.0):
+        """
+        ctor.
+        :param base_url: Address of the server, without the API prefix.
+        :param transport: Transport of the requests, for example httpx.ASGITransport(app) to call an app in the same
+        process. None for HTTP connections.
+        :param max_connections: Connections kept open to the server.
+        :param max_concurrency: Requests in flight at the same time.
+        :param batch_size: Largest number of queued operations per request.
+        :param batch_delay: Seconds to collect operations before sending them, 0 for the ones queued until the loop
+        runs the next task.
+        :param timeout: Seconds to wait for a response.
+        """
+        if max_concurrency < 1 or batch_size < 1:
+            raise ValueError(f"Concurrency and batch size must be positive, got {max_concurrency} and {batch_size}.")
+        self.__client: httpx.AsyncClient = httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + API_PREFIX,
+            transport=transport,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections))
+        self.__requests: asyncio.Semaphore = asyncio.Semaphore(max_concurrency)
+        self.__batch_size: int = batch_size
+        self.__batch_delay: float = batch_delay
+        self.__queue: list[tuple[str, BaseModel, asyncio.Future]] = []
+        self.__collecting: asyncio.Task | None = None
+        self.__sending: asyncio.Task | None = None
+        self.__order: asyncio.Lock = asyncio.Lock()
+        self.__timeout: float = timeout
+        self.__sent: int = 0
+
+    async def __aenter__(self) -> "ControlClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def sent(self) -> int:
+        """Number of requests sent."""
+        return self.__sent
+
+    async def close(self):
+        """Send the queued operations and close the connections."""
+        await self.flush()
+        await self.__client.aclose()
+
+    async def flush(self):
+        """Wait until the queued operations are sent."""
+        sending = self.__sending
+        if sending is not None:
+            await asyncio.shield(sending)
+
+    async def status(self) -> dict[str, Any]:
+        """Get the status of the server."""
+        return await self.__request("GET", "/status")
+
+    async def initialize(self) -> bool:
+        """Set up the OPC UA server."""
+        return await self.__request("POST", "/initialize")
+
+    async def start_job(self):
+        """Start a job of the machine."""
+        await self.__request("POST", "/start_job")
+
+    async def stop_job(self):
+        """Stop the running job."""
+        await self.__request("POST", "/stop_job")
+
+    async def is_job_running(self) -> bool:
+        """Whether a job is running."""
+        return await self.__request("GET", "/is_job_running")
+
+    async def add_sensor(self, sensor_config: SensorConfig) -> bool:
+        """Queue a sensor to add. :return: Whether it was added."""
+        return await self.__queued("/add_sensor", sensor_config)
+
+    async def add_sensors(self, sensor_configs: list[SensorConfig]) -> list[bool]:
+        """Queue sensors to add. :return: Whether each one was added."""
+        return list(await asyncio.gather(*(self.add_sensor(x) for x in sensor_configs)))
+
+    async def delete_sensor(self, sensor_id: SensorId) -> bool:
+        """Queue a sensor to delete. :return: Whether it was found."""
+        return await self.__queued("/delete_sensor", sensor_id)
+
+    async def delete_sensors(self, sensor_ids: list[SensorId]) -> list[bool]:
+        """Queue sensors to delete. :return: Whether each one was found."""
+        return list(await asyncio.gather(*(self.delete_sensor(x) for x in sensor_ids)))
+
+    async def get_sensors(self, sensor_type: SensorType | None = None, namespace: str | None = None,
+                          simulator_config: bool = False, page_size: int = PAGE_SIZE) -> list[SensorConfig]:
+        """
+        Get the sensors, page by page.
+        :param sensor_type: Only sensors of this type, None for all.
+        :param namespace: Only sensors in this namespace or below, None for all.
+        :param simulator_config: Whether to include the simulator configurations.
+        :param page_size: Sensors per request.
+        :raises httpx.HTTPStatusError: 409 Conflict if the sensors changed while listing them.
+        """
+        params: dict[str, Any] = {"limit": page_size, "simulator_config": simulator_config}
+        if sensor_type is not None:
+            params["sensor_type"] = str(sensor_type)
+        if namespace is not None:
+            params["namespace"] = namespace
+        sensors: list[SensorConfig] = []
+        while True:
+            page: SensorConfigList = SensorConfigList.model_validate(
+                await self.__request("GET", "/get_sensors", params=params))
+            sensors += page.sensors
+            if page.next_cursor is None:
+                return sensors
+            params["cursor"] = page.next_cursor
+
+    async def get_node_ids(self) -> SensorNodeIdsList:
+        """Get the OPC UA node IDs of the sensors."""
+        return SensorNodeIdsList.model_validate(await self.__request("GET", "/get_node_ids"))
+
+    async def changes(self, since: int = 0, wait: float = 0.0) -> dict[str, Any]:
+        """Get the changes after a version, see /v0.1/changes."""
+        return await self.__request("GET", "/changes", params={"since": since, "wait": wait},
+                                    timeout=self.__timeout + wait)
+
+    async def values(self) -> dict[str, list[Any]]:
+        """Get the latest value of every sensor, as columns type, identifier, timestamp and value."""
+        return await self.__request("GET", "/values")
+
+    async def speed_factor(self) -> float:
+        """Get how many simulated seconds pass per real second."""
+        return await self.__request("GET", "/speed_factor")
+
+    async def set_speed_factor(self, factor: float) -> bool:
+        """Set how many simulated seconds pass per real second. :return: Whether it was set."""
+        return await self.__request("POST", "/set_speed_factor", params={"factor": factor})
+
+    async def __request(self, method: str, path: str, **kwargs) -> Any:
+        await self.flush()
+        return await self.__send(method, path, **kwargs)
+
+    async def __send(self, method: str, path: str, **kwargs) -> Any:
+        async with self.__requests:
+            self.__sent += 1
+            response: httpx.Response = await self.__client.request(method, path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def __queued(self, path: str, item: BaseModel) -> Any:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.__queue.append((path, item, future))
+        if self.__collecting is None:
+            self.__collecting = self.__sending = asyncio.create_task(self.__send_queued())
+        return await future
+
+    async def __send_queued(self):
+        await asyncio.sleep(self.__batch_delay)
+        queue, self.__queue, self.__collecting = self.__queue, [], None
+        # sent one after the other, also the chunks of a run, operations queued later wait for the ones before
+        async with self.__order:
+            for path, run in itertools.groupby(queue, key=lambda x: x[0]):
+                operations: list[tuple[str, BaseModel, asyncio.Future]] = list(run)
+                for i in range(0, len(operations), self.__batch_size):
+                    await self.__send_batch(path, operations[i:i + self.__batch_size])
+
+    async def __send_batch(self, path: str, operations: list[tuple[str, BaseModel, asyncio.Future]]):
+        try:
+            if len(operations) == 1:
+                results: list[Any] = [await self.__send("POST", path, json=operations[0][1].model_dump(mode="json"))]
+            else:
+                results = await self.__send("POST", _BULK_PATHS[path],
+                                            json=[x.model_dump(mode="json") for _, x, _ in operations])
+        except Exception as e:
+            logging.warning("Sending %s queued operations to %s failed: %r", len(operations), path, e)
+            for _, _, future in operations:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(operations, results, strict=True):
+            if not future.done():
+                future.set_result(result)
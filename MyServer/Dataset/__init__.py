@@ -0,0 +1,9 @@
+from .scenario_action import ScenarioAction
+from .scenario import Scenario, ScenarioEvent
+from .output_format import OutputFormat
+from .chunked_file_writer import ChunkedFileWriter
+from .rotating_file_writer import RotatingFileWriter
+from .fast_forward_generator import FastForwardGenerator
+
+__all__ = ["ScenarioAction", "Scenario", "ScenarioEvent", "OutputFormat", "ChunkedFileWriter", "RotatingFileWriter",
+           "FastForwardGenerator"]
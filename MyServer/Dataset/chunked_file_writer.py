@@ -0,0 +1,52 @@
+import logging
+import os
+
+import pandas as pd
+
+from .output_format import OutputFormat
+
+
+class ChunkedFileWriter:
+    """Writes data frames to a sequence of numbered part files, one file per chunk."""
+
+    def __init__(self, directory: str, prefix: str, output_format: OutputFormat = OutputFormat.PARQUET):
+        """
+        ctor.
+        :param directory: Directory to write the files to. Created if not present.
+        :param prefix: Prefix of the file names.
+        :param output_format: Format of the files.
+        """
+        self.__directory = directory
+        self.__prefix = prefix
+        self.__output_format = output_format
+        self.__files: list[str] = []
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def files(self) -> list[str]:
+        """Files written so far."""
+        return list(self.__files)
+
+    @property
+    def output_format(self) -> OutputFormat:
+        """Format of the files."""
+        return self.__output_format
+
+    def write(self, frame: pd.DataFrame) -> str:
+        """
+        Write a chunk to a new part file.
+        :param frame: The chunk to write.
+        :return: Path of the written file.
+        """
+        file_name = f"{self.__prefix}_part_{len(self.__files):05d}.{self.__output_format}"
+        file_path = os.path.join(self.__directory, file_name)
+        match self.__output_format:
+            case OutputFormat.PARQUET:
+                frame.to_parquet(file_path, index=False)
+            case OutputFormat.CSV:
+                frame.to_csv(file_path, index=False)
+            case OutputFormat.ARROW:
+                frame.to_feather(file_path, compression="uncompressed")
+        logging.debug(f"Written {len(frame)} rows to {file_path}.")
+        self.__files.append(file_path)
+        return file_path
@@ -0,0 +1,169 @@
+import logging
+import math
+
+import numpy as np
+import pandas as pd
+
+from MyServer.Lifetime import MachineModel
+from MyServer.Simulation import SimulationDriver
+from .chunked_file_writer import ChunkedFileWriter
+from .output_format import OutputFormat
+from .scenario import Scenario, ScenarioEvent
+
+TIMESTAMP_COLUMN: str = "timestamp"
+MAX_SAMPLES_PER_CHUNK: int = 50_000_000
+"""Samples of all sensors held in memory before they are written, 400 MB of float64 values."""
+
+
+class _RateGroup:
+    """
+    Drivers sharing the same update rate. The group is simulated as one vectorized system: every driver follows
+    x_(k+1) = w * x_k + (1 - w) * target + noise, the same recurrence the drivers use when measuring live.
+    """
+
+    def __init__(self, drivers: list[SimulationDriver[float]], updates_per_second: float, writer: ChunkedFileWriter):
+        self.drivers = drivers
+        self.updates_per_second = updates_per_second
+        self.writer = writer
+        self.columns = [d.sensor.name for d in drivers]
+        period: float = 1.0 / updates_per_second
+        self.period_ns: float = period * 1e9
+        self.values = np.array([d.last_value for d in drivers], dtype=np.float64)
+        self.weights = np.exp(-period / np.array([d.adaption_rate for d in drivers], dtype=np.float64))
+        self.random = np.random.default_rng([d.to_driver_data().random_seed for d in drivers])
+        self.bias = np.zeros(len(drivers), dtype=np.float64)
+        self.st_dev = np.zeros(len(drivers), dtype=np.float64)
+        self.next_tick: int = 0
+        self.blocks: list[np.ndarray] = []
+        self.first_tick_of_chunk: int = 0
+        self.update_targets()
+
+    def update_targets(self):
+        """Read the targets from the drivers, to be called whenever mode or state changed."""
+        for i, driver in enumerate(self.drivers):
+            target, st_dev = driver.target(driver.mode, driver.state)
+            self.bias[i] = (1.0 - self.weights[i]) * target
+            self.st_dev[i] = st_dev
+
+    def simulate(self, until: float):
+        """
+        Simulate all ticks before a point in virtual time.
+        :param until: Seconds after the start of the scenario, exclusive.
+        """
+        end_tick: int = math.ceil(until * self.updates_per_second - 1e-9)
+        count: int = end_tick - self.next_tick
+        if count <= 0:
+            return
+        block = self.random.standard_normal((count, len(self.drivers)))
+        block *= self.st_dev
+        block += self.bias
+        x = self.values
+        for row in block:
+            np.multiply(x, self.weights, out=x)
+            np.add(x, row, out=x)
+            row[:] = x
+        self.blocks.append(block)
+        self.next_tick = end_tick
+
+    def flush(self, start: np.datetime64):
+        """Write the ticks simulated since the last flush."""
+        if not self.blocks:
+            return
+        ticks = np.arange(self.first_tick_of_chunk, self.next_tick, dtype=np.float64)
+        timestamps = start + (ticks * self.period_ns).astype(np.int64).astype("timedelta64[ns]")
+        values = self.blocks[0] if len(self.blocks) == 1 else np.concatenate(self.blocks)
+        frame = pd.DataFrame(values, columns=self.columns)
+        frame.insert(0, TIMESTAMP_COLUMN, timestamps)
+        self.writer.write(frame)
+        self.blocks = []
+        self.first_tick_of_chunk = self.next_tick
+
+
+class FastForwardGenerator:
+    """
+    Runs the simulation drivers of a machine model in virtual time, as fast as possible, and streams the samples to
+    chunked files. One set of files is written per update rate, with one column per sensor.
+    """
+
+    def __init__(self,
+                 model: MachineModel,
+                 scenario: Scenario,
+                 directory: str,
+                 output_format: OutputFormat = OutputFormat.PARQUET,
+                 chunk_seconds: float = 3600.0,
+                 max_samples_per_chunk: int = MAX_SAMPLES_PER_CHUNK):
+        """
+        ctor.
+        :param model: Machine model with the drivers to simulate.
+        :param scenario: Scenario to run.
+        :param directory: Directory to write the files to.
+        :param output_format: Format of the files.
+        :param chunk_seconds: Virtual time covered by one file at most.
+        :param max_samples_per_chunk: Samples of all sensors per chunk at most, shortens the chunks of many or fast
+        sensors. Bounds the memory usage.
+        """
+        if chunk_seconds <= 0 or max_samples_per_chunk <= 0:
+            raise ValueError(f"Chunk length and size must be positive, got {chunk_seconds} s and "
+                             f"{max_samples_per_chunk} samples.")
+        self.__model = model
+        self.__scenario = scenario
+        self.__chunk_seconds = chunk_seconds
+        self.__start = np.datetime64(scenario.start, "ns")
+
+        by_rate: dict[float, list[SimulationDriver[float]]] = {}
+        for driver in model.mutators:
+            if not isinstance(driver, SimulationDriver):
+                logging.warning(f"Driver {type(driver).__name__} is not a simulation driver, skipping.")
+                continue
+            try:
+                driver.target(driver.mode, driver.state)
+            except NotImplementedError:
+                logging.warning(f"Driver of {driver.sensor.name} cannot be fast-forwarded, skipping.")
+                continue
+            by_rate.setdefault(driver.sensor.updates_per_second, []).append(driver)
+
+        self.__groups: list[_RateGroup] = [
+            _RateGroup(drivers, rate, ChunkedFileWriter(directory, f"samples_{rate:g}Hz", output_format))
+            for rate, drivers in by_rate.items()
+        ]
+        samples_per_second: float = sum(g.updates_per_second * len(g.drivers) for g in self.__groups)
+        if samples_per_second > 0:
+            # at least one tick of the fastest group, the chunks would not advance otherwise
+            shortest: float = 1.0 / max(g.updates_per_second for g in self.__groups)
+            self.__chunk_seconds = min(chunk_seconds, max(max_samples_per_chunk / samples_per_second, shortest))
+
+    def run(self) -> list[str]:
+        """
+        Run the scenario.
+        :return: The written files.
+        """
+        duration = self.__scenario.duration
+        logging.info(f"Fast-forwarding {duration} s for {sum(len(g.drivers) for g in self.__groups)} sensors.")
+        events: list[ScenarioEvent] = list(self.__scenario.events)
+        chunk_start: float = 0.0
+        while chunk_start < duration:
+            chunk_end: float = min(chunk_start + self.__chunk_seconds, duration)
+            while events and events[0].time < chunk_end:
+                event = events.pop(0)
+                self.__simulate(event.time)
+                self.__apply(event)
+            self.__simulate(chunk_end)
+            for group in self.__groups:
+                group.flush(self.__start)
+            chunk_start = chunk_end
+
+        if events:
+            logging.warning(f"{len(events)} event(s) after the end of the scenario ignored.")
+        files = [f for group in self.__groups for f in group.writer.files]
+        logging.info(f"Fast-forward finished, {len(files)} file(s) written.")
+        return files
+
+    def __simulate(self, until: float):
+        for group in self.__groups:
+            group.simulate(until)
+
+    def __apply(self, event: ScenarioEvent):
+        logging.info(f"Scenario event at {event.time} s: {event.action}.")
+        getattr(self.__model, event.action.value)()
+        for group in self.__groups:
+            group.update_targets()
@@ -0,0 +1,10 @@
+from enum import StrEnum
+
+class OutputFormat(StrEnum):
+    """File formats for generated data."""
+    CSV = "csv"
+    """Comma separated values, human readable but large."""
+    PARQUET = "parquet"
+    """Compressed columnar format."""
+    ARROW = "arrow"
+    """Uncompressed Arrow IPC file format, can be memory-mapped, for example for replay."""
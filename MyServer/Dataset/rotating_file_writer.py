@@ -0,0 +1,87 @@
+import logging
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.parquet
+
+from .output_format import OutputFormat
+
+
+class RotatingFileWriter:
+    """
+    Appends Arrow tables to a file and starts a new file once the current one exceeds a size or an age. Not thread safe,
+    meant to be used from a single writer thread.
+    """
+
+    def __init__(self, directory: str, prefix: str, output_format: OutputFormat = OutputFormat.PARQUET,
+                 max_file_bytes: int = 256 * 1024 * 1024, max_file_seconds: float = 3600.0):
+        """
+        ctor.
+        :param directory: Directory to write the files to. Created if not present.
+        :param prefix: Prefix of the file names.
+        :param output_format: Format of the files.
+        :param max_file_bytes: Size after which a new file is started.
+        :param max_file_seconds: Age in seconds after which a new file is started.
+        """
+        self.__directory = directory
+        self.__prefix = prefix
+        self.__output_format = output_format
+        self.__max_file_bytes = max_file_bytes
+        self.__max_file_seconds = max_file_seconds
+        self.__files: list[str] = []
+        self.__sink: pa.OSFile | None = None
+        self.__writer = None
+        self.__schema: pa.Schema | None = None
+        self.__opened: float = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def files(self) -> list[str]:
+        """Files written so far, including the open one."""
+        return list(self.__files)
+
+    def write(self, table: pa.Table):
+        """
+        Append a table to the current file.
+        :param table: Data to write. A new file is started if the schema changes.
+        """
+        if self.__output_format == OutputFormat.CSV:
+            table = table.cast(pa.schema([
+                pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f for f in table.schema
+            ]))
+        if self.__writer is not None and (not table.schema.equals(self.__schema)
+                                          or time.monotonic() - self.__opened >= self.__max_file_seconds):
+            self.close()
+        if self.__writer is None:
+            self.__open(table.schema)
+        self.__writer.write_table(table)
+        if self.__sink.tell() >= self.__max_file_bytes:
+            self.close()
+
+    def close(self):
+        """Close the current file. The next write starts a new one."""
+        if self.__writer is None:
+            return
+        self.__writer.close()
+        self.__sink.close()
+        logging.debug(f"Closed {self.__files[-1]}.")
+        self.__writer = None
+        self.__sink = None
+
+    def __open(self, schema: pa.Schema):
+        file_path = os.path.join(self.__directory,
+                                 f"{self.__prefix}_{len(self.__files):05d}.{self.__output_format}")
+        logging.debug(f"Opening {file_path}.")
+        self.__sink = pa.OSFile(file_path, "wb")
+        match self.__output_format:
+            case OutputFormat.PARQUET:
+                self.__writer = pyarrow.parquet.ParquetWriter(self.__sink, schema)
+            case OutputFormat.ARROW:
+                self.__writer = pa.ipc.new_file(self.__sink, schema)
+            case OutputFormat.CSV:
+                self.__writer = pyarrow.csv.CSVWriter(self.__sink, schema)
+        self.__schema = schema
+        self.__opened = time.monotonic()
+        self.__files.append(file_path)
@@ -0,0 +1,51 @@
+import dataclasses
+import json
+from datetime import datetime
+from typing import Any
+
+from .scenario_action import ScenarioAction
+
+
+@dataclasses.dataclass(frozen=True)
+class ScenarioEvent:
+    """Event in a scenario, triggered at a point in virtual time."""
+    time: float
+    """Seconds after the start of the scenario."""
+    action: ScenarioAction
+    """Action to trigger on the machine model."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Scenario:
+    """Timed sequence of machine events to simulate."""
+    start: datetime
+    """Virtual start time of the scenario."""
+    duration: float
+    """Duration of the scenario in seconds."""
+    events: tuple[ScenarioEvent, ...] = ()
+    """Events, sorted by time."""
+
+    def __post_init__(self):
+        if self.duration <= 0:
+            raise ValueError(f"Duration must be positive, got {self.duration}.")
+        object.__setattr__(self, "events", tuple(sorted(self.events, key=lambda e: e.time)))
+
+    @staticmethod
+    def from_dict(d: dict[str, Any]) -> "Scenario":
+        """
+        Create a scenario from a dictionary.
+        :param d: Dictionary with "start" (ISO format), "duration" (seconds) and "events", a list of entries with
+            "time" (seconds after start) and "event" (one of the scenario actions).
+        """
+        if "duration" not in d:
+            raise ValueError("Field 'duration' must be present in the scenario.")
+        start = datetime.fromisoformat(d["start"]) if "start" in d else datetime.now()
+        events = tuple(ScenarioEvent(time=float(e["time"]), action=ScenarioAction(e["event"]))
+                       for e in d.get("events", []))
+        return Scenario(start=start, duration=float(d["duration"]), events=events)
+
+    @staticmethod
+    def load(file_path: str) -> "Scenario":
+        """Load a scenario from a JSON file."""
+        with open(file_path, "r") as f:
+            return Scenario.from_dict(json.load(f))
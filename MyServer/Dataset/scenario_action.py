@@ -0,0 +1,12 @@
+from enum import StrEnum
+
+class ScenarioAction(StrEnum):
+    """Actions which can be triggered on the machine model during a scenario."""
+    START_JOB = "start_job"
+    """Start a job."""
+    STOP_JOB = "stop_job"
+    """Stop the running job."""
+    SET_STATE_BROKEN = "set_state_broken"
+    """Set the machine state to broken."""
+    SET_STATE_NORMAL = "set_state_normal"
+    """Set the machine state to normal."""
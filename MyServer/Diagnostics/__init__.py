@@ -0,0 +1,4 @@
+from .rate_limit_filter import RateLimitFilter
+from .log_pipeline import LogPipeline
+
+__all__ = ["RateLimitFilter", "LogPipeline"]
@@ -0,0 +1,85 @@
+import logging
+import logging.handlers
+import queue
+from collections.abc import Iterable
+
+from .rate_limit_filter import RateLimitFilter
+
+
+class _DeferringQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler which leaves the formatting to the listener thread and never blocks the caller."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped: int = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # same process, hence no need to pickle: formatting is left to the handlers of the listener
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BlockingStopQueueListener(logging.handlers.QueueListener):
+    """Queue listener which waits for space in a full queue on stop, instead of failing."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """
+    Queue based logging. Log calls only filter the record and put it into a bounded queue; a background thread
+    formats the records and writes them to the actual handlers. If the handlers cannot keep up, for example on a slow
+    disk, records are dropped instead of stalling the caller.
+    """
+
+    def __init__(self, handlers: Iterable[logging.Handler], queue_size: int = 10000,
+                 rate_limit: RateLimitFilter | None = None):
+        """
+        ctor.
+        :param handlers: Handlers writing the records, called from the background thread only.
+        :param queue_size: Number of records waiting for the handlers before new ones are dropped.
+        :param rate_limit: Filter for repeated messages. If None, all records are passed.
+        """
+        self.__queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.__handler = _DeferringQueueHandler(self.__queue)
+        self.__rate_limit = rate_limit
+        if rate_limit is not None:
+            self.__handler.addFilter(rate_limit)
+        self.__listener = _BlockingStopQueueListener(self.__queue, *handlers, respect_handler_level=True)
+        self.__loggers: list[logging.Logger] = []
+
+    @property
+    def dropped(self) -> int:
+        """Number of records dropped because the handlers did not keep up."""
+        return self.__handler.dropped
+
+    @property
+    def suppressed(self) -> int:
+        """Number of records suppressed by the rate limit."""
+        return 0 if self.__rate_limit is None else self.__rate_limit.suppressed
+
+    def install(self, level: int, logger_names: Iterable[str] = ("",)):
+        """
+        Attach the pipeline to loggers and start the background thread.
+        :param level: Level of the loggers.
+        :param logger_names: Names of the loggers, "" is the root logger.
+        """
+        for name in logger_names:
+            logger = logging.getLogger(name)
+            logger.setLevel(level)
+            logger.addHandler(self.__handler)
+            self.__loggers.append(logger)
+        self.__listener.start()
+
+    def stop(self):
+        """Detach the pipeline from the loggers and write the pending records."""
+        for logger in self.__loggers:
+            logger.removeHandler(self.__handler)
+        self.__loggers.clear()
+        self.__listener.stop()
@@ -0,0 +1,70 @@
+import logging
+import threading
+import time
+
+SUPPRESSED_SUFFIX: str = " (%d similar messages suppressed)"
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most a burst of records with the same message template pass per interval. Suppressed records are counted
+    and reported with the first record passing in the next interval. Relies on lazy formatting: records are grouped
+    by their unformatted message, so f-strings defeat the grouping. Thread safe, records are filtered on the threads
+    logging them.
+    """
+
+    def __init__(self, burst: int = 20, interval: float = 10.0, max_keys: int = 10000):
+        """
+        ctor.
+        :param burst: Records per template and interval which pass.
+        :param interval: Length of the interval in seconds.
+        :param max_keys: Number of templates to keep track of, the counters are reset when exceeded.
+        """
+        super().__init__()
+        self.__burst = burst
+        self.__interval = interval
+        self.__max_keys = max_keys
+        # template -> [start of the interval, passed records, suppressed records]
+        self.__windows: dict[tuple[str, int, object], list] = {}
+        self.__suppressed_total: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+
+    @property
+    def suppressed(self) -> int:
+        """Number of records suppressed so far."""
+        return self.__suppressed_total
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now: float = time.monotonic()
+        key = (record.name, record.levelno, record.msg)
+        with self.__lock:
+            window = self.__windows.get(key)
+            if window is None:
+                if len(self.__windows) >= self.__max_keys:
+                    self.__windows.clear()
+                self.__windows[key] = [now, 1, 0]
+                return True
+            if now - window[0] >= self.__interval:
+                suppressed: int = window[2]
+                window[0], window[1], window[2] = now, 1, 0
+            elif window[1] < self.__burst:
+                window[1] += 1
+                return True
+            else:
+                window[2] += 1
+                self.__suppressed_total += 1
+                return False
+        if suppressed > 0:
+            _report(record, suppressed)
+        return True
+
+
+def _report(record: logging.LogRecord, suppressed: int):
+    """Append the number of suppressed records to the message of a record."""
+    if record.args and isinstance(record.msg, str) and isinstance(record.args, tuple):
+        record.msg = record.msg + SUPPRESSED_SUFFIX
+        record.args = record.args + (suppressed,)
+    else:
+        # without arguments, the message is not formatted and may contain a literal %
+        record.msg = record.getMessage() + SUPPRESSED_SUFFIX % suppressed
+        record.args = ()
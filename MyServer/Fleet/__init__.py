@@ -0,0 +1,5 @@
+from .machine_template import MachineTemplate
+from .fleet import Fleet, FleetMachine
+from .fleet_scheduler import FleetScheduler
+
+__all__ = ["MachineTemplate", "Fleet", "FleetMachine", "FleetScheduler"]
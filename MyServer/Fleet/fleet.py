@@ -0,0 +1,197 @@
+import dataclasses
+import json
+import logging
+from collections.abc import Mapping
+from typing import Any
+
+from MyServer.Lifetime import MachineModel, MachineModelBase
+from MyServer.Lifetime.machine_model_base import next_version
+from MyServer.MachineOperation import Mode, SensorId, SensorType
+from MyServer.OpcUa import FOLDER_SEPARATOR
+from MyServer.Sensor.Base import SensorBase, DriverBase
+from MyServer.Simulation import SimulationDriver
+from .machine_template import MachineTemplate
+
+MACHINE: str = "machine"
+"""Field of a custom message naming the machine it is meant for."""
+
+
+@dataclasses.dataclass(frozen=True)
+class FleetMachine:
+    """How a machine of a fleet was created."""
+    template: MachineTemplate
+    """Template shared with other machines."""
+    overrides: Mapping[SensorId, Mapping[str, Any]]
+    """Fields replacing the ones of the template, by sensor."""
+    seed: int
+    """Offset of the random seeds."""
+
+
+class Fleet(MachineModelBase):
+    """
+    Hosts many machine models in one process. Every machine gets a top level folder of its own in the data model,
+    named after the machine, and its own mode and state. Machines are created from templates, see MachineTemplate.
+    """
+
+    def __init__(self):
+        self._machines: dict[str, MachineModel] = {}
+        self._origins: dict[str, FleetMachine] = {}
+        self._seed: int = 0
+        self._version: int = next_version()
+
+    @property
+    def machines(self) -> dict[str, MachineModel]:
+        """The machines by name."""
+        return dict(self._machines)
+
+    def machine(self, name: str) -> MachineModel | None:
+        """Get a machine by name, None if not hosted."""
+        return self._machines.get(name)
+
+    @property
+    def version(self) -> int:
+        """The latest version of the fleet and its machines, changes with the machines and their sensors."""
+        return max([self._version] + [x.version for x in self._machines.values()])
+
+    def origin(self, name: str) -> FleetMachine | None:
+        """Get how a machine was created, None if not hosted."""
+        return self._origins.get(name)
+
+    def add_machine(self, name: str, template: MachineTemplate,
+                    overrides: Mapping[SensorId, Mapping[str, Any]] | None = None,
+                    seed: int | None = None) -> MachineModel:
+        """
+        Create a machine from a template.
+        :param name: Name of the machine and of its folder in the data model.
+        :param template: Configuration of the machine.
+        :param overrides: Fields replacing the ones of the template, by sensor, see MachineTemplate.entry.
+        :param seed: Offset of the random seeds. If None, every machine gets a new one.
+        :raises ValueError: If the name is taken or not a valid folder name.
+        """
+        if not name or FOLDER_SEPARATOR in name:
+            raise ValueError(f"Invalid machine name: {name!r}.")
+        if name in self._machines:
+            raise ValueError(f"Machine {name} already exists.")
+        if seed is None:
+            seed = self._seed
+        self._seed = max(self._seed, seed + 1)
+        origin = FleetMachine(template=template, overrides=dict(overrides or {}), seed=seed)
+        model: MachineModel = template.instantiate(name, origin.overrides, seed)
+        self._machines[name] = model
+        self._origins[name] = origin
+        self._version = next_version()
+        logging.info("Added machine %s with %s sensors.", name, len(model.sensors))
+        return model
+
+    def remove_machine(self, name: str) -> bool:
+        """
+        Stop the sensors of a machine and remove it.
+        :return: Whether the machine was hosted.
+        """
+        model: MachineModel | None = self._machines.pop(name, None)
+        if model is None:
+            logging.warning("Machine %s not found.", name)
+            return False
+        del self._origins[name]
+        self._version = next_version()
+        for sensor in model.sensors:
+            if sensor.running:
+                sensor.stop()
+        logging.info("Removed machine %s.", name)
+        return True
+
+    def add_sensor(self, sensor: SensorBase, driver: DriverBase | SimulationDriver = None, **kwargs):
+        """
+        Add a sensor to one machine. The sensor is not part of the template, so it is not saved.
+        :param sensor: Sensor to add. Its namespace should start with the name of the machine.
+        :param driver: Driver of the sensor. If None, a default driver is created.
+        :param kwargs: "machine" with the name of the machine, the others are passed to the machine.
+        """
+        name: str | None = kwargs.pop(MACHINE, None)
+        if name not in self._machines:
+            logging.warning("Sensor %s not added, machine %r not found.", sensor.name, name)
+            return
+        self._machines[name].add_sensor(sensor, driver, **kwargs)
+
+    def delete_sensor(self, sensor_id: SensorId, machine: str | None = None):
+        """
+        Delete a sensor.
+        :param sensor_id: ID of the sensor.
+        :param machine: Name of the machine. If None, the sensor is deleted from every machine.
+        """
+        names: list[str] = list(self._machines) if machine is None else [machine]
+        for name in names:
+            model: MachineModel | None = self._machines.get(name)
+            if model is not None and any(x.sensor_id == sensor_id for x in model.sensors):
+                model.delete_sensor(sensor_id)
+
+    @property
+    def sensors(self) -> list[SensorBase]:
+        """Sensors of all machines."""
+        return [x for model in self._machines.values() for x in model.sensors]
+
+    @property
+    def mutators(self) -> list[DriverBase | SimulationDriver]:
+        """Drivers of all machines."""
+        return [x for model in self._machines.values() for x in model.mutators]
+
+    @property
+    def mode(self) -> Mode:
+        """Running if a job runs on any machine."""
+        running: bool = any(x.mode == Mode.RUNNING for x in self._machines.values())
+        return Mode.RUNNING if running else Mode.IDLE
+
+    def start_job(self):
+        logging.info("Starting job on %s machines.", len(self._machines))
+        for model in self._machines.values():
+            model.start_job()
+
+    def stop_job(self):
+        logging.info("Stopping job on %s machines.", len(self._machines))
+        for model in self._machines.values():
+            model.stop_job()
+
+    def custom_message(self, message: dict[str, Any]) -> bool:
+        """Pass a message to the machine named in its "machine" field, or to all machines without."""
+        message = dict(message)
+        name: str | None = message.pop(MACHINE, None)
+        if name is None:
+            return all([x.custom_message(message) for x in self._machines.values()])
+        if name not in self._machines:
+            logging.warning("Message for unknown machine %s.", name)
+            return False
+        return self._machines[name].custom_message(message)
+
+    def save_configuration(self, file_path: str):
+        """Save the templates and the machines created from them. Sensors added later are not saved."""
+        logging.info("Saving fleet of %s machines to %s.", len(self._machines), file_path)
+        templates: list[MachineTemplate] = []
+        machines: list[dict[str, Any]] = []
+        for name, origin in self._origins.items():
+            if not any(x is origin.template for x in templates):
+                templates.append(origin.template)
+            machines.append({
+                "name": name,
+                "template": next(i for i, x in enumerate(templates) if x is origin.template),
+                "seed": origin.seed,
+                "overrides": [{"sensor_id": k.model_dump(mode="json"), "values": dict(v)}
+                              for k, v in origin.overrides.items()]
+            })
+        with open(file_path, "w") as f:
+            json.dump({"templates": [x.to_list() for x in templates], "machines": machines}, f, indent=4)
+
+    def restore_configuration(self, file_path: str):
+        """Add the machines of a file written by save_configuration."""
+        logging.info("Loading fleet from %s.", file_path)
+        with open(file_path, "r") as f:
+            dictionary = json.load(f)
+        templates: list[MachineTemplate] = [MachineTemplate(x) for x in dictionary.get("templates", [])]
+        for entry in dictionary.get("machines", []):
+            overrides: dict[SensorId, dict[str, Any]] = {
+                SensorId(type=SensorType(x["sensor_id"]["type"]), identifier=x["sensor_id"]["identifier"]): x["values"]
+                for x in entry.get("overrides", [])
+            }
+            try:
+                self.add_machine(entry["name"], templates[entry["template"]], overrides, entry.get("seed"))
+            except (KeyError, IndexError, ValueError) as e:
+                logging.error("Machine %s not restored: %r. Skipping.", entry.get("name"), e)
@@ -0,0 +1,102 @@
+import heapq
+import logging
+from datetime import datetime, timedelta
+
+from MyServer.Sensor.Base import SensorBase
+from MyServer.Simulation import SimulationDriver
+from MyServer.Timing import Clock, ScaledClock
+
+
+class FleetScheduler:
+    """
+    Polls the simulation drivers of many machines from one task instead of one task per sensor. The drivers are kept
+    in a heap by their next due time, each wake-up measures all due drivers and hands the samples to their sensors,
+    which notify their callbacks as usual. Drivers which are not simulation drivers keep being polled by their sensors.
+    """
+
+    def __init__(self, drivers: list, clock: Clock | None = None):
+        """
+        ctor.
+        :param drivers: Drivers of the machines. Only simulation drivers are scheduled.
+        :param clock: Clock of the server, used for the due times and the time stamps.
+        """
+        self.__drivers: list[SimulationDriver] = [x for x in drivers if isinstance(x, SimulationDriver)]
+        self.__clock: Clock = clock if clock is not None else ScaledClock()
+        self.__running: bool = False
+        self.__samples: int = 0
+        self.__wake_ups: int = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the drivers are taken off their sensors."""
+        return self.__running
+
+    @property
+    def sensors(self) -> list[SensorBase]:
+        """Sensors fed by the scheduler."""
+        return [x.sensor for x in self.__drivers]
+
+    @property
+    def samples(self) -> int:
+        """Number of samples handed to the sensors."""
+        return self.__samples
+
+    @property
+    def wake_ups(self) -> int:
+        """Number of times the scheduler woke up with due drivers."""
+        return self.__wake_ups
+
+    def start(self):
+        """Take the drivers off their sensors. Sensors polling these drivers are stopped."""
+        if self.__running:
+            logging.warning("Fleet scheduler already running.")
+            return
+        for driver in self.__drivers:
+            if driver.sensor.running:
+                driver.sensor.stop()
+            driver.sensor.source = None
+        self.__running = True
+        logging.info("Scheduling %s drivers in one task.", len(self.__drivers))
+
+    async def run(self):
+        """Poll the drivers at their update rates until stopped. Meant to run as a task."""
+        now: datetime = self.__clock.now()
+        periods: list[timedelta] = [timedelta(seconds=1.0 / x.sensor.updates_per_second) for x in self.__drivers]
+        # (due time, index into the drivers)
+        schedule: list[tuple[datetime, int]] = [(now, i) for i in range(len(self.__drivers))]
+        while self.__running and schedule:
+            now = self.__clock.now()
+            due: list[int] = []
+            while schedule[0][0] <= now:
+                time, index = schedule[0]
+                due.append(index)
+                next_time: datetime = time + periods[index]
+                if next_time <= now:  # missed samples are dropped, a slow loop must not build a backlog
+                    next_time = now + periods[index]
+                heapq.heapreplace(schedule, (next_time, index))
+            if due:
+                self.__wake_ups += 1
+                for index in due:
+                    await self.__sample(self.__drivers[index], now)
+            await self.__clock.sleep((schedule[0][0] - self.__clock.now()).total_seconds())
+
+    async def __sample(self, driver: SimulationDriver, now: datetime):
+        sensor: SensorBase = driver.sensor
+        sensor.on_polling()
+        value = driver.measure()
+        try:
+            await sensor.on_new_data(now, value)
+        except Exception as e:
+            # one failing callback must not stop the other machines
+            logging.warning("Sample of %s dropped: %r", sensor.name, e)
+            return
+        self.__samples += 1
+
+    async def stop(self):
+        """Stop polling and give the drivers back to their sensors."""
+        if not self.__running:
+            return
+        self.__running = False
+        for driver in self.__drivers:
+            driver.sensor.source = driver.measure
+        logging.info("Fleet scheduler stopped after %s samples.", self.__samples)
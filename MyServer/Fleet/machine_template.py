@@ -0,0 +1,106 @@
+import json
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
+
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import SensorId, SensorType
+from MyServer.OpcUa import FOLDER_SEPARATOR
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(x) for x in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(x) for x in value]
+    return value
+
+
+class MachineTemplate:
+    """
+    Configuration shared by machines of one kind: the serialized drivers, as written by
+    MachineModel.save_configuration. The entries are kept once and read-only, the machines created from the template
+    only carry their overrides.
+    """
+
+    def __init__(self, entries: list[dict[str, Any]]):
+        """
+        ctor.
+        :param entries: Serialized drivers. Each needs a "sensor" entry with type and identifier.
+        """
+        self.__entries: tuple[Mapping[str, Any], ...] = tuple(_freeze(x) for x in entries)
+        self.__sensor_ids: tuple[SensorId, ...] = tuple(
+            SensorId(type=SensorType(x["sensor"]["sensor_type"]), identifier=x["sensor"]["identifier"])
+            for x in self.__entries
+        )
+
+    @staticmethod
+    def from_file(file_path: str) -> "MachineTemplate":
+        """Load a template from a configuration written by MachineModel.save_configuration."""
+        with open(file_path, "r") as f:
+            return MachineTemplate(json.load(f))
+
+    @staticmethod
+    def from_model(model: MachineModel) -> "MachineTemplate":
+        """Take the current drivers of a machine model as template."""
+        return MachineTemplate([x.to_driver_data().as_dict() for x in model.mutators])
+
+    @property
+    def entries(self) -> tuple[Mapping[str, Any], ...]:
+        """The serialized drivers, read-only."""
+        return self.__entries
+
+    @property
+    def sensor_ids(self) -> tuple[SensorId, ...]:
+        """IDs of the sensors of every machine, in entry order."""
+        return self.__sensor_ids
+
+    def to_list(self) -> list[dict[str, Any]]:
+        """Get the entries as plain dictionaries, for example for json."""
+        return [_thaw(x) for x in self.__entries]
+
+    def entry(self, index: int, namespace: str, override: Mapping[str, Any] | None = None,
+              seed: int = 0) -> dict[str, Any]:
+        """
+        Get the serialized driver of one sensor of a machine.
+        :param index: Position of the entry.
+        :param namespace: Top level folder of the machine, prepended to the namespace of the sensor.
+        :param override: Fields replacing the ones of the template. Dictionaries, for example "sensor", are updated.
+        :param seed: Added to the random seed, so machines of one template do not produce the same signals.
+        """
+        merged: dict[str, Any] = _thaw(self.__entries[index])
+        if "random_seed" in merged:
+            merged["random_seed"] += seed
+        for key, value in (override or {}).items():
+            if isinstance(value, Mapping) and isinstance(merged.get(key), dict):
+                merged[key].update(value)
+            else:
+                merged[key] = value
+        merged["sensor"]["namespace"] = namespace + FOLDER_SEPARATOR + merged["sensor"]["namespace"]
+        if "namespace" in merged:
+            merged["namespace"] = merged["sensor"]["namespace"]
+        return merged
+
+    def instantiate(self, namespace: str, overrides: Mapping[SensorId, Mapping[str, Any]] | None = None,
+                    seed: int = 0) -> MachineModel:
+        """
+        Create a machine model with a driver and sensor for every entry.
+        :param namespace: Top level folder of the machine in the data model, for example "Press042".
+        :param overrides: Fields replacing the ones of the template, by sensor, see entry.
+        :param seed: Added to the random seeds of the drivers.
+        :raises ValueError: If an entry cannot be turned into a driver.
+        """
+        overrides = overrides or {}
+        model: MachineModel = MachineModel()
+        for index, sensor_id in enumerate(self.__sensor_ids):
+            driver = model.create_driver(self.entry(index, namespace, overrides.get(sensor_id), seed))
+            model.add_sensor(driver.sensor, driver)
+        return model
@@ -1,4 +1,13 @@
 from .startup import StartUp
 from .machine_model import MachineModel
 from .machine_model_base import MachineModelBase
-__all__ =["StartUp", "MachineModel", "MachineModelBase"]
\ No newline at end of file
+from .configuration_journal import ConfigurationJournal
+from .journal_operation import JournalOperation
+from .json_stream import iter_json_array
+from .binary_snapshot import is_snapshot, read_snapshot, write_snapshot
+from .sensor_listing import SensorListing
+from .change_kind import ChangeKind
+from .change_log import ChangeLog, ConfigurationChange
+__all__ =["StartUp", "MachineModel", "MachineModelBase", "ConfigurationJournal", "JournalOperation", "iter_json_array",
+          "is_snapshot", "read_snapshot", "write_snapshot", "SensorListing",
+          "ChangeKind", "ChangeLog", "ConfigurationChange"]
@@ -0,0 +1,105 @@
+import json
+import mmap
+import os
+import struct
+from typing import Any
+
+import numpy as np
+
+MAGIC: bytes = b"DSDSNAP1"
+"""First bytes of a binary snapshot."""
+ALIGNMENT: int = 64
+"""Columns start at multiples of this many bytes, so they can be viewed in place."""
+_HEADER_SIZE = struct.Struct("<Q")
+
+
+def is_snapshot(file_path: str) -> bool:
+    """Whether a file is a binary snapshot, as opposed to a json configuration."""
+    with open(file_path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _encode(values: list[Any]) -> tuple[dict[str, Any], bytes]:
+    """Get the description and the binary data of a column."""
+    if all(type(x) is bool for x in values):
+        return {"dtype": "|b1"}, np.array(values, dtype=np.bool_).tobytes()
+    if all(type(x) is int for x in values):
+        return {"dtype": "<i8"}, np.array(values, dtype=np.int64).tobytes()
+    if all(type(x) in (int, float) for x in values):
+        return {"dtype": "<f8"}, np.array(values, dtype=np.float64).tobytes()
+    if all(type(x) is str for x in values):
+        # dictionary encoded, namespaces and file names repeat
+        labels: dict[str, int] = {}
+        codes = np.array([labels.setdefault(x, len(labels)) for x in values], dtype=np.int32)
+        return {"dtype": "<i4", "labels": list(labels)}, codes.tobytes()
+    return {"values": values}, b""  # anything else is kept in the header
+
+
+def write_snapshot(file_path: str, groups: dict[str, tuple[list[int], dict[str, list[Any]]]]):
+    """
+    Write serialized drivers as binary snapshot: a header in json describing the columns of each group, followed by
+    the numeric columns as raw little endian arrays. The file is written next to the target and renamed.
+    :param file_path: File to write.
+    :param groups: Positions of the drivers and their columns (see to_columns), by kind of driver.
+    """
+    header: dict[str, Any] = {"groups": []}
+    blocks: list[bytes] = []
+    offset: int = 0
+    for kind, (positions, columns) in groups.items():
+        described: dict[str, dict[str, Any]] = {}
+        for name, values in [("position", positions)] + list(columns.items()):
+            description, data = _encode(values)
+            if data:
+                padding: int = -offset % ALIGNMENT
+                blocks.append(b"\0" * padding)
+                offset += padding
+                description["offset"] = offset
+                blocks.append(data)
+                offset += len(data)
+            described[name] = description
+        header["groups"].append({"kind": kind, "count": len(positions), "columns": described})
+    encoded: bytes = json.dumps(header).encode("utf-8")
+    start: int = len(MAGIC) + _HEADER_SIZE.size + len(encoded)
+    start += -start % ALIGNMENT
+    temporary: str = file_path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_SIZE.pack(len(encoded)))
+        f.write(encoded)
+        f.write(b"\0" * (start - f.tell()))
+        for block in blocks:
+            f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, file_path)
+
+
+def read_snapshot(file_path: str) -> list[tuple[str, list[int], dict[str, list[Any]]]]:
+    """
+    Read a binary snapshot. The file is memory-mapped, each column is converted to a list in one step.
+    :return: Kind of driver, positions and columns of each group.
+    :raises ValueError: If the file is not a binary snapshot.
+    """
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{file_path} is not a binary snapshot.")
+        size: int = _HEADER_SIZE.unpack_from(data, len(MAGIC))[0]
+        header_end: int = len(MAGIC) + _HEADER_SIZE.size + size
+        header: dict[str, Any] = json.loads(data[len(MAGIC) + _HEADER_SIZE.size:header_end])
+        start: int = header_end + (-header_end % ALIGNMENT)
+        groups: list[tuple[str, list[int], dict[str, list[Any]]]] = []
+        for group in header["groups"]:
+            columns: dict[str, list[Any]] = {}
+            for name, description in group["columns"].items():
+                if "values" in description:
+                    columns[name] = description["values"]
+                    continue
+                # converted right away, no view may outlive the map
+                values: list[Any] = np.frombuffer(data, dtype=description["dtype"], count=group["count"],
+                                                  offset=start + description["offset"]).tolist()
+                if "labels" in description:
+                    labels: list[str] = description["labels"]
+                    values = [labels[x] for x in values]
+                columns[name] = values
+            groups.append((group["kind"], columns.pop("position"), columns))
+    return groups
@@ -0,0 +1,17 @@
+from enum import StrEnum
+
+
+class ChangeKind(StrEnum):
+    """Kind of an entry of the change log of a machine model."""
+    ADD = "add"
+    """A sensor was added, the values are its serialized driver."""
+    DELETE = "delete"
+    """A sensor was deleted."""
+    UPDATE = "update"
+    """The parameters of a driver changed, the values are the serialized driver."""
+    MODE = "mode"
+    """The mode of the machine changed."""
+    STATE = "state"
+    """The state of the machine changed."""
+    RESET = "reset"
+    """Many sensors were replaced at once, for example restored from a file. Replicas have to list the sensors anew."""
@@ -0,0 +1,113 @@
+import asyncio
+import dataclasses
+import threading
+from collections import deque
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from MyServer.MachineOperation import SensorId
+from .change_kind import ChangeKind
+
+CAPACITY: int = 10000
+"""Changes kept by default. Replicas further behind have to list the sensors anew."""
+
+
+@dataclasses.dataclass(frozen=True)
+class ConfigurationChange:
+    """Entry of the change log of a machine model."""
+    version: int
+    """Version of the change, see MachineModelBase.version. Larger for later changes."""
+    kind: ChangeKind
+    """What changed."""
+    sensor_id: SensorId | None = None
+    """Sensor the change applies to, None for changes of the machine."""
+    values: Mapping[str, Any] | Callable[[], Mapping[str, Any] | None] | None = None
+    """
+    Serialized driver of added and updated sensors, the new mode or state of the machine. Or a function returning
+    them, called when the change is read, so adding many sensors does not serialize their drivers.
+    """
+
+    def as_dict(self) -> dict[str, Any]:
+        values = self.values() if callable(self.values) else self.values
+        return {
+            "version": self.version,
+            "kind": self.kind,
+            "sensor_id": None if self.sensor_id is None else self.sensor_id.model_dump(mode="json"),
+            "values": None if values is None else dict(values)
+        }
+
+
+class ChangeLog:
+    """
+    The latest changes of a machine model, in the order of their versions. Replicas of the configuration ask for the
+    changes since the version they know (since) instead of listing all sensors again. Changes are appended on the loop
+    of the model, waiting for them (wait) works from any loop.
+    """
+
+    def __init__(self, capacity: int = CAPACITY, start: int = 0):
+        """
+        ctor.
+        :param capacity: Number of changes kept, the oldest ones are dropped.
+        :param start: Version of the model when the log is created, the changes before are unknown.
+        """
+        self.__changes: deque[ConfigurationChange] = deque(maxlen=capacity)
+        self.__dropped: int = start  # version of the latest dropped change
+        self.__waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.__lock: threading.Lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """Version of the latest change, the start version if none."""
+        return self.__changes[-1].version if self.__changes else self.__dropped
+
+    def append(self, change: ConfigurationChange):
+        """Append a change and wake up the waiting requests. The version must be larger than the ones before."""
+        with self.__lock:
+            if len(self.__changes) == self.__changes.maxlen:
+                self.__dropped = self.__changes[0].version
+            self.__changes.append(change)
+            waiters, self.__waiters = self.__waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def since(self, version: int) -> list[ConfigurationChange] | None:
+        """
+        Get the changes after a version.
+        :param version: Latest version known, for example from an earlier call or the ETag of the sensor listing.
+        :return: The changes, oldest first. None if some of them were dropped already or are unknown, and for a
+        version after the latest one, which was issued by another process, for example before a restart.
+        """
+        with self.__lock:
+            if version < self.__dropped or version > self.version:
+                return None
+            changes: list[ConfigurationChange] = []
+            for change in reversed(self.__changes):  # the recent ones are asked for
+                if change.version <= version:
+                    break
+                changes.append(change)
+        changes.reverse()
+        return changes
+
+    async def wait(self, version: int, timeout: float) -> bool:
+        """
+        Wait until there are changes after a version.
+        :param version: Latest version known.
+        :param timeout: Seconds to wait at most.
+        :return: Whether there are changes.
+        """
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        with self.__lock:
+            if self.version > version:
+                return True
+            self.__waiters.append((asyncio.get_running_loop(), future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except TimeoutError:
+            with self.__lock:
+                self.__waiters = [x for x in self.__waiters if x[1] is not future]
+        return self.version > version
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
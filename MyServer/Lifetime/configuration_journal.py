@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any
+
+from MyServer.MachineOperation import SensorId
+from .journal_operation import JournalOperation
+
+JOURNAL_SUFFIX: str = ".journal"
+"""Appended to the file name of the snapshot to get the one of the journal."""
+OPERATION: str = "op"
+ENTRY: str = "entry"
+SENSOR_ID: str = "sensor_id"
+VALUES: str = "values"
+START_VALUE: str = "start_value"
+
+_COMPACT = object()
+"""Queued to request a compaction."""
+
+
+def _key(entry: dict[str, Any]) -> tuple[str, int]:
+    return entry["sensor"]["sensor_type"], entry["sensor"]["identifier"]
+
+
+def _apply(entries: dict[tuple[str, int], dict[str, Any]], record: dict[str, Any]):
+    # replaying a record twice has no further effect, so records already in the snapshot may be replayed
+    match record[OPERATION]:
+        case JournalOperation.ADD | JournalOperation.UPDATE:
+            entries[_key(record[ENTRY])] = record[ENTRY]
+        case JournalOperation.DELETE:
+            entries.pop((record[SENSOR_ID]["type"], record[SENSOR_ID]["identifier"]), None)
+        case JournalOperation.CHECKPOINT:
+            for sensor_type, identifier, value in record[VALUES]:
+                entry = entries.get((sensor_type, identifier))
+                if entry is not None and START_VALUE in entry:
+                    entry[START_VALUE] = value
+
+
+class ConfigurationJournal:
+    """
+    Records the changes of a machine configuration in an append-only journal next to a snapshot. Every change is one
+    line of json, so recording it does not depend on the number of sensors. The lines are written and synced to the
+    disk by a background thread; the thread also folds the journal into a new snapshot from time to time, written to
+    a temporary file and renamed over the old one, so a crash at any point leaves a snapshot and journal to load.
+    The snapshot has the format of MachineModel.save_configuration.
+    """
+
+    def __init__(self, file_path: str, compact_records: int = 10000, compact_seconds: float = 600.0):
+        """
+        ctor.
+        :param file_path: File of the snapshot. The journal is the same file with JOURNAL_SUFFIX.
+        :param compact_records: Records after which the journal is folded into the snapshot.
+        :param compact_seconds: Seconds after which a journal with records is folded into the snapshot.
+        """
+        self.__file_path = file_path
+        self.__journal_path = file_path + JOURNAL_SUFFIX
+        self.__compact_records = compact_records
+        self.__compact_seconds = compact_seconds
+        self.__queue: queue.SimpleQueue[dict[str, Any] | object | None] = queue.SimpleQueue()
+        self.__thread: threading.Thread | None = None
+        self.__records: int = 0
+        self.__compactions: int = 0
+
+    @property
+    def file_path(self) -> str:
+        """File of the snapshot."""
+        return self.__file_path
+
+    @property
+    def journal_path(self) -> str:
+        """File of the journal."""
+        return self.__journal_path
+
+    @property
+    def records(self) -> int:
+        """Number of records written."""
+        return self.__records
+
+    @property
+    def compactions(self) -> int:
+        """Number of snapshots written."""
+        return self.__compactions
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is running."""
+        return self.__thread is not None
+
+    def load(self) -> list[dict[str, Any]]:
+        """
+        Read the snapshot and replay the journal. Blocks, call before start or from a thread.
+        :return: Serialized drivers, in the order they were added.
+        """
+        entries: dict[tuple[str, int], dict[str, Any]] = {}
+        if os.path.isfile(self.__file_path):
+            with open(self.__file_path, "r") as f:
+                entries = {_key(x): x for x in json.load(f)}
+        if os.path.isfile(self.__journal_path):
+            with open(self.__journal_path, "r") as f:
+                for number, line in enumerate(f, 1):
+                    try:
+                        _apply(entries, json.loads(line))
+                    except (ValueError, KeyError) as e:
+                        # a crash while appending leaves a partial last line
+                        logging.warning("Journal %s: line %s skipped: %r", self.__journal_path, number, e)
+        return list(entries.values())
+
+    def start(self, entries: list[dict[str, Any]]):
+        """
+        Start the writer thread.
+        :param entries: Current configuration, as returned by load.
+        """
+        if self.__thread is not None:
+            logging.warning("Journal already started.")
+            return
+        self.__thread = threading.Thread(target=self.__write_loop, args=({_key(x): x for x in entries},),
+                                         name="ConfigurationJournal", daemon=True)
+        self.__thread.start()
+
+    def added(self, entry: dict[str, Any]):
+        """Record a new sensor by its serialized driver."""
+        self.__put({OPERATION: JournalOperation.ADD, ENTRY: entry})
+
+    def updated(self, entry: dict[str, Any]):
+        """Record the new parameters of a driver by its serialized driver."""
+        self.__put({OPERATION: JournalOperation.UPDATE, ENTRY: entry})
+
+    def deleted(self, sensor_id: SensorId):
+        """Record the deletion of a sensor."""
+        self.__put({OPERATION: JournalOperation.DELETE, SENSOR_ID: sensor_id.model_dump(mode="json")})
+
+    def checkpoint(self, values: dict[SensorId, float]):
+        """
+        Record the last values of sensors, they are restored as start values of the drivers.
+        :param values: Last value by sensor.
+        """
+        self.__put({OPERATION: JournalOperation.CHECKPOINT, "time": datetime.now().isoformat(),
+                    VALUES: [[k.type.value, k.identifier, v] for k, v in values.items()]})
+
+    def compact(self):
+        """Fold the journal into a new snapshot, in the background."""
+        self.__put(_COMPACT)
+
+    def close(self):
+        """Write the remaining records. Does not wait for the writer, see join."""
+        if self.__thread is not None:
+            self.__queue.put(None)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """
+        Wait for the writer thread to finish, after close. Blocks, do not call on the event loop.
+        :param timeout: Seconds to wait at most, None to wait until finished.
+        :return: Whether the writer finished.
+        """
+        if self.__thread is None:
+            return True
+        self.__thread.join(timeout)
+        if self.__thread.is_alive():
+            return False
+        self.__thread = None
+        logging.info("Journal closed after %s records.", self.__records)
+        return True
+
+    def __put(self, record: dict[str, Any] | object):
+        if self.__thread is None:
+            logging.warning("Journal not started, change not recorded.")
+            return
+        self.__queue.put(record)
+
+    def __write_loop(self, entries: dict[tuple[str, int], dict[str, Any]]):
+        journal = open(self.__journal_path, "a")
+        pending: int = 0  # records since the last snapshot
+        last_compaction: float = time.monotonic()
+        running: bool = True
+        while running:
+            try:
+                items = [self.__queue.get(timeout=self.__compact_seconds)]
+            except queue.Empty:
+                items = []
+            while not self.__queue.empty():  # one sync for everything queued meanwhile
+                items.append(self.__queue.get())
+            compact: bool = False
+            for item in items:
+                if item is None:
+                    running = False
+                elif item is _COMPACT:
+                    compact = True
+                else:
+                    try:
+                        journal.write(json.dumps(item) + "\n")
+                        _apply(entries, item)
+                    except Exception as e:
+                        logging.error("Journal record not written: %r", e)
+                        continue
+                    self.__records += 1
+                    pending += 1
+            journal.flush()
+            os.fsync(journal.fileno())
+            if pending > 0 and (compact or pending >= self.__compact_records
+                                or time.monotonic() - last_compaction >= self.__compact_seconds):
+                try:
+                    self.__write_snapshot(list(entries.values()))
+                except OSError as e:
+                    logging.error("Snapshot not written, keeping the journal: %r", e)
+                    continue
+                journal.close()
+                journal = open(self.__journal_path, "w")  # the snapshot holds everything so far
+                pending = 0
+                last_compaction = time.monotonic()
+                self.__compactions += 1
+        journal.close()
+
+    def __write_snapshot(self, entries: list[dict[str, Any]]):
+        temporary: str = self.__file_path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(entries, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.__file_path)
+        directory: int = os.open(os.path.dirname(os.path.abspath(self.__file_path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)  # makes the rename itself durable
+        finally:
+            os.close(directory)
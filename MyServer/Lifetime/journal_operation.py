@@ -0,0 +1,13 @@
+from enum import StrEnum
+
+
+class JournalOperation(StrEnum):
+    """Kind of a record of the configuration journal."""
+    ADD = "add"
+    """A sensor was added, the record holds its serialized driver."""
+    DELETE = "delete"
+    """A sensor was deleted, the record holds its type and identifier."""
+    UPDATE = "update"
+    """The parameters of a driver changed, the record holds the serialized driver."""
+    CHECKPOINT = "checkpoint"
+    """Last values of the sensors, restored as start values."""
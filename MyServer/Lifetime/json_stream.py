@@ -0,0 +1,62 @@
+import json
+from collections.abc import Iterator
+from typing import Any
+
+CHUNK_SIZE: int = 1 << 20
+"""Characters read from the file at once."""
+
+_WHITESPACE: str = " \t\n\r"
+
+
+def iter_json_array(file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Read the elements of a json array one by one, for example the serialized drivers written by
+    MachineModel.save_configuration. Only the current chunk and element are held in memory, not the whole document.
+    :param file_path: File with a json array.
+    :param chunk_size: Characters read at once.
+    :raises ValueError: If the file is not a json array.
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, "r") as f:
+        buffer: str = ""
+        position: int = 0
+        end_of_file: bool = False
+
+        def refill() -> bool:
+            nonlocal buffer, position, end_of_file
+            chunk: str = f.read(chunk_size)
+            end_of_file = chunk == ""
+            buffer, position = buffer[position:] + chunk, 0
+            return not end_of_file
+
+        expected: str = "["  # allowed tokens, "]" and "" also allow an element
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position == len(buffer):
+                if not refill():
+                    raise ValueError(f"Unexpected end of the json array in {file_path}.")
+                continue
+            token: str = buffer[position]
+            if token == "]" and expected in ("]", ",]"):
+                return
+            if expected in ("[", ",]"):
+                if token != expected[0]:
+                    raise ValueError(f"Unexpected {token!r} in the json array in {file_path}.")
+                position += 1
+                expected = "]" if token == "[" else ""
+                continue
+            if token == "]":
+                raise ValueError(f"Unexpected {token!r} in the json array in {file_path}.")
+            try:
+                element, next_position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if refill():  # the element continues in the next chunk
+                    continue
+                raise
+            if not end_of_file and buffer.find(",", next_position) < 0 and buffer.find("]", next_position) < 0:
+                refill()  # a number at the end of the chunk may continue in the next one, decode again
+                continue
+            yield element
+            position = next_position
+            expected = ",]"
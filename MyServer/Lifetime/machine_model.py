@@ -1,18 +1,57 @@
+import functools
+import gc
 import json
+import os
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
 from typing import Any
 import logging
 import dataclasses
 from enum import Enum
 
-from MyServer.Lifetime.machine_model_base import MachineModelBase
+from MyServer.Lifetime.machine_model_base import MachineModelBase, next_version
+from MyServer.Lifetime.configuration_journal import ConfigurationJournal
+from MyServer.Lifetime.change_kind import ChangeKind
+from MyServer.Lifetime.change_log import ChangeLog, ConfigurationChange
+from MyServer.Lifetime.binary_snapshot import is_snapshot, read_snapshot, write_snapshot
+from MyServer.Lifetime.json_stream import iter_json_array
 from MyServer.MachineOperation.sensor_data_model import SensorId
-from MyServer.MachineOperation import State, Mode, SensorType
-from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.MachineOperation import State, Mode, SensorType, StateCell
+from MyServer.Sensor import TemperatureSensor, PressureSensor, WaveformSensor
 from MyServer.Simulation import DriverFactory, TemperatureSimulationDriverFactory, TemperatureSimulationDriver, \
-    SimulationDriver, PressureSimulationDriver
+    SimulationDriver, PressureSimulationDriver, PressureSimulationDriverFactory, ReplaySimulationDriverFactory, \
+    WaveformSimulationDriver, WaveformSimulationDriverFactory, to_columns, to_entries
 from MyServer.Sensor.Base import SensorBase, DriverBase
+from MyServer.Modbus import ModbusDriverFactory
+from MyServer.Upstream import UpstreamDriver, UpstreamDriverFactory
 
 MACHINE_STATE: str = "machine_state"
+REPLAY_FILE: str = "replay_file"
+MODBUS_HOST: str = "host"
+UPSTREAM_URL: str = "url"
+
+
+def _serialized(driver: DriverBase | SimulationDriver) -> dict[str, Any] | None:
+    """Serialize a driver as in save_configuration, None if it cannot be serialized."""
+    try:
+        return driver.to_driver_data().as_dict()
+    except AttributeError:
+        return None
+
+
+@contextmanager
+def _collection_paused():
+    """
+    Pause the cyclic garbage collector while creating many objects at once. None of them is garbage, but the collector
+    would scan the growing heap over and over.
+    """
+    collecting: bool = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if collecting:
+            gc.enable()
 
 
 class MachineModel(MachineModelBase):
@@ -23,7 +62,7 @@ class MachineModel(MachineModelBase):
         d_used = {x: False for x in message.keys()}
         if MACHINE_STATE in message:
             set_state: bool = message[MACHINE_STATE]
-            logging.debug(f"Set machine state \"running\": {set_state}.")
+            logging.debug('Set machine state "running": %s.', set_state)
             if set_state:
                 self.set_state_normal()
                 d_used[MACHINE_STATE] = True
@@ -34,40 +73,48 @@ class MachineModel(MachineModelBase):
         # find any element that has not been processed
         fully_used = all(d_used.values())
         if not fully_used:
-            logging.warning(f"Unused message(s): {",".join([k for k, v in d_used.items() if not v])}")
+            logging.warning("Unused message(s): %s", ",".join([k for k, v in d_used.items() if not v]))
         return fully_used
 
 
     def start_job(self):
         logging.info("Starting job.")
-        for mutator in self._drivers:
-            mutator.mode = Mode.RUNNING
         self.mode = Mode.RUNNING
 
     def stop_job(self):
         logging.info("Stopping job.")
-        for mutator in self._drivers:
-            mutator.mode = Mode.IDLE
         self.mode = Mode.IDLE
 
     def set_state_broken(self):
         logging.info("Setting machine state to \"broken\".")
-        for mutator in self._drivers:
-            mutator.state = State.BROKEN
+        self.state = State.BROKEN
 
     def set_state_normal(self):
         logging.info("Setting machine state to \"normal\".")
-        for mutator in self._drivers:
-            mutator.state = State.NORMAL
+        self.state = State.NORMAL
 
     def __init__(self):
+        self._cell: StateCell = StateCell(Mode.IDLE, State.NORMAL)
+        self._groups: dict[str, StateCell] = {}
         self._sensors: list[SensorBase] = []
         self._drivers: list[DriverBase | SimulationDriver] = []
-        self._state: State = State.NORMAL
-        self._mode: Mode = Mode.IDLE
+        self._journal: ConfigurationJournal | None = None
+        self._version: int = next_version()
+        self._changes: ChangeLog = ChangeLog(start=self._version)
 
         self._sensor_factory_map: dict[SensorType, DriverFactory] = {
             SensorType.TEMPERATURE: TemperatureSimulationDriverFactory(),
+            SensorType.PRESSURE: PressureSimulationDriverFactory(),
+            SensorType.WAVEFORM: WaveformSimulationDriverFactory(),
+        }
+        self._replay_factory: DriverFactory = ReplaySimulationDriverFactory()
+        self._modbus_factory: DriverFactory = ModbusDriverFactory()
+        self._upstream_factory: DriverFactory = UpstreamDriverFactory()
+        self._factories: dict[str, DriverFactory] = {
+            **self._sensor_factory_map,
+            REPLAY_FILE: self._replay_factory,
+            MODBUS_HOST: self._modbus_factory,
+            UPSTREAM_URL: self._upstream_factory
         }
 
     def __del__(self):
@@ -80,29 +127,65 @@ class MachineModel(MachineModelBase):
         :param sensor: Sensor to add.
         :param driver: mutator for the sensor. If None, a default mutator is created for the respective sensor.
         """
-        logging.info(f"Adding sensor {sensor.name}, type {sensor.sensor_type}, to machine.")
+        logging.info("Adding sensor %s, type %s, to machine.", sensor.name, sensor.sensor_type)
         self._sensors.append(sensor)
         if driver is not None:
-            logging.info(f"Driver for sensor {sensor.name} given, continue with present one.")
-            driver.state = self._state
-            driver.mode = self._mode
-            self._drivers.append(driver)
+            logging.info("Driver for sensor %s given, continue with present one.", sensor.name)
+            self._add_driver(driver)
             return
 
-        logging.info(f"No driver for sensor {sensor.name} given, use default configuration.")
+        logging.info("No driver for sensor %s given, use default configuration.", sensor.name)
         # create the driver automatically
         if isinstance(sensor, TemperatureSensor):
-            logging.info(f"Adding {sensor.name} as temperature sensor.")
+            logging.info("Adding %s as temperature sensor.", sensor.name)
             temperature_driver: TemperatureSimulationDriver = TemperatureSimulationDriver(sensor, **kwargs)
-            temperature_driver.state = self._state
-            temperature_driver.mode = self._mode
-            self._drivers.append(temperature_driver)
+            self._add_driver(temperature_driver)
         elif isinstance(sensor, PressureSensor):
-            logging.info(f"Adding {sensor.name} as pressure sensor.")
+            logging.info("Adding %s as pressure sensor.", sensor.name)
             pressure_driver: PressureSimulationDriver = PressureSimulationDriver(sensor, **kwargs)
-            pressure_driver.state = self._state
-            pressure_driver.mode = self._mode
-            self._drivers.append(pressure_driver)
+            self._add_driver(pressure_driver)
+        elif isinstance(sensor, WaveformSensor):
+            logging.info("Adding %s as waveform sensor.", sensor.name)
+            waveform_driver: WaveformSimulationDriver = WaveformSimulationDriver(sensor, **kwargs)
+            self._add_driver(waveform_driver)
+
+    def _add_driver(self, driver: DriverBase | SimulationDriver):
+        self._attach(driver)
+        self._drivers.append(driver)
+        if self._journal is None:
+            self._record(ChangeKind.ADD, driver.sensor.sensor_id, functools.partial(_serialized, driver))
+            return
+        entry: dict[str, Any] | None = _serialized(driver)
+        if entry is None:
+            logging.warning("Sensor %s not recorded in the journal.", driver.sensor.name)
+        else:
+            self._journal.added(entry)
+        self._record(ChangeKind.ADD, driver.sensor.sensor_id, entry)
+
+    def _record(self, kind: ChangeKind, sensor_id: SensorId | None = None,
+                values: dict[str, Any] | Callable[[], dict[str, Any] | None] | None = None):
+        """Append a change to the change log. Changes of the sensors also change the version of the configuration."""
+        version: int = next_version()
+        if kind not in (ChangeKind.MODE, ChangeKind.STATE):
+            self._version = version
+        self._changes.append(ConfigurationChange(version, kind, sensor_id, values))
+
+    def _attach(self, driver: DriverBase | SimulationDriver):
+        """Let a driver follow the state cell of the machine, drivers without a cell get the current values."""
+        if hasattr(driver, "cell"):
+            driver.cell = self._cell
+        else:
+            driver.state = self._cell.state
+            driver.mode = self._cell.mode
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def changes(self) -> ChangeLog:
+        """The latest changes of the sensors and of mode and state, for replicas of the configuration."""
+        return self._changes
 
     @property
     def mutators(self) -> list[DriverBase]:
@@ -116,75 +199,258 @@ class MachineModel(MachineModelBase):
 
 
     def save_configuration(self, file_path: str):
-        """Save the current configuration to a file."""
-        logging.info(f"Saving configuration to file {file_path}.")
+        """
+        Save the current configuration to a file. The file is replaced only once written, so a crash keeps the old one.
+        If the journal of the file is open, the journal already holds every change and is only compacted in the
+        background.
+        """
+        if self._journal is not None and os.path.abspath(file_path) == os.path.abspath(self._journal.file_path):
+            logging.info("Compacting the journal of %s.", file_path)
+            self._journal.compact()
+            return
+        logging.info("Saving configuration to file %s.", file_path)
         serialized = []
         for driver in self._drivers:
             d = driver.to_driver_data()
             serialized.append(d.as_dict())
 
-        with open(file_path, "w") as f:
+        temporary: str = file_path + ".tmp"
+        with open(temporary, "w") as f:
             json.dump(serialized, f, indent=4)
+        os.replace(temporary, file_path)
 
-    def restore_configuration(self, file_path: str):
-        """Load mutators from a file."""
-        logging.info(f"Loading configuration from {file_path}.")
-        with open(file_path, "r") as f:
-            dictionary = json.load(f)
-        for entry in dictionary:
-            logging.debug(f"Entries: {entry}")
-            if "sensor" not in entry:
-                logging.error("Field 'sensor' must be present in the dictionary. Skipping.")
-                continue
-            if not isinstance(entry["sensor"], dict):
-                logging.error("Field 'sensor' is not of dictionary type. Skipping.")
-                continue
-            if not "sensor_type" in entry.get("sensor"):
-                logging.error("'sensor_type' cannot be determined. Skipping.")
-                continue
-            try:
-                sensor_type = SensorType(entry.get("sensor").get("sensor_type"))
-                factory: DriverFactory = self._sensor_factory_map[sensor_type]
-            except KeyError:
-                raise NotImplementedError(f"The case {entry['type']} is not implemented yet.")
-            driver: DriverBase | SimulationDriver = factory.from_dict(entry)
-            logging.info(f"Adding sensor {driver.sensor.name}.")
+    @property
+    def journal(self) -> ConfigurationJournal | None:
+        """Journal recording the changes of the configuration, None if not open."""
+        return self._journal
+
+    def open_journal(self, file_path: str, **kwargs) -> ConfigurationJournal:
+        """
+        Add the sensors of a snapshot and its journal, see ConfigurationJournal, and record every further change of
+        the configuration in the journal: added and deleted sensors, changed drivers (record_change) and last values
+        (checkpoint).
+        :param file_path: File of the snapshot, the journal is next to it.
+        :param kwargs: Passed to ConfigurationJournal.
+        """
+        if self._journal is not None:
+            logging.warning("Journal %s already open.", self._journal.file_path)
+            return self._journal
+        journal = ConfigurationJournal(file_path, **kwargs)
+        entries: list[dict[str, Any]] = journal.load()
+        logging.info("Loading %s sensors from the journal of %s.", len(entries), file_path)
+        for driver in self.create_drivers(entries):
+            self._attach(driver)
             self._sensors.append(driver.sensor)
             self._drivers.append(driver)
+        self._record(ChangeKind.RESET)
+        journal.start([x.to_driver_data().as_dict() for x in self._drivers])
+        self._journal = journal
+        return journal
+
+    def close_journal(self):
+        """Write the remaining records and close the journal. Blocks until written, do not call on the event loop."""
+        if self._journal is None:
+            return
+        self._journal.close()
+        self._journal.join()
+        self._journal = None
+
+    def record_change(self, sensor_id: SensorId):
+        """
+        Record the parameters of a driver in the change log and, if open, the journal, after changing them through
+        the mutators. Also changes the version, so cached listings of the drivers are rebuilt.
+        :param sensor_id: ID of the sensor of the driver.
+        """
+        driver = next((x for x in self._drivers if x.sensor.sensor_id == sensor_id), None)
+        if driver is None:
+            logging.warning("Change of sensor %s not recorded, sensor not found.", sensor_id)
+            return
+        entry: dict[str, Any] | None = _serialized(driver)
+        self._record(ChangeKind.UPDATE, sensor_id, entry)
+        if self._journal is not None and entry is not None:
+            self._journal.updated(entry)
+
+    def checkpoint(self):
+        """Record the last values of the simulated sensors in the journal, they are restored as start values."""
+        if self._journal is None:
+            return
+        self._journal.checkpoint({x.sensor.sensor_id: float(x.last_value) for x in self._drivers
+                                  if isinstance(x, SimulationDriver) and not x.sensor.sensor_type.is_array})
+
+    def save_snapshot(self, file_path: str):
+        """
+        Save the current configuration as binary snapshot, see binary_snapshot. Restored by restore_configuration
+        faster than json, the numeric fields are memory-mapped instead of parsed.
+        """
+        logging.info("Saving snapshot to file %s.", file_path)
+        groups: dict[str, tuple[list[int], list[dict[str, Any]]]] = {}
+        for position, driver in enumerate(self._drivers):
+            entry: dict[str, Any] = driver.to_driver_data().as_dict()
+            positions, entries = groups.setdefault(self._factory_kind(entry), ([], []))
+            positions.append(position)
+            entries.append(entry)
+        write_snapshot(file_path, {kind: (positions, to_columns(entries))
+                                   for kind, (positions, entries) in groups.items()})
+
+    def restore_configuration(self, file_path: str):
+        """Load mutators from a file, json as written by save_configuration or a binary snapshot (save_snapshot)."""
+        logging.info("Loading configuration from %s.", file_path)
+        with _collection_paused():
+            if is_snapshot(file_path):
+                created: list[tuple[int, DriverBase | SimulationDriver]] = []
+                for kind, positions, columns in read_snapshot(file_path):
+                    if kind not in self._factories:
+                        logging.error("Unknown kind of driver %s. Skipping %s sensors.", kind, len(positions))
+                        continue
+                    created.extend(self._create_group(self._factories[kind], positions, columns))
+                created.sort(key=lambda x: x[0])
+                drivers = [driver for _, driver in created]
+            else:
+                drivers = self.create_drivers(iter_json_array(file_path))
+            for driver in drivers:  # still paused, the collector would go through the new drivers right away
+                self._attach(driver)
+            self._sensors.extend(driver.sensor for driver in drivers)
+            self._drivers.extend(drivers)
+        self._record(ChangeKind.RESET)
+        logging.info("Restored %s sensors.", len(drivers))
+
+    def _factory_kind(self, entry: dict[str, Any]) -> str:
+        """
+        Get the key of the factory of a serialized driver in _factories.
+        :raises ValueError: If the entry is malformed.
+        """
+        if "sensor" not in entry:
+            raise ValueError("Field 'sensor' must be present in the dictionary.")
+        if not isinstance(entry["sensor"], dict):
+            raise ValueError("Field 'sensor' is not of dictionary type.")
+        if not "sensor_type" in entry.get("sensor"):
+            raise ValueError("'sensor_type' cannot be determined.")
+        if REPLAY_FILE in entry:
+            return REPLAY_FILE
+        if MODBUS_HOST in entry:
+            return MODBUS_HOST
+        if UPSTREAM_URL in entry:
+            return UPSTREAM_URL
+        if entry["sensor"]["sensor_type"] not in self._factories:
+            raise NotImplementedError(f"The case {entry['sensor']['sensor_type']} is not implemented yet.")
+        return entry["sensor"]["sensor_type"]
+
+    def create_driver(self, entry: dict[str, Any]) -> DriverBase | SimulationDriver:
+        """
+        Create a driver and its sensor from a dictionary, as written by save_configuration. The driver is not added.
+        :param entry: Serialized driver.
+        :raises ValueError: If the entry is malformed.
+        """
+        return self._factories[self._factory_kind(entry)].from_dict(entry)
+
+    def create_drivers(self, entries: Iterable[dict[str, Any]]) -> list[DriverBase | SimulationDriver]:
+        """
+        Create drivers and their sensors from many dictionaries, as written by save_configuration, in bulk per kind
+        of driver. Malformed entries are skipped. The drivers are not added.
+        :param entries: Serialized drivers.
+        :return: The drivers, in the order of the entries.
+        """
+        groups: dict[str, tuple[list[int], list[dict[str, Any]]]] = {}
+        with _collection_paused():
+            for position, entry in enumerate(entries):
+                try:
+                    kind: str = self._factory_kind(entry)
+                except (ValueError, NotImplementedError) as e:
+                    logging.error("%s Skipping.", e)
+                    continue
+                positions, grouped = groups.setdefault(kind, ([], []))
+                positions.append(position)
+                grouped.append(entry)
+            created: list[tuple[int, DriverBase | SimulationDriver]] = []
+            for kind, (positions, grouped) in groups.items():
+                try:
+                    columns: dict[str, list[Any]] | None = to_columns(grouped)
+                except KeyError:
+                    columns = None  # the fields differ, only one by one
+                created.extend(self._create_group(self._factories[kind], positions, columns, grouped))
+        created.sort(key=lambda x: x[0])
+        return [driver for _, driver in created]
+
+    @staticmethod
+    def _create_group(factory: DriverFactory, positions: list[int], columns: dict[str, list[Any]] | None,
+                      entries: list[dict[str, Any]] | None = None) -> list[tuple[int, DriverBase | SimulationDriver]]:
+        """
+        Create drivers of one kind in one go, falling back to one by one.
+        :param factory: Factory of the drivers.
+        :param positions: Positions of the drivers, returned with them.
+        :param columns: Serialized drivers as columns (see to_columns), None to create them one by one.
+        :param entries: Serialized drivers for the fallback, None to take them from the columns.
+        :return: Positions and created drivers, malformed ones are skipped.
+        """
+        if columns is not None:
+            try:
+                return list(zip(positions, factory.from_columns(columns), strict=True))
+            except (KeyError, TypeError, ValueError) as e:
+                logging.warning("Creating %s drivers one by one: %r", len(positions), e)
+        created: list[tuple[int, DriverBase | SimulationDriver]] = []
+        for position, entry in zip(positions, entries if entries is not None else to_entries(columns)):
+            try:
+                created.append((position, factory.from_dict(entry)))
+            except (KeyError, TypeError, ValueError) as e:
+                logging.error("Driver %s not created: %r Skipping.", entry.get("sensor"), e)
+        return created
 
     def delete_sensor(self, sensor_id: SensorId):
-        logging.info(f"Deleting sensor {sensor_id}.")
+        logging.info("Deleting sensor %s.", sensor_id)
         mutator = next(x for x in self._drivers
                        if x.sensor.sensor_id == sensor_id)
         sensor = mutator.sensor
         sensor.stop()
+        if isinstance(mutator, UpstreamDriver):
+            mutator.session.remove(sensor)
         self._drivers.remove(mutator)
         self._sensors.remove(sensor)
+        self._record(ChangeKind.DELETE, sensor_id)
+        if self._journal is not None:
+            self._journal.deleted(sensor_id)
 
     @property
     def state(self) -> State:
         """Get the current state of the machine."""
-        return self._state
+        return self._cell.state
 
     @state.setter
     def state(self, value: State):
-        """Set the current state of the machine."""
-        logging.info(f"Setting state to {value}.")
-        for m in self._drivers:
-            m.state = value
-
-        self._state = value
+        """Set the current state of the machine. One write, the drivers share the cell of the machine."""
+        logging.info("Setting state to %s.", value)
+        self._cell.state = value
+        self._record(ChangeKind.STATE, values={"state": value})
 
     @property
     def mode(self) -> Mode:
         """Get the current mode of the machine."""
-        return self._mode
+        return self._cell.mode
 
     @mode.setter
     def mode(self, value: Mode):
-        """Set the current mode of the machine."""
-        logging.info(f"Setting mode to {value}")
-        for m in self._drivers:
-            m.mode = value
+        """Set the current mode of the machine. One write, the drivers share the cell of the machine."""
+        logging.info("Setting mode to %s", value)
+        self._cell.mode = value
+        self._record(ChangeKind.MODE, values={"mode": value})
 
-        self._mode = value
+    def group(self, name: str) -> StateCell:
+        """
+        Get the state cell of a group of sensors, for example a part of the machine which fails on its own. The cell
+        follows the machine until its mode or state is set, and again after StateCell.inherit.
+        :param name: Name of the group, created on first use.
+        """
+        if name not in self._groups:
+            self._groups[name] = StateCell(parent=self._cell)
+        return self._groups[name]
+
+    def assign_group(self, sensor_id: SensorId, name: str | None):
+        """
+        Let the driver of a sensor follow a group instead of the machine.
+        :param sensor_id: ID of the sensor.
+        :param name: Name of the group, None to follow the machine again.
+        :raises KeyError: If no driver of the sensor is found or the driver has no state cell.
+        """
+        driver = next((x for x in self._drivers if x.sensor.sensor_id == sensor_id), None)
+        if driver is None or not hasattr(driver, "cell"):
+            raise KeyError(f"No driver with a state cell for sensor {sensor_id}.")
+        driver.cell = self._cell if name is None else self.group(name)
@@ -1,3 +1,5 @@
+import itertools
+import time
 from abc import ABC, abstractmethod
 
 from MyServer.MachineOperation.sensor_data_model import SensorId
@@ -6,6 +8,18 @@ from typing import Any
 
 from MyServer.Simulation import SimulationDriver
 
+# starts at the start time of the process in microseconds, the epoch of the versions: a restarted process counts on
+# above the versions of the one before, so their ETags, cursors and change feed versions do not match the new ones
+_versions = itertools.count(time.time_ns() // 1000)
+
+
+def next_version() -> int:
+    """
+    Get a version number larger than all before, also than the ones of processes started before. Shared by all
+    models, so the versions of several models compare.
+    """
+    return next(_versions)
+
 
 class MachineModelBase(ABC):
     """Abstract machine model class."""
@@ -36,6 +50,14 @@ class MachineModelBase(ABC):
     def mode(self):
         pass
 
+    @property
+    def version(self) -> int | None:
+        """
+        Version of the configuration, changes whenever sensors are added or deleted or their drivers are changed.
+        None if the model does not track changes.
+        """
+        return None
+
     @abstractmethod
     def save_configuration(self, file_path: str):
         """Save the current configuration to a file."""
@@ -0,0 +1,85 @@
+import logging
+from typing import Any
+
+from pydantic import ValidationError
+
+from MyServer.MachineOperation import SensorConfig, SensorType
+from MyServer.OpcUa import folder_path
+from .machine_model_base import MachineModelBase
+
+SENSOR_FIELDS: tuple[str, ...] = ("sensor", "identifier", "namespace")
+"""Fields of the driver data describing the sensor, left out of the simulator configuration."""
+
+
+class SensorListing:
+    """
+    Listing of the sensors of a model as SensorConfig, built once per version of the model (MachineModelBase.version)
+    instead of once per request. Models without version are listed anew every time.
+    The simulator configurations are only built when requested, from to_driver_data of the drivers, and kept for the
+    version as well. Their start value is the last value at that time.
+    """
+
+    def __init__(self, model: MachineModelBase):
+        """
+        ctor.
+        :param model: Model to list the sensors of.
+        """
+        self.__model: MachineModelBase = model
+        self.__version: int | None = None
+        self.__sensors: list[SensorConfig] = []
+        self.__configured: list[SensorConfig] | None = None
+
+    @property
+    def version(self) -> int | None:
+        """Version of the model the listing was built for."""
+        return self.__version
+
+    def sensors(self, simulator_config: bool = False) -> list[SensorConfig]:
+        """
+        Get the sensors of the current version of the model.
+        :param simulator_config: Whether to include the simulator configurations.
+        """
+        version: int | None = self.__model.version
+        if version is None or version != self.__version:
+            self.__version = version
+            self.__sensors = [SensorConfig(type=s.sensor_type, identifier=s.identifier, simulator_config=None,
+                                           namespace=s.namespace) for s in self.__model.sensors]
+            self.__configured = None
+        if not simulator_config:
+            return self.__sensors
+        if self.__configured is None:
+            drivers: list[Any] = list(getattr(self.__model, "mutators", []))
+            self.__configured = [_with_simulator_config(config, driver)
+                                 for config, driver in zip(self.__sensors, drivers, strict=True)] \
+                if len(drivers) == len(self.__sensors) else list(self.__sensors)
+        return self.__configured
+
+    def page(self, offset: int = 0, limit: int | None = None, sensor_type: SensorType | None = None,
+             namespace: str | None = None, simulator_config: bool = False) -> tuple[list[SensorConfig], int | None]:
+        """
+        Get a page of the sensors matching the filters.
+        :param offset: Number of matching sensors to skip.
+        :param limit: Largest number of sensors, None for all.
+        :param sensor_type: Only sensors of this type, None for all.
+        :param namespace: Only sensors in this namespace or below, None for all.
+        :param simulator_config: Whether to include the simulator configurations.
+        :return: The sensors and the offset of the next page, None if it was the last one.
+        """
+        sensors: list[SensorConfig] = self.sensors(simulator_config)
+        if sensor_type is not None or namespace is not None:
+            folders: tuple[str, ...] = folder_path(namespace or "")
+            sensors = [x for x in sensors if (sensor_type is None or x.type == sensor_type)
+                       and (namespace is None or folder_path(x.namespace or "")[:len(folders)] == folders)]
+        end: int = len(sensors) if limit is None else min(len(sensors), offset + limit)
+        return sensors[offset:end], end if end < len(sensors) else None
+
+
+def _with_simulator_config(config: SensorConfig, driver: Any) -> SensorConfig:
+    """Get a copy of the config of a sensor with the simulator configuration of its driver, if it has one."""
+    try:
+        values: dict[str, Any] = driver.to_driver_data().as_dict()
+        return SensorConfig(type=config.type, identifier=config.identifier, namespace=config.namespace,
+                            simulator_config={k: v for k, v in values.items() if k not in SENSOR_FIELDS})
+    except (AttributeError, ValidationError) as e:
+        logging.warning("No simulator configuration for sensor %s: %r", config.identifier, e)
+        return config
@@ -1,7 +1,9 @@
 from .state import State
 from .mode import Mode
 from .sensor_type import SensorType
-from .sensor_data_model import SensorConfig, SensorConfigList, SensorId
+from .state_cell import StateCell
+from .sensor_data_model import SensorConfig, SensorConfigList, SensorId, SensorNodeIds, SensorNodeIdsList
 
 
-__all__ = ["State", "Mode", "SensorType", "SensorConfig", "SensorConfigList", "SensorId"]
+__all__ = ["State", "Mode", "StateCell", "SensorType", "SensorConfig", "SensorConfigList", "SensorId", "SensorNodeIds",
+           "SensorNodeIdsList"]
@@ -9,6 +9,8 @@ class SensorConfig(BaseModel):
     type: SensorType
     identifier: int
     simulator_config: SimulatorConfiguration | None
+    namespace: str | None = None
+    """Folder of the sensor in the data model. If None, the default folder is used."""
     model_config = {
         "frozen": True
     }
@@ -16,6 +18,8 @@ class SensorConfig(BaseModel):
 class SensorConfigList(BaseModel):
     """List sensor configs."""
     sensors: list[SensorConfig]
+    next_cursor: str | None = None
+    """Cursor of the next page, None if this is the last one."""
     model_config = {
         "frozen": True
     }
@@ -27,6 +31,27 @@ class SensorId(BaseModel):
     identifier: int
     """Identifier number. Should be unique."""
 
+    model_config = {
+        "frozen": True
+    }
+
+class SensorNodeIds(BaseModel):
+    """Stable OPC UA node IDs of a sensor, as expanded node IDs with the namespace URI."""
+    type: SensorType
+    identifier: int
+    sensor: str
+    """Node ID of the sensor object."""
+    value: str
+    """Node ID of the value."""
+    sensor_time: str
+    """Node ID of the time stamp of the value."""
+    model_config = {
+        "frozen": True
+    }
+
+class SensorNodeIdsList(BaseModel):
+    """List of sensor node IDs."""
+    sensors: list[SensorNodeIds]
     model_config = {
         "frozen": True
     }
\ No newline at end of file
@@ -3,3 +3,9 @@ from enum import StrEnum
 class SensorType(StrEnum):
     TEMPERATURE = "Temperature"
     PRESSURE = "Pressure"
+    WAVEFORM = "Waveform"
+
+    @property
+    def is_array(self) -> bool:
+        """Whether the sensors publish blocks of samples instead of single values."""
+        return self == SensorType.WAVEFORM
\ No newline at end of file
@@ -0,0 +1,63 @@
+from .mode import Mode
+from .state import State
+
+
+class StateCell:
+    """
+    Mode and state of the machine or of a part of it, shared by reference: drivers read the cell they are assigned to,
+    so a transition is one write, whatever the number of drivers. A cell with a parent follows the parent until it is
+    given a mode or state of its own, for example a broken sub-group of an otherwise healthy machine.
+    """
+
+    def __init__(self, mode: Mode | None = None, state: State | None = None, parent: "StateCell | None" = None):
+        """
+        ctor.
+        :param mode: Own mode, None to follow the parent.
+        :param state: Own state, None to follow the parent.
+        :param parent: Cell to follow, None for the machine itself.
+        """
+        self.__mode: Mode | None = mode
+        self.__state: State | None = state
+        self.__parent: StateCell | None = parent
+
+    @property
+    def parent(self) -> "StateCell | None":
+        """Cell followed unless mode or state are set, None for the machine itself."""
+        return self.__parent
+
+    @property
+    def mode(self) -> Mode:
+        """Own mode, otherwise the one of the parent, idle without parent."""
+        if self.__mode is not None:
+            return self.__mode
+        return self.__parent.mode if self.__parent is not None else Mode.IDLE
+
+    @mode.setter
+    def mode(self, value: Mode):
+        self.__mode = value
+
+    @property
+    def state(self) -> State:
+        """Own state, otherwise the one of the parent, normal without parent."""
+        if self.__state is not None:
+            return self.__state
+        return self.__parent.state if self.__parent is not None else State.NORMAL
+
+    @state.setter
+    def state(self, value: State):
+        self.__state = value
+
+    @staticmethod
+    def own(cell: "StateCell", owned: "StateCell | None") -> "StateCell":
+        """
+        Get a cell of a single driver, to give it a mode or state of its own without writing to the cell it shares.
+        :param cell: Cell the driver follows.
+        :param owned: Cell of the driver alone, as returned before, None if there is none.
+        :return: owned if the driver still follows it, otherwise a new cell following cell.
+        """
+        return owned if owned is cell else StateCell(parent=cell)
+
+    def inherit(self):
+        """Drop own mode and state, follow the parent again."""
+        self.__mode = None
+        self.__state = None
@@ -0,0 +1,9 @@
+from .register_layout import RegisterType, DataType, RegisterSpec, RegisterBlock, plan_blocks, MAX_REGISTERS
+from .modbus_connection import ModbusConnection, ModbusError, MODBUS_PORT
+from .modbus_device import ModbusDevice
+from .modbus_driver import ModbusDriver, ModbusDriverFactory
+from .modbus_stand_in import ModbusStandIn
+
+__all__ = ["RegisterType", "DataType", "RegisterSpec", "RegisterBlock", "plan_blocks", "MAX_REGISTERS",
+           "ModbusConnection", "ModbusError", "MODBUS_PORT", "ModbusDevice", "ModbusDriver", "ModbusDriverFactory",
+           "ModbusStandIn"]
\ No newline at end of file
@@ -0,0 +1,143 @@
+import asyncio
+import itertools
+import logging
+import struct
+
+from .register_layout import RegisterType
+
+MODBUS_PORT: int = 502
+"""Default port of Modbus TCP."""
+TIMEOUT: float = 1.0
+"""Seconds to wait for a connection or a response."""
+
+
+class ModbusError(Exception):
+    """Exception response of a device or failed connection."""
+
+
+class ModbusConnection:
+    """
+    Modbus TCP connection to a device or gateway. Requests are sent one after another, as many devices do not accept
+    several requests in flight. A failed connection is closed and opened again with the next request.
+    The connection serves one event loop at a time: used from another loop, for example after a restart of the server,
+    it connects again on that loop.
+    """
+    __connections: dict[tuple[str, int], "ModbusConnection"] = {}
+
+    def __init__(self, host: str, port: int = MODBUS_PORT, timeout: float = TIMEOUT):
+        """
+        ctor.
+        :param host: Host of the device.
+        :param port: Port of the device.
+        :param timeout: Seconds to wait for a connection or a response.
+        """
+        self.__host = host
+        self.__port = port
+        self.__timeout = timeout
+        self.__reader: asyncio.StreamReader | None = None
+        self.__writer: asyncio.StreamWriter | None = None
+        self.__lock: asyncio.Lock = asyncio.Lock()
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__transaction_ids = itertools.count(1)
+        self.__requests: int = 0
+
+    @staticmethod
+    def open(host: str, port: int = MODBUS_PORT) -> "ModbusConnection":
+        """Get the connection to a host, reusing it if it exists already. Connects with the first request."""
+        key = (host, port)
+        connection = ModbusConnection.__connections.get(key)
+        if connection is None:
+            connection = ModbusConnection(host, port)
+            ModbusConnection.__connections[key] = connection
+        return connection
+
+    @staticmethod
+    async def close_all():
+        """Close the connections opened with open and forget them, for example when the server stops."""
+        connections = list(ModbusConnection.__connections.values())
+        ModbusConnection.__connections.clear()
+        for connection in connections:
+            await connection.close()
+
+    @property
+    def host(self) -> str:
+        """Host of the device."""
+        return self.__host
+
+    @property
+    def port(self) -> int:
+        """Port of the device."""
+        return self.__port
+
+    @property
+    def connected(self) -> bool:
+        """Whether the socket is open."""
+        return self.__writer is not None
+
+    @property
+    def requests(self) -> int:
+        """Number of requests sent."""
+        return self.__requests
+
+    async def read_registers(self, unit_id: int, register_type: RegisterType, address: int, count: int) -> list[int]:
+        """
+        Read contiguous registers.
+        :param unit_id: Unit of the device behind the host.
+        :param register_type: Holding or input registers.
+        :param address: Address of the first register.
+        :param count: Number of registers.
+        :raises ModbusError: If the device answers with an exception or the connection fails.
+        """
+        self.__bind()
+        async with self.__lock:
+            transaction_id: int = next(self.__transaction_ids) % 0x10000
+            request: bytes = struct.pack(">HHHBBHH", transaction_id, 0, 6, unit_id, register_type.function_code,
+                                         address, count)
+            try:
+                if self.__writer is None:
+                    self.__reader, self.__writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.__host, self.__port), self.__timeout)
+                self.__writer.write(request)
+                self.__requests += 1
+                header: bytes = await asyncio.wait_for(self.__reader.readexactly(7), self.__timeout)
+                response_id, _, length, _ = struct.unpack(">HHHB", header)
+                pdu: bytes = await asyncio.wait_for(self.__reader.readexactly(length - 1), self.__timeout)
+            except (OSError, asyncio.IncompleteReadError, TimeoutError) as e:
+                self.__close()
+                raise ModbusError(f"Reading from {self.__host}:{self.__port} failed: {e!r}") from e
+            if response_id != transaction_id:
+                self.__close()  # out of step, a late response of a timed out request
+                raise ModbusError(f"Expected transaction {transaction_id}, got {response_id}.")
+        function: int = pdu[0]
+        if function == register_type.function_code | 0x80:
+            raise ModbusError(f"Device {self.__host}:{self.__port} unit {unit_id} answered with exception code "
+                              f"{pdu[1]} reading {count} registers at {address}.")
+        if function != register_type.function_code or pdu[1] != 2 * count:
+            raise ModbusError(f"Unexpected response to reading {count} registers at {address}.")
+        return list(struct.unpack(f">{count}H", pdu[2:2 + 2 * count]))
+
+    def __bind(self):
+        loop = asyncio.get_running_loop()
+        if self.__loop is not loop:
+            # the streams and the lock belong to the loop which used the connection before, which may be closed
+            self.__reader, self.__writer = None, None
+            self.__lock = asyncio.Lock()
+            self.__loop = loop
+
+    def __close(self):
+        if self.__writer is not None:
+            self.__writer.close()
+        self.__reader, self.__writer = None, None
+
+    async def close(self):
+        """Close the socket. The next request connects again."""
+        self.__bind()
+        async with self.__lock:
+            if self.__writer is None:
+                return
+            writer = self.__writer
+            self.__close()
+            try:
+                await writer.wait_closed()
+            except OSError as e:
+                logging.warning("Closing the connection to %s:%s failed: %r", self.__host, self.__port, e)
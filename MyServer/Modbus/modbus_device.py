@@ -0,0 +1,136 @@
+import asyncio
+import logging
+
+from .modbus_connection import ModbusConnection, ModbusError, MODBUS_PORT
+from .register_layout import RegisterSpec, RegisterBlock, plan_blocks, MAX_REGISTERS
+
+COALESCE_WINDOW: float = 0.005
+"""Seconds reads are collected before the block requests are sent."""
+MAX_GAP: int = 8
+"""Largest number of unused registers read to save a request."""
+
+
+class ModbusDevice:
+    """
+    Unit of a Modbus TCP device. Reads of its sensors arriving within a short window, such as the sensors polled at
+    the same tick, are coalesced into block requests of contiguous registers over the shared connection.
+    """
+    __devices: dict[tuple[str, int, int], "ModbusDevice"] = {}
+
+    def __init__(self,
+                 connection: ModbusConnection,
+                 unit_id: int = 1,
+                 window: float = COALESCE_WINDOW,
+                 max_gap: int = MAX_GAP,
+                 max_registers: int = MAX_REGISTERS):
+        """
+        ctor.
+        :param connection: Connection to the device, may be shared with other units.
+        :param unit_id: Unit of the device behind the host.
+        :param window: Seconds reads are collected before they are sent.
+        :param max_gap: Largest number of unused registers read to save a request.
+        :param max_registers: Largest block per request.
+        """
+        if max_registers < 2:
+            raise ValueError(f"Blocks need room for a 32 bit value, got {max_registers} registers.")
+        self.__connection = connection
+        self.__unit_id = unit_id
+        self.__window = window
+        self.__max_gap = max_gap
+        self.__max_registers = max_registers
+        self.__pending: dict[RegisterSpec, asyncio.Future] = {}
+        self.__flushes: set[asyncio.Task] = set()
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__requests: int = 0
+        self.__reads: int = 0
+
+    @staticmethod
+    def open(host: str, port: int = MODBUS_PORT, unit_id: int = 1) -> "ModbusDevice":
+        """Get a unit of a device, reusing it if it exists already. Units of the same host share the connection."""
+        key = (host, port, unit_id)
+        device = ModbusDevice.__devices.get(key)
+        if device is None:
+            device = ModbusDevice(ModbusConnection.open(host, port), unit_id)
+            ModbusDevice.__devices[key] = device
+        return device
+
+    @staticmethod
+    async def close_all():
+        """Forget the units opened with open and close their connections, for example when the server stops."""
+        ModbusDevice.__devices.clear()
+        await ModbusConnection.close_all()
+
+    @property
+    def connection(self) -> ModbusConnection:
+        """Connection to the device."""
+        return self.__connection
+
+    @property
+    def unit_id(self) -> int:
+        """Unit of the device behind the host."""
+        return self.__unit_id
+
+    @property
+    def requests(self) -> int:
+        """Number of block requests sent for this unit."""
+        return self.__requests
+
+    @property
+    def reads(self) -> int:
+        """Number of values read."""
+        return self.__reads
+
+    async def read(self, spec: RegisterSpec) -> float | int:
+        """
+        Read a value, together with the other reads of the window.
+        :param spec: Location and layout of the value.
+        :raises ModbusError: If the block with the value could not be read.
+        """
+        loop = asyncio.get_running_loop()
+        if self.__loop is not loop:  # reads pending on a loop used before are never flushed
+            self.__pending, self.__flushes, self.__loop = {}, set(), loop
+        if not self.__pending:
+            task = loop.create_task(self.__flush_later())
+            self.__flushes.add(task)
+            task.add_done_callback(self.__flushes.discard)
+        future = self.__pending.get(spec)
+        if future is None:
+            future = loop.create_future()
+            self.__pending[spec] = future
+        return await asyncio.shield(future)  # a cancelled reader does not cancel the others of the block
+
+    async def read_many(self, specs: list[RegisterSpec]) -> list[float | int]:
+        """
+        Read several values with as few requests as possible, without waiting for the window.
+        :param specs: Locations and layouts of the values.
+        :raises ModbusError: If a block could not be read.
+        """
+        values: dict[RegisterSpec, float | int] = {}
+        for block in plan_blocks(specs, self.__max_gap, self.__max_registers):
+            values.update(await self.__read_block(block))
+        return [values[x] for x in specs]
+
+    async def __flush_later(self):
+        await asyncio.sleep(self.__window)
+        pending, self.__pending = self.__pending, {}
+        for block in plan_blocks(list(pending), self.__max_gap, self.__max_registers):
+            try:
+                values = await self.__read_block(block)
+            except ModbusError as e:
+                logging.warning("%s", e)
+                for spec in block.specs:
+                    if not pending[spec].done():
+                        pending[spec].set_exception(e)
+                        pending[spec].exception()  # logged above, readers which gave up do not log it again
+                continue
+            for spec in block.specs:
+                if not pending[spec].done():
+                    pending[spec].set_result(values[spec])
+
+    async def __read_block(self, block: RegisterBlock) -> dict[RegisterSpec, float | int]:
+        registers: list[int] = await self.__connection.read_registers(self.__unit_id, block.register_type,
+                                                                      block.address, block.count)
+        self.__requests += 1
+        self.__reads += len(block.specs)
+        return {x: x.decode(registers[x.address - block.address:x.address - block.address + x.count])
+                for x in block.specs}
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any
+
+from MyServer.MachineOperation import Mode, State, SensorType, StateCell
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Sensor.Base import DriverBase, SensorBase, SensorDictBase
+from MyServer.Simulation import DriverFactory
+from .modbus_connection import ModbusError
+from .modbus_device import ModbusDevice
+from .modbus_driver_data import ModbusDriverData
+from .register_layout import RegisterSpec, RegisterType, DataType
+
+RETRY_SECONDS: float = 0.1
+"""Seconds to wait before the first retry of a failed read, doubled with every further failure."""
+MAX_RETRY_SECONDS: float = 10.0
+"""Longest wait between retries of a failed read."""
+
+
+class ModbusDriver(DriverBase[float]):
+    """
+    Driver reading a sensor from the registers of a Modbus TCP device. The sensor polls the driver as usual, the reads
+    of all sensors of the device are coalesced into block requests by the device.
+    """
+
+    def __init__(self, sensor: SensorBase[float], device: ModbusDevice, register: RegisterSpec):
+        """
+        ctor.
+        :param sensor: Sensor to feed.
+        :param device: Device holding the value, may be shared with other drivers.
+        :param register: Location and layout of the value.
+        """
+        self.__sensor = sensor
+        self.__device = device
+        self.__register = register
+        self.__last_value: float = 0.0
+        self.__value_time: datetime = sensor.clock.now()
+        self.cell: StateCell = StateCell()
+        """Mode and state of the machine. The device measures the real machine, so they are only kept for the model."""
+        self.__own_cell: StateCell | None = self.cell
+        sensor.source = self.measure
+        sensor.driver_dict_callback = self.to_driver_data
+
+    @property
+    def mode(self) -> Mode:
+        """Mode of the machine, see cell."""
+        return self.cell.mode
+
+    @mode.setter
+    def mode(self, mode: Mode):
+        """Set the mode of this driver alone, see StateCell.own."""
+        self.cell = self.__own_cell = StateCell.own(self.cell, self.__own_cell)
+        self.cell.mode = mode
+
+    @property
+    def state(self) -> State:
+        """State of the machine, see cell."""
+        return self.cell.state
+
+    @state.setter
+    def state(self, state: State):
+        """Set the state of this driver alone, see StateCell.own."""
+        self.cell = self.__own_cell = StateCell.own(self.cell, self.__own_cell)
+        self.cell.state = state
+
+    @property
+    def sensor(self) -> SensorBase[float]:
+        """Get the sensor assigned to the driver."""
+        return self.__sensor
+
+    @property
+    def device(self) -> ModbusDevice:
+        """Device holding the value."""
+        return self.__device
+
+    @property
+    def register(self) -> RegisterSpec:
+        """Location and layout of the value."""
+        return self.__register
+
+    def last_value(self) -> float:
+        return self.__last_value
+
+    @property
+    def last_value_time(self) -> datetime:
+        """Get the time of the last measurement."""
+        return self.__value_time
+
+    async def measure(self) -> float:
+        """
+        Read the value from the device. A failed read, for example of a device restarting, is retried with a growing
+        delay until the device answers, the poller of the sensor would end otherwise.
+        """
+        delay: float = RETRY_SECONDS
+        while True:
+            try:
+                value: float = float(await self.__device.read(self.__register))
+                break
+            except ModbusError as e:
+                logging.debug("Reading %s failed, retrying in %s s: %s", self.__sensor.sensor_id, delay, e)
+                await asyncio.sleep(delay)  # the device recovers in real time, not in the time of the sensor clock
+                delay = min(2 * delay, MAX_RETRY_SECONDS)
+        self.__value_time, self.__last_value = self.__sensor.clock.now(), value
+        return value
+
+    def do_dict(self) -> dict[str, Any]:
+        return self.to_driver_data().as_dict()
+
+    def to_driver_data(self) -> ModbusDriverData:
+        connection = self.__device.connection
+        return ModbusDriverData(
+            sensor=self.__sensor.to_data_object(),
+            identifier=self.__sensor.identifier,
+            namespace=self.__sensor.namespace,
+            host=connection.host,
+            port=connection.port,
+            unit_id=self.__device.unit_id,
+            register_type=self.__register.register_type,
+            address=self.__register.address,
+            data_type=self.__register.data_type,
+            word_swap=self.__register.word_swap
+        )
+
+
+class ModbusDriverFactory(DriverFactory[float]):
+
+    @staticmethod
+    def from_dict(d: dict) -> ModbusDriver:
+        if not "sensor" in d:
+            raise ValueError("Dict is not in the right format.")
+        sensor_data = SensorDictBase(**d.get("sensor"))
+        match sensor_data.sensor_type:
+            case SensorType.TEMPERATURE:
+                sensor = TemperatureSensor(sensor_data.identifier,
+                                           namespace=sensor_data.namespace,
+                                           updates_per_second=sensor_data.updates_per_second)
+            case SensorType.PRESSURE:
+                sensor = PressureSensor(sensor_data.identifier,
+                                        namespace=sensor_data.namespace,
+                                        updates_per_second=sensor_data.updates_per_second)
+            case _:
+                raise NotImplementedError(f"Modbus for {sensor_data.sensor_type} is not implemented yet.")
+
+        device = ModbusDevice.open(d["host"], d["port"], d["unit_id"])
+        register = RegisterSpec(RegisterType(d["register_type"]), d["address"], DataType(d["data_type"]),
+                                d["word_swap"])
+        return ModbusDriver(sensor=sensor, device=device, register=register)
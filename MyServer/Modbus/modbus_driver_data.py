@@ -0,0 +1,20 @@
+import dataclasses
+
+from MyServer.Sensor.Base import SensorDictBase
+
+
+@dataclasses.dataclass(frozen=True)
+class ModbusDriverData:
+    sensor: SensorDictBase
+    identifier: int
+    namespace: str
+    host: str
+    port: int
+    unit_id: int
+    register_type: str
+    address: int
+    data_type: str
+    word_swap: bool
+
+    def as_dict(self):
+        return dataclasses.asdict(self)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import struct
+
+from .register_layout import RegisterSpec, RegisterType, MAX_REGISTERS
+
+REGISTERS: int = 10000
+"""Registers per register type."""
+
+
+class ModbusStandIn:
+    """
+    In-process Modbus TCP server answering register reads from memory, standing in for a PLC in tests and benchmarks.
+    Supports reading holding (function code 3) and input registers (function code 4).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        """
+        ctor.
+        :param host: Address to listen on.
+        :param port: Port to listen on, 0 for any free port.
+        :param latency: Seconds to wait before answering, to model the cycle time of a PLC.
+        """
+        self.__host = host
+        self.__port = port
+        self.__latency = latency
+        self.__registers: dict[RegisterType, list[int]] = {x: [0] * REGISTERS for x in RegisterType}
+        self.__server: asyncio.Server | None = None
+        self.__writers: set[asyncio.StreamWriter] = set()
+        self.__requests: int = 0
+
+    @property
+    def host(self) -> str:
+        """Address listened on."""
+        return self.__host
+
+    @property
+    def port(self) -> int:
+        """Port listened on, the assigned one after start."""
+        return self.__port
+
+    @property
+    def requests(self) -> int:
+        """Number of requests answered."""
+        return self.__requests
+
+    def set_value(self, spec: RegisterSpec, value: float | int):
+        """Write a value to the registers."""
+        self.__registers[spec.register_type][spec.address:spec.address + spec.count] = spec.encode(value)
+
+    async def start(self):
+        """Start listening."""
+        if self.__server is not None:
+            logging.warning("Stand-in already started.")
+            return
+        self.__server = await asyncio.start_server(self.__serve, self.__host, self.__port)
+        self.__port = self.__server.sockets[0].getsockname()[1]
+
+    async def __serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.__writers.add(writer)
+        try:
+            while True:
+                transaction_id, protocol, length, unit_id = struct.unpack(">HHHB", await reader.readexactly(7))
+                pdu: bytes = await reader.readexactly(length - 1)
+                if self.__latency > 0:
+                    await asyncio.sleep(self.__latency)
+                writer.write(self.__answer(transaction_id, protocol, unit_id, pdu))
+                self.__requests += 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.__writers.discard(writer)
+            writer.close()
+
+    def __answer(self, transaction_id: int, protocol: int, unit_id: int, pdu: bytes) -> bytes:
+        function: int = pdu[0]
+        register_type = next((x for x in RegisterType if x.function_code == function), None)
+        if register_type is None:
+            response: bytes = struct.pack(">BB", function | 0x80, 1)  # illegal function
+        else:
+            address, count = struct.unpack(">HH", pdu[1:5])
+            if not 1 <= count <= MAX_REGISTERS or address + count > REGISTERS:
+                response = struct.pack(">BB", function | 0x80, 2)  # illegal data address
+            else:
+                registers = self.__registers[register_type][address:address + count]
+                response = struct.pack(f">BB{count}H", function, 2 * count, *registers)
+        return struct.pack(">HHHB", transaction_id, protocol, len(response) + 1, unit_id) + response
+
+    async def close(self):
+        """Stop listening and drop the connections."""
+        if self.__server is None:
+            return
+        self.__server.close()
+        for writer in list(self.__writers):
+            writer.close()
+        await self.__server.wait_closed()
+        self.__server = None
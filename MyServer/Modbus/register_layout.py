@@ -0,0 +1,114 @@
+import dataclasses
+import struct
+from collections.abc import Sequence
+from enum import StrEnum
+
+MAX_REGISTERS: int = 125
+"""Largest number of registers one read request may return."""
+
+
+class RegisterType(StrEnum):
+    HOLDING = "holding"
+    INPUT = "input"
+
+    @property
+    def function_code(self) -> int:
+        """Function code reading registers of the type."""
+        return 3 if self == RegisterType.HOLDING else 4
+
+
+class DataType(StrEnum):
+    FLOAT32 = "float32"
+    INT16 = "int16"
+    UINT16 = "uint16"
+
+    @property
+    def register_count(self) -> int:
+        """Number of 16 bit registers a value takes."""
+        return 2 if self == DataType.FLOAT32 else 1
+
+
+@dataclasses.dataclass(frozen=True)
+class RegisterSpec:
+    """Location and layout of a value in the registers of a device."""
+    register_type: RegisterType
+    """Holding or input registers."""
+    address: int
+    """Address of the first register."""
+    data_type: DataType = DataType.FLOAT32
+    """Layout of the value."""
+    word_swap: bool = False
+    """Whether the low word of a 32 bit value comes first. Registers are big endian either way."""
+
+    @property
+    def count(self) -> int:
+        """Number of registers of the value."""
+        return self.data_type.register_count
+
+    def decode(self, registers: Sequence[int]) -> float | int:
+        """
+        Decode the value.
+        :param registers: The registers of the value, count of them.
+        """
+        match self.data_type:
+            case DataType.FLOAT32:
+                words = (registers[1], registers[0]) if self.word_swap else (registers[0], registers[1])
+                return struct.unpack(">f", struct.pack(">HH", *words))[0]
+            case DataType.INT16:
+                return struct.unpack(">h", struct.pack(">H", registers[0]))[0]
+            case DataType.UINT16:
+                return registers[0]
+        raise NotImplementedError(f"The data type {self.data_type} is not implemented yet.")
+
+    def encode(self, value: float | int) -> list[int]:
+        """Encode a value as registers, the inverse of decode."""
+        match self.data_type:
+            case DataType.FLOAT32:
+                words = list(struct.unpack(">HH", struct.pack(">f", value)))
+                return words[::-1] if self.word_swap else words
+            case DataType.INT16:
+                return list(struct.unpack(">H", struct.pack(">h", int(value))))
+            case DataType.UINT16:
+                return [int(value)]
+        raise NotImplementedError(f"The data type {self.data_type} is not implemented yet.")
+
+
+@dataclasses.dataclass(frozen=True)
+class RegisterBlock:
+    """Contiguous registers read with one request, covering the values of several sensors."""
+    register_type: RegisterType
+    """Holding or input registers."""
+    address: int
+    """Address of the first register."""
+    count: int
+    """Number of registers."""
+    specs: tuple[RegisterSpec, ...]
+    """Values within the block."""
+
+
+def plan_blocks(specs: Sequence[RegisterSpec], max_gap: int = 8, max_registers: int = MAX_REGISTERS) \
+        -> list[RegisterBlock]:
+    """
+    Coalesce values into as few read requests as possible. Values of the same register type are merged into a block
+    if at most max_gap unused registers lie in between and the block stays within max_registers.
+    :param specs: Values to read.
+    :param max_gap: Largest number of unused registers read to save a request.
+    :param max_registers: Largest block.
+    """
+    blocks: list[RegisterBlock] = []
+    ordered = sorted(set(specs), key=lambda x: (x.register_type, x.address, x.count))
+    current: list[RegisterSpec] = []
+    start: int = 0
+    end: int = 0
+    for spec in ordered:
+        if current and spec.register_type == current[0].register_type and spec.address <= end + max_gap \
+                and max(end, spec.address + spec.count) - start <= max_registers:
+            current.append(spec)
+            end = max(end, spec.address + spec.count)
+            continue
+        if current:
+            blocks.append(RegisterBlock(current[0].register_type, start, end - start, tuple(current)))
+        current, start, end = [spec], spec.address, spec.address + spec.count
+    if current:
+        blocks.append(RegisterBlock(current[0].register_type, start, end - start, tuple(current)))
+    return blocks
@@ -1,4 +1,10 @@
+from .aggregation import Aggregation
 from .server_configuration import ServerConfiguration
 from .variant_type import variant_type
+from .folder_layout import FOLDER_SEPARATOR, folder_path, folder_layout
+from .node_ids import VALUE, SENSOR_TIME, SAMPLE_INTERVAL, sensor_node_id, namespace_uri, expanded_node_id
+from .aggregate_nodes import AggregateNodes
 
-__all__ = ["ServerConfiguration", "variant_type"]
\ No newline at end of file
+__all__ = ["ServerConfiguration", "variant_type", "FOLDER_SEPARATOR", "folder_path", "folder_layout", "VALUE",
+           "SENSOR_TIME", "SAMPLE_INTERVAL", "sensor_node_id", "namespace_uri", "expanded_node_id",
+           "Aggregation", "AggregateNodes"]
\ No newline at end of file
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from datetime import datetime
+
+import asyncua
+from asyncua import ua
+from asyncua.ua import VariantType
+
+from MyServer.Sensor.Base import SensorBase, LatestValues
+from .aggregation import Aggregation
+from .folder_layout import FOLDER_SEPARATOR
+
+VALUES: str = "Values"
+"""Browse name of the current values of a group."""
+SENSOR_TIMES: str = "SensorTimes"
+"""Browse name of the time stamps of the current values of a group."""
+SENSOR_TYPES: str = "SensorTypes"
+"""Browse name of the sensor types of a group, the first half of the sensor IDs."""
+IDENTIFIERS: str = "Identifiers"
+"""Browse name of the sensor identifiers of a group, the second half of the sensor IDs."""
+TICK: float = 0.1
+"""Seconds between two refreshes of the aggregate nodes."""
+
+
+class _Group:
+    """Positions of the sensors of a group in the latest values, marked as changed by their samples."""
+
+    def __init__(self, sensors: list[SensorBase], positions: list[int]):
+        self.sensors: list[SensorBase] = sensors
+        self.positions: list[int] = positions
+        self.changed: bool = False
+        self.values_node: asyncua.Node | None = None
+        self.times_node: asyncua.Node | None = None
+
+
+class AggregateNodes:
+    """
+    Variables holding the current values of a group of sensors as one array each, so bulk consumers read the whole
+    fleet in a single Read or subscribe to it with a single monitored item. The values are taken from the latest
+    values of the sensors (LatestValues), the arrays are written to the data model once per tick. The indices of the
+    arrays are fixed, the sensor ID of each index is published in the SensorTypes and Identifiers arrays.
+    """
+
+    def __init__(self, sensors: list[SensorBase], aggregation: Aggregation, tick: float = TICK,
+                 latest: LatestValues | None = None):
+        """
+        ctor.
+        :param sensors: Sensors to aggregate.
+        :param aggregation: Grouping of the sensors.
+        :param tick: Seconds between two refreshes of the arrays.
+        :param latest: Latest values of the sensors, shared with other consumers and started by the caller. None to
+        collect them on add_to.
+        """
+        self.__aggregation = aggregation
+        self.__tick = tick
+        self.__sensors: dict[str, list[SensorBase]] = {}
+        if aggregation != Aggregation.NONE:
+            for sensor in (x for x in sensors if not x.sensor_type.is_array):
+                self.__sensors.setdefault(self.group_name(sensor), []).append(sensor)
+        self.__groups: dict[str, _Group] = {}
+        self.__latest: LatestValues | None = latest
+        self.__own_latest: bool = latest is None
+        self.__group_of: dict[int, _Group] = {}
+
+    @property
+    def groups(self) -> list[str]:
+        """Names of the groups, that is, of the aggregate objects."""
+        return list(self.__sensors)
+
+    def group_name(self, sensor: SensorBase) -> str:
+        """Get the name of the aggregate object of a sensor."""
+        if self.__aggregation == Aggregation.SENSOR_TYPE:
+            return str(sensor.sensor_type)
+        return ".".join(x for x in sensor.namespace.split(FOLDER_SEPARATOR) if x)
+
+    async def add_to(self, folder: asyncua.Node, idx: int, now: datetime):
+        """
+        Add one object per group to the data model and start collecting the values of the sensors.
+        :param folder: Folder to add the objects to.
+        :param idx: Namespace index of the objects.
+        :param now: Time stamp of the values before the first sample, if the latest values are not shared.
+        """
+        if self.__latest is None:
+            self.__latest = LatestValues([x for sensors in self.__sensors.values() for x in sensors], now)
+        latest: LatestValues = self.__latest
+        for name, sensors in self.__sensors.items():
+            group = _Group(sensors, [latest.position(x) for x in sensors])
+            registered_group: asyncua.Node = await folder.add_object(idx, name)
+            group.values_node = await registered_group.add_variable(
+                idx, VALUES, ua.Variant([latest.values[x] for x in group.positions], VariantType.Float))
+            group.times_node = await registered_group.add_variable(
+                idx, SENSOR_TIMES, ua.Variant([latest.times[x] for x in group.positions], VariantType.DateTime))
+            await registered_group.add_variable(
+                idx, SENSOR_TYPES, ua.Variant([str(x.sensor_type) for x in sensors], VariantType.String))
+            await registered_group.add_variable(
+                idx, IDENTIFIERS, ua.Variant([x.identifier for x in sensors], VariantType.Int32))
+            self.__group_of.update((x, group) for x in group.positions)
+            self.__groups[name] = group
+            logging.info("Aggregate %s added for %s sensors.", name, len(sensors))
+        latest.add_listener(self.__on_sample)
+        if self.__own_latest:
+            latest.start()
+
+    def __on_sample(self, position: int, ts: datetime, v):
+        group: _Group | None = self.__group_of.get(position)
+        if group is not None:
+            group.changed = True
+
+    async def refresh(self) -> int:
+        """
+        Write the arrays of the groups with new values to the data model.
+        :return: Number of groups written.
+        """
+        written: int = 0
+        for group in self.__groups.values():
+            if not group.changed:
+                continue
+            group.changed = False
+            # copies, the data model keeps the written lists
+            values, times = self.__latest.values, self.__latest.times
+            await group.values_node.set_value(ua.Variant([values[x] for x in group.positions], VariantType.Float))
+            await group.times_node.set_value(ua.Variant([times[x] for x in group.positions], VariantType.DateTime))
+            written += 1
+        return written
+
+    async def run(self):
+        """Refresh the arrays until cancelled. Meant to run as a task."""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.__tick)
+
+    def close(self):
+        """Stop collecting the values of the sensors."""
+        if self.__latest is not None:
+            self.__latest.remove_listener(self.__on_sample)
+            if self.__own_latest:
+                self.__latest.close()
+                self.__latest = None
+        self.__group_of.clear()
+        self.__groups.clear()
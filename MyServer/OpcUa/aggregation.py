@@ -0,0 +1,10 @@
+from enum import StrEnum
+
+class Aggregation(StrEnum):
+    """Grouping of the sensors into aggregate nodes holding the values of a whole group as arrays."""
+    NONE = "none"
+    """No aggregate nodes."""
+    SENSOR_TYPE = "type"
+    """One aggregate node per sensor type."""
+    NAMESPACE = "namespace"
+    """One aggregate node per sensor namespace."""
\ No newline at end of file
@@ -0,0 +1,41 @@
+import math
+
+FOLDER_SEPARATOR: str = "/"
+"""Separates the folders of a namespace path, for example "Plant/Line1/Cell3"."""
+
+
+def folder_path(namespace: str) -> tuple[str, ...]:
+    """Split a namespace into its folders. Empty segments are dropped."""
+    return tuple(x for x in namespace.split(FOLDER_SEPARATOR) if x)
+
+
+def folder_layout[T](items: list[T], max_folder_size: int) -> list[tuple[tuple[str, ...], T]]:
+    """
+    Distribute the items of a folder into subfolders holding at most max_folder_size children each, nesting the
+    subfolders if there are too many of them. Subfolders are named by the positions of the items they contain.
+    :param items: Children of the folder, in browse order.
+    :param max_folder_size: Largest number of children of a folder. 0 keeps all items in the folder.
+    :return: Subfolder path, relative to the folder, for each item.
+    """
+    if max_folder_size <= 0 or len(items) <= max_folder_size:
+        return [((), x) for x in items]
+    if max_folder_size < 2:
+        raise ValueError(f"Folders must hold at least two children to be sharded, got {max_folder_size}.")
+    width: int = len(str(len(items) - 1))
+    layout: list[tuple[tuple[str, ...], T]] = []
+
+    def split(offset: int, chunk: list[T], prefix: tuple[str, ...]):
+        if len(chunk) <= max_folder_size:
+            layout.extend((prefix, x) for x in chunk)
+            return
+        # smallest power of the folder size that needs no more than max_folder_size subfolders
+        size: int = max_folder_size
+        while math.ceil(len(chunk) / size) > max_folder_size:
+            size *= max_folder_size
+        for start in range(0, len(chunk), size):
+            part = chunk[start:start + size]
+            first, last = offset + start, offset + start + len(part) - 1
+            split(first, part, prefix + (f"{first:0{width}d}-{last:0{width}d}",))
+
+    split(0, items, ())
+    return layout
@@ -0,0 +1,70 @@
+from MyServer.MachineOperation import SensorType
+from .folder_layout import folder_path
+from .server_configuration import ServerConfiguration
+
+VALUE: str = "Value"
+"""Browse name of the value field of a sensor."""
+SENSOR_TIME: str = "SensorTime"
+"""Browse name of the time stamp field of a sensor."""
+SAMPLE_INTERVAL: str = "SampleInterval"
+"""Browse name of the field with the seconds between two samples of an array sensor."""
+
+TYPE_BLOCK: int = 100_000_000
+"""Node IDs reserved per sensor type."""
+FIELD_BLOCK: int = 10
+"""Node IDs reserved per sensor: the object and its fields."""
+TYPE_INDEX: dict[SensorType, int] = {
+    SensorType.TEMPERATURE: 1,
+    SensorType.PRESSURE: 2,
+    SensorType.WAVEFORM: 3
+}
+"""Block of each sensor type. Fixed, new types get new numbers."""
+FIELD_INDEX: dict[str | None, int] = {
+    None: 0,
+    VALUE: 1,
+    SENSOR_TIME: 2,
+    SAMPLE_INTERVAL: 3
+}
+"""Position of the sensor object (None) and its fields within the block of the sensor."""
+
+
+def sensor_node_id(sensor_type: SensorType, identifier: int, field: str | None = None) -> int | None:
+    """
+    Get the numeric node ID of a sensor or one of its fields, that is,
+    TYPE_INDEX[sensor_type] * TYPE_BLOCK + identifier * FIELD_BLOCK + FIELD_INDEX[field].
+    For example, the value of temperature sensor 42 is 100000421 and its time stamp 100000422.
+    :param sensor_type: Type of the sensor.
+    :param identifier: Identifier of the sensor.
+    :param field: Browse name of the field, None for the sensor object.
+    :return: The node ID, None if the sensor has no stable node ID.
+    """
+    if sensor_type not in TYPE_INDEX or field not in FIELD_INDEX:
+        return None
+    if not 0 <= identifier < TYPE_BLOCK // FIELD_BLOCK:
+        return None
+    return TYPE_INDEX[sensor_type] * TYPE_BLOCK + identifier * FIELD_BLOCK + FIELD_INDEX[field]
+
+
+def namespace_uri(company: str, namespace: str) -> str:
+    """Get the URI of the namespace of a top level folder."""
+    return "urn:" + company + ":opcua:" + namespace
+
+
+def expanded_node_id(configuration: ServerConfiguration, sensor_type: SensorType, identifier: int, namespace: str,
+                     field: str | None = None) -> str | None:
+    """
+    Get the stable node ID of a sensor or one of its fields as expanded node ID with the namespace URI, for example
+    "nsu=urn:TestCompany.com:opcua:Sensors;i=100000421". Unlike the namespace index, the URI does not depend on the
+    order the namespaces are registered in, so clients can keep the node ID across restarts and skip browsing.
+    :param configuration: Configuration of the server serving the sensor.
+    :param sensor_type: Type of the sensor.
+    :param identifier: Identifier of the sensor.
+    :param namespace: Namespace of the sensor, empty for the default folder.
+    :param field: Browse name of the field, None for the sensor object.
+    :return: The node ID, None if the sensor has no stable node ID.
+    """
+    numeric: int | None = sensor_node_id(sensor_type, identifier, field)
+    if numeric is None:
+        return None
+    top: str = (folder_path(namespace) or folder_path(configuration.sensors))[0]
+    return f"nsu={namespace_uri(configuration.company, top)};i={numeric}"
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+from .aggregation import Aggregation
+
 @dataclass(frozen=True)
 class ServerConfiguration:
     """Configuration for a basic OPC UA server."""
@@ -14,3 +16,20 @@ class ServerConfiguration:
     device_name: str = "Device"
     """Name of the device to store data in. For human readability."""
     sensors: str = "Sensors"
+    """Default folder of the sensors."""
+    max_folder_size: int = 0
+    """Largest number of sensors in a folder before they are split into subfolders. 0 keeps all sensors in one folder."""
+    aggregation: Aggregation = Aggregation.NONE
+    """Grouping of the sensors into aggregate nodes with the values of all sensors of a group as arrays."""
+    aggregates: str = "Aggregates"
+    """Folder of the aggregate nodes."""
+    pubsub_url: str = ""
+    """Address of the PubSub publisher, for example "opc.udp://239.0.0.1:4840". Empty to publish client/server only."""
+    pubsub_interface: str = ""
+    """Address of the interface the PubSub messages are sent from if multicast, empty for the default route."""
+    publishing_interval: float = 0.1
+    """Seconds between two PubSub network messages."""
+    checkpoint_interval: float = 60.0
+    """Seconds between two checkpoints of the last sensor values to the configuration journal, if open."""
+    history_depth: int = 1
+    """Latest samples kept per sensor for the value and history requests, 1 for the current values only."""
@@ -9,5 +9,7 @@ def variant_type(sensor_type: SensorType) -> tuple[VariantType, Any] | None:
     match sensor_type:
         case SensorType.TEMPERATURE | SensorType.PRESSURE:
             return VariantType.Float, 0.0
+        case SensorType.WAVEFORM:
+            return VariantType.Float, []
 
     return None
\ No newline at end of file
@@ -0,0 +1,4 @@
+from .uadp_publisher import UadpPublisher, udp_address
+from .uadp_subscriber import UadpSubscriber
+
+__all__ = ["UadpPublisher", "UadpSubscriber", "udp_address"]
\ No newline at end of file
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import socket
+from datetime import datetime, timezone
+from ipaddress import ip_address
+from urllib.parse import urlparse
+
+from asyncua import ua
+from asyncua.pubsub.uadp import UadpNetworkMessage, UadpHeader, UadpGroupHeader, UadpDataSetDataValue, \
+    UadpDataSetMessageHeader
+from asyncua.ua import VariantType
+
+from MyServer.MachineOperation import SensorId
+from MyServer.Sensor.Base import SensorBase, LatestValues
+
+PUBSUB_PORT: int = 4840
+"""Default port of OPC UA PubSub over UDP."""
+PUBLISHING_INTERVAL: float = 0.1
+"""Seconds between two network messages of a writer."""
+FIELDS_PER_MESSAGE: int = 1000
+"""Sensors per DataSetMessage. Keeps a network message of Float data values below 16 kB."""
+
+
+def udp_address(url: str) -> tuple[str, int]:
+    """
+    Get host and port of an opc.udp URL, for example "opc.udp://239.0.0.1:4840".
+    :param url: The URL.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme != "opc.udp" or not parsed.hostname:
+        raise ValueError(f"Not an opc.udp URL: {url}.")
+    return parsed.hostname, parsed.port if parsed.port is not None else PUBSUB_PORT
+
+
+class UadpPublisher:
+    """
+    OPC UA PubSub publisher sending the sensor values as UADP network messages over UDP. Unlike client/server
+    subscriptions, which are encoded once per session, every publishing interval encodes one network message per
+    writer and sends it once to a unicast or multicast address, however many subscribers listen.
+    The sensors are split into writers of at most fields_per_message sensors each, writer i (from 1) publishes the
+    sensors with the positions [(i - 1) * fields_per_message, i * fields_per_message) in one DataSetMessage, each
+    field a data value with the latest value and its time stamp, taken from the latest values of the sensors
+    (LatestValues).
+    """
+
+    def __init__(self,
+                 sensors: list[SensorBase],
+                 address: tuple[str, int],
+                 publisher_id: int = 1,
+                 writer_group_id: int = 1,
+                 publishing_interval: float = PUBLISHING_INTERVAL,
+                 fields_per_message: int = FIELDS_PER_MESSAGE,
+                 interface: str | None = None,
+                 ttl: int = 1,
+                 latest: LatestValues | None = None):
+        """
+        ctor.
+        :param sensors: Sensors to publish. Array sensors are skipped.
+        :param address: Host and port to send to, unicast or multicast.
+        :param publisher_id: Publisher ID in the network message header.
+        :param writer_group_id: Writer group ID in the group header.
+        :param publishing_interval: Seconds between two network messages of a writer.
+        :param fields_per_message: Largest number of sensors per DataSetMessage.
+        :param interface: Address of the interface multicast messages are sent from, None for the default route.
+        For example "127.0.0.1" for local tests.
+        :param ttl: Time to live of multicast messages, 1 keeps them in the local network.
+        :param latest: Latest values of the sensors, shared with other consumers and started by the caller. None to
+        collect them while started.
+        """
+        if fields_per_message < 1:
+            raise ValueError(f"At least one field per message is required, got {fields_per_message}.")
+        self.__sensors: list[SensorBase] = [x for x in sensors if not x.sensor_type.is_array]
+        self.__address: tuple[str, int] = address
+        self.__publisher_id: ua.UInt16 = ua.UInt16(publisher_id)
+        self.__writer_group_id: ua.UInt16 = ua.UInt16(writer_group_id)
+        self.__publishing_interval = publishing_interval
+        self.__fields_per_message = fields_per_message
+        self.__interface = interface
+        self.__ttl = ttl
+        self.__own_latest: bool = latest is None
+        self.__latest: LatestValues = latest if latest is not None \
+            else LatestValues(self.__sensors, datetime.now(timezone.utc))
+        self.__positions: list[int] = [self.__latest.position(x) for x in self.__sensors]
+        self.__transport: asyncio.DatagramTransport | None = None
+        self.__sequence_number: int = 0
+        self.__messages_sent: int = 0
+        self.__bytes_sent: int = 0
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Host and port the messages are sent to."""
+        return self.__address
+
+    @property
+    def layout(self) -> dict[int, list[SensorId]]:
+        """Sensor IDs published by each writer, by DataSetWriterId, in field order."""
+        size: int = self.__fields_per_message
+        return {i // size + 1: [x.sensor_id for x in self.__sensors[i:i + size]]
+                for i in range(0, len(self.__sensors), size)}
+
+    @property
+    def messages_sent(self) -> int:
+        """Number of network messages sent."""
+        return self.__messages_sent
+
+    @property
+    def bytes_sent(self) -> int:
+        """Number of bytes sent."""
+        return self.__bytes_sent
+
+    @property
+    def running(self) -> bool:
+        """Whether the socket is open."""
+        return self.__transport is not None
+
+    async def start(self):
+        """Open the socket and start collecting the values of the sensors."""
+        if self.__transport is not None:
+            logging.warning("Publisher already started.")
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if ip_address(socket.gethostbyname(self.__address[0])).is_multicast:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.__ttl)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+            if self.__interface is not None:
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.__interface))
+        sock.setblocking(False)
+        self.__transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            asyncio.DatagramProtocol, sock=sock)
+        if self.__own_latest:
+            self.__latest.start()
+        logging.info("Publishing %s sensors to %s:%s.", len(self.__sensors), *self.__address)
+
+    def encode(self) -> list[bytes]:
+        """Encode the latest values as one network message per writer."""
+        self.__sequence_number = (self.__sequence_number + 1) % 0x10000
+        now: datetime = datetime.now(timezone.utc)
+        size: int = self.__fields_per_message
+        values, times = self.__latest.values, self.__latest.times
+        messages: list[bytes] = []
+        for start in range(0, len(self.__sensors), size):
+            writer_id: int = start // size + 1
+            fields: list[ua.DataValue] = [
+                ua.DataValue(ua.Variant(values[x], VariantType.Float), SourceTimestamp=times[x])
+                for x in self.__positions[start:start + size]
+            ]
+            message = UadpNetworkMessage(
+                Header=UadpHeader(PublisherId=self.__publisher_id),
+                GroupHeader=UadpGroupHeader(WriterGroupId=self.__writer_group_id,
+                                            NetworkMessageNo=ua.UInt16(writer_id),
+                                            SequenceNo=ua.UInt16(self.__sequence_number)),
+                DataSetPayloadHeader=[ua.UInt16(writer_id)],
+                Payload=[UadpDataSetDataValue(
+                    UadpDataSetMessageHeader(SequenceNo=ua.UInt16(self.__sequence_number), Timestamp=now), fields)]
+            )
+            messages.append(message.to_binary())
+        return messages
+
+    def publish(self) -> int:
+        """
+        Send the latest values once.
+        :return: Number of bytes sent.
+        """
+        if self.__transport is None:
+            return 0
+        messages: list[bytes] = self.encode()
+        sent: int = 0
+        for message in messages:
+            self.__transport.sendto(message, self.__address)
+            sent += len(message)
+        self.__messages_sent += len(messages)
+        self.__bytes_sent += sent
+        return sent
+
+    async def run(self):
+        """Publish until closed. Meant to run as a task."""
+        while self.__transport is not None:
+            self.publish()
+            await asyncio.sleep(self.__publishing_interval)
+
+    def close(self):
+        """Stop collecting the values of the sensors and close the socket."""
+        if self.__own_latest:
+            self.__latest.close()
+        if self.__transport is not None:
+            self.__transport.close()
+            self.__transport = None
+        logging.info("Publisher stopped after %s messages.", self.__messages_sent)
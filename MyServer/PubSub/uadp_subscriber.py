@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import socket
+import struct
+from datetime import datetime
+from ipaddress import ip_address
+
+from asyncua import ua
+from asyncua.common.utils import Buffer
+from asyncua.pubsub.uadp import UadpNetworkMessage, UadpDataSetDataValue
+
+from MyServer.MachineOperation import SensorId
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, subscriber: "UadpSubscriber"):
+        self.subscriber = subscriber
+
+    def datagram_received(self, data: bytes, addr):
+        self.subscriber.receive(data)
+
+
+class UadpSubscriber:
+    """
+    OPC UA PubSub subscriber for the messages of a UadpPublisher. Keeps the latest data value of every field, that
+    is, of every sensor if the layout of the publisher is known. Used as test and benchmark harness.
+    """
+
+    def __init__(self,
+                 address: tuple[str, int],
+                 layout: dict[int, list[SensorId]] | None = None,
+                 publisher_id: int | None = None,
+                 interface: str | None = None):
+        """
+        ctor.
+        :param address: Host and port to listen on. A multicast host is joined.
+        :param layout: Sensor IDs published by each writer, see UadpPublisher.layout. Needed for the values by
+        sensor ID.
+        :param publisher_id: Only accept messages of this publisher, None for all.
+        :param interface: Address of the interface to join multicast groups on, None for the default interface.
+        """
+        self.__address = address
+        self.__positions: dict[SensorId, tuple[int, int]] = {
+            sensor_id: (writer_id, index)
+            for writer_id, sensor_ids in (layout or {}).items()
+            for index, sensor_id in enumerate(sensor_ids)
+        }
+        self.__publisher_id = publisher_id
+        self.__interface = interface
+        self.__fields: dict[int, list[ua.DataValue]] = {}
+        self.__transport: asyncio.DatagramTransport | None = None
+        self.__received: int = 0
+        self.__invalid: int = 0
+        self.__message_event: asyncio.Event = asyncio.Event()
+
+    @property
+    def received(self) -> int:
+        """Number of network messages received."""
+        return self.__received
+
+    @property
+    def invalid(self) -> int:
+        """Number of datagrams which could not be decoded."""
+        return self.__invalid
+
+    async def start(self):
+        """Open the socket."""
+        if self.__transport is not None:
+            logging.warning("Subscriber already started.")
+            return
+        host, port = self.__address
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # several subscribers of one multicast group
+        if ip_address(socket.gethostbyname(host)).is_multicast:
+            sock.bind(("", port))
+            interface: bytes = socket.inet_aton(self.__interface or "0.0.0.0")
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+                            struct.pack("=4s4s", socket.inet_aton(socket.gethostbyname(host)), interface))
+        else:
+            sock.bind((host, port))
+        sock.setblocking(False)
+        self.__transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: _Protocol(self), sock=sock)
+
+    def receive(self, data: bytes):
+        """
+        Decode a network message and keep its fields.
+        :param data: The datagram.
+        """
+        try:
+            message: UadpNetworkMessage = UadpNetworkMessage.from_binary(Buffer(data))
+        except Exception as e:
+            logging.warning("Invalid UADP message: %r", e)
+            self.__invalid += 1
+            return
+        if self.__publisher_id is not None and message.Header.PublisherId != self.__publisher_id:
+            return
+        writer_ids: list[int] = message.DataSetPayloadHeader or [0]
+        for writer_id, dataset in zip(writer_ids, message.Payload):
+            if isinstance(dataset, UadpDataSetDataValue):
+                self.__fields[writer_id] = dataset.Data
+        self.__received += 1
+        self.__message_event.set()
+
+    def fields(self, writer_id: int) -> list[ua.DataValue]:
+        """Get the latest fields of a writer, empty if none were received."""
+        return self.__fields.get(writer_id, [])
+
+    def latest(self, sensor_id: SensorId) -> tuple[datetime, float] | None:
+        """
+        Get the latest sample of a sensor.
+        :param sensor_id: ID of the sensor.
+        :return: Time stamp and value, None if the sensor was not received.
+        """
+        if sensor_id not in self.__positions:
+            return None
+        writer_id, index = self.__positions[sensor_id]
+        fields: list[ua.DataValue] = self.fields(writer_id)
+        if index >= len(fields):
+            return None
+        return fields[index].SourceTimestamp, fields[index].Value.Value
+
+    async def wait(self, count: int = 1, timeout: float = 5.0) -> bool:
+        """
+        Wait until a number of network messages was received in total.
+        :param count: Number of messages.
+        :param timeout: Seconds to wait at most.
+        :return: Whether the messages were received in time.
+        """
+        async def wait_for_count():
+            while self.__received < count:
+                self.__message_event.clear()
+                await self.__message_event.wait()
+
+        try:
+            await asyncio.wait_for(wait_for_count(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    def close(self):
+        """Close the socket."""
+        if self.__transport is not None:
+            self.__transport.close()
+            self.__transport = None
@@ -0,0 +1,4 @@
+from .sample_recorder import SampleRecorder
+from .value_history import ValueHistory, SENSOR_TYPES
+
+__all__ = ["SampleRecorder", "ValueHistory", "SENSOR_TYPES"]
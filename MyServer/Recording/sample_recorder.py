@@ -0,0 +1,213 @@
+import array
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+
+import numpy as np
+import pyarrow as pa
+
+from MyServer.Dataset import OutputFormat, RotatingFileWriter
+from MyServer.Sensor.Base import SensorBase
+
+TIMESTAMP_COLUMN: str = "timestamp"
+SENSOR_COLUMN: str = "sensor"
+VALUE_COLUMN: str = "value"
+
+_EPOCH: datetime = datetime(1970, 1, 1)
+_MICROSECOND: timedelta = timedelta(microseconds=1)
+
+
+class _Batch:
+    """Samples in columnar layout, appended to on the event loop."""
+
+    def __init__(self):
+        self.sensors: array.array = array.array("i")
+        self.timestamps: array.array = array.array("q")
+        self.values: array.array = array.array("d")
+        self.created: float = time.monotonic()
+
+    def __len__(self):
+        return len(self.values)
+
+
+class SampleRecorder:
+    """
+    Records the samples published by sensors. Samples are appended to columnar in-memory batches through the sensor
+    callbacks; full batches are handed to a background thread which writes them to rotating files, so no file I/O
+    happens on the event loop. Batches older than flush_seconds are handed over as well, also when no more samples
+    arrive. If the disk cannot keep up, batches are dropped rather than blocking the sampling.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 prefix: str = "samples",
+                 output_format: OutputFormat = OutputFormat.PARQUET,
+                 batch_rows: int = 65536,
+                 flush_seconds: float = 10.0,
+                 max_file_bytes: int = 256 * 1024 * 1024,
+                 max_file_seconds: float = 3600.0,
+                 max_pending_batches: int = 64):
+        """
+        ctor.
+        :param directory: Directory to write the files to.
+        :param prefix: Prefix of the file names.
+        :param output_format: Format of the files.
+        :param batch_rows: Number of samples after which a batch is handed to the writer.
+        :param flush_seconds: Age in seconds after which a batch is handed to the writer.
+        :param max_file_bytes: Size after which a new file is started.
+        :param max_file_seconds: Age in seconds after which a new file is started.
+        :param max_pending_batches: Batches waiting for the writer before new ones are dropped.
+        """
+        self.__writer = RotatingFileWriter(directory, prefix, output_format, max_file_bytes, max_file_seconds)
+        self.__batch_rows = batch_rows
+        self.__flush_seconds = flush_seconds
+        self.__queue: queue.Queue[tuple[_Batch, tuple[str, ...]] | None] = queue.Queue(maxsize=max_pending_batches)
+        self.__batch: _Batch = _Batch()
+        self.__sensor_names: list[str] = []
+        self.__callbacks: dict[SensorBase, Callable] = {}
+        self.__thread: threading.Thread | None = None
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__dropped_batches: int = 0
+        self.__recorded: int = 0
+
+    @property
+    def files(self) -> list[str]:
+        """Files written so far."""
+        return self.__writer.files
+
+    @property
+    def recorded(self) -> int:
+        """Number of samples recorded so far."""
+        return self.__recorded
+
+    @property
+    def dropped_batches(self) -> int:
+        """Number of batches dropped because the writer did not keep up."""
+        return self.__dropped_batches
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is running."""
+        return self.__thread is not None
+
+    def start(self):
+        """Start the writer thread."""
+        if self.__thread is not None:
+            logging.warning("Recorder already started.")
+            return
+        self.__thread = threading.Thread(target=self.__write_loop, name="SampleRecorder", daemon=True)
+        self.__thread.start()
+
+    def record(self, sensors: Iterable[SensorBase[float]]):
+        """
+        Start recording sensors.
+        :param sensors: Sensors to record. Sensors which are recorded already and array sensors are skipped.
+        Call it on the loop of the sensors, old batches are flushed on it.
+        """
+        try:
+            self.__loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logging.warning("Recording outside of an event loop, batches are only flushed by new samples.")
+        for sensor in sensors:
+            if sensor in self.__callbacks or sensor.sensor_type.is_array:
+                continue
+            logging.info(f"Recording {sensor.name}.")
+            callback = self.__make_callback(len(self.__sensor_names))
+            self.__sensor_names.append(sensor.name)
+            self.__callbacks[sensor] = callback
+            sensor.add_callback(callback)
+
+    def close(self):
+        """Stop recording and hand the remaining samples to the writer. Does not wait for the writer, see join."""
+        for sensor, callback in self.__callbacks.items():
+            sensor.remove_callback(callback)
+        self.__callbacks.clear()
+        if self.__thread is None:
+            return
+        self.flush()
+        self.__queue.put(None)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """
+        Wait for the writer thread to write all samples, after close. Blocks, do not call on the event loop.
+        :param timeout: Seconds to wait at most, None to wait until finished.
+        :return: Whether the writer finished.
+        """
+        if self.__thread is None:
+            return True
+        self.__thread.join(timeout)
+        if self.__thread.is_alive():
+            return False
+        self.__thread = None
+        logging.info(f"Recorder closed, {self.__recorded} samples recorded, {self.__dropped_batches} batches dropped.")
+        return True
+
+    def flush(self):
+        """Hand the current batch to the writer."""
+        batch = self.__batch
+        if len(batch) == 0:
+            return
+        self.__batch = _Batch()
+        try:
+            self.__queue.put_nowait((batch, tuple(self.__sensor_names)))
+        except queue.Full:
+            self.__dropped_batches += 1
+            logging.error(f"Recorder cannot keep up, dropped {len(batch)} samples.")
+
+    def __flush_old(self):
+        if len(self.__batch) and time.monotonic() - self.__batch.created >= self.__flush_seconds:
+            self.flush()
+
+    def __request_flush(self):
+        """Flush an old batch on the loop of the sensors, they append to it there."""
+        loop = self.__loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self.__flush_old)
+        except RuntimeError:  # closed in the meantime
+            pass
+
+    def __make_callback(self, index: int):
+        async def callback(timestamp: datetime, value: float):
+            batch = self.__batch
+            batch.sensors.append(index)
+            batch.timestamps.append((timestamp - _EPOCH) // _MICROSECOND)
+            batch.values.append(value)
+            self.__recorded += 1
+            if len(batch) >= self.__batch_rows or time.monotonic() - batch.created >= self.__flush_seconds:
+                self.flush()
+
+        return callback
+
+    def __write_loop(self):
+        sensor_count: int = 0
+        while True:
+            try:
+                item = self.__queue.get(timeout=self.__flush_seconds)
+            except queue.Empty:
+                # no full batch for a while, the last samples of quiet sensors are written as well
+                self.__request_flush()
+                continue
+            if item is None:
+                break
+            batch, names = item
+            try:
+                if len(names) != sensor_count:
+                    self.__writer.close()  # the sensor dictionary is part of the schema of a file
+                    sensor_count = len(names)
+                table = pa.table({
+                    TIMESTAMP_COLUMN: pa.array(np.frombuffer(batch.timestamps, dtype=np.int64),
+                                               type=pa.timestamp("us")),
+                    SENSOR_COLUMN: pa.DictionaryArray.from_arrays(np.frombuffer(batch.sensors, dtype=np.int32),
+                                                                  pa.array(names, type=pa.string())),
+                    VALUE_COLUMN: np.frombuffer(batch.values, dtype=np.float64)
+                })
+                self.__writer.write(table)
+            except Exception as e:
+                logging.error(f"Recorder was not able to write {len(batch)} samples: {e.__repr__()}")
+        self.__writer.close()
@@ -0,0 +1,145 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from MyServer.MachineOperation import SensorType
+from MyServer.Sensor.Base import SensorBase, LatestValues
+
+SENSOR_TYPES: list[SensorType] = list(SensorType)
+"""Sensor types by the codes in the type column."""
+TYPE_COLUMN: str = "type"
+IDENTIFIER_COLUMN: str = "identifier"
+TIMESTAMP_COLUMN: str = "timestamp"
+VALUE_COLUMN: str = "value"
+
+_EPOCH: datetime = datetime(1970, 1, 1)
+_UTC_EPOCH: datetime = _EPOCH.replace(tzinfo=timezone.utc)
+_MICROSECOND: timedelta = timedelta(microseconds=1)
+
+
+def to_microseconds(timestamp: datetime) -> int:
+    """Convert a time stamp to microseconds since the epoch, as stored in the history. Naive ones are taken as UTC."""
+    return (timestamp - (_EPOCH if timestamp.tzinfo is None else _UTC_EPOCH)) // _MICROSECOND
+
+
+class ValueHistory:
+    """
+    The latest samples of the sensors in numpy arrays, one ring buffer of depth samples per sensor. A listener of the
+    latest values of the sensors (LatestValues) only writes into the arrays, reads (latest, window) select from them
+    without Python objects per sample and return columns: type code (see SENSOR_TYPES), identifier, time stamp in
+    microseconds since the epoch and value. Array sensors are skipped.
+    A history of shared latest values which is not started costs nothing per sample: it starts with the first read,
+    from the current values.
+    """
+
+    def __init__(self, sensors: list[SensorBase], depth: int = 1, latest: LatestValues | None = None):
+        """
+        ctor.
+        :param sensors: Sensors to keep the samples of.
+        :param depth: Samples kept per sensor, 1 for the current values only.
+        :param latest: Latest values of the sensors, shared with other consumers and started by the caller. None to
+        collect them while started.
+        """
+        if depth < 1:
+            raise ValueError(f"At least one sample per sensor is required, got {depth}.")
+        self.__sensors: list[SensorBase] = [x for x in sensors if not x.sensor_type.is_array]
+        self.__depth: int = depth
+        self.__types: np.ndarray = np.array([SENSOR_TYPES.index(x.sensor_type) for x in self.__sensors],
+                                            dtype=np.int32)
+        self.__identifiers: np.ndarray = np.array([x.identifier for x in self.__sensors], dtype=np.int64)
+        self.__values: np.ndarray = np.zeros((len(self.__sensors), depth), dtype=np.float64)
+        self.__timestamps: np.ndarray = np.zeros((len(self.__sensors), depth), dtype=np.int64)
+        self.__counts: np.ndarray = np.zeros(len(self.__sensors), dtype=np.int64)
+        self.__own_latest: bool = latest is None
+        self.__latest: LatestValues = latest if latest is not None else LatestValues(self.__sensors, datetime.now())
+        self.__rows: dict[int, int] = {self.__latest.position(x): row for row, x in enumerate(self.__sensors)}
+        self.__started: bool = False
+        self.__closed: bool = False
+
+    @property
+    def depth(self) -> int:
+        """Samples kept per sensor."""
+        return self.__depth
+
+    @property
+    def sensors(self) -> list[SensorBase]:
+        """The sensors, in the order of their rows."""
+        return list(self.__sensors)
+
+    def start(self):
+        """Start keeping the samples of the sensors."""
+        if self.__started:
+            logging.warning("History already started.")
+            return
+        self.__started = True
+        self.__latest.add_listener(self.__on_sample)
+        if self.__own_latest:
+            self.__latest.start()
+
+    def close(self):
+        """Stop keeping the samples. The kept ones can still be read."""
+        self.__closed = True
+        if not self.__started:
+            return
+        self.__started = False
+        self.__latest.remove_listener(self.__on_sample)
+        if self.__own_latest:
+            self.__latest.close()
+
+    def __on_sample(self, position: int, ts: datetime, v: float):
+        index: int | None = self.__rows.get(position)
+        if index is None:
+            return
+        slot: int = self.__counts[index] % self.__depth
+        self.__values[index, slot] = v
+        self.__timestamps[index, slot] = to_microseconds(ts)
+        self.__counts[index] += 1
+
+    def __start_on_read(self):
+        if self.__started or self.__closed or self.__own_latest:
+            return
+        values, times, samples = self.__latest.values, self.__latest.times, self.__latest.samples
+        for position, index in self.__rows.items():
+            if position is not None and samples[position]:
+                self.__on_sample(position, times[position], values[position])
+        self.start()
+
+    def latest(self) -> dict[str, np.ndarray]:
+        """Get the latest sample of every sensor with samples, in the order of the sensors."""
+        self.__start_on_read()
+        rows: np.ndarray = np.flatnonzero(self.__counts)
+        slots: np.ndarray = (self.__counts[rows] - 1) % self.__depth
+        return self.__columns(rows, self.__timestamps[rows, slots], self.__values[rows, slots])
+
+    def window(self, start: datetime | None = None, end: datetime | None = None,
+               sensor_type: SensorType | None = None, identifier: int | None = None) -> dict[str, np.ndarray]:
+        """
+        Get the kept samples of a time span, ordered by sensor and time.
+        :param start: First time stamp, None for the oldest kept.
+        :param end: Time stamp after the last one, None for the latest.
+        :param sensor_type: Only samples of sensors of this type, None for all.
+        :param identifier: Only samples of sensors with this identifier, None for all.
+        """
+        self.__start_on_read()
+        mask: np.ndarray = self.__timestamps > 0
+        if start is not None:
+            mask &= self.__timestamps >= to_microseconds(start)
+        if end is not None:
+            mask &= self.__timestamps < to_microseconds(end)
+        if sensor_type is not None:
+            mask &= (self.__types == SENSOR_TYPES.index(sensor_type))[:, np.newaxis]
+        if identifier is not None:
+            mask &= (self.__identifiers == identifier)[:, np.newaxis]
+        rows, slots = np.nonzero(mask)
+        timestamps: np.ndarray = self.__timestamps[rows, slots]
+        order: np.ndarray = np.lexsort((timestamps, rows))
+        return self.__columns(rows[order], timestamps[order], self.__values[rows, slots][order])
+
+    def __columns(self, rows: np.ndarray, timestamps: np.ndarray, values: np.ndarray) -> dict[str, np.ndarray]:
+        return {
+            TYPE_COLUMN: self.__types[rows],
+            IDENTIFIER_COLUMN: self.__identifiers[rows],
+            TIMESTAMP_COLUMN: timestamps,
+            VALUE_COLUMN: values
+        }
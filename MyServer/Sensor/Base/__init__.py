@@ -1,2 +1,4 @@
 from .driver_base import DriverBase
-from .sensor_base import SensorBase, SensorDictBase
\ No newline at end of file
+from .sample_batch import SampleBatch
+from .sensor_base import SensorBase, SensorDictBase
+from .latest_values import LatestValues
@@ -2,7 +2,7 @@ from typing import Any
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 
-@dataclass
+@dataclass(eq=False)  # drivers are compared by identity, for example when removed from the model
 class DriverBase[T](ABC):
 
     @abstractmethod
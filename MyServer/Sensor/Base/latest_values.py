@@ -0,0 +1,100 @@
+import logging
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from .sensor_base import SensorBase
+
+
+class LatestValues:
+    """
+    Latest value and time stamp of each sensor, collected with one callback per sensor for all consumers which need
+    the current values, such as the aggregate nodes and the PubSub publisher, instead of a callback of each of them.
+    Consumers of every sample register a listener, called by the same callback with the position of the sensor.
+    Array sensors are skipped.
+    """
+
+    def __init__(self, sensors: list[SensorBase], now: datetime):
+        """
+        ctor.
+        :param sensors: Sensors to collect the values of.
+        :param now: Time stamp of the values before the first sample.
+        """
+        self.__sensors: list[SensorBase] = [x for x in sensors if not x.sensor_type.is_array]
+        self.__positions: dict[SensorBase, int] = {x: i for i, x in enumerate(self.__sensors)}
+        self.__values: list[Any] = [0.0] * len(self.__sensors)
+        self.__times: list[datetime] = [now] * len(self.__sensors)
+        self.__samples: list[int] = [0] * len(self.__sensors)
+        self.__listeners: list[Callable[[int, datetime, Any], None]] = []
+        self.__callbacks: list[tuple[SensorBase, Callable]] = []
+
+    @property
+    def sensors(self) -> list[SensorBase]:
+        """The sensors, in the order of their positions."""
+        return list(self.__sensors)
+
+    @property
+    def values(self) -> list[Any]:
+        """Latest value of each sensor, by position. Written in place, copy it to keep it."""
+        return self.__values
+
+    @property
+    def times(self) -> list[datetime]:
+        """Time stamp of the latest value of each sensor, by position. Written in place, copy it to keep it."""
+        return self.__times
+
+    @property
+    def samples(self) -> list[int]:
+        """Number of samples of each sensor, by position."""
+        return self.__samples
+
+    @property
+    def running(self) -> bool:
+        """Whether the values are collected."""
+        return bool(self.__callbacks)
+
+    def position(self, sensor: SensorBase) -> int | None:
+        """Get the position of a sensor, None if its values are not collected."""
+        return self.__positions.get(sensor)
+
+    def add_listener(self, listener: Callable[[int, datetime, Any], None]):
+        """
+        Call a function with the position, time stamp and value of every sample. Called within the sensor callback,
+        so it should only store the sample.
+        :param listener: The function.
+        """
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[int, datetime, Any], None]):
+        """Stop calling a listener."""
+        if listener in self.__listeners:
+            self.__listeners.remove(listener)
+
+    def start(self):
+        """Start collecting the values of the sensors."""
+        if self.__callbacks:
+            logging.warning("Latest values already collected.")
+            return
+        for index, sensor in enumerate(self.__sensors):
+            callback = self.__make_callback(index)
+            self.__callbacks.append((sensor, callback))
+            sensor.add_callback(callback)
+
+    def close(self):
+        """Stop collecting the values. The latest ones can still be read."""
+        for sensor, callback in self.__callbacks:
+            sensor.remove_callback(callback)
+        self.__callbacks.clear()
+
+    def __make_callback(self, index: int):
+        values, times, samples, listeners = self.__values, self.__times, self.__samples, self.__listeners
+
+        # a coroutine function, synchronous callbacks are run in a thread by the sensor
+        async def callback(ts: datetime, v):
+            values[index] = v
+            times[index] = ts
+            samples[index] += 1
+            for listener in listeners:
+                listener(index, ts, v)
+
+        return callback
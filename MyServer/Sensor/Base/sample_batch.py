@@ -0,0 +1,14 @@
+from collections.abc import Sequence
+from datetime import datetime
+from typing import NamedTuple
+
+
+class SampleBatch[T](NamedTuple):
+    """
+    Several samples returned by one call of a sensor source, for drivers which read many values per request. Unpacks
+    as (timestamps, values), both of the same length.
+    """
+    timestamps: Sequence[datetime]
+    """Time stamp of every sample, in order."""
+    values: Sequence[T]
+    """The samples."""
\ No newline at end of file
@@ -1,6 +1,6 @@
 import dataclasses
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from datetime import datetime
 import asyncio
 from decimal import InvalidOperation
@@ -9,6 +9,8 @@ import logging
 
 
 from MyServer.MachineOperation import SensorType, SensorId
+from MyServer.Timing import Clock, SYSTEM_CLOCK
+from .sample_batch import SampleBatch
 
 
 @dataclasses.dataclass(frozen=True)
@@ -40,8 +42,9 @@ class SensorBase[T](ABC):
     __last_value: T
     __last_measured_time: datetime
     __mutator_dict: Callable[[], SensorDictBase] | None = None
-    __source: Callable[[...], T] | None
+    __source: Callable[[...], T | SampleBatch[T] | Awaitable[T | SampleBatch[T]]] | None
     __task: asyncio.Task | None
+    __clock: Clock
 
     def __init__(self, name: str, sensor_type: SensorType, identifier: int, namespace: str, updates_per_second: float):
         """
@@ -59,20 +62,25 @@ class SensorBase[T](ABC):
         self.__callback_locks: dict[Callable[[datetime, T], ...], asyncio.Lock] = {}
         self.__source = None
         self.__task = None
-        self.__sensor_id: SensorId = SensorId(type=sensor_type, identifier=identifier)
+        self.__clock = SYSTEM_CLOCK
+        self.__sensor_type: SensorType = sensor_type
+        self.__identifier: int = identifier
+        self.__sensor_id: SensorId | None = None  # validated on first use, most sensors are never asked for it
 
     def __del__(self):
-        logging.info(f"Shutting down {self.__name} (ID = {self.__sensor_id}).")
+        logging.info("Shutting down %s (ID = %s).", self.__name, self.__identifier)
         self.stop()
 
     @property
     def identifier(self) -> int:
         """Get the identifier."""
-        return self.__sensor_id.identifier
+        return self.__identifier
 
     @property
     def sensor_id(self) -> SensorId:
         """Get the sensor ID."""
+        if self.__sensor_id is None:
+            self.__sensor_id = SensorId(type=self.__sensor_type, identifier=self.__identifier)
         return self.__sensor_id
 
     @property
@@ -93,7 +101,7 @@ class SensorBase[T](ABC):
     @property
     def sensor_type(self) -> SensorType:
         """Get the sensor type."""
-        return self.__sensor_id.type
+        return self.__sensor_type
 
     def to_data_object(self) -> SensorDictBase:
         return self._to_data_dictionary()
@@ -118,54 +126,76 @@ class SensorBase[T](ABC):
 
     @property
     def source(self):
+        """
+        Function polled for new data. Returns a single value, time stamped when received, or a SampleBatch of values
+        with their own time stamps. Coroutine functions are awaited, so sources doing I/O do not block the event loop.
+        """
         return self.__source
 
     @source.setter
-    def source(self, value: Callable[[...], T]):
+    def source(self, value: Callable[[...], T | SampleBatch[T] | Awaitable[T | SampleBatch[T]]]):
         if self.__task is not None:
             return
         self.__source = value
 
+    @property
+    def clock(self) -> Clock:
+        """The clock used for time stamps and for the polling interval."""
+        return self.__clock
+
+    @clock.setter
+    def clock(self, value: Clock):
+        if self.__task is not None:
+            return
+        self.__clock = value
+
     @property
     def running(self):
-        return self.__task is not None
+        """Whether the sensor is polled, False once the poller ended with an error."""
+        return self.__task is not None and not self.__task.done()
 
     async def __poller(self):
         time_span: float = 1.0 / self.__updates_per_second
-        logging.debug(f"Setting up poller (ID = {self.__sensor_id}).")
+        logging.debug("Setting up poller (ID = %s).", self.sensor_id)
         try:
             while self.__source is not None:
-                start_time: datetime = datetime.now()  # start of the full process
+                start_time: datetime = self.__clock.now()  # start of the full process
                 self.on_polling()
-                value: T = self.source()
-                time: datetime = datetime.now()  # time when received - source might take a while
-                await self.on_new_data(time, value)
-                stop_time: datetime = datetime.now()  # awaited new data received
+                value: T | SampleBatch[T] = self.source()
+                if inspect.isawaitable(value):
+                    value = await value
+                if isinstance(value, SampleBatch):
+                    for time, sample in zip(value.timestamps, value.values, strict=True):
+                        await self.on_new_data(time, sample)
+                else:
+                    time: datetime = self.__clock.now()  # time when received - source might take a while
+                    await self.on_new_data(time, value)
+                stop_time: datetime = self.__clock.now()  # awaited new data received
                 time_delta: float = (stop_time - start_time).total_seconds()
                 if time_delta < time_span:
-                    await asyncio.sleep(time_span - time_delta)
+                    await self.__clock.sleep(time_span - time_delta)
         except Exception as e:
-            logging.error(f"Error while receiving data from ID = {self.__sensor_id}: {e}")
+            logging.error("Error while receiving data from ID = %s: %s", self.sensor_id, e)
             raise e
 
     def start(self):
         """Start polling the sensor."""
-        logging.info(f"Starting the sensor ID = {self.__sensor_id}.")
-        if self.__task is not None:
-            logging.error(f"Sensor with ID = {self.__sensor_id} already running."
-                          "Please call \"running\" before the start.")
+        logging.info("Starting the sensor ID = %s.", self.sensor_id)
+        if self.running:  # a poller which ended with an error is replaced
+            logging.error("Sensor with ID = %s already running."
+                          "Please call \"running\" before the start.", self.sensor_id)
             raise InvalidOperation("Task already started.")
         if self.__source is None:
-            logging.error(f"Source of the sensor {self.__sensor_id} is not set.")
+            logging.error("Source of the sensor %s is not set.", self.sensor_id)
             return
 
         self.__task = asyncio.create_task(self.__poller())
 
     def stop(self):
         """Stop polling the sensor."""
-        logging.info(f"Stopping the sensor with ID = {self.__sensor_id}.")
+        logging.info("Stopping the sensor with ID = %s.", self.sensor_id)
         if self.__task is None:
-            logging.warning(f"Sensor with ID = {self.__sensor_id} was not running.")
+            logging.warning("Sensor with ID = %s was not running.", self.sensor_id)
             return
         if not self.__task.done():
             self.__task.cancel()
@@ -179,28 +209,35 @@ class SensorBase[T](ABC):
         """
         self.__last_value = data
         self.__last_measured_time = timestamp
-
-        # avoids potential race conditions if called again before the callback has returned
-        async def safe_call(cb: Callable[[datetime, T], ...]):
-            lock = self.__callback_locks.setdefault(cb, asyncio.Lock())
-            async with lock:
-                if inspect.iscoroutinefunction(cb):
-                    await cb(timestamp, data)
-                else:
-                    await asyncio.to_thread(cb, timestamp, data)
-
+        callbacks = self.__callbacks
+        if not callbacks:
+            return
         try:
-            await asyncio.gather(*(safe_call(cb) for cb in self.__callbacks))
+            if len(callbacks) == 1:  # most sensors have one, a gather would wrap it into a task per sample
+                await self.__safe_call(callbacks[0], timestamp, data)
+            else:
+                await asyncio.gather(*(self.__safe_call(cb, timestamp, data) for cb in callbacks))
         except Exception as e:
-            logging.error(f"Was not able to gather: {e.__repr__()}")
+            logging.error("Was not able to gather: %r", e)
             raise e
 
+    async def __safe_call(self, cb: Callable[[datetime, T], ...], timestamp: datetime, data: T):
+        """Call a callback, avoiding potential race conditions if called again before the callback has returned."""
+        lock = self.__callback_locks.get(cb)
+        if lock is None:
+            lock = self.__callback_locks[cb] = asyncio.Lock()
+        async with lock:
+            if inspect.iscoroutinefunction(cb):
+                await cb(timestamp, data)
+            else:
+                await asyncio.to_thread(cb, timestamp, data)
+
     def add_callback(self, callback):
         """Add a callback. Can be added only once.
         :param callback: The callback to add.
         """
         if callback not in self.__callbacks:
-            logging.info(f"Adding callback to sensor with ID = {self.__sensor_id}.")
+            logging.info("Adding callback to sensor with ID = %s.", self.sensor_id)
             self.__callbacks.append(callback)
 
     def remove_callback(self, callback: Callable[[datetime, T], ...]) -> bool:
@@ -210,8 +247,9 @@ class SensorBase[T](ABC):
         :return: Whether the callback was removed.
         """
         if callback not in self.__callbacks:
-            logging.warning(f"Trying to remove a callback from sensor with ID = {self.__sensor_id} which was not present")
+            logging.warning("Trying to remove a callback from sensor with ID = %s which was not present",
+                            self.sensor_id)
             return False
-        logging.info(f"Removing callback from sensor with ID = {self.__sensor_id}.")
+        logging.info("Removing callback from sensor with ID = %s.", self.sensor_id)
         self.__callbacks.remove(callback)
         return True
@@ -1,3 +1,4 @@
 import MyServer.Sensor.Base
 from .temperature_sensor import TemperatureSensor
-from .pressure_sensor import PressureSensor
\ No newline at end of file
+from .pressure_sensor import PressureSensor
+from .waveform_sensor import WaveformSensor, WaveformSensorDict, WaveformBlock
\ No newline at end of file
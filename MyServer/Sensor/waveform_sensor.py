@@ -0,0 +1,88 @@
+import dataclasses
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from MyServer.MachineOperation import SensorType
+from MyServer.Sensor.Base.sensor_base import SensorBase, SensorDictBase
+
+
+@dataclasses.dataclass(frozen=True)
+class WaveformBlock:
+    """Block of equidistant samples."""
+    start: datetime
+    """Time of the first sample."""
+    sample_interval: float
+    """Seconds between two samples."""
+    samples: np.ndarray
+    """The samples, float32."""
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def end(self) -> datetime:
+        """Time of the first sample of the next block."""
+        return self.start + timedelta(seconds=len(self.samples) * self.sample_interval)
+
+
+@dataclasses.dataclass(frozen=True)
+class WaveformSensorDict(SensorDictBase):
+    """Dictionary for waveform sensors."""
+    block_size: int
+    """Samples per block."""
+
+
+class WaveformSensor(SensorBase[WaveformBlock]):
+    """
+    Waveform sensor for high sample rates, for example vibration or acoustics. Every poll delivers a block of
+    block_size samples, so the sensor is polled sample_rate / block_size times per second.
+    """
+
+    def __init__(self,
+                 identifier: int,
+                 namespace: str = "Sensors",
+                 sample_rate: float = 10240.0,
+                 block_size: int = 1024):
+        """
+        ctor.
+        :param identifier: Identifier of the sensor.
+        :param namespace: Namespace of the sensor.
+        :param sample_rate: Samples per second.
+        :param block_size: Samples per block.
+        """
+        super().__init__(name=f"Waveform_sensor_{identifier:03d}",
+                         identifier=identifier,
+                         sensor_type=SensorType.WAVEFORM,
+                         namespace=namespace,
+                         updates_per_second=sample_rate / max(block_size, 1))
+        if block_size < 1:
+            raise ValueError(f"Blocks need at least one sample, got {block_size}.")
+        self.__block_size = block_size
+
+    @property
+    def block_size(self) -> int:
+        """Samples per block."""
+        return self.__block_size
+
+    @property
+    def sample_rate(self) -> float:
+        """Samples per second."""
+        return self.updates_per_second * self.__block_size
+
+    @property
+    def sample_interval(self) -> float:
+        """Seconds between two samples."""
+        return 1.0 / self.sample_rate
+
+    def _to_data_dictionary(self) -> WaveformSensorDict:
+        return WaveformSensorDict(
+            sensor_type=SensorType.WAVEFORM,
+            identifier=self.identifier,
+            namespace=self.namespace,
+            updates_per_second=self.updates_per_second,
+            block_size=self.__block_size
+        )
+
+    def on_polling(self):
+        pass  # currently nothing to do here
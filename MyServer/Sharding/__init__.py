@@ -0,0 +1,4 @@
+from .shared_value_table import SharedValueTable
+from .sharded_simulation import ShardedSimulation
+
+__all__ = ["SharedValueTable", "ShardedSimulation"]
@@ -0,0 +1,92 @@
+import heapq
+import logging
+import signal
+import time
+from typing import Any
+
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import StateCell
+from MyServer.Timing import ScaledClock, WorkerClock
+from .shared_value_table import SharedValueTable, to_microseconds, WRITING
+
+POLL_INTERVAL: float = 0.1
+"""Longest sleep of a worker, bounds the reaction time to stop requests and mode changes."""
+
+
+def run_shard(table_name: str,
+              size: int,
+              shards: int,
+              shard: int,
+              entries: list[tuple[int, dict[str, Any]]],
+              clock: WorkerClock):
+    """
+    Entry point of a worker process. Rebuilds the drivers from their serialized form and writes their samples to
+    the shared table until a stop is requested.
+    :param table_name: Name of the shared memory block.
+    :param size: Number of slots of the table.
+    :param shards: Number of shards writing to the table.
+    :param shard: Index of this shard.
+    :param entries: Slot and serialized driver, as written by save_configuration.
+    :param clock: Clock of the server to continue.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C reaches the whole process group, the server stops us
+    table = SharedValueTable.attach(table_name, size, shards)
+    try:
+        _ShardLoop(table, shard, entries, clock.resume()).run()
+    finally:
+        table.close()
+
+
+class _ShardLoop:
+    """Polls the drivers of one shard at their update rates."""
+
+    def __init__(self, table: SharedValueTable, shard: int, entries: list[tuple[int, dict[str, Any]]],
+                 clock: ScaledClock):
+        self.__table = table
+        self.__shard = shard
+        self.__speed = clock.speed
+        factory = MachineModel()
+        self.__cell: StateCell = StateCell()
+        self.__drivers = []
+        for slot, entry in entries:
+            driver = factory.create_driver(entry)
+            driver.sensor.clock = clock
+            driver.cell = self.__cell
+            self.__drivers.append((slot, driver))
+
+    def __apply_control(self):
+        # the drivers share the cell of the shard, so a change is one write
+        self.__cell.mode = self.__table.mode
+        self.__cell.state = self.__table.state
+
+    def run(self):
+        logging.info("Shard %s running %s drivers.", self.__shard, len(self.__drivers))
+        values = self.__table.values
+        timestamps = self.__table.timestamps
+        now: float = time.monotonic()
+        # (due time, slot, index into the drivers, period in real seconds)
+        schedule: list[tuple[float, int, int, float]] = [
+            (now, slot, i, 1.0 / (driver.sensor.updates_per_second * self.__speed))
+            for i, (slot, driver) in enumerate(self.__drivers)
+        ]
+        heapq.heapify(schedule)
+        while not self.__table.stop_requested:
+            self.__apply_control()
+            now = time.monotonic()
+            count: int = 0
+            while schedule and schedule[0][0] <= now:
+                due, slot, index, period = schedule[0]
+                driver = self.__drivers[index][1]
+                value = driver.measure()
+                timestamps[slot] = WRITING  # the reader leaves the slot for its next poll
+                values[slot] = value
+                timestamps[slot] = to_microseconds(driver.last_value_time)
+                count += 1
+                # a shard falling behind skips samples instead of bursting to catch up
+                heapq.heapreplace(schedule, (max(due + period, now), slot, index, period))
+            if count:
+                self.__table.add_samples(self.__shard, count)
+            wait: float = schedule[0][0] - time.monotonic() if schedule else POLL_INTERVAL
+            if wait > 0:
+                time.sleep(min(wait, POLL_INTERVAL))
+        logging.info("Shard %s stopped.", self.__shard)
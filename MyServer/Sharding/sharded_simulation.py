@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from multiprocessing.process import BaseProcess
+
+import numpy as np
+
+from MyServer.Lifetime import MachineModel
+from MyServer.Sensor.Base import SensorBase
+from MyServer.Simulation import SimulationDriver
+from MyServer.Timing import Clock, ScaledClock, spawn_workers
+from .shard_worker import run_shard
+from .shared_value_table import SharedValueTable, from_microseconds_array, WRITING
+
+TICK: float = 0.01
+"""Seconds between two reads of the shared table."""
+JOIN_TIMEOUT: float = 5.0
+
+
+class ShardedSimulation:
+    """
+    Runs the simulation drivers of a machine model in worker processes. The drivers are partitioned into contiguous
+    slot ranges, one per worker. The workers write their samples to a shared table, the server process reads the
+    table each tick and hands the new samples to the sensors, which notify their callbacks as usual. Sensors deleted
+    from the model are no longer fed. Drivers which are not simulation drivers keep being polled by their sensors.
+    """
+
+    def __init__(self, model: MachineModel, shards: int, clock: Clock | None = None, tick: float = TICK):
+        """
+        ctor.
+        :param model: Machine model with the drivers to distribute.
+        :param shards: Number of worker processes.
+        :param clock: Clock of the server. The workers run a copy of it, speed changes after the start do not reach
+        the workers.
+        :param tick: Seconds between two reads of the shared table.
+        """
+        if shards < 1:
+            raise ValueError(f"At least one shard is required, got {shards}.")
+        self.__model = model
+        self.__shards = shards
+        self.__clock: Clock = clock if clock is not None else ScaledClock()
+        self.__tick = tick
+        self.__drivers: list[SimulationDriver] = []
+        self.__sensors: list[SensorBase] = []
+        self.__processes: list[BaseProcess] = []
+        self.__table: SharedValueTable | None = None
+        self.__last_seen: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.__active: np.ndarray = np.zeros(0, dtype=bool)  # slots of sensors still in the model
+        self.__version: int = model.version
+
+    @property
+    def running(self) -> bool:
+        """Whether the workers are started."""
+        return self.__table is not None
+
+    @property
+    def table(self) -> SharedValueTable | None:
+        """The shared table, None if not running."""
+        return self.__table
+
+    @property
+    def sensors(self) -> list[SensorBase]:
+        """Sensors fed from the shared table, in slot order."""
+        return [x for x, active in zip(self.__sensors, self.__active) if active]
+
+    def start(self):
+        """Move the simulation drivers to the worker processes. Sensors polling these drivers are stopped."""
+        if self.__table is not None:
+            logging.warning("Sharded simulation already running.")
+            return
+        # array sensors produce blocks, which do not fit into a slot of the table
+        self.__drivers = [d for d in self.__model.mutators
+                          if isinstance(d, SimulationDriver) and not d.sensor.sensor_type.is_array]
+        self.__sensors = [d.sensor for d in self.__drivers]
+        for sensor in self.__sensors:
+            if sensor.running:
+                sensor.stop()
+            sensor.source = None
+
+        size: int = len(self.__drivers)
+        shards: int = max(1, min(self.__shards, size))
+        table = SharedValueTable.create(size, shards)
+        table.mode = self.__model.mode
+        table.state = self.__model.state
+        self.__table = table
+        self.__last_seen = np.zeros(size, dtype=np.int64)
+        self.__active = np.ones(size, dtype=bool)
+        self.__version = self.__model.version
+
+        context, clock = spawn_workers(self.__clock)
+        for shard in range(shards):
+            low, high = size * shard // shards, size * (shard + 1) // shards
+            entries = [(slot, self.__drivers[slot].to_driver_data().as_dict()) for slot in range(low, high)]
+            process = context.Process(target=run_shard,
+                                      args=(table.name, size, shards, shard, entries, clock),
+                                      name=f"simulation-shard-{shard}",
+                                      daemon=True)
+            process.start()
+            self.__processes.append(process)
+        logging.info("Started %s simulation shards for %s drivers.", shards, size)
+
+    async def poll(self) -> int:
+        """
+        Publish mode and state to the workers and hand the samples written since the last poll to the sensors.
+        :return: Number of new samples.
+        """
+        table = self.__table
+        if table is None:
+            return 0
+        table.mode = self.__model.mode
+        table.state = self.__model.state
+        if self.__model.version != self.__version:  # sensors were added or deleted
+            self.__version = self.__model.version
+            self.__drop_deleted()
+
+        timestamps = table.timestamps
+        changed = np.flatnonzero((timestamps != self.__last_seen) & self.__active)
+        if changed.size == 0:
+            return 0
+        stamps = timestamps[changed]  # only the changed slots are gathered, the table itself is not copied
+        values = table.values[changed]
+        # a slot written to while its value was read is left for the next poll, see SharedValueTable
+        whole = (timestamps[changed] == stamps) & (stamps != WRITING)
+        if not whole.all():
+            changed, stamps, values = changed[whole], stamps[whole], values[whole]
+        self.__last_seen[changed] = stamps
+        # converted in one step per poll, the sensors are awaited one after another: a gather would wrap every
+        # sample into a task, which costs more than the callbacks of most sensors
+        sensors = self.__sensors
+        for slot, stamp, value in zip(changed.tolist(), from_microseconds_array(stamps), values.tolist()):
+            await sensors[slot].on_new_data(stamp, value)
+        return changed.size
+
+    def __drop_deleted(self):
+        present: set[int] = {id(x) for x in self.__model.sensors}
+        for slot in np.flatnonzero(self.__active).tolist():
+            if id(self.__sensors[slot]) not in present:
+                self.__active[slot] = False
+                logging.info("Sensor %s deleted, no longer fed from the shards.", self.__sensors[slot].name)
+
+    async def run(self):
+        """Poll the table until stopped. Meant to run as a task."""
+        while self.__table is not None:
+            await self.poll()
+            await asyncio.sleep(self.__tick)
+
+    async def stop(self):
+        """Stop the workers, release the table and give the drivers back to their sensors."""
+        table = self.__table
+        if table is None:
+            return
+        table.request_stop()
+        for process in self.__processes:
+            await asyncio.to_thread(process.join, JOIN_TIMEOUT)
+            if process.is_alive():
+                logging.warning("Shard %s did not stop in time, terminating.", process.name)
+                process.terminate()
+        logging.info("Simulation shards stopped after %s samples.", table.samples())
+        self.__processes = []
+        self.__table = None
+        table.close()
+        table.unlink()
+        for driver, active in zip(self.__drivers, self.__active):
+            if active:
+                driver.sensor.source = driver.measure
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta, timezone
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from MyServer.MachineOperation import Mode, State
+
+_EPOCH: datetime = datetime(1970, 1, 1)
+_MICROSECOND: timedelta = timedelta(microseconds=1)
+
+_MODE: int = 0
+_STATE: int = 1
+_STOP: int = 2
+_HEADER: int = 4
+"""Control cells in front of the per shard sample counters."""
+
+WRITING: int = -1
+"""Time stamp of a slot while a worker writes its value."""
+
+_MODES: list[Mode] = list(Mode)
+_STATES: list[State] = list(State)
+
+
+def to_microseconds(timestamp: datetime) -> int:
+    """Convert a time stamp to microseconds since the epoch, as stored in the table. Naive times are taken as UTC."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def from_microseconds(microseconds: int) -> datetime:
+    """Convert microseconds since the epoch back to a naive time stamp."""
+    return _EPOCH + timedelta(microseconds=microseconds)
+
+
+def from_microseconds_array(microseconds: np.ndarray) -> list[datetime]:
+    """Convert many time stamps of the table at once, see from_microseconds."""
+    return microseconds.astype("datetime64[us]").tolist()
+
+
+class SharedValueTable:
+    """
+    Sample table in shared memory, exchanged between the simulation workers and the server process.
+    Layout: int64 control cells (mode, state, stop flag, reserved, one sample counter per shard), float64 values and
+    int64 time stamps in microseconds since the epoch. A time stamp of 0 means no sample yet. Writers mark the slot
+    with the time stamp WRITING, store the value and then the time stamp: a reader finding the same time stamp before
+    and after reading the value has read a whole pair.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, size: int, shards: int, owner: bool):
+        """
+        ctor. Use create or attach.
+        :param memory: The shared memory block.
+        :param size: Number of slots.
+        :param shards: Number of shards writing to the table.
+        :param owner: Whether the table releases the block on unlink.
+        """
+        self.__memory = memory
+        self.__size = size
+        self.__shards = shards
+        self.__owner = owner
+        control_cells: int = _HEADER + shards
+        buffer = memory.buf
+        self.__control = np.ndarray((control_cells,), dtype=np.int64, buffer=buffer)
+        self.__values = np.ndarray((size,), dtype=np.float64, buffer=buffer, offset=control_cells * 8)
+        self.__timestamps = np.ndarray((size,), dtype=np.int64, buffer=buffer, offset=(control_cells + size) * 8)
+
+    @staticmethod
+    def create(size: int, shards: int) -> "SharedValueTable":
+        """
+        Allocate a new, zeroed table.
+        :param size: Number of slots.
+        :param shards: Number of shards writing to the table.
+        """
+        if size < 0 or shards < 1:
+            raise ValueError(f"Invalid table layout: {size} slots, {shards} shards.")
+        nbytes: int = (_HEADER + shards + 2 * size) * 8
+        memory = shared_memory.SharedMemory(create=True, size=nbytes)
+        memory.buf[:nbytes] = bytes(nbytes)
+        return SharedValueTable(memory, size, shards, owner=True)
+
+    @staticmethod
+    def attach(name: str, size: int, shards: int) -> "SharedValueTable":
+        """
+        Attach to a table created by another process.
+        :param name: Name of the shared memory block.
+        :param size: Number of slots.
+        :param shards: Number of shards writing to the table.
+        """
+        # spawned workers share the resource tracker of the creating process, which removes the block on unlink
+        memory = shared_memory.SharedMemory(name=name)
+        return SharedValueTable(memory, size, shards, owner=False)
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block, to attach from other processes."""
+        return self.__memory.name
+
+    @property
+    def size(self) -> int:
+        """Number of slots."""
+        return self.__size
+
+    @property
+    def shards(self) -> int:
+        """Number of shards writing to the table."""
+        return self.__shards
+
+    @property
+    def values(self) -> np.ndarray:
+        """View on the values, no copy."""
+        return self.__values
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """View on the time stamps in microseconds since the epoch, no copy."""
+        return self.__timestamps
+
+    @property
+    def mode(self) -> Mode:
+        """Mode of the machine, set by the server process."""
+        return _MODES[self.__control[_MODE]]
+
+    @mode.setter
+    def mode(self, value: Mode):
+        self.__control[_MODE] = _MODES.index(value)
+
+    @property
+    def state(self) -> State:
+        """State of the machine, set by the server process."""
+        return _STATES[self.__control[_STATE]]
+
+    @state.setter
+    def state(self, value: State):
+        self.__control[_STATE] = _STATES.index(value)
+
+    @property
+    def stop_requested(self) -> bool:
+        """Whether the workers shall stop."""
+        return bool(self.__control[_STOP])
+
+    def request_stop(self):
+        """Ask the workers to stop."""
+        self.__control[_STOP] = 1
+
+    def add_samples(self, shard: int, count: int):
+        """
+        Count samples written by a shard.
+        :param shard: Index of the shard.
+        :param count: Number of samples.
+        """
+        self.__control[_HEADER + shard] += count
+
+    def samples(self, shard: int | None = None) -> int:
+        """
+        Number of samples written so far.
+        :param shard: Index of the shard, None for all shards.
+        """
+        if shard is None:
+            return int(self.__control[_HEADER:].sum())
+        return int(self.__control[_HEADER + shard])
+
+    def close(self):
+        """Release the views and detach from the block."""
+        del self.__control, self.__values, self.__timestamps
+        self.__memory.close()
+
+    def unlink(self):
+        """Remove the block. Only done by the creating process, after all workers have stopped."""
+        if self.__owner:
+            self.__memory.unlink()
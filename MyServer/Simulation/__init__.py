@@ -1,4 +1,8 @@
+from .driver_columns import COLUMN_SEPARATOR, to_columns, to_entries
 from .simulation_driver import SimulationDriver, DriverFactory
 from .simulation_temperature_driver import TemperatureSimulationDriver, TemperatureSimulationDriverFactory
 from .simulation_pressure_driver import PressureSimulationDriver, PressureSimulationDriverFactory
 from .simulation_driver_data import SimulationDriverData
+from .replay_file import ReplayFile
+from .simulation_replay_driver import ReplaySimulationDriver, ReplaySimulationDriverFactory
+from .simulation_waveform_driver import WaveformSimulationDriver, WaveformSimulationDriverFactory
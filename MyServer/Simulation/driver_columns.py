@@ -0,0 +1,39 @@
+from collections.abc import Iterable
+from typing import Any
+
+COLUMN_SEPARATOR: str = "."
+"""Joins the key of a nested dictionary and the key within, for example "sensor.identifier"."""
+
+
+def to_columns(entries: Iterable[dict[str, Any]]) -> dict[str, list[Any]]:
+    """
+    Transpose serialized drivers of one kind into columns, one per field. Nested dictionaries, like the sensor, are
+    flattened to columns "sensor.identifier", "sensor.namespace", ...
+    :param entries: Serialized drivers, all with the fields of the first one.
+    :raises KeyError: If an entry lacks a field of the first one.
+    """
+    columns: dict[str, list[Any]] = {}
+    paths: list[tuple[str, str | None]] = []
+    for entry in entries:
+        if not paths:
+            for key, value in entry.items():
+                for inner in (value if isinstance(value, dict) else [None]):
+                    paths.append((key, inner))
+                    columns[key if inner is None else key + COLUMN_SEPARATOR + inner] = []
+        for (key, inner), column in zip(paths, columns.values()):
+            column.append(entry[key] if inner is None else entry[key][inner])
+    return columns
+
+
+def to_entries(columns: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    """Turn columns as returned by to_columns back into serialized drivers."""
+    count: int = len(next(iter(columns.values()), []))
+    entries: list[dict[str, Any]] = [{} for _ in range(count)]
+    for name, column in columns.items():
+        key, _, inner = name.partition(COLUMN_SEPARATOR)
+        for entry, value in zip(entries, column, strict=True):
+            if inner:
+                entry.setdefault(key, {})[inner] = value
+            else:
+                entry[key] = value
+    return entries
@@ -0,0 +1,11 @@
+import dataclasses
+from .simulation_driver_data import SimulationDriverData
+
+
+@dataclasses.dataclass(frozen=True)
+class ReplayDriverData(SimulationDriverData[float]):
+    replay_file: str
+    column: str
+    timestamp_column: str
+    speed: float
+    loop: bool
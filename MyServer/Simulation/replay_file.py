@@ -0,0 +1,106 @@
+import bisect
+import logging
+import os
+import weakref
+
+import numpy as np
+import pyarrow as pa
+
+TIMESTAMP_COLUMN: str = "timestamp"
+
+_TICKS_PER_SECOND: dict[str, int] = {"s": 1, "ms": 1_000, "us": 1_000_000, "ns": 1_000_000_000}
+
+
+class ReplayFile:
+    """
+    Recorded data in an Arrow IPC file with one timestamp column and one column per signal. The file is read through a
+    memory map without copying, only the pages which are actually replayed are loaded. Drivers replaying columns of the
+    same file share one instance, see open.
+    """
+    __open_files: weakref.WeakValueDictionary[tuple[str, str], "ReplayFile"] = weakref.WeakValueDictionary()
+
+    def __init__(self, file_path: str, timestamp_column: str = TIMESTAMP_COLUMN):
+        """
+        ctor.
+        :param file_path: Path to the Arrow IPC file.
+        :param timestamp_column: Name of the column with the time stamps. Must be of Arrow timestamp type and sorted.
+        """
+        logging.info(f"Memory mapping replay file {file_path}.")
+        self.__file_path = file_path
+        self.__timestamp_column = timestamp_column
+        self.__source = pa.memory_map(file_path, "r")
+        self.__table: pa.Table = pa.ipc.open_file(self.__source).read_all()  # buffers point into the memory map
+        if self.__table.num_rows == 0:
+            raise ValueError(f"Replay file {file_path} is empty.")
+        if timestamp_column not in self.__table.column_names:
+            raise ValueError(f"Replay file {file_path} has no time stamp column {timestamp_column}.")
+        time_type = self.__table.schema.field(timestamp_column).type
+        if not pa.types.is_timestamp(time_type):
+            raise ValueError(f"Column {timestamp_column} must be a timestamp column, is {time_type}.")
+
+        self.__ticks_per_second: int = _TICKS_PER_SECOND[time_type.unit]
+        self.__time_chunks: list[np.ndarray] = [
+            c.to_numpy(zero_copy_only=True).view(np.int64) for c in self.__table.column(timestamp_column).chunks
+        ]
+        self.__chunk_starts: list[int] = [int(c[0]) for c in self.__time_chunks]
+        self.__first: int = self.__chunk_starts[0]
+        last: int = int(self.__time_chunks[-1][-1])
+        rows: int = self.__table.num_rows
+        # one loop lasts one sample interval longer than the recording, so the last sample is replayed as well
+        self.__loop_length: int = (last - self.__first) * rows // (rows - 1) if rows > 1 else 1
+        self.__duration: int = last - self.__first
+        self.__columns: dict[str, list[np.ndarray]] = {}
+
+    @staticmethod
+    def open(file_path: str, timestamp_column: str = TIMESTAMP_COLUMN) -> "ReplayFile":
+        """Get the replay file for a path, reusing the memory map if the file is already open."""
+        key = (os.path.abspath(file_path), timestamp_column)
+        replay_file = ReplayFile.__open_files.get(key)
+        if replay_file is None:
+            replay_file = ReplayFile(file_path, timestamp_column)
+            ReplayFile.__open_files[key] = replay_file
+        return replay_file
+
+    @property
+    def file_path(self) -> str:
+        """Path of the file."""
+        return self.__file_path
+
+    @property
+    def timestamp_column(self) -> str:
+        """Name of the time stamp column."""
+        return self.__timestamp_column
+
+    @property
+    def column_names(self) -> list[str]:
+        """Names of the replayable columns."""
+        return [x for x in self.__table.column_names if x != self.__timestamp_column]
+
+    @property
+    def duration(self) -> float:
+        """Seconds between the first and the last sample."""
+        return self.__duration / self.__ticks_per_second
+
+    def value_at(self, column: str, elapsed: float, loop: bool = True) -> float:
+        """
+        Get the value of a column at a time of the recording. The last sample at or before that time is returned.
+        :param column: Name of the column.
+        :param elapsed: Seconds after the first sample.
+        :param loop: Whether to start over at the end of the recording, otherwise the last value is held.
+        """
+        values = self.__column(column)
+        offset: int = max(0, int(elapsed * self.__ticks_per_second))
+        offset = offset % self.__loop_length if loop else min(offset, self.__duration)
+        time_stamp: int = self.__first + offset
+        chunk: int = bisect.bisect_right(self.__chunk_starts, time_stamp) - 1
+        index: int = int(np.searchsorted(self.__time_chunks[chunk], time_stamp, side="right")) - 1
+        return float(values[chunk][index])
+
+    def __column(self, column: str) -> list[np.ndarray]:
+        values = self.__columns.get(column)
+        if values is None:
+            if column not in self.column_names:
+                raise KeyError(f"Column {column} not in replay file {self.__file_path}.")
+            values = [c.to_numpy(zero_copy_only=True) for c in self.__table.column(column).chunks]
+            self.__columns[column] = values
+        return values
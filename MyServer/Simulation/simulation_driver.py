@@ -1,8 +1,10 @@
 from datetime import datetime
+from typing import Any
 
-from MyServer.MachineOperation import State, Mode
+from MyServer.MachineOperation import State, Mode, StateCell
 from abc import ABC, abstractmethod
 
+from .driver_columns import to_entries
 from .simulation_driver_data import SimulationDriverData
 from MyServer.Sensor.Base import SensorBase
 
@@ -15,9 +17,9 @@ class SimulationDriver[T](ABC):
         self.__sensor: SensorBase[T] = sensor
         self.__sensor.source = self.measure
         self.__current_value: T = start_value
-        self.__value_time: datetime = datetime.now()
-        self.__mode: Mode = mode
-        self.__state: State = state
+        self.__value_time: datetime = sensor.clock.now()
+        self.__cell: StateCell = StateCell(mode, state)
+        self.__own_cell: StateCell | None = self.__cell
         sensor.driver_dict_callback = self.to_driver_data
 
     @property
@@ -25,25 +27,37 @@ class SimulationDriver[T](ABC):
         """Get the sensor assigned to the simulated driver."""
         return self.__sensor
 
+    @property
+    def cell(self) -> StateCell:
+        """Cell holding mode and state, possibly shared with other drivers."""
+        return self.__cell
+
+    @cell.setter
+    def cell(self, cell: StateCell):
+        """Follow another cell, for example the one of the machine model or of a group."""
+        self.__cell = cell
+
     @property
     def mode(self) -> Mode:
         """Get the currently set mode."""
-        return self.__mode
+        return self.__cell.mode
 
     @mode.setter
     def mode(self, mode: Mode):
-        """Set the mode."""
-        self.__mode = mode
+        """Set the mode of this driver alone. A driver sharing a cell gets one of its own, following the shared one."""
+        self.__cell = self.__own_cell = StateCell.own(self.__cell, self.__own_cell)
+        self.__cell.mode = mode
 
     @property
     def state(self):
         """Get the state of the machine."""
-        return self.__state
+        return self.__cell.state
 
     @state.setter
     def state(self, state: State):
-        """Set the state."""
-        self.__state = state
+        """Set the state of this driver alone. A driver sharing a cell gets one of its own, following the shared one."""
+        self.__cell = self.__own_cell = StateCell.own(self.__cell, self.__own_cell)
+        self.__cell.state = state
 
     @property
     def last_value(self) -> T:
@@ -65,6 +79,15 @@ class SimulationDriver[T](ABC):
         """Update the current value."""
         pass
 
+    def target(self, mode: Mode, state: State) -> tuple[T, float]:
+        """
+        Value the driver converges to in the given mode and state, together with the standard deviation of the noise.
+        Used by vectorized simulations which do not call measure for every sample.
+        :param mode: Mode of the machine.
+        :param state: State of the machine.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not describe a target value.")
+
     def measure(self) -> T:
         """Interface function for measurements."""
         self.__value_time, self.__current_value = self._update_current_value()
@@ -77,3 +100,12 @@ class DriverFactory[T](ABC):
     def from_dict(d: dict) -> SimulationDriver[T]:
         """create a new instance from a dict."""
         ...
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list[Any]]) -> list[SimulationDriver[T]]:
+        """
+        Create many instances at once from their dicts transposed into columns, see to_columns. Factories of many
+        drivers override this to skip the per-dict validation.
+        :raises KeyError: If a column is missing.
+        """
+        return [cls.from_dict(x) for x in to_entries(columns)]
@@ -2,6 +2,7 @@ import json
 import math
 import random
 from datetime import datetime
+from typing import Any
 
 from MyServer.MachineOperation import State, Mode
 from MyServer.Sensor import PressureSensor
@@ -22,7 +23,7 @@ class PressureSimulationDriver(SimulationDriver[float]):
                  adaption_rate: float = 0.01):
         super().__init__(sensor, start_value)
         self._seed = random_seed
-        self._random = random.Random(random_seed)
+        self._random: random.Random | None = None  # created by the first measurement, restores skip seeding
         self._st_dev = st_dev
         self._st_dev_broken = st_dev_broken
         self._value_idle = value_idle
@@ -48,32 +49,42 @@ class PressureSimulationDriver(SimulationDriver[float]):
         )
         return d
 
+    @property
+    def adaption_rate(self) -> float:
+        """How fast the system reacts to other states."""
+        return self._adaption_rate
+
+    def target(self, mode: Mode, state: State) -> tuple[float, float]:
+        return self._target_value(mode, state)
+
     def _update_current_value(self) -> tuple[datetime, float]:
-        target_value, st_dev = self._target_value()
-        time_delta = (datetime.now() - self.last_value_time).total_seconds()
+        target_value, st_dev = self.target(self.mode, self.state)
+        time_stamp = self.sensor.clock.now()
+        time_delta = max(0.0, (time_stamp - self.last_value_time).total_seconds())
         weight = math.exp(- time_delta / self._adaption_rate)
         adapted_value = weight * self.last_value + (1 - weight) * target_value
+        if self._random is None:
+            self._random = random.Random(self._seed)
         noisy_value = self._random.normalvariate(adapted_value, st_dev)
-        time_stamp = datetime.now()
         return time_stamp, noisy_value
 
-    def _target_value(self) -> tuple[float, float]:
-        match self.state:
+    def _target_value(self, mode: Mode, state: State) -> tuple[float, float]:
+        match state:
             case State.NORMAL:
-                return self._target_value_healthy()
+                return self._target_value_healthy(mode)
             case State.BROKEN:
-                return self._target_value_broken()
+                return self._target_value_broken(mode)
         return 0, 0
 
-    def _target_value_healthy(self) -> tuple[float, float]:
-        match self.mode:
+    def _target_value_healthy(self, mode: Mode) -> tuple[float, float]:
+        match mode:
             case Mode.IDLE:
                 return self._value_idle, self._st_dev
             case Mode.RUNNING:
                 return self._value_running, self._st_dev
 
-    def _target_value_broken(self) -> tuple[float, float]:
-        match self.mode:
+    def _target_value_broken(self, mode: Mode) -> tuple[float, float]:
+        match mode:
             case Mode.IDLE:
                 return self._value_idle, self._st_dev
             case Mode.RUNNING:
@@ -106,4 +117,17 @@ class PressureSimulationDriverFactory(DriverFactory[float]):
                                           adaption_rate = d["adaption_rate"]
                                           )
 
-        return driver
\ No newline at end of file
+        return driver
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list[Any]]) -> list[SimulationDriver[float]]:
+        sensors = [PressureSensor(i, namespace=n, updates_per_second=u) for i, n, u in
+                   zip(columns["sensor.identifier"], columns["sensor.namespace"], columns["sensor.updates_per_second"],
+                       strict=True)]
+        return [PressureSimulationDriver(sensor=s, start_value=v, random_seed=r, st_dev=d, st_dev_broken=e,
+                                         value_idle=i, value_running=w, value_running_broken=b, adaption_rate=a)
+                for s, v, r, d, e, i, w, b, a in zip(sensors, columns["start_value"], columns["random_seed"],
+                                                     columns["st_dev"], columns["st_dev_broken"],
+                                                     columns["value_idle"], columns["value_running"],
+                                                     columns["value_running_broken"], columns["adaption_rate"],
+                                                     strict=True)]
@@ -0,0 +1,95 @@
+from datetime import datetime
+
+from MyServer.MachineOperation import SensorType
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Sensor.Base import SensorBase, SensorDictBase
+from .replay_driver_data import ReplayDriverData
+from .replay_file import ReplayFile
+from .simulation_driver import SimulationDriver, DriverFactory
+from .simulation_driver_data import SimulationDriverData
+
+
+class ReplaySimulationDriver(SimulationDriver[float]):
+    """Driver replaying a column of a recorded file. Mode and state of the machine are part of the recording."""
+
+    def __init__(self, sensor: SensorBase[float],
+                 replay_file: ReplayFile,
+                 column: str,
+                 speed: float = 1.0,
+                 loop: bool = True):
+        """
+        ctor.
+        :param sensor: Sensor to feed.
+        :param replay_file: File with the recording, may be shared with other drivers.
+        :param column: Column of the file to replay.
+        :param speed: Seconds of the recording replayed per second on the sensor clock.
+        :param loop: Whether to start over at the end of the recording, otherwise the last value is held.
+        """
+        if speed <= 0:
+            raise ValueError(f"Speed must be positive, got {speed}.")
+        super().__init__(sensor, replay_file.value_at(column, 0.0))
+        self.__replay_file = replay_file
+        self.__column = column
+        self.__speed = speed
+        self.__loop = loop
+        self.__replay_start: datetime | None = None  # replay starts with the first measurement
+
+    @property
+    def speed(self) -> float:
+        """Seconds of the recording replayed per second."""
+        return self.__speed
+
+    @property
+    def loop(self) -> bool:
+        """Whether the replay starts over at the end of the recording."""
+        return self.__loop
+
+    def _update_current_value(self) -> tuple[datetime, float]:
+        time_stamp = self.sensor.clock.now()
+        if self.__replay_start is None:
+            self.__replay_start = time_stamp
+        elapsed: float = (time_stamp - self.__replay_start).total_seconds() * self.__speed
+        return time_stamp, self.__replay_file.value_at(self.__column, elapsed, self.__loop)
+
+    def to_driver_data(self) -> SimulationDriverData[float]:
+        sensor_description: SensorDictBase = self.sensor.to_data_object()
+        d: ReplayDriverData = ReplayDriverData(
+            identifier=self.sensor.identifier,
+            namespace=self.sensor.namespace,
+            start_value=self.last_value,
+            random_seed=0,
+            sensor=sensor_description,
+            replay_file=self.__replay_file.file_path,
+            column=self.__column,
+            timestamp_column=self.__replay_file.timestamp_column,
+            speed=self.__speed,
+            loop=self.__loop
+        )
+        return d
+
+
+class ReplaySimulationDriverFactory(DriverFactory[float]):
+
+    @staticmethod
+    def from_dict(d: dict) -> ReplaySimulationDriver:
+        if not "sensor" in d:
+            raise ValueError("Dict is not in the right format.")
+        sensor_data = SensorDictBase(**d.get("sensor"))
+        match sensor_data.sensor_type:
+            case SensorType.TEMPERATURE:
+                sensor = TemperatureSensor(sensor_data.identifier,
+                                           namespace=sensor_data.namespace,
+                                           updates_per_second=sensor_data.updates_per_second)
+            case SensorType.PRESSURE:
+                sensor = PressureSensor(sensor_data.identifier,
+                                        namespace=sensor_data.namespace,
+                                        updates_per_second=sensor_data.updates_per_second)
+            case _:
+                raise NotImplementedError(f"Replay for {sensor_data.sensor_type} is not implemented yet.")
+
+        replay_file = ReplayFile.open(d["replay_file"], d["timestamp_column"])
+        return ReplaySimulationDriver(sensor=sensor,
+                                      replay_file=replay_file,
+                                      column=d["column"],
+                                      speed=d["speed"],
+                                      loop=d["loop"])
@@ -1,6 +1,7 @@
 import random
 import math
 from datetime import datetime
+from typing import Any
 
 from MyServer.Sensor import TemperatureSensor
 from MyServer.MachineOperation import Mode, State
@@ -33,42 +34,52 @@ class TemperatureSimulationDriver(SimulationDriver[float]):
         :param adaption_rate: How fast the system reacts to other states.
         """
         super().__init__(sensor, start_value)
-        self.__random = random.Random(random_seed)
+        self.__random: random.Random | None = None  # seeded on first use, seeding is most of the construction time
         self.__seed = random_seed
         self.__st_dev: float = st_dev
         self._value_idle: float = value_idle
         self._value_running: float = value_running
         self._value_running_broken: float = value_running_broken
         self._adaption_rate = adaption_rate
-        self._last_measurement: datetime = datetime.now()
+        self._last_measurement: datetime = self.last_value_time
 
 
+    @property
+    def adaption_rate(self) -> float:
+        """How fast the system reacts to other states."""
+        return self._adaption_rate
+
+    def target(self, mode: Mode, state: State) -> tuple[float, float]:
+        return self._target_value(mode, state), self.__st_dev
+
     def _update_current_value(self) -> tuple[datetime, float]:
-        target_value = self._target_value()
-        time_delta = (datetime.now() - self.last_value_time).total_seconds()
+        target_value, st_dev = self.target(self.mode, self.state)
+        time_stamp = self.sensor.clock.now()
+        time_delta = max(0.0, (time_stamp - self.last_value_time).total_seconds())
         weight = math.exp(- time_delta / self._adaption_rate)
         adapted_value = weight * self.last_value + (1 - weight) * target_value
-        noisy_value = self.__random.normalvariate(adapted_value, self.__st_dev)
-        time_stamp = datetime.now()
+        if self.__random is None:
+            self.__random = random.Random(self.__seed)
+        noisy_value = self.__random.normalvariate(adapted_value, st_dev)
         return time_stamp, noisy_value
 
-    def _target_value(self) -> float:
-        match self.state:
+    def _target_value(self, mode: Mode, state: State) -> float:
+        match state:
             case State.NORMAL:
-                return self._target_value_healthy()
+                return self._target_value_healthy(mode)
             case State.BROKEN:
-                return self._target_value_broken()
+                return self._target_value_broken(mode)
         return 0
 
-    def _target_value_healthy(self) -> float:
-        match self.mode:
+    def _target_value_healthy(self, mode: Mode) -> float:
+        match mode:
             case Mode.IDLE:
                 return self._value_idle
             case Mode.RUNNING:
                 return self._value_running
 
-    def _target_value_broken(self) -> float:
-        match self.mode:
+    def _target_value_broken(self, mode: Mode) -> float:
+        match mode:
             case Mode.IDLE:
                 return self._value_idle
             case Mode.RUNNING:
@@ -116,3 +127,15 @@ class TemperatureSimulationDriverFactory(DriverFactory[float]):
                                              adaption_rate=d["adaption_rate"],
                                              st_dev=d["st_dev"])
         return driver
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list[Any]]) -> list[TemperatureSimulationDriver]:
+        sensors = [TemperatureSensor(i, namespace=n, updates_per_second=u) for i, n, u in
+                   zip(columns["sensor.identifier"], columns["sensor.namespace"], columns["sensor.updates_per_second"],
+                       strict=True)]
+        return [TemperatureSimulationDriver(sensor=s, start_value=v, random_seed=r, st_dev=d, value_idle=i,
+                                            value_running=w, value_running_broken=b, adaption_rate=a)
+                for s, v, r, d, i, w, b, a in zip(sensors, columns["start_value"], columns["random_seed"],
+                                                  columns["st_dev"], columns["value_idle"], columns["value_running"],
+                                                  columns["value_running_broken"], columns["adaption_rate"],
+                                                  strict=True)]
@@ -0,0 +1,147 @@
+import math
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+
+from MyServer.MachineOperation import Mode, State
+from MyServer.Sensor import WaveformSensor, WaveformSensorDict, WaveformBlock
+from .simulation_driver import DriverFactory, SimulationDriver
+from .waveform_driver_data import WaveformDriverData
+
+
+class WaveformSimulationDriver(SimulationDriver[WaveformBlock]):
+    """
+    Simulator implementation for waveform sensors: a sine at the rotation frequency of the machine, whose amplitude
+    depends on the mode, plus a fault harmonic if the running machine is broken, plus white noise. Every measurement
+    is a block of block_size samples, computed in one vectorized step. The blocks are continuous in phase and time,
+    that is, a block starts where the previous one ended, unless the sensor lagged behind by more than a block.
+    """
+
+    def __init__(self, sensor: WaveformSensor,
+                 start_value: float = 0.0,
+                 random_seed: int = 42,
+                 frequency: float = 50.0,
+                 amplitude_idle: float = 0.1,
+                 amplitude_running: float = 1.0,
+                 fault_frequency: float = 150.0,
+                 fault_amplitude: float = 0.5,
+                 st_dev: float = 0.05):
+        """
+        ctor.
+        :param sensor: Sensor to mutate.
+        :param start_value: Offset of the signal.
+        :param random_seed: Random generator seed for the noise.
+        :param frequency: Frequency of the base oscillation in Hz.
+        :param amplitude_idle: Amplitude of the base oscillation when the machine is idle.
+        :param amplitude_running: Amplitude of the base oscillation when the machine is running.
+        :param fault_frequency: Frequency of the fault oscillation in Hz.
+        :param fault_amplitude: Amplitude of the fault oscillation when the machine is running, but broken.
+        :param st_dev: Standard deviation of the noise.
+        """
+        super().__init__(sensor, WaveformBlock(sensor.clock.now(), sensor.sample_interval,
+                                               np.zeros(0, dtype=np.float32)))
+        self.__offset: float = start_value
+        self.__seed: int = random_seed
+        self.__random: np.random.Generator = np.random.default_rng(random_seed)
+        self.__frequency: float = frequency
+        self.__amplitude_idle: float = amplitude_idle
+        self.__amplitude_running: float = amplitude_running
+        self.__fault_frequency: float = fault_frequency
+        self.__fault_amplitude: float = fault_amplitude
+        self.__st_dev: float = st_dev
+        self.__sample_count: int = 0
+        self.__next_start: datetime | None = None
+        self.__origin: datetime | None = None
+
+    @property
+    def sensor(self) -> WaveformSensor:
+        return super().sensor
+
+    def amplitudes(self, mode: Mode, state: State) -> tuple[float, float]:
+        """
+        Amplitudes of the base and the fault oscillation in the given mode and state.
+        :param mode: Mode of the machine.
+        :param state: State of the machine.
+        """
+        if mode != Mode.RUNNING:
+            return self.__amplitude_idle, 0.0
+        if state == State.BROKEN:
+            return self.__amplitude_running, self.__fault_amplitude
+        return self.__amplitude_running, 0.0
+
+    def _update_current_value(self) -> tuple[datetime, WaveformBlock]:
+        size: int = self.sensor.block_size
+        interval: float = self.sensor.sample_interval
+        duration: timedelta = timedelta(seconds=size * interval)
+        now: datetime = self.sensor.clock.now()
+        start: datetime | None = self.__next_start
+        if start is None or now - start > 2 * duration:  # first block, or lagging behind by more than a block
+            start = now - duration
+            if self.__origin is None:
+                self.__origin = start
+            # the phase follows the time skipped, as if the blocks in between had been measured
+            self.__sample_count = round((start - self.__origin).total_seconds() / interval)
+        times: np.ndarray = (self.__sample_count + np.arange(size)) * interval
+        amplitude, fault_amplitude = self.amplitudes(self.mode, self.state)
+        samples: np.ndarray = self.__offset + amplitude * np.sin(2 * math.pi * self.__frequency * times)
+        if fault_amplitude != 0.0:
+            samples += fault_amplitude * np.sin(2 * math.pi * self.__fault_frequency * times)
+        samples += self.__random.normal(0.0, self.__st_dev, size)
+        self.__sample_count += size
+        self.__next_start = start + duration
+        return now, WaveformBlock(start, interval, samples.astype(np.float32))
+
+    def to_driver_data(self) -> WaveformDriverData:
+        sensor_description: WaveformSensorDict = self.sensor.to_data_object()
+        d: WaveformDriverData = WaveformDriverData(
+            identifier=self.sensor.identifier,
+            namespace=self.sensor.namespace,
+            start_value=self.__offset,
+            random_seed=self.__seed,
+            frequency=self.__frequency,
+            amplitude_idle=self.__amplitude_idle,
+            amplitude_running=self.__amplitude_running,
+            fault_frequency=self.__fault_frequency,
+            fault_amplitude=self.__fault_amplitude,
+            st_dev=self.__st_dev,
+            sensor=sensor_description
+        )
+        return d
+
+
+class WaveformSimulationDriverFactory(DriverFactory[WaveformBlock]):
+
+    @staticmethod
+    def from_dict(d: dict) -> WaveformSimulationDriver:
+        if not "sensor" in d:
+            raise ValueError("Dict is not in the right format.")
+        sensor_data = WaveformSensorDict(**d.get("sensor"))
+
+        sensor = WaveformSensor(sensor_data.identifier,
+                                namespace=sensor_data.namespace,
+                                sample_rate=sensor_data.updates_per_second * sensor_data.block_size,
+                                block_size=sensor_data.block_size)
+
+        driver = WaveformSimulationDriver(sensor=sensor,
+                                          start_value=d["start_value"],
+                                          random_seed=d["random_seed"],
+                                          frequency=d["frequency"],
+                                          amplitude_idle=d["amplitude_idle"],
+                                          amplitude_running=d["amplitude_running"],
+                                          fault_frequency=d["fault_frequency"],
+                                          fault_amplitude=d["fault_amplitude"],
+                                          st_dev=d["st_dev"])
+        return driver
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list[Any]]) -> list[WaveformSimulationDriver]:
+        sensors = [WaveformSensor(i, namespace=n, sample_rate=u * b, block_size=b) for i, n, u, b in
+                   zip(columns["sensor.identifier"], columns["sensor.namespace"], columns["sensor.updates_per_second"],
+                       columns["sensor.block_size"], strict=True)]
+        return [WaveformSimulationDriver(sensor=s, start_value=v, random_seed=r, frequency=f, amplitude_idle=i,
+                                         amplitude_running=w, fault_frequency=ff, fault_amplitude=fa, st_dev=d)
+                for s, v, r, f, i, w, ff, fa, d in zip(sensors, columns["start_value"], columns["random_seed"],
+                                                       columns["frequency"], columns["amplitude_idle"],
+                                                       columns["amplitude_running"], columns["fault_frequency"],
+                                                       columns["fault_amplitude"], columns["st_dev"], strict=True)]
@@ -0,0 +1,12 @@
+import dataclasses
+from .simulation_driver_data import SimulationDriverData
+
+
+@dataclasses.dataclass(frozen=True)
+class WaveformDriverData(SimulationDriverData[float]):
+    frequency: float
+    amplitude_idle: float
+    amplitude_running: float
+    fault_frequency: float
+    fault_amplitude: float
+    st_dev: float
\ No newline at end of file
@@ -0,0 +1,4 @@
+from .supervised_machine_model import SupervisedMachineModel
+from .endpoint_supervisor import EndpointSupervisor
+
+__all__ = ["SupervisedMachineModel", "EndpointSupervisor"]
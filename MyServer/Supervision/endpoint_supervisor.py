@@ -0,0 +1,208 @@
+import asyncio
+import dataclasses
+import inspect
+import logging
+import os
+from collections.abc import Callable
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+from MyServer.Dataset import ScenarioAction
+from MyServer.MachineOperation import Mode
+from MyServer.OpcUa import ServerConfiguration, expanded_node_id
+from MyServer.opc_ua_server import OPC_TCP, IP_ADDRESS, OPC_UA_PORT, COMPANY, DEVICE, SENSOR_URI, SERVER_ENDPOINT, \
+    CONFIGURATION_FILE
+from MyServer.Sensor.Base import SensorBase
+from MyServer.Timing import ScaledClock, spawn_workers
+from .endpoint_worker import run_endpoint, ACTION, STOP
+from .supervised_machine_model import SupervisedMachineModel
+
+SETUP_TIMEOUT: float = 60.0
+"""Seconds a worker may take to import, build its drivers and start its server."""
+STOP_TIMEOUT: float = 10.0
+
+
+class EndpointSupervisor:
+    """
+    Control plane for several OPC UA endpoints. Sensors are assigned to endpoints by their namespace, every endpoint
+    runs its own server and drivers in a worker process on its own port, which spreads the client sessions and
+    subscriptions across cores. The supervisor keeps the configuration and forwards job and state changes to the
+    workers. It offers the interface of OpcUaTestServer used by the HTTP API.
+    """
+
+    def __init__(self,
+                 namespace_ports: dict[str, int],
+                 server_endpoint: str = SERVER_ENDPOINT,
+                 server_configuration: ServerConfiguration | None = None,
+                 machine_model_file: str = CONFIGURATION_FILE,
+                 clock: ScaledClock | None = None):
+        """
+        ctor.
+        :param namespace_ports: Port of the endpoint serving each namespace. Namespaces may share a port, sensors in
+        other namespaces are served on the port of the server configuration.
+        :param server_endpoint: Definition for the server endpoints.
+        :param server_configuration: Configuration shared by the endpoints, apart from the port.
+        :param machine_model_file: File to restore the configuration of the machine model from.
+        :param clock: Clock handed to the workers at setup. If None, a real time clock is used.
+        """
+        if server_configuration is None:
+            server_configuration = ServerConfiguration(
+                company=COMPANY,
+                ip_address=IP_ADDRESS,
+                device_name=DEVICE,
+                port=OPC_UA_PORT,
+                fields=[SENSOR_URI]
+            )
+        self._configuration: ServerConfiguration = server_configuration
+        self._namespace_ports: dict[str, int] = dict(namespace_ports)
+        self._server_endpoint: str = server_endpoint
+        self._clock: ScaledClock = clock if clock is not None else ScaledClock()
+        self._model: SupervisedMachineModel = SupervisedMachineModel(self._broadcast)
+        self._workers: dict[int, tuple[BaseProcess, Connection]] = {}
+        self._set_up: bool = False
+        if os.path.isfile(machine_model_file):
+            self._model.restore_configuration(machine_model_file)
+
+    @property
+    def model(self) -> SupervisedMachineModel:
+        return self._model
+
+    @property
+    def clock(self) -> ScaledClock:
+        """Get the clock handed to the workers. Speed changes after setup do not reach them."""
+        return self._clock
+
+    @property
+    def configuration(self) -> ServerConfiguration:
+        """Get the configuration shared by the endpoints."""
+        return self._configuration
+
+    @property
+    def end_points(self) -> dict[int, str]:
+        """Get the end point of every running worker by port."""
+        return {port: self.end_point_of(port) for port in self._workers}
+
+    def end_point_of(self, port: int) -> str:
+        """Get the end point served on a port."""
+        return OPC_TCP + "://" + IP_ADDRESS + ":" + str(port) + "/" + self._server_endpoint + "/"
+
+    def port_of(self, namespace: str) -> int:
+        """Get the port of the endpoint serving a namespace."""
+        return self._namespace_ports.get(namespace, self._configuration.port)
+
+    def node_id(self, sensor: SensorBase, field: str | None = None) -> str | None:
+        """Get the stable node ID of a sensor or one of its fields on the endpoint serving it, see expanded_node_id."""
+        return expanded_node_id(self._configuration, sensor.sensor_type, sensor.identifier, sensor.namespace, field)
+
+    def alive_status(self) -> bool:
+        """Return whether all workers are running."""
+        return self._set_up and bool(self._workers) and all(p.is_alive() for p, _ in self._workers.values())
+
+    @property
+    def is_initialized(self) -> bool:
+        """Returns whether the system is initialized."""
+        return self._set_up
+
+    @property
+    def is_job_running(self) -> bool:
+        """Returns whether a job is running."""
+        return self._model.mode == Mode.RUNNING
+
+    async def execute(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a function and return its result. The supervisor lives on the loop of its callers."""
+        result = fn(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def setup_server(self) -> bool:
+        """
+        Start one worker per port with the sensors of its namespaces.
+        :returns: Whether all workers started.
+        """
+        if self._set_up:
+            logging.warning("Tried to setup the endpoints, but already set up.")
+            return False
+
+        by_port: dict[int, list[dict[str, Any]]] = {}
+        namespaces: dict[int, str] = {}
+        for driver in self._model.mutators:
+            port: int = self.port_of(driver.sensor.namespace)
+            by_port.setdefault(port, []).append(driver.to_driver_data().as_dict())
+            namespaces.setdefault(port, driver.sensor.namespace)
+
+        context, clock = spawn_workers(self._clock)
+        for port, entries in by_port.items():
+            connection, child_connection = context.Pipe()
+            configuration = dataclasses.replace(self._configuration, port=port, fields=list(self._configuration.fields),
+                                                sensors=namespaces[port])
+            process = context.Process(target=run_endpoint,
+                                      args=(child_connection, configuration, self._server_endpoint, entries,
+                                            self._model.mode, self._model.state, clock),
+                                      name=f"opc-ua-endpoint-{port}",
+                                      daemon=True)
+            process.start()
+            child_connection.close()
+            self._workers[port] = process, connection
+            logging.info("Started endpoint on port %s with %s sensors.", port, len(entries))
+
+        results = await asyncio.gather(*(self._wait_for_setup(port) for port in self._workers))
+        if not all(results):
+            logging.error("Not all endpoints started, stopping.")
+            await self.stop()
+            return False
+        self._set_up = True
+        logging.info("All %s endpoints set up.", len(self._workers))
+        return True
+
+    async def _wait_for_setup(self, port: int) -> bool:
+        _, connection = self._workers[port]
+        ready: bool = await asyncio.to_thread(connection.poll, SETUP_TIMEOUT)
+        if not ready:
+            logging.error("Endpoint on port %s did not start in time.", port)
+            return False
+        try:
+            return bool(connection.recv())
+        except EOFError:
+            logging.error("Endpoint on port %s exited during setup.", port)
+            return False
+
+    def _broadcast(self, action: ScenarioAction):
+        for port, (_, connection) in self._workers.items():
+            try:
+                connection.send((ACTION, action.value))
+            except (BrokenPipeError, OSError) as e:
+                logging.error("Endpoint on port %s unreachable: %r", port, e)
+
+    async def start(self):
+        if not self._set_up:
+            logging.info("Starting endpoints")
+            return await self.setup_server()
+        logging.warning("Endpoints already started.")
+        return False
+
+    async def stop(self):
+        logging.info("Stopping endpoints")
+        for port, (process, connection) in self._workers.items():
+            try:
+                connection.send((STOP, None))
+            except (BrokenPipeError, OSError):
+                pass  # already gone
+        for port, (process, connection) in self._workers.items():
+            await asyncio.to_thread(process.join, STOP_TIMEOUT)
+            if process.is_alive():
+                logging.warning("Endpoint on port %s did not stop in time, terminating.", port)
+                process.terminate()
+            connection.close()
+        self._workers = {}
+        self._set_up = False
+        logging.info("Endpoints stopped.")
+
+    async def start_job(self):
+        logging.info("Start job called in endpoint supervisor.")
+        self._model.start_job()
+
+    async def stop_job(self):
+        logging.info("Stopping job called in endpoint supervisor.")
+        self._model.stop_job()
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import signal
+from multiprocessing.connection import Connection
+from typing import Any
+
+from MyServer.Dataset import ScenarioAction
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import Mode, State
+from MyServer.OpcUa import ServerConfiguration
+from MyServer.opc_ua_server import OpcUaTestServer
+from MyServer.Timing import ScaledClock, WorkerClock
+
+ACTION: str = "action"
+"""Command applying a ScenarioAction to the model of the worker."""
+STOP: str = "stop"
+"""Command stopping the worker."""
+
+
+def run_endpoint(connection: Connection,
+                 configuration: ServerConfiguration,
+                 server_endpoint: str,
+                 entries: list[dict[str, Any]],
+                 mode: Mode,
+                 state: State,
+                 clock: WorkerClock):
+    """
+    Entry point of an endpoint worker process. Serves the given sensors on an OPC UA server of its own and applies
+    the commands received through the connection until stopped.
+    :param connection: Command channel to the supervisor. Receives (command, argument) tuples, sends the setup result.
+    :param configuration: Configuration of the OPC UA server of this worker.
+    :param server_endpoint: Definition for the server endpoint.
+    :param entries: Serialized drivers, as written by save_configuration.
+    :param mode: Mode of the machine at the start.
+    :param state: State of the machine at the start.
+    :param clock: Clock of the supervisor to continue.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C reaches the whole process group, the supervisor stops us
+    asyncio.run(_serve(connection, configuration, server_endpoint, entries, mode, state, clock.resume()))
+
+
+async def _serve(connection: Connection, configuration: ServerConfiguration, server_endpoint: str,
+                 entries: list[dict[str, Any]], mode: Mode, state: State, clock: ScaledClock):
+    model: MachineModel = MachineModel()
+    for entry in entries:
+        driver = model.create_driver(entry)
+        model.add_sensor(driver.sensor, driver)
+    model.mode = mode
+    model.state = state
+    server = OpcUaTestServer(machine=model, server_endpoint=server_endpoint, server_configuration=configuration,
+                             machine_model_file="", clock=clock)
+    try:
+        result: bool = await server.setup_server()
+    except Exception as e:
+        logging.error("Endpoint on port %s failed to start: %r", configuration.port, e)
+        result = False
+    connection.send(result)
+    if not result:
+        return
+
+    logging.info("Endpoint on port %s serving %s sensors.", configuration.port, len(entries))
+    while True:
+        try:
+            command, argument = await asyncio.to_thread(connection.recv)
+        except EOFError:
+            logging.warning("Supervisor of the endpoint on port %s is gone.", configuration.port)
+            break
+        if command == STOP:
+            break
+        if command == ACTION:
+            getattr(model, ScenarioAction(argument).value)()
+        else:
+            logging.warning("Unknown command %s.", command)
+    await server.stop()
@@ -0,0 +1,35 @@
+from collections.abc import Callable
+
+from MyServer.Dataset import ScenarioAction
+from MyServer.Lifetime import MachineModel
+
+
+class SupervisedMachineModel(MachineModel):
+    """
+    Machine model of a supervisor. Holds the configuration of all sensors and forwards every job and state change to
+    the endpoint workers, which run the drivers.
+    """
+
+    def __init__(self, broadcast: Callable[[ScenarioAction], None]):
+        """
+        ctor.
+        :param broadcast: Called with every job or state change after it was applied to this model.
+        """
+        super().__init__()
+        self.__broadcast = broadcast
+
+    def start_job(self):
+        super().start_job()
+        self.__broadcast(ScenarioAction.START_JOB)
+
+    def stop_job(self):
+        super().stop_job()
+        self.__broadcast(ScenarioAction.STOP_JOB)
+
+    def set_state_broken(self):
+        super().set_state_broken()
+        self.__broadcast(ScenarioAction.SET_STATE_BROKEN)
+
+    def set_state_normal(self):
+        super().set_state_normal()
+        self.__broadcast(ScenarioAction.SET_STATE_NORMAL)
@@ -0,0 +1,7 @@
+from .clock import Clock
+from .system_clock import SystemClock, SYSTEM_CLOCK
+from .scaled_clock import ScaledClock
+from .manual_clock import ManualClock
+from .worker_clock import WorkerClock, spawn_workers
+
+__all__ = ["Clock", "SystemClock", "SYSTEM_CLOCK", "ScaledClock", "ManualClock", "WorkerClock", "spawn_workers"]
@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+
+class Clock(ABC):
+    """Source of time for sensors, drivers and the server."""
+
+    @abstractmethod
+    def now(self) -> datetime:
+        """Get the current time."""
+        pass
+
+    @abstractmethod
+    async def sleep(self, seconds: float):
+        """
+        Suspend the calling task.
+        :param seconds: Time to sleep, measured on this clock.
+        """
+        pass
+
+    @property
+    def speed(self) -> float:
+        """How many seconds on this clock pass per second of real time."""
+        return 1.0
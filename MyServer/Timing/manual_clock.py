@@ -0,0 +1,80 @@
+import asyncio
+import heapq
+import itertools
+import time
+import weakref
+from datetime import datetime, timedelta
+
+from .clock import Clock
+
+
+class ManualClock(Clock):
+    """
+    Clock which only moves when advanced, for tests. Sleeping tasks are woken in order of their deadlines, and each
+    step waits until the woken tasks are sleeping again, so a test sees every sample without waiting in real time.
+    """
+    __sleepers: list[tuple[datetime, int, asyncio.Future, asyncio.Task | None]]
+
+    def __init__(self, start: datetime | None = None, settle_timeout: float = 1.0):
+        """
+        ctor.
+        :param start: Initial time. If None, the current time is used.
+        :param settle_timeout: Real time in seconds to wait for tasks to go back to sleep after being woken.
+        """
+        self.__now: datetime = start if start is not None else datetime.now()
+        self.__sleepers = []
+        self.__counter = itertools.count()
+        self.__participants: weakref.WeakSet[asyncio.Task] = weakref.WeakSet()
+        self.__settle_timeout: float = settle_timeout
+
+    def now(self) -> datetime:
+        self.__track()
+        return self.__now
+
+    async def sleep(self, seconds: float):
+        task = self.__track()
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.__sleepers,
+                       (self.__now + timedelta(seconds=seconds), next(self.__counter), future, task))
+        await future
+
+    async def advance(self, seconds: float):
+        """
+        Move the clock forward.
+        :param seconds: Time to move forward.
+        """
+        target: datetime = self.__now + timedelta(seconds=seconds)
+        await self.settle()
+        while self.__sleepers and self.__sleepers[0][0] <= target:
+            deadline = self.__sleepers[0][0]
+            self.__now = max(self.__now, deadline)
+            while self.__sleepers and self.__sleepers[0][0] <= deadline:
+                _, _, future, _ = heapq.heappop(self.__sleepers)
+                if not future.done():
+                    future.set_result(None)
+            await self.settle()
+        self.__now = max(self.__now, target)
+
+    async def settle(self):
+        """Wait until every task that uses the clock is either sleeping on it or finished."""
+        current = asyncio.current_task()
+        deadline: float = time.monotonic() + self.__settle_timeout
+        for _ in range(3):
+            await asyncio.sleep(0)
+        while time.monotonic() < deadline:
+            sleeping = {task for _, _, future, task in self.__sleepers if not future.done()}
+            if all(task.done() or task is current or task in sleeping for task in self.__participants):
+                return
+            await asyncio.sleep(0.0005)
+
+    def __track(self) -> asyncio.Task | None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:  # called outside the event loop, for example from a callback thread
+            return None
+        if task is not None:
+            self.__participants.add(task)
+        return task
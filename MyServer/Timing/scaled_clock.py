@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from .clock import Clock
+
+
+class ScaledClock(Clock):
+    """Clock running at a multiple of real time. The speed can be changed at runtime."""
+
+    def __init__(self, speed: float = 1.0, start: datetime | None = None, epoch: float | None = None):
+        """
+        ctor.
+        :param speed: Seconds on this clock per second of real time.
+        :param start: Time of the clock at creation, or at epoch if given. If None, the current time is used.
+        :param epoch: Wall time (time.time()) at which the clock showed start, for example taken by a parent process
+        before starting a worker. The clock continues from there instead of from its creation. None for the creation.
+        """
+        if speed <= 0:
+            raise ValueError(f"Speed must be positive, got {speed}.")
+        self.__speed: float = speed
+        self.__anchor_time: datetime = start if start is not None else datetime.now()
+        if epoch is not None:
+            self.__anchor_time += timedelta(seconds=(time.time() - epoch) * speed)
+        self.__anchor_monotonic: float = time.monotonic()
+
+    def now(self) -> datetime:
+        elapsed: float = (time.monotonic() - self.__anchor_monotonic) * self.__speed
+        return self.__anchor_time + timedelta(seconds=elapsed)
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds / self.__speed)
+
+    @property
+    def speed(self) -> float:
+        return self.__speed
+
+    @speed.setter
+    def speed(self, value: float):
+        """Change the speed. The time continues from its current value, it does not jump."""
+        if value <= 0:
+            raise ValueError(f"Speed must be positive, got {value}.")
+        logging.info(f"Setting clock speed to {value}.")
+        self.__anchor_time = self.now()
+        self.__anchor_monotonic = time.monotonic()
+        self.__speed = value
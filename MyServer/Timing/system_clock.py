@@ -0,0 +1,18 @@
+import asyncio
+from datetime import datetime
+
+from .clock import Clock
+
+
+class SystemClock(Clock):
+    """Real time clock."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+SYSTEM_CLOCK: SystemClock = SystemClock()
+"""Shared real time clock, the default for sensors."""
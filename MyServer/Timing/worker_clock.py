@@ -0,0 +1,33 @@
+import dataclasses
+import multiprocessing
+import time
+from datetime import datetime
+from multiprocessing.context import SpawnContext
+
+from .clock import Clock
+from .scaled_clock import ScaledClock
+
+
+@dataclasses.dataclass(frozen=True)
+class WorkerClock:
+    """Clock handed to a worker process, the worker continues it instead of starting its own at import time."""
+    start: datetime
+    """Time of the parent clock when the workers were started."""
+    epoch: float
+    """Wall time (time.time()) of start."""
+    speed: float
+    """Speed of the parent clock. Changes after the start do not reach the workers."""
+
+    def resume(self) -> ScaledClock:
+        """Continue the clock in the worker, its startup time does not shift the time stamps."""
+        return ScaledClock(self.speed, self.start, self.epoch)
+
+
+def spawn_workers(clock: Clock) -> tuple[SpawnContext, WorkerClock]:
+    """
+    Prepare starting worker processes which continue the given clock.
+    :param clock: Clock of the parent process.
+    :return: Context to start the processes with and the clock to pass to them.
+    """
+    # spawn, a forked child would inherit the event loop and the threads of the parent
+    return multiprocessing.get_context("spawn"), WorkerClock(clock.now(), time.time(), clock.speed)
@@ -0,0 +1,4 @@
+from .upstream_session import UpstreamSession
+from .upstream_driver import UpstreamDriver, UpstreamDriverFactory
+
+__all__ = ["UpstreamSession", "UpstreamDriver", "UpstreamDriverFactory"]
\ No newline at end of file
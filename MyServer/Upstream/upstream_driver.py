@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import Any
+
+from MyServer.MachineOperation import Mode, State, SensorType, StateCell
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Sensor.Base import DriverBase, SensorBase, SensorDictBase
+from MyServer.Simulation import DriverFactory
+from .upstream_driver_data import UpstreamDriverData
+from .upstream_session import UpstreamSession
+
+
+class UpstreamDriver(DriverBase[float]):
+    """
+    Driver re-publishing a variable of an upstream OPC UA server. The sensor is not polled, the session of the upstream
+    hands it the data changes of the variable. The session has to be started, see OpcUaTestServer.
+    """
+
+    def __init__(self, sensor: SensorBase[float], session: UpstreamSession, node_id: str):
+        """
+        ctor.
+        :param sensor: Sensor to feed.
+        :param session: Session to the upstream, may be shared with other drivers.
+        :param node_id: Node ID of the variable, see UpstreamSession.add.
+        """
+        self.__sensor = sensor
+        self.__session = session
+        self.__node_id = node_id
+        self.__last_value: float = 0.0
+        self.__value_time: datetime = sensor.clock.now()
+        self.cell: StateCell = StateCell()
+        """Mode and state of the machine. The upstream measures the real machine, only kept for the model."""
+        self.__own_cell: StateCell | None = self.cell
+        sensor.add_callback(self.__on_new_data)
+        sensor.driver_dict_callback = self.to_driver_data
+        session.add(node_id, sensor)
+
+    async def __on_new_data(self, ts: datetime, v: float):
+        self.__value_time, self.__last_value = ts, v
+
+    @property
+    def mode(self) -> Mode:
+        """Mode of the machine, see cell."""
+        return self.cell.mode
+
+    @mode.setter
+    def mode(self, mode: Mode):
+        """Set the mode of this driver alone, see StateCell.own."""
+        self.cell = self.__own_cell = StateCell.own(self.cell, self.__own_cell)
+        self.cell.mode = mode
+
+    @property
+    def state(self) -> State:
+        """State of the machine, see cell."""
+        return self.cell.state
+
+    @state.setter
+    def state(self, state: State):
+        """Set the state of this driver alone, see StateCell.own."""
+        self.cell = self.__own_cell = StateCell.own(self.cell, self.__own_cell)
+        self.cell.state = state
+
+    @property
+    def sensor(self) -> SensorBase[float]:
+        """Get the sensor assigned to the driver."""
+        return self.__sensor
+
+    @property
+    def session(self) -> UpstreamSession:
+        """Session to the upstream."""
+        return self.__session
+
+    @property
+    def node_id(self) -> str:
+        """Node ID of the variable."""
+        return self.__node_id
+
+    def last_value(self) -> float:
+        return self.__last_value
+
+    @property
+    def last_value_time(self) -> datetime:
+        """Get the time of the last data change."""
+        return self.__value_time
+
+    def do_dict(self) -> dict[str, Any]:
+        return self.to_driver_data().as_dict()
+
+    def to_driver_data(self) -> UpstreamDriverData:
+        return UpstreamDriverData(
+            sensor=self.__sensor.to_data_object(),
+            identifier=self.__sensor.identifier,
+            namespace=self.__sensor.namespace,
+            url=self.__session.url,
+            node_id=self.__node_id
+        )
+
+
+class UpstreamDriverFactory(DriverFactory[float]):
+
+    @staticmethod
+    def from_dict(d: dict) -> UpstreamDriver:
+        if not "sensor" in d:
+            raise ValueError("Dict is not in the right format.")
+        sensor_data = SensorDictBase(**d.get("sensor"))
+        match sensor_data.sensor_type:
+            case SensorType.TEMPERATURE:
+                sensor = TemperatureSensor(sensor_data.identifier,
+                                           namespace=sensor_data.namespace,
+                                           updates_per_second=sensor_data.updates_per_second)
+            case SensorType.PRESSURE:
+                sensor = PressureSensor(sensor_data.identifier,
+                                        namespace=sensor_data.namespace,
+                                        updates_per_second=sensor_data.updates_per_second)
+            case _:
+                raise NotImplementedError(f"Upstream for {sensor_data.sensor_type} is not implemented yet.")
+
+        return UpstreamDriver(sensor=sensor, session=UpstreamSession.open(d["url"]), node_id=d["node_id"])
@@ -0,0 +1,15 @@
+import dataclasses
+
+from MyServer.Sensor.Base import SensorDictBase
+
+
+@dataclasses.dataclass(frozen=True)
+class UpstreamDriverData:
+    sensor: SensorDictBase
+    identifier: int
+    namespace: str
+    url: str
+    node_id: str
+
+    def as_dict(self):
+        return dataclasses.asdict(self)
\ No newline at end of file
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from asyncua import Client, ua
+from asyncua.common.subscription import DataChangeEvent, Subscription
+
+from MyServer.Sensor.Base import SensorBase
+
+PUBLISHING_INTERVAL: float = 0.1
+"""Seconds between two notification messages of a subscription."""
+ITEMS_PER_SUBSCRIPTION: int = 1000
+"""Monitored items per subscription."""
+RECONNECT_DELAY: float = 1.0
+"""Seconds to wait before connecting again after the connection failed or was lost."""
+
+
+class UpstreamSession:
+    """
+    Client session to an upstream OPC UA server, feeding local sensors with the values of remote variables. The
+    variables are monitored in a few large subscriptions, and the notifications received since the last wake-up are
+    handed to the sensors in one batch. If the connection fails or is lost, the session connects again and subscribes
+    anew, resolving the namespace URIs of the node IDs again, as the upstream may have restarted.
+    """
+    __sessions: dict[str, "UpstreamSession"] = {}
+
+    def __init__(self,
+                 url: str,
+                 publishing_interval: float = PUBLISHING_INTERVAL,
+                 items_per_subscription: int = ITEMS_PER_SUBSCRIPTION,
+                 reconnect_delay: float = RECONNECT_DELAY,
+                 timeout: float = 4.0):
+        """
+        ctor.
+        :param url: Endpoint of the upstream server, for example "opc.tcp://plc1:4840/freeopcua/server/".
+        :param publishing_interval: Seconds between two notification messages of a subscription.
+        :param items_per_subscription: Largest number of monitored items per subscription.
+        :param reconnect_delay: Seconds to wait before connecting again.
+        :param timeout: Seconds to wait for a response of the upstream.
+        """
+        if items_per_subscription < 1:
+            raise ValueError(f"At least one item per subscription is required, got {items_per_subscription}.")
+        self.__url = url
+        self.__publishing_interval = publishing_interval
+        self.__items_per_subscription = items_per_subscription
+        self.__reconnect_delay = reconnect_delay
+        self.__timeout = timeout
+        self.__sensors: dict[str, list[SensorBase]] = {}
+        self.__task: asyncio.Task | None = None
+        self.__connected: asyncio.Event = asyncio.Event()
+        self.__batch: list[tuple[SensorBase, datetime, float]] = []
+        self.__batch_ready: asyncio.Event = asyncio.Event()
+        self.__connects: int = 0
+        self.__notifications: int = 0
+
+    @staticmethod
+    def open(url: str) -> "UpstreamSession":
+        """Get the session to an upstream, reusing it if it exists already."""
+        session = UpstreamSession.__sessions.get(url)
+        if session is None:
+            session = UpstreamSession(url)
+            UpstreamSession.__sessions[url] = session
+        return session
+
+    @staticmethod
+    async def close_all():
+        """Stop the sessions opened with open and forget them, for example when the server stops."""
+        sessions = list(UpstreamSession.__sessions.values())
+        UpstreamSession.__sessions.clear()
+        for session in sessions:
+            await session.stop()
+
+    @property
+    def url(self) -> str:
+        """Endpoint of the upstream server."""
+        return self.__url
+
+    @property
+    def running(self) -> bool:
+        """Whether the session is started and keeps connecting."""
+        return self.__task is not None and not self.__task.done()
+
+    @property
+    def connected(self) -> bool:
+        """Whether the session is connected and subscribed."""
+        return self.__connected.is_set()
+
+    @property
+    def connects(self) -> int:
+        """Number of successful connects, more than one after reconnects."""
+        return self.__connects
+
+    @property
+    def notifications(self) -> int:
+        """Number of data changes received."""
+        return self.__notifications
+
+    def add(self, node_id: str, sensor: SensorBase):
+        """
+        Feed a sensor with a remote variable. Subscribed with the next connect if the session is running already.
+        :param node_id: Node ID of the variable, the namespace preferably given by URI, for example
+        "nsu=urn:TestCompany.com:opcua:Sensors;i=100000421".
+        :param sensor: The sensor.
+        """
+        self.__sensors.setdefault(node_id, []).append(sensor)
+
+    def remove(self, sensor: SensorBase):
+        """Stop feeding a sensor."""
+        for node_id, sensors in list(self.__sensors.items()):
+            if sensor in sensors:
+                sensors.remove(sensor)
+            if not sensors:
+                del self.__sensors[node_id]
+
+    def start(self):
+        """Connect in the background, and keep connecting until stopped."""
+        if self.__task is not None:
+            logging.warning("Session to %s already started.", self.__url)
+            return
+        # new events on the running loop, the session may have run on another one before, for example a stopped server
+        self.__connected = asyncio.Event()
+        self.__batch_ready = asyncio.Event()
+        self.__batch = []
+        self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        """Disconnect."""
+        if self.__task is None:
+            return
+        self.__task.cancel()
+        try:
+            await self.__task
+        except asyncio.CancelledError:
+            pass
+        self.__task = None
+
+    async def wait_connected(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until the session is connected and subscribed.
+        :param timeout: Seconds to wait at most.
+        :return: Whether the session is connected.
+        """
+        try:
+            await asyncio.wait_for(self.__connected.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    async def __run(self):
+        fan_in = asyncio.create_task(self.__fan_in())
+        try:
+            while True:
+                await self.__session()
+                await asyncio.sleep(self.__reconnect_delay)
+        finally:
+            fan_in.cancel()
+
+    async def __session(self):
+        """Connect, subscribe and consume the notifications until the connection is lost."""
+        client = Client(self.__url, timeout=self.__timeout, watchdog_intervall=self.__reconnect_delay)
+        lost = asyncio.Event()
+
+        async def on_lost(e: Exception):
+            logging.warning("Connection to %s lost: %r", self.__url, e)
+            lost.set()
+
+        client.connection_lost_callback = on_lost
+        consumers: list[asyncio.Task] = []
+        try:
+            await client.connect()
+            for subscription, nodes in await self.__subscribe(client):
+                consumers.append(asyncio.create_task(self.__consume(subscription, nodes)))
+            self.__connects += 1
+            self.__connected.set()
+            logging.info("Subscribed %s variables of %s in %s subscriptions.", len(self.__sensors), self.__url,
+                         len(consumers))
+            await lost.wait()
+        except (OSError, TimeoutError, ua.UaError) as e:
+            logging.warning("Session to %s failed: %r", self.__url, e)
+        except Exception as e:  # for example an unknown namespace URI, the session keeps trying, cancelling ends it
+            logging.error("Session to %s failed unexpectedly: %r", self.__url, e)
+        finally:
+            self.__connected.clear()
+            for consumer in consumers:
+                consumer.cancel()
+            try:
+                await client.disconnect()
+            except Exception as e:  # the connection is gone already, nothing left to clean up
+                logging.debug("Disconnecting from %s failed: %r", self.__url, e)
+
+    async def __subscribe(self, client: Client) -> list[tuple[Subscription, dict[ua.NodeId, list[SensorBase]]]]:
+        """Create the subscriptions, each monitoring up to items_per_subscription variables."""
+        indices: dict[str, int] = {}
+        nodes: dict[ua.NodeId, list[SensorBase]] = {}
+        for node_id, sensors in self.__sensors.items():
+            parsed: ua.NodeId = ua.NodeId.from_string(node_id)
+            uri: str | None = getattr(parsed, "NamespaceUri", None)  # only expanded node IDs have one
+            if uri:
+                if uri not in indices:
+                    indices[uri] = await client.get_namespace_index(uri)
+                parsed = ua.NodeId(parsed.Identifier, indices[uri], parsed.NodeIdType)
+            nodes[parsed] = sensors
+        result: list[tuple[Subscription, dict[ua.NodeId, list[SensorBase]]]] = []
+        ordered = list(nodes)
+        size: int = self.__items_per_subscription
+        for start in range(0, len(ordered), size):
+            chunk = ordered[start:start + size]
+            # iterator mode, the notifications are queued instead of dispatched as one task each
+            subscription = await client.create_subscription(self.__publishing_interval * 1000, None,
+                                                            queue_maxsize=4 * len(chunk))
+            await subscription.subscribe_data_change([client.get_node(x) for x in chunk])
+            result.append((subscription, {x: nodes[x] for x in chunk}))
+        return result
+
+    async def __consume(self, subscription: Subscription, nodes: dict[ua.NodeId, list[SensorBase]]):
+        """Move the notifications of a subscription to the batch."""
+        async for event in subscription:
+            if not isinstance(event, DataChangeEvent) or event.value is None:
+                continue
+            data_value: ua.DataValue = event.data.monitored_item.Value
+            time_stamp: datetime = data_value.SourceTimestamp or data_value.ServerTimestamp \
+                or datetime.now(timezone.utc)
+            for sensor in nodes.get(event.node.nodeid, []):
+                self.__batch.append((sensor, time_stamp, event.value))
+            self.__notifications += 1
+            self.__batch_ready.set()
+
+    async def __fan_in(self):
+        """Hand the batch to the sensors, all notifications received since the last wake-up at once."""
+        while True:
+            await self.__batch_ready.wait()
+            self.__batch_ready.clear()
+            batch, self.__batch = self.__batch, []
+            results = await asyncio.gather(*(sensor.on_new_data(ts, v) for sensor, ts, v in batch),
+                                           return_exceptions=True)
+            for error in (x for x in results if isinstance(x, Exception)):
+                logging.error("Feeding a sensor from %s failed: %r", self.__url, error)
@@ -1,2 +1,2 @@
 from .opc_ua_server import OpcUaTestServer
-
+from .server_thread import ServerThread
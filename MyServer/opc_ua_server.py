@@ -1,15 +1,30 @@
+import dataclasses
 import json
 
 import asyncua
 import asyncio
+import inspect
 import os
+from collections.abc import Callable
+from typing import Any
 from asyncua import ua
 from asyncua.ua import VariantType
 import logging
 
+from MyServer.Lifetime.machine_model import MachineModel
 from MyServer.Lifetime.machine_model_base import MachineModelBase
+from MyServer.Fleet import Fleet, FleetScheduler
 from MyServer.MachineOperation import Mode
-from MyServer.OpcUa import ServerConfiguration, variant_type
+from MyServer.Modbus import ModbusDevice
+from MyServer.OpcUa import ServerConfiguration, variant_type, folder_path, folder_layout, sensor_node_id, VALUE, \
+    SENSOR_TIME, SAMPLE_INTERVAL, namespace_uri, expanded_node_id, Aggregation, AggregateNodes
+from MyServer.PubSub import UadpPublisher, udp_address
+from MyServer.Recording import ValueHistory
+from MyServer.Sensor import WaveformSensor, WaveformBlock
+from MyServer.Sensor.Base import SensorBase, LatestValues
+from MyServer.Sharding import ShardedSimulation
+from MyServer.Timing import Clock, ScaledClock
+from MyServer.Upstream import UpstreamDriver, UpstreamSession
 from datetime import datetime
 
 
@@ -39,7 +54,10 @@ class OpcUaTestServer:
                  server_endpoint: str = SERVER_ENDPOINT,
                  server_configuration: ServerConfiguration | None = None,
                  machine_model_file: str = CONFIGURATION_FILE,
-                 sensor_uri: str = SENSOR_URI):
+                 sensor_uri: str = SENSOR_URI,
+                 clock: Clock | None = None,
+                 shards: int = 0,
+                 journal: bool = False):
         """
         ctor.
         :param freq: Frequency control, distance between two samples. Used for clean shutdowns.
@@ -48,8 +66,14 @@ class OpcUaTestServer:
         :param machine_model_file: File to store the configuration of the machine model.
         :param sensor_uri: URI for the sensor.
         :param machine: Machine representation.
+        :param clock: Clock for the sensors. If None, a real time clock is used whose speed can be changed at runtime.
+        :param shards: Number of worker processes running the simulation drivers. 0 runs them in this process.
+        :param journal: Record every change of the machine configuration in a journal next to machine_model_file,
+        see MachineModel.open_journal. Only for MachineModel.
         """
-        logging.info(f"Creating OpcUaTestServer with {freq=} {server_endpoint=} {server_configuration=} {machine_model_file=} {sensor_uri=}")
+        logging.info("Creating OpcUaTestServer with freq=%r server_endpoint=%r server_configuration=%r "
+                     "machine_model_file=%r sensor_uri=%r",
+                     freq, server_endpoint, server_configuration, machine_model_file, sensor_uri)
         self._freq = freq
         self._stopped = True
         if server_configuration is None:
@@ -65,6 +89,21 @@ class OpcUaTestServer:
         self._configuration: ServerConfiguration = server_configuration
         self._machine_model_file = machine_model_file
         self._set_up: bool = False
+        self._clock: Clock = clock if clock is not None else ScaledClock()
+        self._shards: int = shards
+        self._simulation: ShardedSimulation | None = None
+        self._simulation_task: asyncio.Task | None = None
+        self._aggregates: AggregateNodes | None = None
+        self._aggregates_task: asyncio.Task | None = None
+        self._publisher: UadpPublisher | None = None
+        self._publisher_task: asyncio.Task | None = None
+        self._history: ValueHistory | None = None
+        self._latest: LatestValues | None = None
+        self._upstreams: list[UpstreamSession] = []
+        self._checkpoint_task: asyncio.Task | None = None
+        self._scheduler: FleetScheduler | None = None
+        self._scheduler_task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
 
         self._end_point: str = (OPC_TCP
                                 + "://" + IP_ADDRESS
@@ -73,18 +112,96 @@ class OpcUaTestServer:
 
         self._server: asyncua.Server = asyncua.Server()
         self._model: MachineModelBase = machine
-        if os.path.isfile(machine_model_file):
+        if journal and isinstance(self._model, MachineModel):
+            self._model.open_journal(self._machine_model_file)
+        elif os.path.isfile(machine_model_file):
             self._model.restore_configuration(self._machine_model_file)
 
     @property
     def model(self) -> MachineModelBase:
         return self._model
 
+    @property
+    def clock(self) -> Clock:
+        """Get the clock of the sensors."""
+        return self._clock
+
+    @clock.setter
+    def clock(self, value: Clock):
+        """Set the clock of the sensors. Takes effect on setup."""
+        if self._set_up:
+            logging.warning("Clock cannot be changed after setup.")
+            return
+        self._clock = value
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop | None:
+        """Get the event loop the server and the sensors run on. None if they run on the loop of the caller."""
+        return self._loop
+
+    @loop.setter
+    def loop(self, value: asyncio.AbstractEventLoop | None):
+        """Set the event loop the server and the sensors run on. Takes effect on setup."""
+        if self._set_up:
+            logging.warning("Loop cannot be changed after setup.")
+            return
+        self._loop = value
+
+    async def execute(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a function on the loop of the server and return its result. Used by callers on another loop or thread,
+        for example the HTTP API, to change the server or the model without racing the sensors.
+        :param fn: Function or coroutine function to run.
+        :param args: Positional arguments.
+        :param kwargs: Keyword arguments.
+        """
+        async def command():
+            result = fn(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        loop = self._loop
+        if loop is None or loop is asyncio.get_running_loop():
+            return await command()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(command(), loop))
+
+    @property
+    def shards(self) -> int:
+        """Get the number of worker processes running the simulation drivers."""
+        return self._shards
+
+    @shards.setter
+    def shards(self, value: int):
+        """Set the number of worker processes running the simulation drivers. Takes effect on setup."""
+        if self._set_up:
+            logging.warning("Shards cannot be changed after setup.")
+            return
+        self._shards = value
+
     @property
     def configuration(self):
         """Get the current configuration."""
         return self._configuration
 
+    @configuration.setter
+    def configuration(self, value: ServerConfiguration):
+        """Set the configuration. Takes effect on setup, the port only for new instances."""
+        if self._set_up:
+            logging.warning("Configuration cannot be changed after setup.")
+            return
+        self._configuration = value
+
+    @property
+    def history(self) -> ValueHistory | None:
+        """Get the latest samples of the sensors, None before the server is set up."""
+        return self._history
+
+    @property
+    def publisher(self) -> UadpPublisher | None:
+        """Get the PubSub publisher, None if not publishing."""
+        return self._publisher
+
     @property
     def end_point(self):
         """Get the end point of the server."""
@@ -110,36 +227,100 @@ class OpcUaTestServer:
         :returns: Whether setup was successful.
         """
         if self._set_up or not self._stopped:
-            logging.warning(f"Tried to setup the server, but set up = {self._set_up}, stopped = {self._stopped}.")
+            logging.warning("Tried to setup the server, but set up = %s, stopped = %s.", self._set_up, self._stopped)
             return False
 
         await self._server.init()
         self._server.set_endpoint(self._end_point)
         self._server.set_security_policy([ua.SecurityPolicyType.NoSecurity])
-        sensor_uri: str = self.get_uri(self._configuration.sensors)
-        sensor_idx: int = await self._server.register_namespace(sensor_uri)
-        objects: asyncua.Node = self._server.nodes.objects
-        sensor_folder: asyncua.Node = await objects.add_folder(sensor_idx, self._configuration.sensors)
+        folders: dict[tuple[str, ...], tuple[int, asyncua.Node]] = {}
+        await self._folder(folders, folder_path(self._configuration.sensors))
+        by_namespace: dict[tuple[str, ...], list[SensorBase]] = {}
         for sensor in self._model.sensors:
-            logging.info(f"Trying to add {sensor.name} to the data model.")
-            if sensor.namespace != self._configuration.sensors:
-                logging.warning(f"Alternative sensor folder not implemented yet, skipping {sensor.name}.")
-            registered_sensor: asyncua.Node = await sensor_folder.add_object(sensor_idx, sensor.name)
+            by_namespace.setdefault(self._sensor_path(sensor), []).append(sensor)
+        placed: list[tuple[tuple[str, ...], SensorBase]] = [
+            (path + subfolder, sensor)
+            for path, sensors in by_namespace.items()
+            for subfolder, sensor in folder_layout(sensors, self._configuration.max_folder_size)
+        ]
+        # folders first, their generated node IDs must not take the stable node IDs of the sensors
+        for path, _ in placed:
+            await self._folder(folders, path)
+        for path, sensor in placed:
+            logging.info("Trying to add %s to the data model.", sensor.name)
+            sensor_idx, sensor_folder = await self._folder(folders, path)
+            if sensor_node_id(sensor.sensor_type, sensor.identifier) is None:
+                logging.warning("Sensor %s has no stable node ID, using generated ones.", sensor.name)
+
+            def stable_id(field: str | None) -> ua.NodeId | int:
+                numeric: int | None = sensor_node_id(sensor.sensor_type, sensor.identifier, field)
+                return sensor_idx if numeric is None else ua.NodeId(numeric, sensor_idx)
+
+            registered_sensor: asyncua.Node = await sensor_folder.add_object(stable_id(None), sensor.name)
             variant, default_value = variant_type(sensor.sensor_type)
-            value_field: asyncua.Node = await registered_sensor.add_variable(sensor_idx,
-                                                                             "Value",
+            value_field: asyncua.Node = await registered_sensor.add_variable(stable_id(VALUE),
+                                                                             VALUE,
                                                                              default_value,
                                                                              varianttype=variant)
-            time_field: asyncua.Node = await registered_sensor.add_variable(sensor_idx,
-                                                                            "SensorTime",
-                                                                            datetime.now(),
+            time_field: asyncua.Node = await registered_sensor.add_variable(stable_id(SENSOR_TIME),
+                                                                            SENSOR_TIME,
+                                                                            self._clock.now(),
                                                                             varianttype=VariantType.DateTime)
             await value_field.set_writable()
 
-            sensor.add_callback(self._make_callback(value_field, time_field, variant))
-            if not sensor.running:
+            if isinstance(sensor, WaveformSensor):
+                # one write per block, the time stamps of the samples follow from the start and the interval
+                await value_field.write_value_rank(ua.ValueRank.OneDimension)
+                await value_field.write_array_dimensions([sensor.block_size])
+                await registered_sensor.add_variable(stable_id(SAMPLE_INTERVAL),
+                                                     SAMPLE_INTERVAL,
+                                                     sensor.sample_interval,
+                                                     varianttype=VariantType.Double)
+                sensor.add_callback(self._make_waveform_callback(value_field, time_field))
+            else:
+                sensor.add_callback(self._make_callback(value_field, time_field, variant))
+            sensor.clock = self._clock
+            logging.info("Sensor %s added.", sensor.name)
+        # one callback per sensor for the consumers of the latest values below
+        self._latest = LatestValues(self._model.sensors, self._clock.now())
+        if self._configuration.aggregation != Aggregation.NONE:
+            aggregates_idx, aggregates_folder = await self._folder(folders, folder_path(self._configuration.aggregates))
+            self._aggregates = AggregateNodes(self._model.sensors, self._configuration.aggregation,
+                                              latest=self._latest)
+            await self._aggregates.add_to(aggregates_folder, aggregates_idx, self._clock.now())
+            self._aggregates_task = asyncio.create_task(self._aggregates.run())
+        if self._configuration.pubsub_url:
+            self._publisher = UadpPublisher(self._model.sensors, udp_address(self._configuration.pubsub_url),
+                                            publishing_interval=self._configuration.publishing_interval,
+                                            interface=self._configuration.pubsub_interface or None,
+                                            latest=self._latest)
+            await self._publisher.start()
+            self._publisher_task = asyncio.create_task(self._publisher.run())
+        self._history = ValueHistory(self._model.sensors, self._configuration.history_depth, self._latest)
+        if self._configuration.history_depth > 1:
+            self._history.start()  # the current values only: started by the first request, no work per sample before
+        self._latest.start()
+        if self._shards > 0 and isinstance(self._model, MachineModel):
+            # takes the simulation drivers off their sensors, the remaining sensors are started below
+            self._simulation = ShardedSimulation(self._model, self._shards, self._clock)
+            self._simulation.start()
+            self._simulation_task = asyncio.create_task(self._simulation.run())
+        if isinstance(self._model, Fleet):
+            # one task for the simulated sensors of all machines instead of one per sensor
+            self._scheduler = FleetScheduler(self._model.mutators, self._clock)
+            self._scheduler.start()
+            self._scheduler_task = asyncio.create_task(self._scheduler.run())
+        for sensor in self._model.sensors:
+            if not sensor.running and sensor.source is not None:
                 sensor.start()
-            logging.info(f"Sensor {sensor.name} added.")
+        # sensors of upstream servers are not polled, the sessions hand them the data changes
+        for driver in self._model.mutators if isinstance(self._model, (MachineModel, Fleet)) else []:
+            if isinstance(driver, UpstreamDriver) and driver.session not in self._upstreams:
+                self._upstreams.append(driver.session)
+        for session in self._upstreams:
+            session.start()
+        if isinstance(self._model, MachineModel) and self._model.journal is not None:
+            self._checkpoint_task = asyncio.create_task(self._checkpoints(self._model))
         logging.info("All sensors added, starting OPC UA server.")
         await self._server.start()
         await asyncio.sleep(0.05)  # asyncua is not reliable, hence better wait for a bit here
@@ -147,6 +328,41 @@ class OpcUaTestServer:
         self._set_up = True
         return True
 
+    async def _checkpoints(self, model: MachineModel):
+        while True:
+            await asyncio.sleep(self._configuration.checkpoint_interval)
+            model.checkpoint()
+
+    async def _folder(self, folders: dict[tuple[str, ...], tuple[int, asyncua.Node]],
+                      path: tuple[str, ...]) -> tuple[int, asyncua.Node]:
+        """
+        Get a folder of the data model, creating it and its parents if missing. Every top level folder gets a namespace
+        of its own, its subfolders share it.
+        :param folders: Folders created so far, by path.
+        :param path: Folder path.
+        """
+        if path in folders:
+            return folders[path]
+        if len(path) == 1:
+            idx: int = await self._server.register_namespace(self.get_uri(path[0]))
+            parent: asyncua.Node = self._server.nodes.objects
+        else:
+            idx, parent = await self._folder(folders, path[:-1])
+        folders[path] = idx, await parent.add_folder(idx, path[-1])
+        return folders[path]
+
+    def _sensor_path(self, sensor: SensorBase) -> tuple[str, ...]:
+        """Get the folder path of a sensor, before splitting large folders."""
+        return folder_path(sensor.namespace) or folder_path(self._configuration.sensors)
+
+    def node_id(self, sensor: SensorBase, field: str | None = None) -> str | None:
+        """
+        Get the stable node ID of a sensor or one of its fields, see expanded_node_id.
+        :param sensor: The sensor.
+        :param field: Browse name of the field, None for the sensor object.
+        """
+        return expanded_node_id(self._configuration, sensor.sensor_type, sensor.identifier, sensor.namespace, field)
+
     @staticmethod
     def _make_callback(value_field: asyncua.Node, datetime_field: asyncua.Node, vt: ua.VariantType):
         async def callback(ts: datetime, v):
@@ -156,6 +372,14 @@ class OpcUaTestServer:
 
         return callback
 
+    @staticmethod
+    def _make_waveform_callback(value_field: asyncua.Node, datetime_field: asyncua.Node):
+        async def callback(ts: datetime, block: WaveformBlock):
+            await value_field.set_value(ua.Variant(block.samples.tolist(), VariantType.Float))
+            await datetime_field.set_value(ua.Variant(block.start, VariantType.DateTime))
+
+        return callback
+
     async def start(self):
         if self._server is None:
             logging.info("Starting server")
@@ -168,6 +392,43 @@ class OpcUaTestServer:
         logging.info("Stopping server")
         for sensor in self._model.sensors:
             sensor.stop()
+        if self._simulation is not None:
+            self._simulation_task.cancel()
+            await self._simulation.stop()
+            self._simulation = None
+            self._simulation_task = None
+        if self._scheduler is not None:
+            self._scheduler_task.cancel()
+            await self._scheduler.stop()
+            self._scheduler = None
+            self._scheduler_task = None
+        if self._aggregates is not None:
+            self._aggregates_task.cancel()
+            self._aggregates.close()
+            self._aggregates = None
+            self._aggregates_task = None
+        if self._publisher is not None:
+            self._publisher_task.cancel()
+            self._publisher.close()
+            self._publisher = None
+            self._publisher_task = None
+        if self._history is not None:
+            self._history.close()  # kept, the last samples can still be read
+        if self._latest is not None:
+            self._latest.close()
+            self._latest = None
+        for session in self._upstreams:
+            await session.stop()
+        await UpstreamSession.close_all()
+        await ModbusDevice.close_all()  # bound to this loop, the drivers connect again with their next read
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+            self._checkpoint_task = None
+            self._model.checkpoint()  # the last values at shutdown
+        if isinstance(self._model, MachineModel) and self._model.journal is not None:
+            # the writer is a daemon thread, the queued records are lost at exit unless written here
+            await asyncio.to_thread(self._model.close_journal)
+        self._upstreams.clear()
         await self._server.stop()
         self._stopped = True
         await asyncio.sleep(0.01 + self._freq)
@@ -175,11 +436,15 @@ class OpcUaTestServer:
 
     async def start_job(self):
         logging.info("Start job called in OPC UA server.")
-        await self._model.start_job()
+        result = self._model.start_job()
+        if inspect.isawaitable(result):  # models may implement the job control synchronously
+            await result
 
     async def stop_job(self):
         logging.info("Stopping job called in OPC UA server.")
-        await self._model.stop_job()
+        result = self._model.stop_job()
+        if inspect.isawaitable(result):  # models may implement the job control synchronously
+            await result
 
     def save_configuration(self, file_name: str):
         """
@@ -191,15 +456,14 @@ class OpcUaTestServer:
             logging.warning("Saving of configuration skipped: not set up.")
             return
 
-        if os.path.isfile(file_name):
-            logging.info(f"Removing previous file {file_name}.")
-            os.remove(file_name)
-
-        with open(file_name, "w") as f:
-            json.dump(self._configuration, f)
+        # written next to the previous file and renamed over it, a crash keeps the previous one
+        temporary: str = file_name + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(dataclasses.asdict(self._configuration), f)
+        os.replace(temporary, file_name)
 
-        logging.info(f"Configuration written to {file_name}.")
+        logging.info("Configuration written to %s.", file_name)
 
     def get_uri(self, namespace: str) -> str:
         """Get the URI for a namespace. No check whether the namespace exists, just for the convention."""
-        return "urn:" + self._configuration.company + ":opcua:" + namespace
+        return namespace_uri(self._configuration.company, namespace)
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import threading
+
+from .opc_ua_server import OpcUaTestServer
+
+STOP_TIMEOUT: float = 30.0
+
+
+class ServerThread:
+    """
+    Runs the event loop of an OPC UA server, and with it the sensor pollers, on a thread of its own. Requests from
+    other loops reach the server through OpcUaTestServer.execute, so a busy HTTP API does not delay the sampling.
+    """
+
+    def __init__(self, server: OpcUaTestServer, name: str = "opc-ua-server"):
+        """
+        ctor.
+        :param server: Server to host. Must not be set up yet.
+        :param name: Name of the thread.
+        """
+        self.__server = server
+        self.__name = name
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__thread: threading.Thread | None = None
+
+    @property
+    def server(self) -> OpcUaTestServer:
+        """The hosted server."""
+        return self.__server
+
+    @property
+    def running(self) -> bool:
+        """Whether the thread is running."""
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def start(self):
+        """Start the thread and hand its loop to the server."""
+        if self.__thread is not None:
+            logging.warning("Server thread already started.")
+            return
+        loop = asyncio.new_event_loop()
+        self.__loop = loop
+        self.__server.loop = loop
+        self.__thread = threading.Thread(target=self.__run, name=self.__name, daemon=True)
+        self.__thread.start()
+        logging.info("Server thread %s started.", self.__name)
+
+    def __run(self):
+        asyncio.set_event_loop(self.__loop)
+        self.__loop.run_forever()
+
+    def stop(self, timeout: float = STOP_TIMEOUT):
+        """
+        Stop the server if it is set up, then the loop, and wait for the thread. Blocks, call it from a worker thread
+        when on a loop.
+        :param timeout: Seconds to wait for the server and for the thread.
+        """
+        if self.__thread is None:
+            return
+        loop = self.__loop
+        if self.__server.is_initialized:
+            try:
+                asyncio.run_coroutine_threadsafe(self.__server.stop(), loop).result(timeout)
+            except Exception as e:
+                logging.error("Stopping the server failed: %r", e)
+        loop.call_soon_threadsafe(loop.stop)
+        self.__thread.join(timeout)
+        if self.__thread.is_alive():
+            logging.error("Server thread %s did not stop in time.", self.__name)
+            return
+        loop.close()
+        self.__thread = None
+        self.__loop = None
+        logging.info("Server thread %s stopped.", self.__name)
@@ -1,5 +1,9 @@
+import time
 from typing import Any, Generator
 
+import msgpack
+import numpy as np
+import pyarrow as pa
 import pytest
 from fastapi.testclient import TestClient
 
@@ -7,6 +11,8 @@ from MyServer.Lifetime import MachineModel
 from main import app, opc_ua_server
 
 from MyServer.MachineOperation import SensorType, SensorId, SensorConfig
+from MyServer.OpcUa import ServerConfiguration
+from MyServer.Sensor import TemperatureSensor, PressureSensor
 
 @pytest.fixture
 def client() -> Generator[TestClient, Any, None]:
@@ -69,3 +75,143 @@ def test_delete_sensor(client: TestClient):
     assert len(response.json()["sensors"]) == 0, print("Sensor was not deleted.")
 
 
+def test_set_speed_factor(client: TestClient):
+    response = client.post("/v0.1/set_speed_factor", params={"factor": 10.0})
+    assert response.is_success, print(response)
+    assert response.json(), "Speed factor was not set."
+
+    response = client.get("/v0.1/speed_factor")
+    assert response.is_success, print(response)
+    assert response.json() == 10.0
+
+    response = client.post("/v0.1/set_speed_factor", params={"factor": -1.0})
+    assert response.is_success, print(response)
+    assert not response.json(), "Negative speed factor must be rejected."
+
+def test_recording(client: TestClient, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    response = client.post("/v0.1/start_recording", params={"output_format": "csv"})
+    assert response.is_success, print(response)
+    assert response.json(), "Recording was not started."
+
+    response = client.post("/v0.1/start_recording")
+    assert response.is_success, print(response)
+    assert not response.json(), "Recording must not be started twice."
+
+    response = client.post("/v0.1/stop_recording")
+    assert response.is_success, print(response)
+    assert response.json() == [], "No samples were published, hence no files expected."
+
+
+def test_get_node_ids(client: TestClient):
+    sensor_config: SensorConfig = SensorConfig(type=SensorType.TEMPERATURE, identifier=42, simulator_config=None)
+    response = client.post("/v0.1/add_sensor", json=sensor_config.model_dump())
+    assert response.is_success, print(response)
+
+    response = client.get("/v0.1/get_node_ids")
+    assert response.is_success, print(response)
+    sensors = response.json()["sensors"]
+    assert len(sensors) == 1, "Expected the node IDs of one sensor."
+    assert sensors[0]["value"] == "nsu=urn:TestCompany.com:opcua:Sensors;i=100000421"
+
+
+def test_get_sensors_etag(client: TestClient):
+    response = client.post("/v0.1/add_sensor", json=SensorConfig(type=SensorType.TEMPERATURE, identifier=1,
+                                                                  simulator_config=None).model_dump())
+    assert response.is_success
+    response = client.get("/v0.1/get_sensors")
+    etag = response.headers["ETag"]
+    response = client.get("/v0.1/get_sensors", headers={"If-None-Match": etag})
+    assert response.status_code == 304, "Unchanged listing sent again."
+
+    response = client.post("/v0.1/add_sensor", json=SensorConfig(type=SensorType.PRESSURE, identifier=2,
+                                                                  simulator_config=None).model_dump())
+    assert response.is_success
+    response = client.get("/v0.1/get_sensors", headers={"If-None-Match": etag})
+    assert response.status_code == 200, "Listing not invalidated by adding a sensor."
+    assert response.headers["ETag"] != etag
+    assert len(response.json()["sensors"]) == 2
+
+
+def test_get_sensors_pages(client: TestClient):
+    for i in range(5):
+        sensor_type = SensorType.TEMPERATURE if i % 2 == 0 else SensorType.PRESSURE
+        config = SensorConfig(type=sensor_type, identifier=i, simulator_config=None, namespace=f"Hall{i % 2}/Line")
+        assert client.post("/v0.1/add_sensor", json=config.model_dump()).is_success
+
+    identifiers: list[int] = []
+    params: dict = {"limit": 2}
+    while True:
+        page = client.get("/v0.1/get_sensors", params=params).json()
+        identifiers += [x["identifier"] for x in page["sensors"]]
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert identifiers == [0, 1, 2, 3, 4]
+
+    page = client.get("/v0.1/get_sensors", params={"sensor_type": "Pressure", "simulator_config": True}).json()
+    assert [x["identifier"] for x in page["sensors"]] == [1, 3]
+    assert page["sensors"][0]["simulator_config"]["st_dev_broken"] == 0.4
+    page = client.get("/v0.1/get_sensors", params={"namespace": "Hall0"}).json()
+    assert [x["identifier"] for x in page["sensors"]] == [0, 2, 4]
+
+    assert client.post("/v0.1/add_sensor", json=SensorConfig(type=SensorType.TEMPERATURE, identifier=9,
+                                                             simulator_config=None).model_dump()).is_success
+    response = client.get("/v0.1/get_sensors", params=params)
+    assert response.status_code == 409, "Cursor of a changed listing accepted."
+
+
+def test_changes(client: TestClient):
+    since = int(client.get("/v0.1/get_sensors").headers["ETag"].strip('"'))
+    response = client.get("/v0.1/changes", params={"since": since})
+    assert response.json() == {"version": since, "complete": True, "changes": []}
+
+    config = SensorConfig(type=SensorType.PRESSURE, identifier=5, simulator_config=None)
+    assert client.post("/v0.1/add_sensor", json=config.model_dump()).is_success
+    answer = client.get("/v0.1/changes", params={"since": since, "wait": 1.0}).json()
+    assert [x["kind"] for x in answer["changes"]] == ["add"]
+    assert answer["changes"][0]["sensor_id"] == {"type": "Pressure", "identifier": 5}
+    assert answer["version"] > since
+
+    # a version of the server before a restart asks for a new listing, without waiting
+    answer = client.get("/v0.1/changes", params={"since": answer["version"] + 1000, "wait": 5.0}).json()
+    assert answer["complete"] is False and answer["changes"] == []
+
+
+def test_binary_values(tmp_path):
+    model: MachineModel = MachineModel()
+    model.add_sensor(TemperatureSensor(1, updates_per_second=20.0))
+    model.add_sensor(PressureSensor(2, updates_per_second=20.0))
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48462,
+                                        history_depth=8)
+    app.state.server = opc_ua_server.OpcUaTestServer(machine=model, server_configuration=configuration,
+                                                     machine_model_file=str(tmp_path / "model.json"))
+    with TestClient(app) as client:
+        assert client.get("/v0.1/values").json()["identifier"] == [], "Values before the server is set up."
+        assert client.post("/v0.1/initialize").json()
+        for _ in range(50):
+            if len(client.get("/v0.1/values").json()["identifier"]) == 2:
+                break
+            time.sleep(0.1)
+        answer = client.get("/v0.1/values").json()
+        assert sorted(zip(answer["type"], answer["identifier"])) == [("Pressure", 2), ("Temperature", 1)]
+
+        response = client.get("/v0.1/history", params={"sensor_type": "Temperature"},
+                              headers={"Accept": "application/vnd.apache.arrow.stream"})
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.column_names == ["type", "identifier", "timestamp", "value"]
+        assert set(table.column("identifier").to_pylist()) == {1}
+        assert table.column("timestamp").type == pa.timestamp("us")
+
+        response = client.get("/v0.1/get_sensors", headers={"Accept": "application/msgpack, application/json;q=0.5"})
+        assert response.headers["content-type"] == "application/msgpack"
+        columns = msgpack.unpackb(response.content)
+        assert np.frombuffer(columns["identifier"]["data"], dtype=columns["identifier"]["dtype"]).tolist() == [1, 2]
+        assert columns["type"]["labels"][columns["type"]["codes"]["data"][0]] == "Temperature"
+        # the json ETag does not validate a cached msgpack body, nor the other way round
+        etag = response.headers["ETag"]
+        assert etag != client.get("/v0.1/get_sensors").headers["ETag"]
+        assert client.get("/v0.1/get_sensors", headers={"If-None-Match": etag}).status_code == 200
+        assert client.get("/v0.1/get_sensors", headers={"If-None-Match": etag,
+                                                        "Accept": "application/msgpack"}).status_code == 304
@@ -0,0 +1,59 @@
+from typing import Any, Generator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from MyServer.Fleet import Fleet, MachineTemplate
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import SensorConfig, SensorId, SensorType
+from MyServer.OpcUa import ServerConfiguration
+from MyServer.Sensor import TemperatureSensor
+from main import app, opc_ua_server
+
+
+@pytest.fixture
+def client(tmp_path) -> Generator[TestClient, Any, None]:
+    model: MachineModel = MachineModel()
+    model.add_sensor(TemperatureSensor(1))
+    fleet: Fleet = Fleet()
+    for name in ("Press01", "Press02"):
+        fleet.add_machine(name, MachineTemplate.from_model(model))
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48460)
+    app.state.server = opc_ua_server.OpcUaTestServer(machine=fleet, server_configuration=configuration,
+                                                     machine_model_file=str(tmp_path / "fleet.json"))
+    with TestClient(app) as client:
+        yield client
+
+
+def test_machine_prefixes(client: TestClient):
+    assert client.get("/v0.1/machines").json() == ["Press01", "Press02"]
+    assert client.post("/v0.1/machines/Press02/start_job").json()
+    assert client.get("/v0.1/machines/Press01/status").json()["mode"] == "idle"
+    assert client.get("/v0.1/machines/Press02/status").json()["mode"] == "running"
+    sensors = client.get("/v0.1/machines/Press01/get_sensors").json()["sensors"]
+    assert [x["namespace"] for x in sensors] == ["Press01/Sensors"]
+    node_ids = client.get("/v0.1/machines/Press02/get_node_ids").json()["sensors"]
+    assert "urn:TestCompany.com:opcua:Press02" in node_ids[0]["value"]
+    assert not client.post("/v0.1/machines/Press03/start_job").json(), "Unknown machine accepted."
+
+
+def test_sensors_of_a_machine(client: TestClient):
+    config = SensorConfig(type=SensorType.PRESSURE, identifier=7, simulator_config=None)
+    # the generic routes do not know the machine
+    assert client.post("/v0.1/add_sensor", json=config.model_dump()).status_code == 409
+    assert client.post("/v0.1/add_sensors", json=[config.model_dump()]).status_code == 409
+    sensor_id = SensorId(type=SensorType.TEMPERATURE, identifier=1).model_dump()
+    assert client.post("/v0.1/delete_sensor", json=sensor_id).status_code == 409
+    assert client.post("/v0.1/delete_sensors", json=[sensor_id]).status_code == 409
+    assert len(client.get("/v0.1/machines/Press01/get_sensors").json()["sensors"]) == 1
+
+    assert client.post("/v0.1/machines/Press01/add_sensor", json=config.model_dump()).json()
+    sensors = client.get("/v0.1/machines/Press01/get_sensors").json()["sensors"]
+    assert [(x["identifier"], x["namespace"]) for x in sensors] == [(1, "Press01/Sensors"), (7, "Press01/Sensors")]
+    assert len(client.get("/v0.1/machines/Press02/get_sensors").json()["sensors"]) == 1
+
+    assert client.post("/v0.1/machines/Press02/delete_sensor", json=sensor_id).json()
+    assert not client.post("/v0.1/machines/Press02/delete_sensor", json=sensor_id).json()
+    assert client.get("/v0.1/machines/Press02/get_sensors").json()["sensors"] == []
+    assert len(client.get("/v0.1/machines/Press01/get_sensors").json()["sensors"]) == 2
+    assert not client.post("/v0.1/machines/Press03/add_sensor", json=config.model_dump()).json()
@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+import pytest
+
+from MyServer import OpcUaTestServer
+from MyServer.Client import ControlClient
+from MyServer.Client.control_client import BATCH_SIZE
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import SensorConfig, SensorId, SensorType
+from main import app
+
+
+def create_client(batch_size: int = BATCH_SIZE) -> ControlClient:
+    # the app is called in the process, without a server loop the commands run on the loop of the test
+    app.state.server = OpcUaTestServer(machine=MachineModel())
+    return ControlClient(transport=httpx.ASGITransport(app=app), batch_size=batch_size)
+
+
+@pytest.mark.asyncio
+async def test_batched_operations():
+    async with create_client() as sut:
+        configs = [SensorConfig(type=SensorType.TEMPERATURE if i % 2 else SensorType.PRESSURE, identifier=i,
+                                simulator_config=None, namespace="Hall1") for i in range(50)]
+        assert await sut.add_sensors(configs) == [True] * 50
+        assert sut.sent == 1, "Queued sensors not sent in one request."
+
+        sensors = await sut.get_sensors(page_size=20)
+        assert [x.identifier for x in sensors] == list(range(50))
+        assert sut.sent == 4
+        assert len(await sut.get_sensors(sensor_type=SensorType.PRESSURE)) == 25
+
+        unknown = SensorId(type=SensorType.PRESSURE, identifier=99)
+        assert await sut.delete_sensors([SensorId(type=configs[0].type, identifier=0), unknown]) == [True, False]
+        assert len(await sut.get_sensors()) == 49
+
+
+@pytest.mark.asyncio
+async def test_chunk_order():
+    async with create_client(batch_size=10) as sut:
+        ids = [SensorId(type=SensorType.PRESSURE, identifier=i) for i in range(24)]
+        assert await sut.add_sensors([SensorConfig(type=x.type, identifier=x.identifier, simulator_config=None)
+                                      for x in ids]) == [True] * 24
+        assert sut.sent == 3
+        # the repeated deletion in the last chunk fails, as the first chunk is sent before
+        assert await sut.delete_sensors(ids + ids[:1]) == [True] * 24 + [False]
+        assert sut.sent == 6
+
+
+@pytest.mark.asyncio
+async def test_queued_order():
+    async with create_client() as sut:
+        config = SensorConfig(type=SensorType.PRESSURE, identifier=1, simulator_config=None)
+        assert await sut.add_sensor(config), "Single operation not sent."
+        # queued together: the deletion is sent after the additions
+        results = await asyncio.gather(sut.add_sensor(config.model_copy(update={"identifier": 2})),
+                                       sut.delete_sensor(SensorId(type=SensorType.PRESSURE, identifier=2)),
+                                       sut.add_sensor(config.model_copy(update={"identifier": 3})))
+        assert results == [True, True, True]
+        assert [x.identifier for x in await sut.get_sensors()] == [1, 3]
+        assert (await sut.status())["status"] == "ok"
@@ -0,0 +1,74 @@
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from MyServer.Dataset import FastForwardGenerator, OutputFormat, Scenario, ScenarioAction, ScenarioEvent
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import Mode
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+
+
+@pytest.fixture
+def machine_model() -> MachineModel:
+    model: MachineModel = MachineModel()
+    model.add_sensor(TemperatureSensor(1, updates_per_second=1.0), st_dev=10e-8)
+    model.add_sensor(TemperatureSensor(2, updates_per_second=1.0))
+    model.add_sensor(PressureSensor(1, updates_per_second=0.5))
+    return model
+
+
+def test_scenario_from_dict(tmp_path):
+    file_path = os.path.join(tmp_path, "scenario.json")
+    with open(file_path, "w") as f:
+        json.dump({
+            "start": "2025-01-01T00:00:00",
+            "duration": 120,
+            "events": [{"time": 60, "event": "stop_job"}, {"time": 10, "event": "start_job"}]
+        }, f)
+
+    sut: Scenario = Scenario.load(file_path)
+    assert sut.start == datetime(2025, 1, 1)
+    assert sut.duration == 120.0
+    assert [e.action for e in sut.events] == [ScenarioAction.START_JOB, ScenarioAction.STOP_JOB], \
+        "Events must be sorted by time."
+
+@pytest.mark.parametrize("output_format", [OutputFormat.CSV, OutputFormat.PARQUET])
+def test_run(machine_model: MachineModel, output_format: OutputFormat, tmp_path):
+    scenario: Scenario = Scenario(start=datetime(2025, 1, 1), duration=100.0,
+                                  events=(ScenarioEvent(time=30.0, action=ScenarioAction.START_JOB),))
+    sut = FastForwardGenerator(machine_model, scenario, str(tmp_path), output_format=output_format,
+                               chunk_seconds=40.0)
+    files = sut.run()
+    assert len(files) == 6, f"Three chunks for two update rates expected, got {len(files)}."
+    assert machine_model.mode == Mode.RUNNING, "Scenario events were not applied to the model."
+
+    read = pd.read_parquet if output_format == OutputFormat.PARQUET else pd.read_csv
+    one_hertz = pd.concat([read(f) for f in sorted(files) if "samples_1Hz" in f])
+    assert len(one_hertz) == 100
+    assert list(one_hertz.columns) == ["timestamp", "Temperature_sensor_001", "Temperature_sensor_002"]
+    timestamps = pd.to_datetime(one_hertz["timestamp"])
+    assert timestamps.iloc[0] == pd.Timestamp(2025, 1, 1)
+    assert (timestamps.diff().dropna() == pd.Timedelta(seconds=1)).all(), "Samples must be one second apart."
+
+    temperature = one_hertz["Temperature_sensor_001"].to_numpy()
+    assert abs(temperature[29] - 20.0) < 1e-3, "Temperature must stay at idle value before the job starts."
+    assert temperature[-1] > 79.0, "Temperature must approach the running value after the job started."
+
+    half_hertz = pd.concat([read(f) for f in sorted(files) if "samples_0.5Hz" in f])
+    assert len(half_hertz) == 50
+
+
+def test_chunks_bounded_by_samples(machine_model: MachineModel, tmp_path):
+    scenario: Scenario = Scenario(start=datetime(2025, 1, 1), duration=100.0, events=())
+    # 2.5 samples per second, 100 samples are 40 s
+    sut = FastForwardGenerator(machine_model, scenario, str(tmp_path), output_format=OutputFormat.PARQUET,
+                               max_samples_per_chunk=100)
+    files = sut.run()
+    assert len(files) == 6, f"Three chunks for two update rates expected, got {len(files)}."
+    frames = [pd.read_parquet(f) for f in files]
+    assert sum(len(x) * (len(x.columns) - 1) for x in frames) == 250
+    with pytest.raises(ValueError):
+        FastForwardGenerator(machine_model, scenario, str(tmp_path), max_samples_per_chunk=0)
@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+
+from MyServer.Diagnostics import LogPipeline, RateLimitFilter
+
+
+class SlowHandler(logging.Handler):
+    """Handler simulating a slow disk."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.messages: list[str] = []
+        self.threads: set[str] = set()
+
+    def emit(self, record: logging.LogRecord):
+        time.sleep(self.delay)
+        self.messages.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+class FormattedOnce:
+    """Argument recording the thread it was formatted on."""
+
+    def __init__(self):
+        self.formatted_on: str | None = None
+
+    def __str__(self):
+        self.formatted_on = threading.current_thread().name
+        return "formatted"
+
+
+def test_formatting_in_background():
+    handler = SlowHandler(0.0)
+    sut = LogPipeline([handler])
+    logger = logging.getLogger("test.pipeline.background")
+    logger.propagate = False
+    sut.install(logging.INFO, [logger.name])
+    argument = FormattedOnce()
+    logger.info("Value: %s", argument)
+    logger.debug("Filtered by level: %s", argument)
+    sut.stop()
+    assert handler.messages == ["Value: formatted"]
+    assert argument.formatted_on != threading.current_thread().name, "Record was formatted by the caller."
+    assert threading.current_thread().name not in handler.threads
+
+def test_slow_handler_does_not_block():
+    handler = SlowHandler(0.05)
+    sut = LogPipeline([handler], queue_size=5)
+    logger = logging.getLogger("test.pipeline.slow")
+    logger.propagate = False
+    sut.install(logging.INFO, [logger.name])
+    start = time.monotonic()
+    for i in range(100):
+        logger.info("Sample %d", i)
+    elapsed = time.monotonic() - start
+    sut.stop()
+    assert elapsed < 0.5, f"Logging blocked the caller for {elapsed} s."
+    assert sut.dropped > 0, "Records were expected to be dropped."
+    assert len(handler.messages) + sut.dropped == 100
+
+def test_rate_limit():
+    handler = SlowHandler(0.0)
+    rate_limit = RateLimitFilter(burst=3, interval=0.05)
+    sut = LogPipeline([handler], rate_limit=rate_limit)
+    logger = logging.getLogger("test.pipeline.rate_limit")
+    logger.propagate = False
+    sut.install(logging.INFO, [logger.name])
+    for i in range(10):
+        logger.info("Repeated %d", i)
+    logger.info("Other message")
+    time.sleep(0.06)
+    logger.info("Repeated %d", 10)
+    sut.stop()
+    assert handler.messages == ["Repeated 0", "Repeated 1", "Repeated 2", "Other message",
+                                "Repeated 10 (7 similar messages suppressed)"]
+    assert sut.suppressed == 7
+
+
+def test_rate_limit_without_arguments():
+    sut = RateLimitFilter(burst=1, interval=0.05)
+    records = [logging.LogRecord("test", logging.INFO, __file__, 1, "100% done", (), None) for _ in range(3)]
+    assert [sut.filter(x) for x in records] == [True, False, False]
+    time.sleep(0.06)
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "100% done", (), None)
+    assert sut.filter(record)
+    assert record.getMessage() == "100% done (2 similar messages suppressed)"
+
+
+def test_rate_limit_threads():
+    sut = RateLimitFilter(burst=100, interval=60.0)
+    passed: list[int] = [0] * 8
+
+    def log(index: int):
+        for _ in range(1000):
+            passed[index] += sut.filter(logging.LogRecord("test", logging.INFO, __file__, 1, "Busy %d", (1,), None))
+
+    threads = [threading.Thread(target=log, args=(i,)) for i in range(len(passed))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(passed) == 100, "Burst exceeded by concurrent records."
+    assert sut.suppressed == 7900
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from asyncua import Client, ua
+
+from MyServer import OpcUaTestServer
+from MyServer.Fleet import Fleet, FleetScheduler, MachineTemplate
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import Mode, SensorId, SensorType
+from MyServer.OpcUa import ServerConfiguration, VALUE, sensor_node_id
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Timing import ManualClock
+
+
+def make_template() -> MachineTemplate:
+    model: MachineModel = MachineModel()
+    model.add_sensor(TemperatureSensor(1, updates_per_second=2.0))
+    model.add_sensor(PressureSensor(2, updates_per_second=4.0))
+    return MachineTemplate.from_model(model)
+
+
+def test_template_overrides():
+    template: MachineTemplate = make_template()
+    temperature = SensorId(type=SensorType.TEMPERATURE, identifier=1)
+    sut: Fleet = Fleet()
+    first: MachineModel = sut.add_machine("Press01", template, {temperature: {"start_value": 80.0}})
+    second: MachineModel = sut.add_machine("Press02", template)
+    assert [x.namespace for x in first.sensors] == ["Press01/Sensors"] * 2
+    assert [x.namespace for x in second.sensors] == ["Press02/Sensors"] * 2
+    assert first.mutators[0].last_value == 80.0, "Override not applied."
+    assert second.mutators[0].last_value != 80.0, "Override leaked to another machine."
+    seeds = [x.mutators[0].to_driver_data().random_seed for x in (first, second)]
+    assert seeds[0] != seeds[1], "Machines share their random seeds."
+    assert template.entries[0]["sensor"]["namespace"] == "Sensors", "Template changed by the machines."
+    with pytest.raises(TypeError):
+        template.entries[0]["start_value"] = 0.0
+    with pytest.raises(ValueError):
+        sut.add_machine("Press01", template)
+
+
+def test_machines_independent():
+    sut: Fleet = Fleet()
+    template: MachineTemplate = make_template()
+    for i in range(3):
+        sut.add_machine(f"M{i}", template)
+    assert sut.mode == Mode.IDLE
+    sut.machine("M1").start_job()
+    assert sut.mode == Mode.RUNNING
+    assert [sut.machine(f"M{i}").mode for i in range(3)] == [Mode.IDLE, Mode.RUNNING, Mode.IDLE]
+    assert sut.custom_message({"machine": "M2", "machine_state": False})
+    assert sut.machine("M2").mutators[0].state != sut.machine("M0").mutators[0].state
+    assert sut.remove_machine("M0") and len(sut.sensors) == 4
+
+
+def test_save_restore(tmp_path):
+    sut: Fleet = Fleet()
+    template: MachineTemplate = make_template()
+    pressure = SensorId(type=SensorType.PRESSURE, identifier=2)
+    sut.add_machine("A", template, {pressure: {"sensor": {"updates_per_second": 10.0}}})
+    sut.add_machine("B", template)
+    sut.save_configuration(str(tmp_path / "fleet.json"))
+    restored: Fleet = Fleet()
+    restored.restore_configuration(str(tmp_path / "fleet.json"))
+    assert list(restored.machines) == ["A", "B"]
+    assert restored.origin("A").template is restored.origin("B").template, "Template not shared after restore."
+    assert [x.updates_per_second for x in restored.machine("A").sensors] == [2.0, 10.0]
+    assert [x.to_driver_data().as_dict() for x in restored.mutators] == \
+           [x.to_driver_data().as_dict() for x in sut.mutators]
+
+
+@pytest.mark.asyncio
+async def test_scheduler():
+    clock: ManualClock = ManualClock()
+    fleet: Fleet = Fleet()
+    template: MachineTemplate = make_template()
+    for i in range(50):
+        fleet.add_machine(f"M{i:02d}", template)
+    received: list[int] = [0]
+
+    async def count(ts, v):
+        received[0] += 1
+
+    for sensor in fleet.sensors:
+        sensor.clock = clock
+        sensor.add_callback(count)
+    sut: FleetScheduler = FleetScheduler(fleet.mutators, clock)
+    sut.start()
+    task = asyncio.create_task(sut.run())
+    try:
+        await clock.advance(0.0)
+        await clock.advance(1.0)
+        # 50 machines, 2 + 4 samples per second each, plus the first sample of each sensor
+        assert received[0] == 50 * 6 + 100
+        assert sut.wake_ups == 5, "Due drivers not polled together."
+        assert not any(x.running for x in fleet.sensors), "Sensors still poll on their own."
+    finally:
+        task.cancel()
+        await sut.stop()
+    assert all(x.source is not None for x in fleet.sensors)
+
+
+@pytest.mark.asyncio
+async def test_fleet_server(tmp_path):
+    fleet: Fleet = Fleet()
+    template: MachineTemplate = make_template()
+    fleet.add_machine("Press01", template)
+    fleet.add_machine("Press02", template)
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48459)
+    sut: OpcUaTestServer = OpcUaTestServer(machine=fleet, server_configuration=configuration,
+                                           machine_model_file=str(tmp_path / "fleet.json"), clock=ManualClock())
+    assert await sut.setup_server(), "Server setup not completed."
+    try:
+        assert sut.node_id(fleet.machine("Press01").sensors[0]).startswith(f"nsu={sut.get_uri('Press01')};")
+        for name in ("Press01", "Press02"):
+            sensor = fleet.machine(name).sensors[0]
+            await sensor.on_new_data(sut.clock.now(), 42.0 if name == "Press01" else 7.0)
+        async with Client(url=sut.end_point.replace("0.0.0.0", "127.0.0.1")) as client:
+            values: list[float] = []
+            for name in ("Press01", "Press02"):
+                idx: int = await client.get_namespace_index(sut.get_uri(name))
+                node_id = ua.NodeId(sensor_node_id(SensorType.TEMPERATURE, 1, VALUE), idx)
+                values.append(await client.get_node(node_id).read_value())
+            assert values == [42.0, 7.0], "Machines do not have subtrees of their own."
+    finally:
+        await sut.stop()
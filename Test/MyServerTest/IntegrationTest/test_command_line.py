@@ -0,0 +1,14 @@
+import pytest
+
+from main import parse_arguments
+
+
+def test_parse_arguments():
+    assert not parse_arguments([]).journal, "Imported without a command line, the journal must stay off."
+    assert parse_arguments(["--journal", "--shards", "2"]).journal
+
+
+@pytest.mark.parametrize("conflict", [["--fleet", "MachineModel.json"], ["--endpoints", "LineA=4841"]])
+def test_journal_conflicts(conflict: list[str]):
+    with pytest.raises(SystemExit):
+        parse_arguments(["--journal"] + conflict)
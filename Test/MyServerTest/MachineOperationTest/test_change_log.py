@@ -0,0 +1,57 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+from MyServer.Lifetime import MachineModel, ChangeKind, ChangeLog, ConfigurationChange
+from MyServer.Sensor import TemperatureSensor
+
+
+def test_change_log_since():
+    sut: MachineModel = MachineModel()
+    known: int = sut.version
+    sut.add_sensor(TemperatureSensor(1))
+    sut.add_sensor(TemperatureSensor(2))
+    sut.start_job()
+    driver = sut.mutators[0]
+    driver._value_idle = 30.0
+    sut.record_change(driver.sensor.sensor_id)
+    sut.delete_sensor(sut.sensors[1].sensor_id)
+
+    changes = sut.changes.since(known)
+    assert [x.kind for x in changes] == [ChangeKind.ADD, ChangeKind.ADD, ChangeKind.MODE, ChangeKind.UPDATE,
+                                        ChangeKind.DELETE]
+    assert changes[0].as_dict()["values"]["sensor"]["identifier"] == 1
+    assert changes[3].as_dict()["values"]["value_idle"] == 30.0
+    assert sut.version == changes[-1].version
+    assert changes[2].version < sut.version, "Mode change not ordered."
+    assert sut.changes.since(changes[-2].version) == changes[-1:]
+    # versions of the process before a restart: smaller than the first one, or larger than the latest one
+    assert sut.changes.since(known - 1) is None, "Changes before the log reported complete."
+    assert sut.changes.since(sut.changes.version + 1) is None, "Version after the latest one accepted."
+
+
+def test_change_log_capacity_and_wait():
+    sut: ChangeLog = ChangeLog(capacity=3)
+    for version in range(1, 6):
+        sut.append(ConfigurationChange(version, ChangeKind.DELETE))
+    assert sut.since(1) is None, "Dropped changes not reported."
+    assert [x.version for x in sut.since(2)] == [3, 4, 5]
+
+    async def wait_and_append():
+        waiting = asyncio.create_task(sut.wait(5, 5.0))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        sut.append(ConfigurationChange(6, ChangeKind.RESET))
+        assert await waiting
+        assert not await sut.wait(6, 0.05)
+
+    asyncio.run(wait_and_append())
+
+
+def test_versions_after_restart():
+    before: int = MachineModel().version
+    restarted = subprocess.run([sys.executable, "-c", "from MyServer.Lifetime import MachineModel; "
+                                                      "print(MachineModel().version)"],
+                               cwd=Path(__file__).parents[3], capture_output=True, text=True, check=True)
+    assert int(restarted.stdout) > before, "Versions of a restarted process repeat the ones before."
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel, ConfigurationJournal
+from MyServer.OpcUa import ServerConfiguration
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+
+
+def test_journal_replay(tmp_path):
+    file_path: str = str(tmp_path / "model.json")
+    sut: MachineModel = MachineModel()
+    sut.open_journal(file_path)
+    for i in range(5):
+        sut.add_sensor(TemperatureSensor(i))
+    sut.add_sensor(PressureSensor(1))
+    sut.delete_sensor(sut.sensors[0].sensor_id)
+    pressure = sut.mutators[-1]
+    pressure._value_idle = 1100.0
+    sut.record_change(pressure.sensor.sensor_id)
+    sut.mutators[0].measure()
+    sut.checkpoint()
+    expected_start: float = sut.mutators[0].last_value
+    sut.close_journal()
+    assert not os.path.isfile(file_path), "Snapshot written without compaction."
+    with open(file_path + ".journal", "r") as f:
+        assert len(f.readlines()) == 9, "Not one line per change."
+
+    restored: MachineModel = MachineModel()
+    restored.open_journal(file_path)
+    try:
+        assert [x.identifier for x in restored.sensors] == [1, 2, 3, 4, 1]
+        assert restored.mutators[-1].to_driver_data().value_idle == 1100.0, "Changed parameters not restored."
+        assert restored.mutators[0].last_value == expected_start, "Last value not restored as start value."
+    finally:
+        restored.close_journal()
+
+
+def test_journal_partial_line(tmp_path):
+    file_path: str = str(tmp_path / "model.json")
+    sut: MachineModel = MachineModel()
+    sut.open_journal(file_path)
+    sut.add_sensor(TemperatureSensor(1))
+    sut.close_journal()
+    with open(file_path + ".journal", "a") as f:
+        f.write('{"op": "add", "entry": {"sens')  # crash while appending
+    assert len(ConfigurationJournal(file_path).load()) == 1
+
+
+def test_journal_compaction(tmp_path):
+    file_path: str = str(tmp_path / "model.json")
+    sut: MachineModel = MachineModel()
+    journal: ConfigurationJournal = sut.open_journal(file_path, compact_records=4)
+    for i in range(10):
+        sut.add_sensor(TemperatureSensor(i))
+    sut.save_configuration(file_path)  # compacts instead of rewriting
+    sut.close_journal()
+    assert journal.compactions >= 1
+    with open(file_path, "r") as f:
+        assert len(json.load(f)) == 10
+    with open(file_path + ".journal", "r") as f:
+        assert f.read() == "", "Journal not truncated after the snapshot."
+    assert not os.path.isfile(file_path + ".tmp")
+    assert len(ConfigurationJournal(file_path).load()) == 10
+
+
+@pytest.mark.asyncio
+async def test_server_stop_writes_journal(tmp_path):
+    file_path: str = str(tmp_path / "model.json")
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48463)
+    server = OpcUaTestServer(machine=MachineModel(), server_configuration=configuration, machine_model_file=file_path,
+                             journal=True)
+    server.model.add_sensor(TemperatureSensor(1, updates_per_second=20.0))
+    assert await server.setup_server()
+    await asyncio.sleep(0.5)
+    await server.stop()
+    assert server.model.journal is None, "Journal not closed on stop."
+    expected_start: float = server.model.mutators[0].last_value
+
+    restored: MachineModel = MachineModel()
+    restored.open_journal(file_path)
+    try:
+        assert [x.identifier for x in restored.sensors] == [1]
+        assert restored.mutators[0].last_value == expected_start, "Checkpoint at stop not written."
+    finally:
+        restored.close_journal()
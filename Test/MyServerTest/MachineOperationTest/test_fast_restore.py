@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from MyServer.Lifetime import MachineModel, iter_json_array, is_snapshot
+from MyServer.Sensor import TemperatureSensor, PressureSensor, WaveformSensor
+
+
+def create_model() -> MachineModel:
+    model: MachineModel = MachineModel()
+    for i in range(6):
+        model.add_sensor(TemperatureSensor(i, namespace=f"Hall{i % 2}") if i % 3 else PressureSensor(i),
+                         random_seed=i)
+    model.add_sensor(WaveformSensor(7, block_size=16))
+    model.add_sensor(TemperatureSensor(8))
+    return model
+
+
+@pytest.mark.parametrize("snapshot", [False, True])
+def test_restore_round_trip(tmp_path, snapshot):
+    model: MachineModel = create_model()
+    file_path: str = str(tmp_path / "configuration")
+    if snapshot:
+        model.save_snapshot(file_path)
+    else:
+        model.save_configuration(file_path)
+    assert is_snapshot(file_path) == snapshot
+
+    restored: MachineModel = MachineModel()
+    restored.restore_configuration(file_path)
+    assert [x.sensor_id for x in restored.sensors] == [x.sensor_id for x in model.sensors], "Order not preserved."
+    assert [x.to_driver_data().as_dict() for x in restored.mutators] == \
+           [x.to_driver_data().as_dict() for x in model.mutators]
+
+
+def test_restore_skips_malformed(tmp_path):
+    entries = [x.to_driver_data().as_dict() for x in create_model().mutators]
+    del entries[1]["st_dev"]  # the bulk construction of the group fails, its other drivers are created one by one
+    entries.insert(3, {"sensor": {"sensor_type": "Unknown"}})
+    file_path: str = str(tmp_path / "configuration.json")
+    with open(file_path, "w") as f:
+        json.dump(entries, f)
+
+    restored: MachineModel = MachineModel()
+    restored.restore_configuration(file_path)
+    assert [x.identifier for x in restored.sensors] == [0, 2, 3, 4, 5, 7, 8]
+
+
+def test_iter_json_array(tmp_path):
+    file_path = tmp_path / "array.json"
+    values = [{"a": [1, 2.5, "x"]}, 12345678, "text, with ] inside", None, {}]
+    file_path.write_text(json.dumps(values, indent=2))
+    for chunk_size in [1, 2, 3, 7, 64, 1 << 20]:
+        assert list(iter_json_array(str(file_path), chunk_size)) == values
+
+    for malformed in ["", "{}", "[1, 2", "[1,, 2]", "[1, 2,]"]:
+        file_path.write_text(malformed)
+        with pytest.raises(ValueError):
+            list(iter_json_array(str(file_path), 2))
@@ -0,0 +1,62 @@
+from MyServer.Lifetime.machine_model import MachineModel
+from MyServer.MachineOperation import Mode, State, StateCell
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+
+
+def test_cell_follows_parent():
+    parent: StateCell = StateCell(Mode.IDLE, State.NORMAL)
+    sut: StateCell = StateCell(parent=parent)
+    assert sut.mode == Mode.IDLE and sut.state == State.NORMAL
+    parent.mode = Mode.RUNNING
+    assert sut.mode == Mode.RUNNING, "Cell does not follow its parent."
+    sut.state = State.BROKEN
+    assert sut.state == State.BROKEN and parent.state == State.NORMAL, "Own state not kept apart from the parent."
+    sut.inherit()
+    assert sut.state == State.NORMAL, "Cell does not follow its parent after inherit."
+
+
+def test_drivers_share_machine_cell():
+    sut: MachineModel = MachineModel()
+    for i in range(10):
+        sut.add_sensor(TemperatureSensor(i))
+    sut.start_job()
+    sut.set_state_broken()
+    assert all(x.mode == Mode.RUNNING for x in sut.mutators), "Mode not propagated to the drivers."
+    assert all(x.state == State.BROKEN for x in sut.mutators), "State not propagated to the drivers."
+    assert all(x.cell is sut.mutators[0].cell for x in sut.mutators), "Drivers do not share one cell."
+
+
+def test_group_partial_failure():
+    sut: MachineModel = MachineModel()
+    temperature: TemperatureSensor = TemperatureSensor(1)
+    pressure: PressureSensor = PressureSensor(1)
+    sut.add_sensor(temperature)
+    sut.add_sensor(pressure)
+    sut.assign_group(pressure.sensor_id, "pump")
+    sut.group("pump").state = State.BROKEN
+    sut.start_job()
+    drivers = {x.sensor.sensor_id: x for x in sut.mutators}
+    assert drivers[pressure.sensor_id].state == State.BROKEN, "Group state not applied."
+    assert drivers[temperature.sensor_id].state == State.NORMAL, "Group state leaked to the machine."
+    assert drivers[pressure.sensor_id].mode == Mode.RUNNING, "Group does not follow the machine mode."
+    sut.group("pump").inherit()
+    assert drivers[pressure.sensor_id].state == State.NORMAL, "Group does not follow the machine after inherit."
+    sut.assign_group(pressure.sensor_id, None)
+    assert drivers[pressure.sensor_id].cell is drivers[temperature.sensor_id].cell
+
+
+def test_driver_state_of_its_own():
+    sut: MachineModel = MachineModel()
+    for i in range(3):
+        sut.add_sensor(TemperatureSensor(i))
+    changes: int = sut.changes.version
+    sut.mutators[0].state = State.BROKEN
+    assert sut.mutators[0].state == State.BROKEN
+    assert sut.state == State.NORMAL, "Driver state written to the machine."
+    assert all(x.state == State.NORMAL for x in sut.mutators[1:]), "Driver state leaked to the other drivers."
+    assert sut.changes.version == changes, "A driver of its own is no change of the machine."
+    sut.start_job()
+    assert sut.mutators[0].mode == Mode.RUNNING, "Driver does not follow the machine mode any more."
+    cell: StateCell = sut.mutators[0].cell
+    sut.mutators[0].mode = Mode.IDLE
+    assert sut.mutators[0].cell is cell and sut.mode == Mode.RUNNING
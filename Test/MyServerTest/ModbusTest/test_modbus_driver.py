@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+
+from MyServer.Lifetime import MachineModel
+from MyServer.Modbus import RegisterSpec, RegisterType, DataType, plan_blocks, ModbusConnection, ModbusDevice, \
+    ModbusDriver, ModbusError, ModbusStandIn
+from MyServer.Sensor import TemperatureSensor
+
+
+def test_decode():
+    for data_type, value in ((DataType.FLOAT32, 21.5), (DataType.INT16, -1234), (DataType.UINT16, 54321)):
+        for word_swap in (False, True):
+            spec = RegisterSpec(RegisterType.HOLDING, 0, data_type, word_swap)
+            assert spec.decode(spec.encode(value)) == value
+    assert RegisterSpec(RegisterType.HOLDING, 0).encode(1.0) == [0x3F80, 0x0000]
+    assert RegisterSpec(RegisterType.HOLDING, 0, word_swap=True).encode(1.0) == [0x0000, 0x3F80]
+
+
+def test_plan_blocks():
+    specs = [RegisterSpec(RegisterType.HOLDING, 2 * i) for i in range(100)]  # 200 contiguous registers
+    specs.append(RegisterSpec(RegisterType.HOLDING, 300, DataType.INT16))  # beyond the gap
+    specs.append(RegisterSpec(RegisterType.INPUT, 0, DataType.INT16))
+    blocks = plan_blocks(specs, max_gap=8)
+    assert [(x.register_type, x.address, x.count) for x in blocks] == [
+        (RegisterType.HOLDING, 0, 124), (RegisterType.HOLDING, 124, 76),
+        (RegisterType.HOLDING, 300, 1), (RegisterType.INPUT, 0, 1)]
+    assert sum(len(x.specs) for x in blocks) == len(specs)
+    assert len(plan_blocks(specs[:10], max_registers=2)) == 10
+
+
+@pytest.mark.asyncio
+async def test_coalesced_reads():
+    stand_in = ModbusStandIn()
+    await stand_in.start()
+    try:
+        device = ModbusDevice(ModbusConnection("127.0.0.1", stand_in.port), window=0.01)
+        specs = [RegisterSpec(RegisterType.HOLDING, 2 * i) for i in range(50)]
+        specs.append(RegisterSpec(RegisterType.INPUT, 7, DataType.INT16))
+        for i, spec in enumerate(specs):
+            stand_in.set_value(spec, i - 25)
+        values = await asyncio.gather(*(device.read(x) for x in specs))
+        assert values == [i - 25 for i in range(len(specs))]
+        assert device.requests == 2 and stand_in.requests == 2
+        assert await device.read_many(specs[:3]) == [-25, -24, -23]
+        with pytest.raises(ModbusError):
+            await device.read(RegisterSpec(RegisterType.HOLDING, 9999))  # past the last register
+        await device.connection.close()
+    finally:
+        await stand_in.close()
+
+
+@pytest.mark.asyncio
+async def test_reconnect():
+    stand_in = ModbusStandIn()
+    await stand_in.start()
+    port: int = stand_in.port
+    connection = ModbusConnection("127.0.0.1", port, timeout=0.5)
+    spec = RegisterSpec(RegisterType.HOLDING, 0)
+    stand_in.set_value(spec, 1.0)
+    assert (await connection.read_registers(1, RegisterType.HOLDING, 0, 2)) == spec.encode(1.0)
+    await stand_in.close()
+    with pytest.raises(ModbusError):
+        await connection.read_registers(1, RegisterType.HOLDING, 0, 2)
+    assert not connection.connected
+    stand_in = ModbusStandIn(port=port)
+    await stand_in.start()
+    try:
+        stand_in.set_value(spec, 2.0)
+        assert (await connection.read_registers(1, RegisterType.HOLDING, 0, 2)) == spec.encode(2.0)
+        await connection.close()
+    finally:
+        await stand_in.close()
+
+
+@pytest.mark.asyncio
+async def test_sensors_share_requests(tmp_path):
+    stand_in = ModbusStandIn()
+    await stand_in.start()
+    try:
+        model: MachineModel = MachineModel()
+        device = ModbusDevice.open("127.0.0.1", stand_in.port)
+        assert ModbusDevice.open("127.0.0.1", stand_in.port) is device
+        received: dict[int, float] = {}
+        for i in range(20):
+            spec = RegisterSpec(RegisterType.INPUT, 2 * i)
+            stand_in.set_value(spec, 100.0 + i)
+            sensor = TemperatureSensor(i, updates_per_second=20)
+            sensor.add_callback(lambda ts, v, i=i: received.__setitem__(i, v))
+            model.add_sensor(sensor, ModbusDriver(sensor, device, spec))
+        for sensor in model.sensors:
+            sensor.start()
+        await asyncio.sleep(0.3)
+        for _ in range(100):  # a collection of the garbage of earlier tests can stall the loop for a while
+            if len(received) == 20:
+                break
+            await asyncio.sleep(0.05)
+        for sensor in model.sensors:
+            sensor.stop()
+        assert received == {i: 100.0 + i for i in range(20)}
+        assert device.reads / device.requests > 10, "Reads of the same tick were not coalesced."
+
+        model.save_configuration(str(tmp_path / "model.json"))
+        restored: MachineModel = MachineModel()
+        restored.restore_configuration(str(tmp_path / "model.json"))
+        driver = restored.mutators[3]
+        assert isinstance(driver, ModbusDriver) and driver.device is device
+        assert driver.register == RegisterSpec(RegisterType.INPUT, 6)
+        assert await driver.measure() == 103.0
+        restored.delete_sensor(driver.sensor.sensor_id)
+        assert len(restored.mutators) == 19 and driver not in restored.mutators
+        await device.connection.close()
+    finally:
+        await stand_in.close()
+
+
+@pytest.mark.asyncio
+async def test_polling_resumes_after_restart():
+    stand_in = ModbusStandIn()
+    await stand_in.start()
+    port: int = stand_in.port
+    spec = RegisterSpec(RegisterType.HOLDING, 0)
+    stand_in.set_value(spec, 1.0)
+    device = ModbusDevice(ModbusConnection("127.0.0.1", port, timeout=0.2), window=0.01)
+    sensor = TemperatureSensor(1, updates_per_second=20)
+    values: list[float] = []
+    sensor.add_callback(lambda ts, v: values.append(v))
+    ModbusDriver(sensor, device, spec)
+    sensor.start()
+    try:
+        await asyncio.sleep(0.3)
+        assert values and values[-1] == 1.0
+        await stand_in.close()
+        await asyncio.sleep(0.5)  # reads fail while the device is away
+        stand_in = ModbusStandIn(port=port)
+        await stand_in.start()
+        stand_in.set_value(spec, 2.0)
+        for _ in range(100):
+            if values[-1] == 2.0:
+                break
+            await asyncio.sleep(0.05)
+        assert values[-1] == 2.0, "Polling did not resume after the device restarted."
+        assert sensor.running
+    finally:
+        sensor.stop()
+        await device.connection.close()
+        await stand_in.close()
+
+
+def test_device_on_another_loop():
+    port: int | None = None
+    spec = RegisterSpec(RegisterType.INPUT, 0)
+
+    async def read(value: float) -> float:
+        nonlocal port
+        stand_in = ModbusStandIn() if port is None else ModbusStandIn(port=port)
+        await stand_in.start()
+        port = stand_in.port
+        try:
+            stand_in.set_value(spec, value)
+            return await ModbusDevice.open("127.0.0.1", port).read(spec)
+        finally:
+            await stand_in.close()
+
+    assert asyncio.run(read(1.0)) == 1.0
+    device = ModbusDevice.open("127.0.0.1", port)
+    assert asyncio.run(read(2.0)) == 2.0  # the streams of the first loop are not used again
+    asyncio.run(ModbusDevice.close_all())
+    assert not device.connection.connected
+    assert ModbusDevice.open("127.0.0.1", port) is not device
@@ -0,0 +1,54 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from asyncua import Client, Node
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.OpcUa import ServerConfiguration, Aggregation, AggregateNodes
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Timing import ManualClock
+
+
+async def child(node: Node, name: str) -> Node:
+    return [x for x in await node.get_children() if (await x.read_browse_name()).Name == name][0]
+
+
+def test_groups():
+    sensors = [TemperatureSensor(1, namespace="Plant/Line1"), PressureSensor(2, namespace="Plant/Line1"),
+               TemperatureSensor(3)]
+    assert AggregateNodes(sensors, Aggregation.SENSOR_TYPE).groups == ["Temperature", "Pressure"]
+    assert AggregateNodes(sensors, Aggregation.NAMESPACE).groups == ["Plant.Line1", "Sensors"]
+    assert AggregateNodes(sensors, Aggregation.NONE).groups == []
+
+
+@pytest.mark.asyncio
+async def test_aggregate_nodes(tmp_path):
+    model: MachineModel = MachineModel()
+    sensors = [TemperatureSensor(i) for i in range(3)]
+    for sensor in sensors:
+        model.add_sensor(sensor)
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48452,
+                                        aggregation=Aggregation.SENSOR_TYPE)
+    clock = ManualClock()
+    sut: OpcUaTestServer = OpcUaTestServer(machine=model, server_configuration=configuration,
+                                           machine_model_file=str(tmp_path / "model.json"), clock=clock)
+    assert await sut.setup_server(), "Server setup not completed."
+    try:
+        stamp: datetime = datetime(2025, 1, 1, 12)
+        await sensors[1].on_new_data(stamp, 42.0)
+        async with Client(url=sut.end_point.replace("0.0.0.0", "127.0.0.1")) as client:
+            aggregate = await child(await child(client.nodes.objects, "Aggregates"), "Temperature")
+            assert await (await child(aggregate, "Identifiers")).read_value() == [0, 1, 2]
+            assert await (await child(aggregate, "SensorTypes")).read_value() == ["Temperature"] * 3
+            values_node = await child(aggregate, "Values")
+            for _ in range(50):  # refreshed once per tick
+                values = await values_node.read_value()
+                if values[1] == 42.0:
+                    break
+                await asyncio.sleep(0.02)
+            assert values[1] == 42.0, "Aggregate was not refreshed."
+            assert (await (await child(aggregate, "SensorTimes")).read_value())[1].replace(tzinfo=None) == stamp
+    finally:
+        await sut.stop()
@@ -0,0 +1,66 @@
+from collections import Counter
+
+import pytest
+from asyncua import Client, Node
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.OpcUa import ServerConfiguration, folder_layout, folder_path
+from MyServer.Sensor import TemperatureSensor
+from MyServer.Timing import ManualClock
+
+
+def test_folder_path():
+    assert folder_path("Sensors") == ("Sensors",)
+    assert folder_path("Plant/Line1//Cell3/") == ("Plant", "Line1", "Cell3")
+
+
+@pytest.mark.parametrize("count, max_folder_size", [(5, 10), (25, 10), (100, 10), (101, 10), (1001, 10), (0, 10)])
+def test_folder_layout(count: int, max_folder_size: int):
+    items = list(range(count))
+    layout = folder_layout(items, max_folder_size)
+    assert [x for _, x in layout] == items, "Items must keep their order."
+
+    children: dict[tuple[str, ...], set] = {}
+    for path, item in layout:
+        children.setdefault(path, set()).add(item)
+        for depth in range(len(path)):
+            children.setdefault(path[:depth], set()).add(path[depth])
+    assert all(len(x) <= max_folder_size for x in children.values()), "Folder exceeds the maximum size."
+
+
+def test_folder_layout_disabled():
+    assert Counter(path for path, _ in folder_layout(list(range(50)), 0)) == {(): 50}
+
+
+async def browse_names(node: Node) -> list[str]:
+    return [(await x.read_browse_name()).Name for x in await node.get_children()]
+
+
+async def child(node: Node, name: str) -> Node:
+    return [x for x in await node.get_children() if (await x.read_browse_name()).Name == name][0]
+
+
+@pytest.mark.asyncio
+async def test_folder_hierarchy(tmp_path):
+    model: MachineModel = MachineModel()
+    for i in range(25):
+        model.add_sensor(TemperatureSensor(i, namespace="Plant/Line1"))
+    model.add_sensor(TemperatureSensor(100, namespace="Plant/Line2"))
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48450,
+                                        max_folder_size=10)
+    sut: OpcUaTestServer = OpcUaTestServer(machine=model, server_configuration=configuration,
+                                           machine_model_file=str(tmp_path / "model.json"), clock=ManualClock())
+    assert await sut.setup_server(), "Server setup not completed."
+    try:
+        async with Client(url=sut.end_point.replace("0.0.0.0", "127.0.0.1")) as client:
+            plant = await child(client.nodes.objects, "Plant")
+            assert await browse_names(plant) == ["Line1", "Line2"]
+            line1 = await child(plant, "Line1")
+            assert await browse_names(line1) == ["00-09", "10-19", "20-24"]
+            last = await child(line1, "20-24")
+            assert await browse_names(last) == [f"Temperature_sensor_{i:03d}" for i in range(20, 25)]
+            line2 = await child(plant, "Line2")
+            assert await browse_names(line2) == ["Temperature_sensor_100"], "Small folders must not be split."
+    finally:
+        await sut.stop()
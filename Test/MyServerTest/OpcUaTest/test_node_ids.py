@@ -0,0 +1,45 @@
+import pytest
+from asyncua import Client, ua
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import SensorType
+from MyServer.OpcUa import ServerConfiguration, sensor_node_id, VALUE, SENSOR_TIME, SAMPLE_INTERVAL
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Timing import ManualClock
+
+
+def test_sensor_node_id():
+    assert sensor_node_id(SensorType.TEMPERATURE, 42) == 100000420
+    assert sensor_node_id(SensorType.TEMPERATURE, 42, VALUE) == 100000421
+    assert sensor_node_id(SensorType.PRESSURE, 42, SENSOR_TIME) == 200000422
+    assert sensor_node_id(SensorType.WAVEFORM, 42, SAMPLE_INTERVAL) == 300000423
+
+
+def test_sensor_node_id_out_of_range():
+    assert sensor_node_id(SensorType.TEMPERATURE, -1) is None
+    assert sensor_node_id(SensorType.TEMPERATURE, 10_000_000) is None
+    assert sensor_node_id(SensorType.TEMPERATURE, 1, "Unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_stable_node_ids(tmp_path):
+    model: MachineModel = MachineModel()
+    model.add_sensor(TemperatureSensor(42, namespace="Plant/Line1"))
+    model.add_sensor(PressureSensor(7))
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48451,
+                                        max_folder_size=10)
+    sut: OpcUaTestServer = OpcUaTestServer(machine=model, server_configuration=configuration,
+                                           machine_model_file=str(tmp_path / "model.json"), clock=ManualClock())
+    assert sut.node_id(model.sensors[0], VALUE) == "nsu=urn:TestCompany.com:opcua:Plant;i=100000421"
+    assert await sut.setup_server(), "Server setup not completed."
+    try:
+        async with Client(url=sut.end_point.replace("0.0.0.0", "127.0.0.1")) as client:
+            for sensor in model.sensors:
+                idx: int = await client.get_namespace_index(sut.get_uri(sensor.namespace.split("/")[0]))
+                for field in (None, VALUE, SENSOR_TIME):
+                    node = client.get_node(ua.NodeId(sensor_node_id(sensor.sensor_type, sensor.identifier, field), idx))
+                    expected: str = sensor.name if field is None else field
+                    assert (await node.read_browse_name()).Name == expected, f"Wrong node for {sensor.name} {field}."
+    finally:
+        await sut.stop()
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from asyncua import Client, Node, ua
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.OpcUa import ServerConfiguration, VALUE, SENSOR_TIME, SAMPLE_INTERVAL, sensor_node_id
+from MyServer.Sensor import WaveformSensor, WaveformBlock, TemperatureSensor
+from MyServer.Timing import ManualClock
+
+
+@pytest.mark.asyncio
+async def test_waveform_nodes(tmp_path):
+    model: MachineModel = MachineModel()
+    sensor: WaveformSensor = WaveformSensor(7, sample_rate=1024.0, block_size=64)
+    model.add_sensor(sensor)
+    model.add_sensor(TemperatureSensor(1))
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48454)
+    sut: OpcUaTestServer = OpcUaTestServer(machine=model, server_configuration=configuration,
+                                           machine_model_file=str(tmp_path / "model.json"), clock=ManualClock())
+    assert await sut.setup_server(), "Server setup not completed."
+    try:
+        sensor.stop()  # only the block written below
+        block = WaveformBlock(datetime(2025, 1, 1, 12), sensor.sample_interval, np.arange(64, dtype=np.float32))
+        await sensor.on_new_data(datetime(2025, 1, 1, 12, 0, 1), block)
+        async with Client(url=sut.end_point.replace("0.0.0.0", "127.0.0.1")) as client:
+            idx: int = await client.get_namespace_index(sut.get_uri("Sensors"))
+
+            def node(field: str) -> Node:
+                return client.get_node(ua.NodeId(sensor_node_id(sensor.sensor_type, sensor.identifier, field), idx))
+
+            value: Node = node(VALUE)
+            assert await value.read_value() == list(range(64))
+            assert await value.read_data_type_as_variant_type() == ua.VariantType.Float
+            assert await value.read_value_rank() == ua.ValueRank.OneDimension
+            assert await value.read_array_dimensions() == [64]
+            time: Node = node(SENSOR_TIME)
+            assert (await time.read_value()).replace(tzinfo=None) == block.start
+            interval: Node = node(SAMPLE_INTERVAL)
+            assert await interval.read_value() == 1 / 1024.0
+    finally:
+        await sut.stop()
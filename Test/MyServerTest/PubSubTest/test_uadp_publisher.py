@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.OpcUa import ServerConfiguration
+from MyServer.PubSub import UadpPublisher, UadpSubscriber, udp_address
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Timing import ManualClock
+
+MULTICAST: tuple[str, int] = ("239.255.0.1", 48460)
+
+
+def test_udp_address():
+    assert udp_address("opc.udp://239.0.0.1:4841") == ("239.0.0.1", 4841)
+    assert udp_address("opc.udp://localhost") == ("localhost", 4840)
+    with pytest.raises(ValueError):
+        udp_address("opc.tcp://localhost:4840")
+
+
+def test_layout():
+    sensors = [TemperatureSensor(i) for i in range(5)]
+    layout = UadpPublisher(sensors, MULTICAST, fields_per_message=2).layout
+    assert list(layout) == [1, 2, 3]
+    assert layout[3] == [sensors[4].sensor_id]
+
+
+@pytest.mark.asyncio
+async def test_multicast_fan_out():
+    sensors = [TemperatureSensor(i) for i in range(5)] + [PressureSensor(1)]
+    publisher = UadpPublisher(sensors, MULTICAST, fields_per_message=4, interface="127.0.0.1")
+    subscribers = [UadpSubscriber(MULTICAST, publisher.layout, publisher_id=1, interface="127.0.0.1")
+                   for _ in range(3)]
+    for subscriber in subscribers:
+        await subscriber.start()
+    await publisher.start()
+    try:
+        stamp: datetime = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+        await sensors[5].on_new_data(stamp, 1013.25)
+        publisher.publish()
+        assert publisher.messages_sent == 2, "Expected one network message per writer."
+        for subscriber in subscribers:
+            assert await subscriber.wait(2), "Messages not received."
+            assert subscriber.latest(sensors[5].sensor_id) == (stamp, pytest.approx(1013.25))
+            assert subscriber.latest(sensors[0].sensor_id)[1] == 0.0
+    finally:
+        publisher.close()
+        for subscriber in subscribers:
+            subscriber.close()
+
+
+@pytest.mark.asyncio
+async def test_server_publishes(tmp_path):
+    model: MachineModel = MachineModel()
+    sensor = TemperatureSensor(3)
+    model.add_sensor(sensor)
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48453,
+                                        pubsub_url="opc.udp://127.0.0.1:48461", publishing_interval=0.02)
+    sut: OpcUaTestServer = OpcUaTestServer(machine=model, server_configuration=configuration,
+                                           machine_model_file=str(tmp_path / "model.json"), clock=ManualClock())
+    subscriber = UadpSubscriber(("127.0.0.1", 48461))
+    await subscriber.start()
+    assert await sut.setup_server(), "Server setup not completed."
+    try:
+        sensor.stop()  # the value is set below
+        await sensor.on_new_data(datetime(2025, 1, 1, tzinfo=timezone.utc), 42.0)
+        assert await subscriber.wait(subscriber.received + 2), "Server did not publish."
+        assert subscriber.fields(1)[0].Value.Value == pytest.approx(42.0)
+    finally:
+        await sut.stop()
+        subscriber.close()
+    assert sut.publisher is None
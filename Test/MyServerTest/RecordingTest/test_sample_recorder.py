@@ -0,0 +1,95 @@
+import asyncio
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from MyServer.Dataset import OutputFormat
+from MyServer.Recording import SampleRecorder
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Timing import ManualClock
+
+
+class CountingSource:
+    value: float = 0.0
+
+    def read_value(self) -> float:
+        self.value += 1.0
+        return self.value
+
+
+def read(file_path: str) -> pd.DataFrame:
+    if file_path.endswith(".parquet"):
+        return pd.read_parquet(file_path)
+    if file_path.endswith(".arrow"):
+        with pa.memory_map(file_path, "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    return pd.read_csv(file_path)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("output_format", [OutputFormat.PARQUET, OutputFormat.ARROW, OutputFormat.CSV])
+async def test_record(output_format: OutputFormat, tmp_path):
+    clock: ManualClock = ManualClock()
+    sensors = [TemperatureSensor(1, updates_per_second=10.0), PressureSensor(1, updates_per_second=10.0)]
+    for sensor in sensors:
+        sensor.clock = clock
+        sensor.source = CountingSource().read_value
+
+    sut: SampleRecorder = SampleRecorder(str(tmp_path), output_format=output_format, batch_rows=8)
+    sut.start()
+    sut.record(sensors)
+    for sensor in sensors:
+        sensor.start()
+    await clock.advance(4.95)
+    for sensor in sensors:
+        sensor.stop()
+    sut.close()
+    assert sut.join(timeout=10.0), "Writer did not finish."
+
+    assert sut.recorded == 100
+    assert sut.dropped_batches == 0
+    frame = pd.concat([read(f) for f in sut.files])
+    assert list(frame.columns) == ["timestamp", "sensor", "value"]
+    assert len(frame) == 100, f"All samples must be written, got {len(frame)}."
+    temperature = frame[frame["sensor"] == sensors[0].name]
+    assert list(temperature["value"]) == [float(x) for x in range(1, 51)]
+    assert pd.to_datetime(temperature["timestamp"]).is_monotonic_increasing
+
+@pytest.mark.asyncio
+async def test_rotation(tmp_path):
+    clock: ManualClock = ManualClock()
+    sensor: TemperatureSensor = TemperatureSensor(1, updates_per_second=10.0)
+    sensor.clock = clock
+    sensor.source = CountingSource().read_value
+    sut: SampleRecorder = SampleRecorder(str(tmp_path), output_format=OutputFormat.CSV, batch_rows=10,
+                                         max_file_bytes=1)
+    sut.start()
+    sut.record([sensor])
+    sensor.start()
+    await clock.advance(2.95)
+    sensor.stop()
+    sut.close()
+    assert sut.join(timeout=10.0), "Writer did not finish."
+    assert len(sut.files) == 3, f"One file per batch expected, got {len(sut.files)}."
+
+@pytest.mark.asyncio
+async def test_flush_quiet_sensor(tmp_path):
+    clock: ManualClock = ManualClock()
+    sensor: TemperatureSensor = TemperatureSensor(1, updates_per_second=10.0)
+    sensor.clock = clock
+    sensor.source = CountingSource().read_value
+    sut: SampleRecorder = SampleRecorder(str(tmp_path), output_format=OutputFormat.CSV, flush_seconds=0.2)
+    sut.start()
+    sut.record([sensor])
+    sensor.start()
+    await clock.advance(0.25)
+    sensor.stop()
+    # no more samples, the writer hands over the batch when it is old
+    for _ in range(50):
+        if sut.files:
+            break
+        await asyncio.sleep(0.1)
+    assert sut.files, "Batch of a quiet sensor not written."
+    sut.close()
+    assert sut.join(timeout=10.0), "Writer did not finish."
+    assert len(read(sut.files[0])) == sut.recorded
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from MyServer.MachineOperation import SensorType
+from MyServer.Recording import ValueHistory, SENSOR_TYPES
+from MyServer.Recording.value_history import to_microseconds
+from MyServer.Sensor import TemperatureSensor, PressureSensor, WaveformSensor
+from MyServer.Sensor.Base import LatestValues
+
+START: datetime = datetime(2024, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_latest_and_window():
+    sensors = [TemperatureSensor(1), PressureSensor(2), WaveformSensor(3, block_size=4), TemperatureSensor(4)]
+    sut: ValueHistory = ValueHistory(sensors, depth=3)
+    assert [x.identifier for x in sut.sensors] == [1, 2, 4], "Array sensors must be skipped."
+    sut.start()
+    for i in range(5):
+        await sensors[0].on_new_data(START + timedelta(seconds=i), float(i))
+    await sensors[1].on_new_data(START, 10.0)
+
+    latest = sut.latest()
+    assert list(latest["identifier"]) == [1, 2], "Sensors without samples must be left out."
+    assert [SENSOR_TYPES[x] for x in latest["type"]] == [SensorType.TEMPERATURE, SensorType.PRESSURE]
+    assert list(latest["value"]) == [4.0, 10.0]
+    assert latest["timestamp"][0] == to_microseconds(START + timedelta(seconds=4))
+    assert to_microseconds(START.replace(tzinfo=timezone.utc)) == to_microseconds(START)
+
+    window = sut.window(sensor_type=SensorType.TEMPERATURE)
+    assert list(window["value"]) == [2.0, 3.0, 4.0], "Only the latest samples are kept, ordered by time."
+    window = sut.window(start=START + timedelta(seconds=3), end=START + timedelta(seconds=4))
+    assert list(window["value"]) == [3.0]
+    assert len(sut.window(identifier=2)["value"]) == 1
+
+    sut.close()
+    await sensors[0].on_new_data(START + timedelta(seconds=5), 5.0)
+    assert sut.latest()["value"][0] == 4.0, "Samples kept after closing."
+    assert isinstance(sut.latest()["value"], np.ndarray)
+
+
+@pytest.mark.asyncio
+async def test_started_by_first_read():
+    sensors = [TemperatureSensor(1), TemperatureSensor(2)]
+    latest = LatestValues(sensors, START)
+    latest.start()
+    sut: ValueHistory = ValueHistory(sensors, latest=latest)
+    await sensors[1].on_new_data(START, 1.0)
+    assert list(sut.latest()["value"]) == [1.0], "Seeded with the current values."
+    await sensors[0].on_new_data(START + timedelta(seconds=1), 2.0)
+    assert list(sut.latest()["value"]) == [2.0, 1.0], "Kept from the first read on."
+    sut.close()
+    latest.close()
@@ -1,4 +1,3 @@
-import asyncio
 import pytest
 from datetime import datetime
 
@@ -10,6 +9,7 @@ from MyServer.Simulation import (
 from MyServer.Sensor import TemperatureSensor
 from MyServer.MachineOperation import Mode
 from MyServer.Sensor.Base import SensorDictBase
+from MyServer.Timing import ManualClock
 
 
 class TestSensorConsumer:
@@ -29,17 +29,19 @@ def test_measure():
 @pytest.mark.asyncio
 async def test_updates():
     sensor: TemperatureSensor = TemperatureSensor(1, updates_per_second=100)
+    clock: ManualClock = ManualClock()
+    sensor.clock = clock
     consumer = TestSensorConsumer()
     sensor.add_callback(consumer.callback)
     sut: TemperatureSimulationDriver = TemperatureSimulationDriver(sensor, start_value=20.0, value_running=200)
     sensor.start()
-    await asyncio.sleep(2.0 / sensor.updates_per_second)  # make sure data is written
+    await clock.advance(2.0 / sensor.updates_per_second)  # make sure data is written
     start_temperature = consumer.temperature
     start_time = consumer.time_stamp
     assert start_temperature > 0
     assert start_time is not None
     sut.mode = Mode.RUNNING
-    await asyncio.sleep(10.0 / sensor.updates_per_second)  # make sure value has time to increase
+    await clock.advance(10.0 / sensor.updates_per_second)  # make sure value has time to increase
     sensor.stop()
     end_temperature = consumer.temperature
     end_time = consumer.time_stamp
@@ -50,16 +52,18 @@ async def test_updates():
 @pytest.mark.asyncio
 async def test_adaption():
     sensor: TemperatureSensor = TemperatureSensor(1, updates_per_second=100)
+    clock: ManualClock = ManualClock()
+    sensor.clock = clock
     consumer = TestSensorConsumer()
     sensor.add_callback(consumer.callback)
     # don't increase the st_dev value, this is here to have a very deterministic behaviour of temperature
     sut: TemperatureSimulationDriver = TemperatureSimulationDriver(sensor, start_value=20.0, value_running=200, st_dev=10e-8)
     sensor.start()
-    await asyncio.sleep(2.0 / sensor.updates_per_second) # make sure data is written
+    await clock.advance(2.0 / sensor.updates_per_second) # make sure data is written
     raw_data = [consumer.temperature] * 10
     sut.mode = Mode.RUNNING
     for i in range(1, 10):
-        await asyncio.sleep(1.0 / sensor.updates_per_second)
+        await clock.advance(1.0 / sensor.updates_per_second)
         raw_data[i] = consumer.temperature
     sensor.stop()  # we don't need to have it running for the rest of the test, just see that the data increases
     last_difference = 10000.0
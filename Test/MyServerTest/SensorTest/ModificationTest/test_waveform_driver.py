@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import Mode, State, SensorType
+from MyServer.Sensor import WaveformSensor, WaveformBlock
+from MyServer.Simulation import WaveformSimulationDriver, WaveformSimulationDriverFactory
+from MyServer.Timing import ManualClock
+
+
+def amplitude(block: WaveformBlock, frequency: float) -> float:
+    spectrum = np.abs(np.fft.rfft(block.samples)) * 2 / len(block)
+    return float(spectrum[round(frequency * len(block) * block.sample_interval)])
+
+
+def test_sensor():
+    sensor: WaveformSensor = WaveformSensor(1, sample_rate=10240.0, block_size=1024)
+    assert sensor.sensor_type == SensorType.WAVEFORM
+    assert SensorType.WAVEFORM.is_array and not SensorType.TEMPERATURE.is_array
+    assert sensor.updates_per_second == 10.0
+    assert sensor.sample_interval == 1 / 10240.0
+    with pytest.raises(ValueError):
+        WaveformSensor(1, block_size=0)
+
+
+def test_measure():
+    sensor: WaveformSensor = WaveformSensor(1, sample_rate=1024.0, block_size=1024)
+    sensor.clock = ManualClock()
+    sut: WaveformSimulationDriver = WaveformSimulationDriver(sensor, start_value=2.0, frequency=50.0,
+                                                             fault_frequency=150.0, st_dev=0.01)
+    block: WaveformBlock = sut.measure()
+    assert len(block) == 1024
+    assert block.samples.dtype == np.float32
+    assert abs(float(block.samples.mean()) - 2.0) < 0.01
+    assert amplitude(block, 50.0) == pytest.approx(0.1, abs=0.01)
+
+    sut.mode = Mode.RUNNING
+    sut.state = State.BROKEN
+    block = sut.measure()
+    assert amplitude(block, 50.0) == pytest.approx(1.0, abs=0.01)
+    assert amplitude(block, 150.0) == pytest.approx(0.5, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_continuous_blocks():
+    sensor: WaveformSensor = WaveformSensor(1, sample_rate=1000.0, block_size=100)
+    clock: ManualClock = ManualClock()
+    sensor.clock = clock
+    blocks: list[WaveformBlock] = []
+    sensor.add_callback(lambda ts, block: blocks.append(block))
+    WaveformSimulationDriver(sensor, st_dev=0.0)
+    sensor.start()
+    await clock.advance(0.35)
+    sensor.stop()
+    assert len(blocks) >= 3
+    for previous, block in zip(blocks, blocks[1:]):
+        assert block.start == previous.end
+    # no phase jump at the block border: the step is as small as within the block
+    samples = np.concatenate([x.samples for x in blocks])
+    assert np.abs(np.diff(samples)).max() < 2 * np.pi * 50.0 * 0.1 * 0.001 * 1.01
+
+
+@pytest.mark.asyncio
+async def test_phase_after_lag():
+    sensor: WaveformSensor = WaveformSensor(1, sample_rate=1000.0, block_size=100)
+    clock: ManualClock = ManualClock()
+    sensor.clock = clock
+    sut: WaveformSimulationDriver = WaveformSimulationDriver(sensor, amplitude_idle=1.0, frequency=3.0, st_dev=0.0)
+    first: WaveformBlock = sut.measure()
+    await clock.advance(1.234)
+    block: WaveformBlock = sut.measure()
+    assert block.start > first.end
+    # the phase is that of the time since the first block, not that of the samples measured
+    elapsed: float = (block.start - first.start).total_seconds()
+    assert float(block.samples[0]) == pytest.approx(np.sin(2 * np.pi * 3.0 * elapsed), abs=1e-4)
+
+
+def test_configuration(tmp_path):
+    model: MachineModel = MachineModel()
+    model.add_sensor(WaveformSensor(3, sample_rate=2048.0, block_size=256), frequency=60.0)
+    model.save_configuration(str(tmp_path / "model.json"))
+    restored: MachineModel = MachineModel()
+    restored.restore_configuration(str(tmp_path / "model.json"))
+    driver = restored.mutators[0]
+    assert isinstance(driver, WaveformSimulationDriver)
+    assert driver.sensor.block_size == 256
+    assert driver.sensor.sample_rate == 2048.0
+    assert driver.to_driver_data() == model.mutators[0].to_driver_data()
+    assert WaveformSimulationDriverFactory.from_dict(model.mutators[0].to_driver_data().as_dict()).sensor.identifier == 3
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+import pytest
+
+from MyServer.Sensor import TemperatureSensor, WaveformSensor
+from MyServer.Sensor.Base import LatestValues
+
+START: datetime = datetime(2024, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_one_callback_for_all_consumers():
+    sensors = [TemperatureSensor(1), WaveformSensor(2, block_size=4), TemperatureSensor(3)]
+    sut = LatestValues(sensors, START)
+    assert sut.sensors == [sensors[0], sensors[2]], "Array sensors must be skipped."
+    assert sut.position(sensors[2]) == 1 and sut.position(sensors[1]) is None
+    samples: list[tuple[int, datetime, float]] = []
+    sut.add_listener(lambda position, ts, v: samples.append((position, ts, v)))
+    sut.start()
+    sut.start()
+    await sensors[2].on_new_data(START.replace(second=1), 21.5)
+    assert sut.values == [0.0, 21.5] and sut.times == [START, START.replace(second=1)]
+    assert samples == [(1, START.replace(second=1), 21.5)], "One call per sample, also if started twice."
+    sut.close()
+    await sensors[2].on_new_data(START.replace(second=2), 22.0)
+    assert sut.values == [0.0, 21.5] and len(samples) == 1
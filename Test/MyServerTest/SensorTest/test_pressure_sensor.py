@@ -1,8 +1,8 @@
-import asyncio
 import pytest
 
 
 from MyServer.Sensor import PressureSensor
+from MyServer.Timing import ManualClock
 from datetime import datetime
 
 class TestPressureSource:
@@ -53,11 +53,13 @@ async def test_start_top():  # async to make sure that an event loop is running
 async def test_set_source():
     test_sensor: TestPressureSource = TestPressureSource()
     sut: PressureSensor = PressureSensor(1)
+    clock: ManualClock = ManualClock()
+    sut.clock = clock
     assert not sut.running
     assert sut.source is None
     sut.source = test_sensor.read_value
     sut.start()
-    await asyncio.sleep(2.0/sut.updates_per_second)  # let the value update
+    await clock.advance(2.0/sut.updates_per_second)  # let the value update
     sut.stop()
     assert test_sensor.read == True
 
@@ -65,10 +67,27 @@ async def test_set_source():
 async def test_callback():
     test_sensor: TestPressureSource = TestPressureSource()
     sut: PressureSensor = PressureSensor(1)
+    clock: ManualClock = ManualClock()
+    sut.clock = clock
     sut.source = test_sensor.read_value
     sut.add_callback(test_sensor.callback)
     sut.start()
-    await asyncio.sleep(2.0 / sut.updates_per_second)
+    await clock.advance(2.0 / sut.updates_per_second)
     sut.stop()
     assert test_sensor.callback_called
     assert test_sensor.callback_called_value > 0
+
+@pytest.mark.asyncio
+async def test_polling_interval():
+    test_sensor: TestPressureSource = TestPressureSource()
+    sut: PressureSensor = PressureSensor(1, updates_per_second=2.0)
+    clock: ManualClock = ManualClock()
+    sut.clock = clock
+    sut.source = test_sensor.read_value
+    sut.add_callback(test_sensor.callback)
+    start = clock.now()
+    sut.start()
+    await clock.advance(10.0)
+    sut.stop()
+    assert test_sensor.last_value == 21, "One sample at start plus two per second expected."
+    assert (test_sensor.callback_called_when - start).total_seconds() == 10.0
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from MyServer.Sensor import TemperatureSensor
+from MyServer.Sensor.Base import SampleBatch
+from MyServer.Timing import ManualClock
+
+
+class Consumer:
+    def __init__(self):
+        self.samples: list[tuple[datetime, float]] = []
+
+    async def callback(self, dt: datetime, f: float):
+        self.samples.append((dt, f))
+
+
+@pytest.mark.asyncio
+async def test_async_source():
+    sensor: TemperatureSensor = TemperatureSensor(1, updates_per_second=10)
+    clock: ManualClock = ManualClock()
+    sensor.clock = clock
+    consumer = Consumer()
+    sensor.add_callback(consumer.callback)
+
+    async def read() -> float:
+        await asyncio.sleep(0)  # I/O, the event loop keeps running
+        return 21.5
+
+    sensor.source = read
+    sensor.start()
+    await clock.advance(0.25)
+    sensor.stop()
+    assert [v for _, v in consumer.samples] == [21.5] * 3
+
+
+@pytest.mark.asyncio
+async def test_batch_source():
+    sensor: TemperatureSensor = TemperatureSensor(1, updates_per_second=10)
+    clock: ManualClock = ManualClock(start=datetime(2025, 1, 1))
+    sensor.clock = clock
+    consumer = Consumer()
+    sensor.add_callback(consumer.callback)
+    read: int = 0
+
+    async def read_batch() -> SampleBatch[float]:
+        nonlocal read
+        read += 1
+        now: datetime = clock.now()
+        return SampleBatch([now - timedelta(seconds=0.05), now], [float(read), read + 0.5])
+
+    sensor.source = read_batch
+    sensor.start()
+    await clock.advance(0.15)
+    sensor.stop()
+    assert [v for _, v in consumer.samples] == [1.0, 1.5, 2.0, 2.5]
+    assert consumer.samples[1][0] - consumer.samples[0][0] == timedelta(seconds=0.05)
+
+
+@pytest.mark.asyncio
+async def test_synchronous_batch_source():
+    sensor: TemperatureSensor = TemperatureSensor(1, updates_per_second=10)
+    clock: ManualClock = ManualClock(start=datetime(2025, 1, 1))
+    sensor.clock = clock
+    consumer = Consumer()
+    sensor.add_callback(consumer.callback)
+    stamps = [datetime(2024, 12, 31, 23, 59, 59, 500000), datetime(2024, 12, 31, 23, 59, 59, 750000)]
+    sensor.source = lambda: SampleBatch(stamps, [1.0, 2.0])
+    sensor.start()
+    await clock.advance(0.05)
+    sensor.stop()
+    assert consumer.samples == list(zip(stamps, [1.0, 2.0]))
+
+
+@pytest.mark.asyncio
+async def test_failed_source():
+    sensor: TemperatureSensor = TemperatureSensor(1, updates_per_second=10)
+    failing: list[bool] = [True]
+
+    async def read() -> float:
+        if failing[0]:
+            raise ConnectionError("Device gone.")
+        return 21.5
+
+    sensor.source = read
+    sensor.start()
+    for _ in range(10):
+        await asyncio.sleep(0.01)
+    assert not sensor.running, "Sensor reported running after its poller ended."
+    failing[0] = False
+    sensor.start()  # replaces the ended poller
+    assert sensor.running
+    sensor.stop()
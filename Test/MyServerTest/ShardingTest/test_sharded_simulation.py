@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import Mode
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Sharding import ShardedSimulation, SharedValueTable
+from MyServer.Sharding.shared_value_table import WRITING, to_microseconds
+from MyServer.Timing import ScaledClock
+
+
+def test_shared_value_table():
+    table: SharedValueTable = SharedValueTable.create(4, 2)
+    try:
+        other: SharedValueTable = SharedValueTable.attach(table.name, 4, 2)
+        table.values[2] = 3.5
+        table.timestamps[2] = 17
+        table.mode = Mode.RUNNING
+        other.add_samples(1, 5)
+        assert other.values[2] == 3.5 and other.timestamps[2] == 17, "Values not shared."
+        assert other.mode == Mode.RUNNING, "Mode not shared."
+        assert table.samples(1) == 5 and table.samples() == 5, "Counters not shared."
+        assert not other.stop_requested
+        table.request_stop()
+        assert other.stop_requested, "Stop request not shared."
+        other.close()
+    finally:
+        table.close()
+        table.unlink()
+
+
+@pytest.mark.asyncio
+async def test_sharded_simulation():
+    model: MachineModel = MachineModel()
+    for i in range(3):
+        model.add_sensor(TemperatureSensor(i, updates_per_second=20.0), adaption_rate=0.05)
+    model.add_sensor(PressureSensor(1, updates_per_second=20.0))
+    received: dict[str, list[tuple[datetime, float]]] = {s.name: [] for s in model.sensors}
+    clock: ScaledClock = ScaledClock()
+    lags: list[float] = []
+    for sensor in model.sensors:
+        async def callback(ts: datetime, value: float, name: str = sensor.name):
+            received[name].append((ts, value))
+            lags.append((clock.now() - ts).total_seconds())
+        sensor.add_callback(callback)
+
+    sut: ShardedSimulation = ShardedSimulation(model, shards=2, clock=clock)
+    sut.start()
+    try:
+        assert sut.table.shards == 2
+        assert all(s.source is None for s in model.sensors), "Sensors still poll the local drivers."
+        task = asyncio.create_task(sut.run())
+        deadline = asyncio.get_running_loop().time() + 30.0
+        while sut.table.samples() < 40 and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.1)
+        assert sut.table.samples(0) > 0 and sut.table.samples(1) > 0, "Not every shard produced samples."
+
+        model.start_job()
+        await asyncio.sleep(1.0)
+        task.cancel()
+        await sut.poll()
+    finally:
+        await sut.stop()
+
+    assert not sut.running
+    for name, samples in received.items():
+        assert len(samples) > 5, f"Too few samples for {name}."
+        times = [ts for ts, _ in samples]
+        assert times == sorted(times), f"Samples of {name} out of order."
+    temperature = received[model.sensors[0].name]
+    assert temperature[0][1] < 40.0 < temperature[-1][1], "Mode change did not reach the workers."
+    assert all(s.source is not None for s in model.sensors), "Drivers not handed back."
+    # the workers continue the clock of the server, their startup time must not shift the time stamps
+    assert -0.1 < min(lags) and max(lags) < 1.0, f"Time stamps off the server clock by {min(lags)} to {max(lags)} s."
+
+
+@pytest.mark.asyncio
+async def test_torn_and_deleted_slots():
+    model: MachineModel = MachineModel()
+    for i in range(3):
+        model.add_sensor(TemperatureSensor(i, updates_per_second=0.01))  # one sample at the start, then quiet
+    received: dict[int, list[float]] = {s.identifier: [] for s in model.sensors}
+    for sensor in model.sensors:
+        sensor.add_callback(lambda ts, v, i=sensor.identifier: received[i].append(v))
+    sut: ShardedSimulation = ShardedSimulation(model, shards=1)
+    sut.start()
+    try:
+        deadline = asyncio.get_running_loop().time() + 30.0
+        while sut.table.samples() < 3 and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.1)
+        assert await sut.poll() == 3
+
+        # a worker in the middle of writing the slot: the value is not handed over before its time stamp
+        table = sut.table
+        table.timestamps[0] = WRITING
+        table.values[0] = 99.0
+        assert await sut.poll() == 0, "Slot handed over while written."
+        table.timestamps[0] = to_microseconds(datetime(2030, 1, 1))
+        assert await sut.poll() == 1
+        assert received[0][-1] == 99.0
+
+        deleted = model.sensors[1]
+        model.delete_sensor(deleted.sensor_id)
+        table.values[1] = 98.0
+        table.timestamps[1] = to_microseconds(datetime(2030, 1, 1))
+        assert await sut.poll() == 0, "Deleted sensor still fed."
+        assert received[1][-1] != 98.0
+        assert deleted not in sut.sensors and len(sut.sensors) == 2
+    finally:
+        await sut.stop()
+    assert deleted.source is None, "Driver handed back to a deleted sensor."
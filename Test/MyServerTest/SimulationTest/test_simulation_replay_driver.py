@@ -0,0 +1,83 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from MyServer.Lifetime import MachineModel
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Simulation import ReplayFile, ReplaySimulationDriver, ReplaySimulationDriverFactory
+from MyServer.Timing import ManualClock
+
+
+@pytest.fixture
+def replay_file_path(tmp_path) -> str:
+    """Ten seconds of recording at 1 Hz, written in two record batches."""
+    file_path = os.path.join(tmp_path, "recording.arrow")
+    timestamps = pa.array(np.datetime64("2025-01-01T00:00:00", "ns") + np.arange(10) * np.timedelta64(1, "s"),
+                          type=pa.timestamp("ns"))
+    table = pa.table({
+        "timestamp": timestamps,
+        "Temperature_sensor_001": np.arange(10, dtype=np.float64),
+        "Pressure_sensor_001": 1000.0 + np.arange(10, dtype=np.float64)
+    })
+    with pa.OSFile(file_path, "wb") as f:
+        with pa.ipc.new_file(f, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=4):
+                writer.write_batch(batch)
+    return file_path
+
+
+def test_value_at(replay_file_path: str):
+    sut: ReplayFile = ReplayFile(replay_file_path)
+    assert sut.duration == 9.0
+    assert sut.column_names == ["Temperature_sensor_001", "Pressure_sensor_001"]
+    assert sut.value_at("Temperature_sensor_001", 0.0) == 0.0
+    assert sut.value_at("Temperature_sensor_001", 4.5) == 4.0, "Last sample before the time expected."
+    assert sut.value_at("Temperature_sensor_001", 5.0) == 5.0, "Sample across a batch boundary expected."
+    assert sut.value_at("Temperature_sensor_001", 12.0) == 2.0, "Replay was expected to loop."
+    assert sut.value_at("Temperature_sensor_001", 12.0, loop=False) == 9.0, "Last value was expected to be held."
+    with pytest.raises(KeyError):
+        sut.value_at("unknown", 0.0)
+
+def test_open_shares_file(replay_file_path: str):
+    first: ReplayFile = ReplayFile.open(replay_file_path)
+    second: ReplayFile = ReplayFile.open(replay_file_path)
+    assert first is second, "Drivers of the same file must share the memory map."
+
+@pytest.mark.asyncio
+async def test_replay(replay_file_path: str):
+    clock: ManualClock = ManualClock(datetime(2030, 1, 1))
+    replay_file: ReplayFile = ReplayFile.open(replay_file_path)
+    temperature_sensor: TemperatureSensor = TemperatureSensor(1, updates_per_second=1.0)
+    pressure_sensor: PressureSensor = PressureSensor(1, updates_per_second=1.0)
+    received: dict[str, list[float]] = {temperature_sensor.name: [], pressure_sensor.name: []}
+    for sensor in (temperature_sensor, pressure_sensor):
+        sensor.clock = clock
+        sensor.add_callback(lambda _, v, name=sensor.name: received[name].append(v))
+        ReplaySimulationDriver(sensor, replay_file, sensor.name, speed=2.0)
+        sensor.start()
+
+    await clock.advance(3.0)
+    temperature_sensor.stop()
+    pressure_sensor.stop()
+    assert received[temperature_sensor.name] == [0.0, 2.0, 4.0, 6.0], "Replay at double speed expected."
+    assert received[pressure_sensor.name] == [1000.0, 1002.0, 1004.0, 1006.0]
+
+def test_restore_configuration(replay_file_path: str, tmp_path):
+    sensor: TemperatureSensor = TemperatureSensor(1)
+    creator: MachineModel = MachineModel()
+    creator.add_sensor(sensor, ReplaySimulationDriver(sensor, ReplayFile.open(replay_file_path),
+                                                      "Temperature_sensor_001", speed=5.0, loop=False))
+    file_path = os.path.join(tmp_path, "configuration.json")
+    creator.save_configuration(file_path)
+
+    sut: MachineModel = MachineModel()
+    sut.restore_configuration(file_path)
+    driver = sut.mutators[0]
+    assert isinstance(driver, ReplaySimulationDriver)
+    assert driver.speed == 5.0
+    assert not driver.loop
+    assert driver.to_driver_data().as_dict() == ReplaySimulationDriverFactory.from_dict(
+        driver.to_driver_data().as_dict()).to_driver_data().as_dict()
@@ -0,0 +1,77 @@
+import socket
+
+import pytest
+from asyncua import Client, ua
+
+from MyServer.MachineOperation import Mode, SensorType
+from MyServer.OpcUa import ServerConfiguration, namespace_uri, sensor_node_id, SENSOR_TIME
+from MyServer.Sensor import TemperatureSensor, PressureSensor
+from MyServer.Supervision import EndpointSupervisor
+
+
+async def browse(end_point: str) -> dict[str, list[str]]:
+    """Get the sensor names below every folder of the objects node which is not part of the standard."""
+    async with Client(url=end_point.replace("0.0.0.0", "127.0.0.1")) as client:
+        folders: dict[str, list[str]] = {}
+        for child in await client.nodes.objects.get_children():
+            name = await child.read_browse_name()
+            if name.NamespaceIndex == 0:
+                continue
+            folders[name.Name] = [(await x.read_browse_name()).Name for x in await child.get_children()]
+        return folders
+
+
+@pytest.mark.asyncio
+async def test_endpoint_supervisor(tmp_path):
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48430)
+    sut: EndpointSupervisor = EndpointSupervisor({"LineA": 48431, "LineB": 48432}, server_configuration=configuration,
+                                                 machine_model_file=str(tmp_path / "model.json"))
+    sut.model.add_sensor(TemperatureSensor(1, namespace="LineA", updates_per_second=10))
+    sut.model.add_sensor(TemperatureSensor(2, namespace="LineB", updates_per_second=10))
+    sut.model.add_sensor(PressureSensor(1, namespace="LineB", updates_per_second=10))
+    sut.model.add_sensor(PressureSensor(2, updates_per_second=10))
+    try:
+        assert await sut.setup_server(), "Endpoints did not start."
+        assert sut.alive_status()
+        assert set(sut.end_points) == {48430, 48431, 48432}
+
+        line_a = await browse(sut.end_point_of(48431))
+        assert line_a == {"LineA": ["Temperature_sensor_001"]}, f"Unexpected data model {line_a}."
+        line_b = await browse(sut.end_point_of(48432))
+        assert line_b == {"LineB": ["Temperature_sensor_002", "Pressure_sensor_001"]}, \
+            f"Unexpected data model {line_b}."
+        default = await browse(sut.end_point_of(48430))
+        assert default == {"Sensors": ["Pressure_sensor_002"]}, f"Unexpected data model {default}."
+
+        # the workers continue the clock of the supervisor, their startup time must not shift the time stamps
+        async with Client(url=sut.end_point_of(48431).replace("0.0.0.0", "127.0.0.1")) as client:
+            idx: int = await client.get_namespace_index(namespace_uri(configuration.company, "LineA"))
+            node = client.get_node(ua.NodeId(sensor_node_id(SensorType.TEMPERATURE, 1, SENSOR_TIME), idx))
+            # encode the supervisor time like the server encodes the worker time, this hides the time zone of the host
+            now = ua.win_epoch_to_datetime(ua.datetime_to_win_epoch(sut.clock.now()))
+            lag: float = (now - await node.read_value()).total_seconds()
+        assert -0.1 < lag < 1.0, f"Time stamps off the supervisor clock by {lag} s."
+
+        await sut.start_job()
+        assert sut.is_job_running
+        assert sut.model.mode == Mode.RUNNING
+    finally:
+        await sut.stop()
+    assert not sut.alive_status()
+    assert not sut.is_initialized, "Stopped endpoints cannot be started again."
+
+
+@pytest.mark.asyncio
+async def test_failed_setup(tmp_path):
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48433)
+    sut: EndpointSupervisor = EndpointSupervisor({}, server_configuration=configuration,
+                                                 machine_model_file=str(tmp_path / "model.json"))
+    sut.model.add_sensor(TemperatureSensor(1, updates_per_second=10))
+    with socket.create_server(("0.0.0.0", 48433)):  # the port is taken, the worker cannot serve on it
+        assert not await sut.setup_server(), "Setup on a taken port reported success."
+    assert not sut.is_initialized, "Failed setup blocks the next one."
+    try:
+        assert await sut.start(), "Endpoints did not start after the port was released."
+        assert sut.alive_status()
+    finally:
+        await sut.stop()
@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from MyServer.Timing import ManualClock
+
+
+def test_now_does_not_move():
+    start: datetime = datetime(2025, 1, 1)
+    sut: ManualClock = ManualClock(start)
+    assert sut.now() == start
+    assert sut.now() == start
+
+@pytest.mark.asyncio
+async def test_advance_without_sleepers():
+    start: datetime = datetime(2025, 1, 1)
+    sut: ManualClock = ManualClock(start)
+    await sut.advance(12.5)
+    assert sut.now() == start + timedelta(seconds=12.5)
+
+@pytest.mark.asyncio
+async def test_sleepers_woken_in_order():
+    start: datetime = datetime(2025, 1, 1)
+    sut: ManualClock = ManualClock(start)
+    woken: list[tuple[str, datetime]] = []
+
+    async def sleeper(name: str, seconds: float):
+        await sut.sleep(seconds)
+        woken.append((name, sut.now()))
+
+    tasks = [asyncio.create_task(sleeper("late", 3.0)), asyncio.create_task(sleeper("early", 1.0))]
+    await sut.advance(2.0)
+    assert woken == [("early", start + timedelta(seconds=1.0))], "Only the early sleeper must be woken."
+    await sut.advance(2.0)
+    assert [name for name, _ in woken] == ["early", "late"]
+    assert woken[1][1] == start + timedelta(seconds=3.0), "Sleeper must see the time of its deadline."
+    await asyncio.gather(*tasks)
+
+@pytest.mark.asyncio
+async def test_periodic_task():
+    sut: ManualClock = ManualClock()
+    ticks: list[datetime] = []
+
+    async def periodic():
+        while True:
+            ticks.append(sut.now())
+            await sut.sleep(0.1)
+
+    task = asyncio.create_task(periodic())
+    await sut.advance(1.0)
+    task.cancel()
+    assert len(ticks) == 11, f"Eleven ticks expected, got {len(ticks)}."
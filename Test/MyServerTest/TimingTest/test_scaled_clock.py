@@ -0,0 +1,39 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from MyServer.Timing import ScaledClock
+
+
+def test_speed():
+    sut: ScaledClock = ScaledClock(speed=100.0)
+    start: datetime = sut.now()
+    time.sleep(0.05)
+    elapsed: float = (sut.now() - start).total_seconds()
+    assert elapsed >= 5.0, f"At least five simulated seconds expected, got {elapsed}."
+
+def test_change_speed_continues_time():
+    sut: ScaledClock = ScaledClock(speed=1000.0)
+    time.sleep(0.01)
+    before: datetime = sut.now()
+    sut.speed = 1.0
+    assert sut.speed == 1.0
+    assert sut.now() >= before, "Time must not jump back when the speed is changed."
+
+def test_epoch():
+    start: datetime = datetime(2024, 1, 1)
+    sut: ScaledClock = ScaledClock(speed=2.0, start=start, epoch=time.time() - 1.0)
+    elapsed: float = (sut.now() - start).total_seconds()
+    assert 2.0 <= elapsed < 2.5, f"Clock must continue from the epoch, got {elapsed} s."
+
+def test_invalid_speed():
+    with pytest.raises(ValueError):
+        ScaledClock(speed=0.0)
+
+@pytest.mark.asyncio
+async def test_sleep():
+    sut: ScaledClock = ScaledClock(speed=100.0)
+    start: float = time.monotonic()
+    await sut.sleep(5.0)
+    assert time.monotonic() - start < 1.0, "Sleep must be scaled to real time."
@@ -0,0 +1,18 @@
+import pickle
+import time
+from datetime import datetime
+
+from MyServer.Timing import ScaledClock, WorkerClock, spawn_workers
+
+
+def test_spawn_workers():
+    parent: ScaledClock = ScaledClock(speed=2.0, start=datetime(2024, 1, 1))
+    context, clock = spawn_workers(parent)
+    assert context.get_start_method() == "spawn"
+    assert clock.speed == 2.0
+
+    time.sleep(0.5)  # startup of the worker
+    sut: ScaledClock = pickle.loads(pickle.dumps(clock)).resume()
+    lag: float = (parent.now() - sut.now()).total_seconds()
+    assert abs(lag) < 0.1, f"Worker clock must continue the parent clock, off by {lag} s."
+    assert isinstance(clock, WorkerClock)
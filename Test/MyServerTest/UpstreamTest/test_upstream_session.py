@@ -0,0 +1,137 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from MyServer import OpcUaTestServer
+from MyServer.Lifetime import MachineModel
+from MyServer.OpcUa import ServerConfiguration, VALUE
+from MyServer.Sensor import TemperatureSensor
+from MyServer.Upstream import UpstreamSession, UpstreamDriver
+
+
+def upstream_server(port: int, sensors: int, directory) -> OpcUaTestServer:
+    model: MachineModel = MachineModel()
+    for i in range(sensors):
+        model.add_sensor(TemperatureSensor(i))
+    configuration = ServerConfiguration(company="Upstream", ip_address="0.0.0.0", fields=[], port=port)
+    return OpcUaTestServer(machine=model, server_configuration=configuration,
+                           machine_model_file=str(directory / f"upstream_{port}.json"), freq=0.0)
+
+
+def url(server: OpcUaTestServer) -> str:
+    return server.end_point.replace("0.0.0.0", "127.0.0.1")
+
+
+async def write(server: OpcUaTestServer, index: int, value: float):
+    sensor = server.model.sensors[index]
+    if sensor.running:
+        sensor.stop()  # only the values written by the test
+    await sensor.on_new_data(datetime.now(), value)
+
+
+async def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+@pytest.mark.asyncio
+async def test_concentrator(tmp_path):
+    upstreams = [upstream_server(48455 + i, 3, tmp_path) for i in range(2)]
+    for upstream in upstreams:
+        assert await upstream.setup_server(), "Upstream setup not completed."
+    model: MachineModel = MachineModel()
+    received: dict[int, float] = {}
+    sessions = [UpstreamSession(url(x), items_per_subscription=2) for x in upstreams]
+    for u, (upstream, session) in enumerate(zip(upstreams, sessions)):
+        for remote in upstream.model.sensors:
+            sensor = TemperatureSensor(10 * u + remote.identifier, namespace=f"Upstream/Plant{u}")
+            sensor.add_callback(lambda ts, v, i=sensor.identifier: received.__setitem__(i, v))
+            model.add_sensor(sensor, UpstreamDriver(sensor, session, upstream.node_id(remote, VALUE)))
+    configuration = ServerConfiguration(company="Concentrator", ip_address="0.0.0.0", fields=[], port=48457)
+    concentrator = OpcUaTestServer(machine=model, server_configuration=configuration,
+                                   machine_model_file=str(tmp_path / "concentrator.json"), freq=0.0)
+    assert await concentrator.setup_server(), "Concentrator setup not completed."
+    try:
+        for session in sessions:
+            assert await session.wait_connected(), f"Not connected to {session.url}."
+        start: float = time.monotonic()
+        await write(upstreams[0], 1, 42.0)
+        await write(upstreams[1], 2, 43.0)
+        assert await wait_for(lambda: received.get(1) == 42.0 and received.get(12) == 43.0)
+        latency: float = time.monotonic() - start
+        assert latency < 1.0, f"End-to-end latency {latency:.3f} s."
+        assert model.mutators[1].last_value() == 42.0
+    finally:
+        await concentrator.stop()
+        for upstream in upstreams:
+            await upstream.stop()
+    assert not any(x.running for x in sessions)
+
+
+@pytest.mark.asyncio
+async def test_reconnect(tmp_path):
+    upstream = upstream_server(48458, 1, tmp_path)
+    assert await upstream.setup_server(), "Upstream setup not completed."
+    node_id: str = upstream.node_id(upstream.model.sensors[0], VALUE)
+    session = UpstreamSession(url(upstream), reconnect_delay=0.2)
+    sensor = TemperatureSensor(1)
+    values: list[float] = []
+    sensor.add_callback(lambda ts, v: values.append(v))
+    UpstreamDriver(sensor, session, node_id)
+    session.start()
+    try:
+        assert await session.wait_connected()
+        await write(upstream, 0, 1.0)
+        assert await wait_for(lambda: 1.0 in values)
+
+        await upstream.stop()
+        assert await wait_for(lambda: not session.connected), "Loss of the upstream not detected."
+        upstream = upstream_server(48458, 1, tmp_path)
+        assert await upstream.setup_server(), "Upstream restart not completed."
+        assert await wait_for(lambda: session.connects == 2, 10.0), "Not reconnected."
+        await write(upstream, 0, 2.0)
+        assert await wait_for(lambda: 2.0 in values), "Not subscribed again."
+    finally:
+        await session.stop()
+        await upstream.stop()
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error(tmp_path):
+    upstream = upstream_server(48465, 1, tmp_path)
+    assert await upstream.setup_server(), "Upstream setup not completed."
+    session = UpstreamSession(url(upstream), reconnect_delay=0.2)
+    unknown = TemperatureSensor(2)
+    UpstreamDriver(unknown, session, "nsu=urn:Unknown:opcua:Sensors;i=1")  # not a namespace of the upstream
+    sensor = TemperatureSensor(1)
+    UpstreamDriver(sensor, session, upstream.node_id(upstream.model.sensors[0], VALUE))
+    session.start()
+    try:
+        assert not await session.wait_connected(0.5)
+        assert session.running, "Session ended on an unexpected error."
+        session.remove(unknown)
+        assert await session.wait_connected(), "Session did not connect again."
+    finally:
+        await session.stop()
+        await upstream.stop()
+
+
+def test_session_on_another_loop():
+    session = UpstreamSession.open("opc.tcp://127.0.0.1:48464/freeopcua/server/")  # nothing listens there
+
+    async def run() -> bool:
+        session.start()
+        connected: bool = await session.wait_connected(0.2)
+        await session.stop()
+        return connected
+
+    assert not asyncio.run(run())
+    assert not asyncio.run(run())  # started again on a new loop, as by a restarted server
+    asyncio.run(UpstreamSession.close_all())
+    assert UpstreamSession.open(session.url) is not session
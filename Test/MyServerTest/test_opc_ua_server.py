@@ -1,4 +1,3 @@
-import asyncio
 from typing import Any
 
 import pytest
@@ -10,6 +9,7 @@ from MyServer.MachineOperation import SensorId, Mode
 from MyServer.Sensor import TemperatureSensor
 from MyServer.Sensor.Base import SensorBase
 from MyServer.Simulation import SimulationDriver
+from MyServer.Timing import ManualClock
 
 
 class MachineModelMock(MachineModelBase):
@@ -61,7 +61,7 @@ def opc_ua_server():
 
     assert len(machine_mock.sensors) > 0, print("Sensor was not added to the system.")
 
-    yield OpcUaTestServer(machine=machine_mock)
+    yield OpcUaTestServer(machine=machine_mock, clock=ManualClock())
 
 @pytest.mark.asyncio
 async def test_setup_server(opc_ua_server: OpcUaTestServer):
@@ -93,7 +93,7 @@ async def test_setup_server(opc_ua_server: OpcUaTestServer):
             if isinstance(value, float):
                 new_value = value + 1.0
                 opc_ua_server.model.temperature = new_value
-                await asyncio.sleep(2.0 / sensor.updates_per_second)
+                await opc_ua_server.clock.advance(2.0 / sensor.updates_per_second)
                 test_value = await value_node.read_value()
                 test_time = await time_node.read_value()
                 assert abs(test_value - new_value) < 1e-12, f"Values mismatch: should be {new_value} but is {test_value}."
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from MyServer import OpcUaTestServer, ServerThread
+from MyServer.Lifetime import MachineModel
+from MyServer.MachineOperation import Mode
+from MyServer.OpcUa import ServerConfiguration
+from MyServer.Sensor import TemperatureSensor
+
+
+@pytest.mark.asyncio
+async def test_server_thread(tmp_path):
+    model: MachineModel = MachineModel()
+    sensor: TemperatureSensor = TemperatureSensor(1, updates_per_second=50)
+    model.add_sensor(sensor)
+    threads: set[str] = set()
+
+    async def callback(ts: datetime, value: float):
+        threads.add(threading.current_thread().name)
+    sensor.add_callback(callback)
+
+    configuration = ServerConfiguration(company="TestCompany.com", ip_address="0.0.0.0", fields=[], port=48410)
+    server: OpcUaTestServer = OpcUaTestServer(machine=model, server_configuration=configuration,
+                                              machine_model_file=str(tmp_path / "model.json"))
+    sut: ServerThread = ServerThread(server, name="test-server-thread")
+    sut.start()
+    try:
+        assert sut.running
+        assert await server.execute(server.setup_server), "Server setup not completed."
+        assert sensor.running
+        await asyncio.sleep(0.2)
+        assert threads == {"test-server-thread"}, f"Sensor sampled on {threads}."
+
+        await server.execute(model.start_job)
+        assert model.mode == Mode.RUNNING, "Command did not reach the model."
+    finally:
+        await asyncio.to_thread(sut.stop)
+    assert not sut.running
+    assert not sensor.running, "Sensors must stop with the server."
@@ -0,0 +1,45 @@
+import argparse
+import logging
+import sys
+
+from MyServer.Dataset import FastForwardGenerator, OutputFormat, Scenario
+from MyServer.Dataset.fast_forward_generator import MAX_SAMPLES_PER_CHUNK
+from MyServer.Lifetime import MachineModel
+
+
+def generate(configuration: str, scenario_file: str, directory: str, output_format: OutputFormat,
+             chunk_seconds: float, max_samples_per_chunk: int = MAX_SAMPLES_PER_CHUNK) -> list[str]:
+    """Generate a data set from a machine model configuration and a scenario."""
+    model: MachineModel = MachineModel()
+    model.restore_configuration(configuration)
+    scenario: Scenario = Scenario.load(scenario_file)
+    generator = FastForwardGenerator(model, scenario, directory, output_format=output_format,
+                                     chunk_seconds=chunk_seconds, max_samples_per_chunk=max_samples_per_chunk)
+    return generator.run()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate sensor data offline, in virtual time.")
+    parser.add_argument("--configuration", default="MachineModel.json",
+                        help="Machine model configuration, as written by the server")
+    parser.add_argument("--scenario", required=True,
+                        help="JSON file with start, duration and timed events of the scenario")
+    parser.add_argument("--output", default="dataset", help="Directory to write the files to")
+    parser.add_argument("--format", default=OutputFormat.PARQUET, choices=[x.value for x in OutputFormat],
+                        help="Format of the written files")
+    parser.add_argument("--chunk-seconds", type=float, default=3600.0,
+                        help="Virtual time covered by one file at most")
+    parser.add_argument("--max-samples-per-chunk", type=int, default=MAX_SAMPLES_PER_CHUNK,
+                        help="Samples of all sensors held in memory before they are written")
+    parser.add_argument(
+        "--logging-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        help="Set the logging level"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=getattr(logging, args.logging_level.upper(), logging.INFO), stream=sys.stdout,
+                        format="%(asctime)s [%(levelname)s] %(message)s")
+
+    generate(args.configuration, args.scenario, args.output, OutputFormat(args.format), args.chunk_seconds,
+             args.max_samples_per_chunk)
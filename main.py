@@ -1,23 +1,141 @@
+import asyncio
+import dataclasses
+import os
 import sys
+from contextlib import asynccontextmanager
 
-from MyServer import opc_ua_server
+from MyServer import opc_ua_server, ServerThread
+from MyServer.Supervision import EndpointSupervisor
+from MyServer.Timing import ScaledClock
 from fastapi import FastAPI
 from fastapi.responses import FileResponse
-from MyServer.Api import router_v01, router_examples
+from MyServer.Api import router_v01, router_examples, router_fleet
 from MyServer.Lifetime import MachineModel
+from MyServer.Fleet import Fleet, MachineTemplate
+from MyServer.Diagnostics import LogPipeline, RateLimitFilter
+from MyServer.OpcUa import Aggregation
 import logging
 from logging.handlers import RotatingFileHandler
 import uvicorn
 import argparse
 
-app = FastAPI(title="OPC UA Server Demo")
+FLEET_FILE: str = "Fleet.json"
+
+def parse_arguments(argv: list[str]) -> argparse.Namespace:
+    """Parse the command line of the service. Exits with a usage error on conflicting options."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--logging-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        help="Set the logging level"
+    )
+    parser.add_argument(
+        "--speed-factor",
+        type=float,
+        default=1.0,
+        help="Simulated seconds per real second, for example 10 or 100 to reach steady state faster"
+    )
+    parser.add_argument(
+        "--log-rate-limit",
+        type=int,
+        default=20,
+        help="Messages with the same text logged per 10 seconds, 0 to log everything"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="Worker processes running the simulation, 0 to simulate in the server process"
+    )
+    parser.add_argument(
+        "--endpoints",
+        nargs="*",
+        default=[],
+        metavar="NAMESPACE=PORT",
+        help="Serve the namespaces on OPC UA endpoints of their own, one worker process per port"
+    )
+    parser.add_argument(
+        "--max-folder-size",
+        type=int,
+        default=0,
+        help="Split folders with more sensors into subfolders of this size, 0 to keep flat folders"
+    )
+    parser.add_argument(
+        "--aggregation",
+        type=Aggregation,
+        default=Aggregation.NONE,
+        choices=list(Aggregation),
+        help="Publish the values of all sensors of a type or namespace as arrays in one node"
+    )
+    parser.add_argument(
+        "--pubsub-url",
+        default="",
+        metavar="URL",
+        help="Also publish the sensor values as OPC UA PubSub messages, for example opc.udp://239.0.0.1:4840"
+    )
+    parser.add_argument(
+        "--fleet",
+        default="",
+        metavar="TEMPLATE",
+        help="Host many machines in this process, each created from this machine model configuration"
+    )
+    parser.add_argument(
+        "--machines",
+        type=int,
+        default=100,
+        help="Number of machines created from the fleet template"
+    )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        help="Record configuration changes in an append-only journal next to the configuration file"
+    )
+    parser.add_argument(
+        "--history",
+        type=int,
+        default=1,
+        metavar="SAMPLES",
+        help="Latest samples kept per sensor for /v0.1/history, 1 keeps the current values only"
+    )
+    args = parser.parse_args(argv)
+    if args.journal and (args.fleet or args.endpoints):
+        parser.error("--journal records the configuration of the single machine model, it cannot be combined with "
+                     "--fleet or --endpoints")
+    return args
+
+
+@asynccontextmanager
+async def lifespan(fast_api: FastAPI):
+    if isinstance(fast_api.state.server, EndpointSupervisor):
+        # the endpoints run in worker processes, the supervisor only has to stop them
+        try:
+            yield
+        finally:
+            await fast_api.state.server.stop()
+        return
+    # the OPC UA server and the sensors get a loop of their own, request bursts must not delay the sampling
+    server_thread = ServerThread(fast_api.state.server)
+    server_thread.start()
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(server_thread.stop)
+
+app = FastAPI(title="OPC UA Server Demo", lifespan=lifespan)
+arguments: argparse.Namespace = parse_arguments(sys.argv[1:] if __name__ == '__main__' else [])
 machine_model: MachineModel = MachineModel()
-server = opc_ua_server.OpcUaTestServer(machine=machine_model)
+# with the journal the snapshot is read together with its journal instead of the plain configuration file
+server = opc_ua_server.OpcUaTestServer(machine=machine_model, journal=arguments.journal)
 app.state.server = server
 app.include_router(router_v01, prefix="/v0.1")
 app.include_router(router_examples, prefix="/v0.1")
+app.include_router(router_fleet, prefix="/v0.1")
 
-def start_service(level, port: int = 8765):
+def start_service(level, port: int = 8765, speed_factor: float = 1.0, log_rate_limit: int = 20, shards: int = 0,
+                  endpoints: dict[str, int] | None = None, max_folder_size: int = 0,
+                  aggregation: Aggregation = Aggregation.NONE, pubsub_url: str = "", fleet: str = "",
+                  machines: int = 0, history: int = 1):
     handler = RotatingFileHandler(
         "DataSourceDemo.log",
         maxBytes=10_485_760,  # 10 MB,
@@ -29,32 +147,68 @@ def start_service(level, port: int = 8765):
     stream_handler = logging.StreamHandler(sys.stdout)
     stream_handler.setFormatter(formatter)
 
+    # logging during the import implicitly attached a synchronous stderr handler, everything goes through the queue
     root_logger = logging.getLogger()
-    root_logger.setLevel(level)
-    root_logger.addHandler(handler)
-    root_logger.addHandler(stream_handler)
+    for existing in list(root_logger.handlers):
+        root_logger.removeHandler(existing)
+
+    # file and console are written from a background thread, a slow disk must not stall the sampling
+    rate_limit = RateLimitFilter(burst=log_rate_limit) if log_rate_limit > 0 else None
+    pipeline = LogPipeline([handler, stream_handler], rate_limit=rate_limit)
+    pipeline.install(level)
 
     for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
         logger = logging.getLogger(name)
-        logger.setLevel(level)
-        logger.addHandler(handler)
+        logger.setLevel(level)  # propagates to the root logger
 
-    logging.info(f"Starting FastAPI service on port {port}.")
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=False, log_config=None)
+    if max_folder_size > 0:
+        server.configuration = dataclasses.replace(server.configuration, max_folder_size=max_folder_size)
+    if aggregation != Aggregation.NONE:
+        server.configuration = dataclasses.replace(server.configuration, aggregation=aggregation)
+    if pubsub_url:
+        server.configuration = dataclasses.replace(server.configuration, pubsub_url=pubsub_url)
+    if history != 1:
+        server.configuration = dataclasses.replace(server.configuration, history_depth=history)
+    if fleet:
+        # many machines in this process, each under a folder and a REST prefix of its own
+        fleet_model: Fleet = Fleet()
+        if os.path.isfile(FLEET_FILE):
+            # restored by the server with the seeds and overrides saved, the template is for a new fleet only
+            logging.info("Restoring the fleet from %s, --fleet and --machines are not used.", FLEET_FILE)
+        else:
+            template: MachineTemplate = MachineTemplate.from_file(fleet)
+            width: int = len(str(max(machines - 1, 0)))
+            for i in range(machines):
+                fleet_model.add_machine(f"Machine{i:0{width}d}", template)
+        app.state.server = opc_ua_server.OpcUaTestServer(machine=fleet_model,
+                                                         server_configuration=server.configuration,
+                                                         machine_model_file=FLEET_FILE,
+                                                         clock=ScaledClock(speed_factor))
+    elif endpoints:
+        app.state.server = EndpointSupervisor(endpoints, server_configuration=server.configuration,
+                                              clock=ScaledClock(speed_factor))
+    else:
+        if speed_factor != 1.0:
+            app.state.server.clock.speed = speed_factor
+        app.state.server.shards = shards
+
+    logging.info("Starting FastAPI service on port %s.", port)
+    try:
+        # pass the instance, importing "main:app" would create a second server next to the configured one
+        uvicorn.run(app, host="0.0.0.0", port=port, reload=False, log_config=None)
+    finally:
+        pipeline.stop()
 
 @app.get("/", response_class=FileResponse)
 async def root():
     return "static/index.html"
 
 if __name__ == '__main__':
-    parser = argparse.ArgumentParser()
-    parser.add_argument(
-        "--logging-level",
-        default="DEBUG",
-        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
-        help="Set the logging level"
-    )
-    args = parser.parse_args()
-    log_level = getattr(logging, args.logging_level.upper(), logging.INFO)
+    log_level = getattr(logging, arguments.logging_level.upper(), logging.INFO)
 
-    start_service(log_level)
+    start_service(log_level, speed_factor=arguments.speed_factor, log_rate_limit=arguments.log_rate_limit,
+                  shards=arguments.shards,
+                  endpoints={k: int(v) for k, v in (x.split("=", 1) for x in arguments.endpoints)},
+                  max_folder_size=arguments.max_folder_size, aggregation=arguments.aggregation,
+                  pubsub_url=arguments.pubsub_url, fleet=arguments.fleet, machines=arguments.machines,
+                  history=arguments.history)